@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for extraction throughput and latency.
+
+Test media is generated locally with ffmpeg's lavfi sources (sine,
+anoisesrc, testsrc), so runs are reproducible on any machine with ffmpeg.
+Results are written as JSON tagged with the machine they ran on, and can be
+compared against a saved baseline to flag regressions.
+
+Examples:
+    python scripts/benchmark.py --quick
+    python scripts/benchmark.py --save-baseline benchmarks/baseline.json
+    python scripts/benchmark.py --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from audio_extractor_ui.capabilities import find_ffmpeg  # noqa: E402
+from audio_extractor_ui.core import AudioExtractor  # noqa: E402
+
+# Generated sources: name -> (lavfi audio, lavfi video or None, codec args,
+# extension). All generators are seeded or deterministic, and the files are
+# written bit-exact, so every machine benchmarks identical inputs.
+MEDIA = {
+    "sine-aac-mp4": (
+        "sine=frequency=440:sample_rate=48000",
+        "testsrc=size=320x240:rate=25",
+        ["-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-b:a", "128k"],
+        "mp4",
+    ),
+    "noise-opus-mkv": (
+        "anoisesrc=color=pink:seed=42:sample_rate=48000",
+        "testsrc=size=320x240:rate=25",
+        ["-c:v", "libx264", "-preset", "ultrafast", "-c:a", "libopus", "-b:a", "96k"],
+        "mkv",
+    ),
+    "sine-mp3": (
+        "sine=frequency=1000:sample_rate=44100",
+        None,
+        ["-c:a", "libmp3lame", "-b:a", "192k"],
+        "mp3",
+    ),
+    "noise-pcm-wav": (
+        "anoisesrc=color=white:seed=7:sample_rate=44100",
+        None,
+        ["-c:a", "pcm_s16le"],
+        "wav",
+    ),
+}
+
+DURATIONS = {"short": 10, "medium": 60, "long": 300}
+QUICK_DURATIONS = {"short": 10}
+
+FORMATS = ["mp3", "wav", "flac", "aac"]
+QUALITIES = ["high", "medium", "low"]
+
+# Median latency increase (relative) reported as a regression
+DEFAULT_THRESHOLD = 0.15
+
+
+def generate_media(media_dir, durations, ffmpeg):
+    """Create the benchmark inputs that do not exist yet."""
+    media_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    for name, (audio, video, codec_args, extension) in MEDIA.items():
+        for label, seconds in durations.items():
+            path = media_dir / f"{name}-{label}.{extension}"
+            if path.exists():
+                files.append((path, seconds))
+                continue
+            print(f"🎛️  Generating {path.name}")
+            cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-y"]
+            cmd.extend(["-f", "lavfi", "-i", f"{audio}:duration={seconds}"])
+            if video:
+                cmd.extend(["-f", "lavfi", "-i", f"{video}:duration={seconds}"])
+            cmd.extend(codec_args)
+            cmd.extend(["-map_metadata", "-1", "-fflags", "+bitexact"])
+            cmd.extend(["-flags:a", "+bitexact", str(path)])
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                # e.g. an ffmpeg build without libx264 or libopus
+                print(f"⚠️  Skipping {path.name}: {result.stderr.strip()}")
+                path.unlink(missing_ok=True)
+                continue
+            files.append((path, seconds))
+    return files
+
+
+def machine_info(ffmpeg):
+    """Describe the machine and toolchain a run was made on."""
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+
+    ffmpeg_version = subprocess.run(
+        [ffmpeg, "-version"], capture_output=True, text=True
+    ).stdout.split("\n", 1)[0]
+    commit = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    ).stdout.strip()
+    return {
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu": cpu_model,
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": ffmpeg_version,
+        "commit": commit or None,
+    }
+
+
+def measure(func, repeat):
+    """Run ``func`` ``repeat`` times; return latencies and the last result."""
+    latencies = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        latencies.append(time.perf_counter() - start)
+    return latencies, result
+
+
+def summarize(latencies, media_seconds, input_bytes):
+    """Latency statistics and throughput of one scenario."""
+    median = statistics.median(latencies)
+    return {
+        "runs": len(latencies),
+        "median": round(median, 4),
+        "min": round(min(latencies), 4),
+        "max": round(max(latencies), 4),
+        "realtime_factor": round(media_seconds / median, 2) if median else None,
+        "mb_per_second": round(input_bytes / median / 1e6, 2) if median else None,
+    }
+
+
+def run_suite(files, formats, qualities, repeat, work_dir):
+    """Benchmark single files, time ranges and batches."""
+    extractor = AudioExtractor()
+    extractor.output_dir = work_dir / "out"
+    scenarios = {}
+
+    def record(key, latencies, result, media_seconds, input_bytes):
+        entry = summarize(latencies, media_seconds, input_bytes)
+        entry["success"] = bool(result.get("success"))
+        if result.get("metrics"):
+            entry["stages"] = result["metrics"].get("stages")
+        scenarios[key] = entry
+        status = "✅" if entry["success"] else "❌"
+        print(
+            f"{status} {key}: {entry['median']:.3f}s median, "
+            f"{entry['realtime_factor']}x realtime"
+        )
+
+    for path, seconds in files:
+        size = path.stat().st_size
+        for output_format in formats:
+            for quality in qualities:
+                latencies, result = measure(
+                    lambda: extractor.extract_from_file(
+                        str(path), output_format, quality, engine="ffmpeg"
+                    ),
+                    repeat,
+                )
+                key = f"file/{path.stem}/{output_format}/{quality}"
+                record(key, latencies, result, seconds, size)
+
+            # A 5 s window from the middle exercises input seeking
+            start = max(0, seconds // 2 - 2)
+            latencies, result = measure(
+                lambda: extractor.extract_from_file(
+                    str(path),
+                    output_format,
+                    "medium",
+                    start_time=str(start),
+                    duration="5",
+                    engine="ffmpeg",
+                ),
+                repeat,
+            )
+            record(f"range/{path.stem}/{output_format}", latencies, result, 5, size)
+
+    batch_dir = work_dir / "batch"
+    batch_dir.mkdir(exist_ok=True)
+    for path, _ in files:
+        shutil.copy2(path, batch_dir / path.name)
+    total_seconds = sum(seconds for _, seconds in files)
+    total_bytes = sum(path.stat().st_size for path, _ in files)
+    for output_format in formats:
+        latencies, result = measure(
+            lambda: extractor.batch_extract(
+                str(batch_dir), output_format, "medium", sniff=False
+            ),
+            repeat,
+        )
+        key = f"batch/{len(files)}-files/{output_format}"
+        record(key, latencies, result, total_seconds, total_bytes)
+
+    return scenarios
+
+
+def compare(current, baseline, threshold):
+    """
+    Compare scenario medians against a baseline.
+
+    Returns:
+        List of (scenario, baseline median, current median, change)
+        for scenarios slower than ``threshold``
+    """
+    regressions = []
+    for key, entry in current.items():
+        reference = baseline.get(key)
+        if not reference or not reference.get("median") or not entry.get("median"):
+            continue
+        change = entry["median"] / reference["median"] - 1
+        if change > threshold:
+            regressions.append((key, reference["median"], entry["median"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audio extraction")
+    parser.add_argument(
+        "--quick", action="store_true", help="Short media, mp3/flac, high quality"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario")
+    parser.add_argument(
+        "--media-dir",
+        default=str(ROOT / "benchmarks" / "media"),
+        help="Where generated media is kept between runs",
+    )
+    parser.add_argument(
+        "--results-dir",
+        default=str(ROOT / "benchmarks" / "results"),
+        help="Where result JSON files are written",
+    )
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="Also write the results here")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative median slowdown reported as a regression",
+    )
+    args = parser.parse_args()
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("❌ ffmpeg not found; it is needed to generate and extract media")
+        sys.exit(2)
+
+    durations = QUICK_DURATIONS if args.quick else DURATIONS
+    formats = ["mp3", "flac"] if args.quick else FORMATS
+    qualities = ["high"] if args.quick else QUALITIES
+    files = generate_media(Path(args.media_dir), durations, ffmpeg)
+
+    with tempfile.TemporaryDirectory(prefix="audio-benchmark-") as temp_dir:
+        scenarios = run_suite(files, formats, qualities, args.repeat, Path(temp_dir))
+
+    machine = machine_info(ffmpeg)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine,
+        "options": {"quick": args.quick, "repeat": args.repeat},
+        "scenarios": scenarios,
+    }
+
+    results_dir = Path(args.results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    result_path = results_dir / f"{machine['host']}-{stamp}.json"
+    result_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"📄 Results written to {result_path}")
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save_baseline).write_text(
+            json.dumps(report, indent=2), encoding="utf-8"
+        )
+        print(f"📌 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("machine", {}).get("host") != machine["host"]:
+            print("⚠️  Baseline was recorded on a different machine")
+        regressions = compare(scenarios, baseline.get("scenarios", {}), args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions:")
+            for key, before, after, change in regressions:
+                print(f"   {key}: {before:.3f}s -> {after:.3f}s (+{change:.0%})")
+            sys.exit(1)
+        print("✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
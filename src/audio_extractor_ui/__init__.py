@@ -9,9 +9,8 @@ __description__ = (
     "A user interface for extracting audio from videos using ffmpeg and yt-dlp"
 )
 
-# Package imports
-from . import core
-from . import utils
+# Submodules are imported on first attribute access to keep startup cheap
+_LAZY_SUBMODULES = ("core", "utils")
 
 __all__ = [
     "__version__",
@@ -21,3 +20,12 @@ __all__ = [
     "core",
     "utils",
 ]
+
+
+def __getattr__(name: str) -> object:
+    """Import submodules lazily on first access."""
+    if name in _LAZY_SUBMODULES:
+        import importlib
+
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
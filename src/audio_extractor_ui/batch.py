@@ -0,0 +1,151 @@
+"""
+Parallel batch extraction over a stream of input files.
+"""
+
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Optional, Any, Generator, Iterable, List, Set
+
+from .metrics import summarize_timings
+from .resources import summarize_resources
+from .results import BatchResult, ExtractionResult
+from .scheduling import JobQueue, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+# Default number of concurrent extraction jobs
+DEFAULT_BATCH_WORKERS = min(32, os.cpu_count() or 1)
+
+
+def run_batch(
+    extractor: Any,
+    input_files: Iterable[Any],
+    output_format: str = "mp3",
+    quality: str = "high",
+    max_workers: Optional[int] = None,
+    duplicates: Optional[Any] = None,
+    controller: Optional[Any] = None,
+    queue: Optional[JobQueue] = None,
+    **options: Any,
+) -> Generator[ExtractionResult, None, None]:
+    """
+    Extract audio from many files concurrently.
+
+    Input files are consumed lazily, so a discovery generator can keep
+    walking while the first jobs already run. Jobs run in the background
+    lane of the shared job queue, so GUI extractions go first. At most
+    ``max_workers`` of them are queued or running at any time, however many
+    threads the queue has.
+
+    Args:
+        extractor: AudioExtractor used for each file
+        input_files: Iterable of input file paths (or other inputs of
+            ``extract_from_file``, e.g. ArchiveMembers)
+        output_format: Audio format (mp3, wav, flac, aac)
+        quality: Audio quality (high, medium, low)
+        max_workers: Number of concurrent jobs (defaults to the CPU count)
+        duplicates: DuplicateFilter skipping near-duplicate sources
+            (optional, see fingerprint.py)
+        controller: ConcurrencyController choosing the number of jobs in
+            flight and each job's ffmpeg threads (optional; replaces the
+            fixed ``max_workers`` window, see concurrency.py)
+        queue: JobQueue running the jobs (optional, the shared queue by
+            default)
+        **options: Extra keyword arguments for ``extract_from_file``
+
+    Yields:
+        ExtractionResult per file, with "input" set, in completion order
+    """
+    workers = max(1, max_workers or DEFAULT_BATCH_WORKERS)
+    if controller is not None:
+        workers = controller.max_jobs
+
+    def window() -> int:
+        return controller.jobs if controller is not None else workers
+
+    def extract(path: Any) -> ExtractionResult:
+        job_options = options
+        if controller is not None:
+            job_options = dict(options, threads=controller.threads)
+        try:
+            if duplicates is not None:
+                result = duplicates.extract(
+                    extractor, path, output_format, quality, **job_options
+                )
+            else:
+                result = extractor.extract_from_file(
+                    path, output_format, quality, **job_options
+                )
+        except Exception as e:
+            logger.error(f"Batch job failed for {path}: {e}")
+            result = ExtractionResult.failure(str(e))
+        result = ExtractionResult.from_dict(result)
+        result.input = path
+        if controller is not None:
+            input_bytes = result.input_bytes
+            if input_bytes is None and isinstance(path, (str, os.PathLike)):
+                try:
+                    input_bytes = os.path.getsize(path)
+                except OSError:
+                    pass
+            # Archive members and streams count as jobs of unknown size
+            controller.job_finished(input_bytes or 0)
+        return result
+
+    files = iter(input_files)
+    if queue is None:
+        queue = get_job_queue()
+    queue.reserve(workers)
+    pending: Set[Future] = set()
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window():
+                path = next(files, None)
+                if path is None:
+                    exhausted = True
+                    break
+                pending.add(queue.submit(extract, path))
+
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if controller is not None:
+                controller.update()
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        # Jobs already running still finish before the batch returns
+        wait(pending)
+
+
+def summarize_batch(results: List[ExtractionResult]) -> BatchResult:
+    """
+    Combine per-file results into a batch result.
+
+    Args:
+        results: Per-file results from ``run_batch``
+
+    Returns:
+        BatchResult containing the batch extraction results
+    """
+    failed = [r for r in results if not r.get("success")]
+    errors = "\n".join(f"{r['input']}: {r.get('error', '')}" for r in failed)
+    return BatchResult(
+        success=bool(results) and not failed,
+        error=errors,
+        output=(
+            f"Processed {len(results)} files: "
+            f"{len(results) - len(failed)} succeeded, {len(failed)} failed"
+        ),
+        exit_code=0 if results and not failed else 1,
+        processed=len(results),
+        failed=len(failed),
+        timings=summarize_timings(results),
+        resources=summarize_resources(results),
+        results=results,
+    )
@@ -0,0 +1,232 @@
+"""
+On-disk cache location, helpers and the per-source media metadata cache.
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .prometheus import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Environment variable overriding the cache directory
+CACHE_DIR_ENV = "AUDIO_EXTRACTOR_CACHE_DIR"
+
+# Records kept in memory by MediaCache (least recently used are dropped)
+DEFAULT_MEMORY_RECORDS = 1024
+
+
+def get_cache_dir() -> Path:
+    """
+    Get (and create) the per-user cache directory.
+
+    Honours ``AUDIO_EXTRACTOR_CACHE_DIR``, then the platform convention
+    (``%LOCALAPPDATA%`` on Windows, ``$XDG_CACHE_HOME`` or ``~/.cache``
+    elsewhere).
+
+    Returns:
+        Path object for the cache directory
+    """
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        cache_dir = Path(override)
+    elif sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home())
+        cache_dir = Path(base) / "audio-extractor-ui" / "cache"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+        cache_dir = Path(base) / "audio-extractor-ui"
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def read_json(path: Path) -> Optional[Any]:
+    """
+    Read a JSON cache file.
+
+    Args:
+        path: Path to the cache file
+
+    Returns:
+        Decoded data, or None if the file is missing or unreadable
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable cache file {path}: {e}")
+        return None
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """
+    Write a JSON cache file atomically.
+
+    The data is written to a temporary file in the same directory and
+    renamed over the target, so readers never see a partial file.
+
+    Args:
+        path: Path to the cache file
+        data: JSON-serializable data
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class MediaCache:
+    """
+    Per-source metadata records (probe results, measurements, ...).
+
+    Records are keyed by the source's absolute path and are only returned
+    while its size and mtime are unchanged, so every stage that learns
+    something about a source can store it once and reuse it for later
+    extractions of the same file. Recently used records are also kept in
+    memory, up to ``max_memory`` of them, so a long batch does not grow
+    the process.
+    """
+
+    def __init__(
+        self, root: Optional[Path] = None, max_memory: int = DEFAULT_MEMORY_RECORDS
+    ):
+        """
+        Initialize the media cache.
+
+        Args:
+            root: Directory holding the records (optional, defaults to
+                ``media`` in the user cache directory)
+            max_memory: Records kept in memory at most
+        """
+        self._root = root
+        self._lock = threading.Lock()
+        self.max_memory = max(1, max_memory)
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @property
+    def root(self) -> Path:
+        """Directory holding the records."""
+        if self._root is None:
+            self._root = get_cache_dir() / "media"
+        return self._root
+
+    def _locate(self, path: str) -> Optional[Tuple[Path, Dict[str, int]]]:
+        """Get the record file and current stamp of a source."""
+        import hashlib
+
+        absolute = os.path.abspath(path)
+        try:
+            stat = os.stat(absolute)
+        except OSError:
+            return None
+        digest = hashlib.sha1(os.fsencode(absolute)).hexdigest()
+        stamp = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        return self.root / digest[:2] / f"{digest}.json", stamp
+
+    def load(self, path: str) -> Dict[str, Any]:
+        """
+        Get all cached fields for a source.
+
+        Args:
+            path: Path to the source file
+
+        Returns:
+            Dict of cached fields (empty if none or if the file changed)
+        """
+        located = self._locate(path)
+        if located is None:
+            return {}
+        record_path, stamp = located
+
+        with self._lock:
+            record = self._memory.get(str(record_path))
+        if record is None:
+            record = read_json(record_path)
+        if not isinstance(record, dict) or record.get("stamp") != stamp:
+            return {}
+
+        with self._lock:
+            self._remember(str(record_path), record)
+        return dict(record.get("fields", {}))
+
+    def get(self, path: str, field: str, default: Any = None) -> Any:
+        """Get one cached field for a source."""
+        fields = self.load(path)
+        CACHE_LOOKUPS.inc(field=field, result="hit" if field in fields else "miss")
+        return fields.get(field, default)
+
+    def set(self, path: str, field: str, value: Any) -> None:
+        """
+        Store one field for a source.
+
+        Args:
+            path: Path to the source file
+            field: Field name
+            value: JSON-serializable value
+        """
+        located = self._locate(path)
+        if located is None:
+            return
+        record_path, stamp = located
+
+        with self._lock:
+            fields = self._load_unlocked(record_path, stamp)
+            fields[field] = value
+            record = {
+                "path": os.path.abspath(path),
+                "stamp": stamp,
+                "fields": fields,
+            }
+            self._remember(str(record_path), record)
+            try:
+                write_json_atomic(record_path, record)
+            except OSError as e:
+                logger.warning(f"Could not write media cache record: {e}")
+
+    def _load_unlocked(
+        self, record_path: Path, stamp: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """Read the fields of a record (caller holds the lock)."""
+        record = self._memory.get(str(record_path)) or read_json(record_path)
+        if not isinstance(record, dict) or record.get("stamp") != stamp:
+            return {}
+        return dict(record.get("fields", {}))
+
+    def _remember(self, key: str, record: Dict[str, Any]) -> None:
+        """Keep a record in memory as most recently used (caller holds the lock)."""
+        self._memory[key] = record
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+
+_media_cache: Optional[MediaCache] = None
+
+
+def get_media_cache() -> MediaCache:
+    """Get the shared media cache."""
+    global _media_cache
+    if _media_cache is None:
+        _media_cache = MediaCache()
+    return _media_cache
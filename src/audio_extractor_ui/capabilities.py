@@ -0,0 +1,376 @@
+"""
+Dependency and encoder capability detection.
+
+Probing ffmpeg and yt-dlp is done once and the resulting capability matrix
+is cached on disk with a TTL. The cache is invalidated early when the
+ffmpeg binary or the yt-dlp installation changes (path, mtime or size), so
+engine choices can be made from the matrix without per-job probing.
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from .cache import get_cache_dir, read_json, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the cached matrix changes
+MATRIX_VERSION = 1
+
+# Default time-to-live of the on-disk matrix, in seconds
+DEFAULT_TTL = 24 * 60 * 60
+
+# Default interval between checks of the binary stamps, in seconds; within
+# it the in-memory matrix is returned without touching the file system
+DEFAULT_REVALIDATE_INTERVAL = 30.0
+
+# Environment variable overriding the ffmpeg binary to use
+FFMPEG_ENV = "AUDIO_EXTRACTOR_FFMPEG"
+
+# Encoders whose presence is tracked in the matrix
+TRACKED_ENCODERS = [
+    "libmp3lame",
+    "aac",
+    "aac_at",
+    "libfdk_aac",
+    "flac",
+    "libopus",
+    "opus",
+    "pcm_s16le",
+]
+
+# Encoder candidates per output format, fastest first
+ENCODER_PREFERENCES: Dict[str, List[str]] = {
+    "mp3": ["libmp3lame"],
+    "aac": ["aac_at", "libfdk_aac", "aac"],
+    "flac": ["flac"],
+    "wav": ["pcm_s16le"],
+    "opus": ["libopus", "opus"],
+}
+
+
+def find_ffmpeg() -> Optional[str]:
+    """Locate the ffmpeg binary, honouring ``AUDIO_EXTRACTOR_FFMPEG``."""
+    override = os.environ.get(FFMPEG_ENV)
+    if override:
+        return override if Path(override).exists() else None
+    return shutil.which("ffmpeg")
+
+
+def find_ffprobe() -> Optional[str]:
+    """Locate the ffprobe binary next to ffmpeg, or on PATH."""
+    ffmpeg = find_ffmpeg()
+    if ffmpeg:
+        ffmpeg_path = Path(ffmpeg)
+        sibling = ffmpeg_path.with_name(
+            ffmpeg_path.name.replace("ffmpeg", "ffprobe")
+        )
+        if sibling != ffmpeg_path and sibling.exists():
+            return str(sibling)
+    return shutil.which("ffprobe")
+
+
+def _find_ytdlp_origin() -> Optional[str]:
+    """Locate the installed yt-dlp package without importing it."""
+    import importlib.util
+
+    try:
+        spec = importlib.util.find_spec("yt_dlp")
+    except (ImportError, ValueError):
+        spec = None
+    if spec is not None and spec.origin:
+        return spec.origin
+    return shutil.which("yt-dlp")
+
+
+def _file_stamp(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Identify a file by resolved path, mtime and size."""
+    if not path:
+        return None
+    try:
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+    except OSError:
+        return None
+    return {
+        "path": str(resolved),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def _run(cmd: List[str]) -> str:
+    """Run a probe command and return its stdout ("" on failure)."""
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, timeout=30
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Capability probe {cmd[:2]} failed: {e}")
+        return ""
+    return result.stdout
+
+
+def parse_ffmpeg_version(output: str) -> Optional[str]:
+    """Extract the version from ``ffmpeg -version`` output."""
+    match = re.search(r"ffmpeg version (\S+)", output)
+    return match.group(1) if match else None
+
+
+def parse_ffmpeg_configuration(output: str) -> List[str]:
+    """Extract the ``--enable-*`` build flags from ``ffmpeg -version``."""
+    return re.findall(r"--enable-([\w-]+)", output)
+
+
+def parse_encoders(output: str) -> List[str]:
+    """Extract audio encoder names from ``ffmpeg -encoders`` output."""
+    encoders = []
+    in_list = False
+    for line in output.splitlines():
+        if line.strip().startswith("------"):
+            in_list = True
+            continue
+        if not in_list:
+            continue
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith("A"):
+            encoders.append(parts[1])
+    return encoders
+
+
+def parse_hwaccels(output: str) -> List[str]:
+    """Extract method names from ``ffmpeg -hwaccels`` output."""
+    lines = output.splitlines()
+    for index, line in enumerate(lines):
+        if line.strip().lower().startswith("hardware acceleration methods"):
+            return [entry.strip() for entry in lines[index + 1:] if entry.strip()]
+    return []
+
+
+def parse_filters(output: str) -> List[str]:
+    """Extract filter names from ``ffmpeg -filters`` output."""
+    filters = []
+    for line in output.splitlines():
+        parts = line.split()
+        # Filter lines look like " TSC aresample  A->A  Resample audio..."
+        if len(parts) >= 3 and "->" in parts[2]:
+            filters.append(parts[1])
+    return filters
+
+
+def detect_ytdlp_version() -> Optional[str]:
+    """Detect the installed yt-dlp version without importing it."""
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        return None
+
+    try:
+        return version("yt-dlp")
+    except PackageNotFoundError:
+        pass
+
+    binary = shutil.which("yt-dlp")
+    if binary:
+        return _run([binary, "--version"]).strip() or None
+    return None
+
+
+def probe_capabilities(ffmpeg: Optional[str]) -> Dict[str, Any]:
+    """
+    Probe ffmpeg and yt-dlp for their capabilities.
+
+    Args:
+        ffmpeg: Path to the ffmpeg binary (None if not installed)
+
+    Returns:
+        Dict describing versions, encoders, hwaccels and filters
+    """
+    matrix: Dict[str, Any] = {
+        "ffmpeg": None,
+        "configuration": [],
+        "encoders": {name: False for name in TRACKED_ENCODERS},
+        "audio_encoders": [],
+        "hwaccels": [],
+        "filters": [],
+        "yt-dlp": detect_ytdlp_version(),
+    }
+
+    if not ffmpeg:
+        return matrix
+
+    version_output = _run([ffmpeg, "-hide_banner", "-version"])
+    encoders = parse_encoders(_run([ffmpeg, "-hide_banner", "-encoders"]))
+
+    matrix["ffmpeg"] = parse_ffmpeg_version(version_output)
+    matrix["configuration"] = parse_ffmpeg_configuration(version_output)
+    matrix["audio_encoders"] = encoders
+    matrix["encoders"] = {name: name in encoders for name in TRACKED_ENCODERS}
+    matrix["hwaccels"] = parse_hwaccels(
+        _run([ffmpeg, "-hide_banner", "-hwaccels"])
+    )
+    matrix["filters"] = parse_filters(_run([ffmpeg, "-hide_banner", "-filters"]))
+    return matrix
+
+
+class CapabilityService:
+    """Cached capability matrix for ffmpeg and yt-dlp."""
+
+    def __init__(
+        self,
+        cache_path: Optional[Path] = None,
+        ttl: float = DEFAULT_TTL,
+        revalidate_interval: float = DEFAULT_REVALIDATE_INTERVAL,
+    ):
+        """
+        Initialize the capability service.
+
+        Args:
+            cache_path: Path of the on-disk matrix (optional, defaults to
+                ``capabilities.json`` in the user cache directory)
+            ttl: Maximum age of the cached matrix in seconds
+            revalidate_interval: Seconds during which the in-memory matrix
+                is trusted without re-stamping the ffmpeg and yt-dlp
+                installations
+        """
+        self._cache_path = cache_path
+        self.ttl = ttl
+        self.revalidate_interval = revalidate_interval
+        self._lock = threading.Lock()
+        self._matrix: Optional[Dict[str, Any]] = None
+        self._validated_at = float("-inf")
+
+    @property
+    def cache_path(self) -> Path:
+        """Path of the on-disk matrix."""
+        if self._cache_path is None:
+            self._cache_path = get_cache_dir() / "capabilities.json"
+        return self._cache_path
+
+    def _stamps(self) -> Dict[str, Any]:
+        """Identify the binaries the matrix was probed from."""
+        ffmpeg = find_ffmpeg()
+        return {
+            "ffmpeg_path": ffmpeg,
+            "ffmpeg": _file_stamp(ffmpeg),
+            "yt-dlp": _file_stamp(_find_ytdlp_origin()),
+        }
+
+    def _is_fresh(self, matrix: Any, stamps: Dict[str, Any]) -> bool:
+        """Check a cached matrix against the TTL and binary stamps."""
+        if not isinstance(matrix, dict):
+            return False
+        if matrix.get("version") != MATRIX_VERSION:
+            return False
+        if time.time() - matrix.get("probed_at", 0) > self.ttl:
+            return False
+        return matrix.get("stamps") == stamps
+
+    def get_matrix(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get the capability matrix, probing only when the cache is stale.
+
+        Args:
+            refresh: Force a new probe regardless of the cache
+
+        Returns:
+            Dict describing versions, encoders, hwaccels and filters
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (
+                not refresh
+                and self._matrix is not None
+                and now - self._validated_at < self.revalidate_interval
+                and time.time() - self._matrix.get("probed_at", 0) <= self.ttl
+            ):
+                return self._matrix
+
+            stamps = self._stamps()
+            self._validated_at = now
+
+            if not refresh and self._is_fresh(self._matrix, stamps):
+                return self._matrix
+
+            if not refresh:
+                cached = read_json(self.cache_path)
+                if self._is_fresh(cached, stamps):
+                    self._matrix = cached
+                    return cached
+
+            logger.info("Probing ffmpeg and yt-dlp capabilities")
+            matrix = probe_capabilities(stamps["ffmpeg_path"])
+            matrix.update(
+                {
+                    "version": MATRIX_VERSION,
+                    "probed_at": time.time(),
+                    "stamps": stamps,
+                }
+            )
+
+            try:
+                write_json_atomic(self.cache_path, matrix)
+            except OSError as e:
+                logger.warning(f"Could not persist capability matrix: {e}")
+
+            self._matrix = matrix
+            return matrix
+
+    def has_ffmpeg(self) -> bool:
+        """Check whether a working ffmpeg was found."""
+        return self.get_matrix()["ffmpeg"] is not None
+
+    def has_encoder(self, name: str) -> bool:
+        """Check whether ffmpeg offers an audio encoder."""
+        return name in self.get_matrix()["audio_encoders"]
+
+    def has_filter(self, name: str) -> bool:
+        """Check whether ffmpeg offers a filter."""
+        return name in self.get_matrix()["filters"]
+
+    def has_build_flag(self, name: str) -> bool:
+        """Check whether ffmpeg was configured with ``--enable-<name>``."""
+        return name in self.get_matrix()["configuration"]
+
+    def select_encoder(self, output_format: str) -> Optional[str]:
+        """
+        Choose the fastest available encoder for an output format.
+
+        Args:
+            output_format: Audio format (mp3, wav, flac, aac)
+
+        Returns:
+            Encoder name, or None if no candidate is available
+        """
+        available = self.get_matrix()["audio_encoders"]
+        for candidate in ENCODER_PREFERENCES.get(output_format, []):
+            if candidate in available:
+                return candidate
+        return None
+
+    def get_dependency_versions(self) -> Dict[str, Any]:
+        """Get the detected ffmpeg and yt-dlp versions."""
+        matrix = self.get_matrix()
+        return {
+            "ffmpeg": matrix["ffmpeg"] or "missing",
+            "yt-dlp": matrix["yt-dlp"] or "missing",
+        }
+
+
+_capability_service: Optional[CapabilityService] = None
+
+
+def get_capability_service() -> CapabilityService:
+    """Get the shared capability service."""
+    global _capability_service
+    if _capability_service is None:
+        _capability_service = CapabilityService()
+    return _capability_service
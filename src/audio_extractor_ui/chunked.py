@@ -0,0 +1,383 @@
+"""
+Split-and-parallel encoding of one long input.
+
+Most audio encoders are single-threaded, so a long recording is cut into
+sample-accurate segments that are encoded by concurrent ffmpeg processes
+and joined with the concat demuxer without re-encoding:
+
+* PCM and FLAC segments are cut exactly and simply concatenated.
+* MP3 and AAC segments start a few codec frames early (pre-roll) so that
+  encoder priming and the first frame's overlap fall into audio that the
+  join drops again; boundaries are aligned to codec frames and the
+  encoder delay, so packets of consecutive segments line up gaplessly.
+* Other encoders get lossless FLAC segments in parallel and a single final
+  encode pass.
+
+Finished segments are recorded in a manifest next to them, so an
+interrupted job resumes with the missing segments only. Segment encodes of
+all jobs share one budget of CPU-count slots, so concurrent chunked jobs
+(batches, watch mode) do not each start one process per core.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional, Any, Dict, List, Tuple
+
+from .cache import read_json, write_json_atomic
+from .engine import FORMAT_EXTENSIONS
+from .resources import combine_usage, run_measured
+
+logger = logging.getLogger(__name__)
+
+# Segments shorter than this (seconds) are not worth a separate process
+MIN_CHUNK_SECONDS = 30.0
+
+# Codec frames encoded before a lossy segment's first kept frame
+PREROLL_FRAMES = 2
+
+# Frame size and encoder delay (ffmpeg's initial_padding) of encoders whose
+# packets can be joined gaplessly
+GAPLESS_ENCODERS: Dict[str, Tuple[int, int]] = {
+    "libmp3lame": (1152, 1105),
+    "aac": (1024, 1024),
+}
+
+# Output formats whose segments are joined as they are
+LOSSLESS_FORMATS = ("wav", "flac")
+
+MANIFEST_NAME = "manifest.json"
+
+# Segment encodes running at once across all jobs
+_segment_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+
+def plan_chunks(
+    first_sample: int, last_sample: int, chunks: int, align: int = 1
+) -> List[int]:
+    """
+    Split a sample range into segments.
+
+    Args:
+        first_sample: First sample of the range
+        last_sample: End of the range (exclusive)
+        chunks: Requested number of segments
+        align: Inner boundaries are multiples of this (relative to
+            ``first_sample``)
+
+    Returns:
+        Segment boundaries, from ``first_sample`` to ``last_sample``
+    """
+    total = last_sample - first_sample
+    if chunks < 2 or total <= 0:
+        return [first_sample, last_sample]
+
+    boundaries = [first_sample]
+    for index in range(1, chunks):
+        offset = total * index // chunks
+        offset -= offset % align
+        if offset > boundaries[-1] - first_sample:
+            boundaries.append(first_sample + offset)
+    boundaries.append(last_sample)
+    return boundaries
+
+
+def _concat_entry(
+    name: str, inpoint: Optional[float], outpoint: Optional[float]
+) -> str:
+    """Build one entry of an ffconcat list."""
+    escaped = name.replace("'", "'\\''")
+    lines = [f"file '{escaped}'"]
+    if inpoint is not None:
+        lines.append(f"inpoint {inpoint:.9f}")
+    if outpoint is not None:
+        lines.append(f"outpoint {outpoint:.9f}")
+    return "\n".join(lines)
+
+
+class ChunkedEncoder:
+    """Encode one input as parallel segments and join them."""
+
+    def __init__(self, engine: Any, max_workers: Optional[int] = None):
+        """
+        Initialize the encoder.
+
+        Args:
+            engine: FFmpegEngine providing the binary and encoder arguments
+            max_workers: Concurrent segment encodes of this job (defaults
+                to the CPU count); all jobs together run at most one per
+                CPU
+        """
+        self.engine = engine
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def extract(
+        self,
+        input_path: str,
+        output_path: Path,
+        output_format: str,
+        quality: str,
+        sample_rate: int,
+        first_sample: int,
+        last_sample: int,
+        chunks: int,
+        audio_filter: Optional[str] = None,
+        work_dir: Optional[Path] = None,
+    ) -> Dict[str, Any]:
+        """
+        Encode a sample range of the input in parallel segments.
+
+        Args:
+            input_path: Path of the input media
+            output_path: Path of the joined output
+            output_format: Audio format (mp3, wav, flac, aac)
+            quality: Audio quality (high, medium, low)
+            sample_rate: Sample rate of the input's audio stream
+            first_sample: First sample to extract
+            last_sample: End of the extracted range (exclusive)
+            chunks: Number of segments
+            audio_filter: ffmpeg filter applied to every segment (optional)
+            work_dir: Directory holding the segments and their manifest
+                (optional, a hidden directory next to the output by default)
+
+        Returns:
+            Dict containing extraction result
+        """
+        encoder = self.engine.capabilities.select_encoder(output_format)
+        gapless = GAPLESS_ENCODERS.get(encoder)
+        if output_format in LOSSLESS_FORMATS:
+            mode, align, delay = "exact", 1, 0
+        elif gapless is not None:
+            mode, (align, delay) = "gapless", gapless
+        else:
+            mode, align, delay = "intermediate", 1, 0
+        segment_format = "flac" if mode == "intermediate" else output_format
+
+        seconds = (last_sample - first_sample) / sample_rate
+        chunks = max(1, min(chunks, int(seconds // MIN_CHUNK_SECONDS)))
+
+        # Inner boundaries sit on the first segment's packet grid, which
+        # starts ``delay`` samples before the first sample
+        boundaries = plan_chunks(first_sample - delay, last_sample, chunks, align)
+        boundaries[0] = first_sample
+        if work_dir is None:
+            work_dir = output_path.parent / f".{output_path.name}.chunks"
+        manifest = self._load_manifest(
+            work_dir,
+            {
+                "source": _source_stamp(input_path),
+                "format": segment_format,
+                "quality": quality,
+                "encoder": encoder,
+                "filter": audio_filter,
+                "boundaries": boundaries,
+            },
+        )
+
+        extension = FORMAT_EXTENSIONS.get(segment_format, segment_format)
+        jobs = []
+        for index in range(len(boundaries) - 1):
+            name = f"chunk_{index:04d}.{extension}"
+            if index in manifest["done"] and (work_dir / name).exists():
+                continue
+            jobs.append((index, name))
+
+        logger.info(
+            f"Encoding {input_path} as {len(boundaries) - 1} segments "
+            f"({len(jobs)} to do, {mode} join)"
+        )
+
+        def encode(job: Tuple[int, str]) -> Tuple[int, Any]:
+            index, name = job
+            cmd = self._segment_command(
+                input_path,
+                work_dir / name,
+                segment_format,
+                quality,
+                sample_rate,
+                boundaries,
+                index,
+                mode,
+                align,
+                delay,
+                audio_filter,
+            )
+            with _segment_slots:
+                return index, run_measured(cmd, text=True)
+
+        errors = []
+        usage = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(encode, job) for job in jobs]
+            for future in as_completed(futures):
+                index, (result, segment_usage) = future.result()
+                usage = combine_usage(usage, segment_usage)
+                if result.returncode != 0:
+                    errors.append(f"segment {index}: {result.stderr.strip()}")
+                    continue
+                # Checkpoint as segments finish so a restart skips them
+                manifest["done"] = sorted(set(manifest["done"]) | {index})
+                write_json_atomic(work_dir / MANIFEST_NAME, manifest)
+
+        if errors:
+            return {
+                "success": False,
+                "error": "\n".join(errors),
+                "output": "",
+                "exit_code": 1,
+                "resources": usage,
+            }
+
+        result, join_usage = self._join(
+            work_dir,
+            output_path,
+            output_format,
+            quality,
+            sample_rate,
+            boundaries,
+            mode,
+            align,
+            delay,
+            segment_format,
+        )
+        usage = combine_usage(usage, join_usage)
+        if result.returncode != 0:
+            return {
+                "success": False,
+                "error": result.stderr,
+                "output": result.stdout,
+                "exit_code": result.returncode,
+                "resources": usage,
+            }
+
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return {
+            "success": True,
+            "error": "",
+            "output": f"Encoded {len(boundaries) - 1} segments",
+            "exit_code": 0,
+            "output_path": str(output_path),
+            "resources": usage,
+        }
+
+    def _load_manifest(
+        self, work_dir: Path, expected: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Reuse a previous run's manifest if it describes the same job."""
+        manifest = read_json(work_dir / MANIFEST_NAME)
+        if isinstance(manifest, dict) and all(
+            manifest.get(key) == value for key, value in expected.items()
+        ):
+            logger.info(
+                f"Resuming with {len(manifest['done'])} finished segments"
+            )
+            return manifest
+
+        shutil.rmtree(work_dir, ignore_errors=True)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        manifest = dict(expected, done=[])
+        write_json_atomic(work_dir / MANIFEST_NAME, manifest)
+        return manifest
+
+    def _segment_command(
+        self,
+        input_path: str,
+        segment_path: Path,
+        segment_format: str,
+        quality: str,
+        sample_rate: int,
+        boundaries: List[int],
+        index: int,
+        mode: str,
+        align: int,
+        delay: int,
+        audio_filter: Optional[str],
+    ) -> List[str]:
+        """Build the ffmpeg command encoding one segment."""
+        start, end = boundaries[index], boundaries[index + 1]
+        if mode == "gapless":
+            if index > 0:
+                # Packet PREROLL_FRAMES of this segment starts exactly at
+                # ``start`` once the encoder delay is accounted for
+                start = max(0, start - PREROLL_FRAMES * align + delay)
+            if index < len(boundaries) - 2:
+                # Complete the frame that overlaps the next segment
+                end = min(boundaries[-1], end + 2 * align)
+
+        filters = [f"atrim=end_sample={end - start}", "asetpts=PTS-STARTPTS"]
+        if audio_filter:
+            filters.append(audio_filter)
+        output_args = ["-ar", str(sample_rate)]
+        if mode == "gapless" and segment_format == "mp3":
+            # Without a LAME tag the packets are read back from timestamp 0
+            output_args.extend(["-write_xing", "0"])
+        return self.engine.build_command(
+            input_path,
+            str(segment_path),
+            output_format=segment_format,
+            quality=quality,
+            audio_filter=",".join(filters),
+            threads=1,
+            input_args=["-ss", f"{start / sample_rate:.9f}"] if start else [],
+            output_args=output_args,
+        )
+
+    def _join(
+        self,
+        work_dir: Path,
+        output_path: Path,
+        output_format: str,
+        quality: str,
+        sample_rate: int,
+        boundaries: List[int],
+        mode: str,
+        align: int,
+        delay: int,
+        segment_format: str,
+    ) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """Concatenate the segments into the output file."""
+        extension = FORMAT_EXTENSIONS.get(segment_format, segment_format)
+        entries = ["ffconcat version 1.0"]
+        last = len(boundaries) - 2
+        for index in range(last + 1):
+            inpoint = outpoint = None
+            if mode == "gapless":
+                frame = align / sample_rate
+                kept_from = PREROLL_FRAMES if index > 0 else 0
+                kept = boundaries[index + 1] - boundaries[index]
+                if index == 0:
+                    kept += delay
+                kept_frames = kept // align
+                if index > 0:
+                    # Half-frame margins land between packet timestamps
+                    inpoint = (kept_from - 0.5) * frame
+                if index < last:
+                    outpoint = (kept_from + kept_frames - 0.5) * frame
+            entries.append(
+                _concat_entry(f"chunk_{index:04d}.{extension}", inpoint, outpoint)
+            )
+
+        list_path = work_dir / "segments.ffconcat"
+        list_path.write_text("\n".join(entries) + "\n", encoding="utf-8")
+
+        cmd = [self.engine.ffmpeg, "-hide_banner", "-nostdin", "-y"]
+        cmd.extend(["-f", "concat", "-safe", "0", "-i", str(list_path), "-vn"])
+        if mode == "intermediate":
+            cmd.extend(self.engine.codec_args(output_format, quality))
+        else:
+            cmd.extend(["-c", "copy"])
+        cmd.append(str(output_path))
+        return run_measured(cmd, text=True)
+
+
+def _source_stamp(path: str) -> Dict[str, Any]:
+    """Identify the input so a stale manifest is not resumed."""
+    stat = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
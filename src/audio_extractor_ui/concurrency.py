@@ -0,0 +1,235 @@
+"""
+Adaptive concurrency for batch and watch jobs.
+
+Whether many single-threaded ffmpeg jobs or fewer multi-threaded ones are
+faster depends on the formats, the inputs and the storage. The controller
+observes job throughput, CPU usage and I/O wait (from ``/proc/stat``) and
+adjusts the number of concurrent jobs and the ``-threads`` value of each
+ffmpeg with an AIMD loop: additive increase while the host has idle CPU
+and throughput keeps improving, multiplicative decrease when the storage
+saturates or throughput drops. Every decision is logged.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Deque, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Window (seconds) over which throughput and CPU usage are measured
+DEFAULT_INTERVAL = 5.0
+
+# CPU utilization below which more parallelism is tried
+CPU_TARGET = 0.85
+
+# Share of CPU time in I/O wait above which the storage is the bottleneck
+IOWAIT_LIMIT = 0.20
+
+# Relative throughput drop that undoes the last increase
+THROUGHPUT_TOLERANCE = 0.10
+
+# Factor applied to the job count on a decrease
+DECREASE_FACTOR = 0.5
+
+# Number of recent decisions kept for inspection
+MAX_DECISIONS = 100
+
+
+def read_cpu_times() -> Optional[Tuple[int, int, int]]:
+    """
+    Read aggregate CPU times from ``/proc/stat``.
+
+    Returns:
+        Tuple of (busy, iowait, total) jiffies, or None where unavailable
+    """
+    try:
+        with open("/proc/stat", "r", encoding="ascii") as f:
+            fields = f.readline().split()
+    except OSError:
+        return None
+    if not fields or fields[0] != "cpu":
+        return None
+    values = [int(value) for value in fields[1:]]
+    idle = values[3]
+    iowait = values[4] if len(values) > 4 else 0
+    # guest time is already included in user/nice
+    total = sum(values[:8])
+    return total - idle - iowait, iowait, total
+
+
+class ConcurrencyController:
+    """AIMD controller for job parallelism and ffmpeg threads."""
+
+    def __init__(
+        self,
+        min_jobs: int = 1,
+        max_jobs: Optional[int] = None,
+        min_threads: int = 1,
+        max_threads: int = 4,
+        interval: float = DEFAULT_INTERVAL,
+        initial_jobs: Optional[int] = None,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            min_jobs: Lowest number of concurrent jobs
+            max_jobs: Highest number of concurrent jobs (defaults to the
+                CPU count)
+            min_threads: Lowest ffmpeg ``-threads`` value
+            max_threads: Highest ffmpeg ``-threads`` value
+            interval: Seconds between decisions
+            initial_jobs: Starting job count (defaults to half the maximum)
+        """
+        cpus = os.cpu_count() or 1
+        self.min_jobs = max(1, min_jobs)
+        self.max_jobs = max(self.min_jobs, max_jobs or cpus)
+        self.min_threads = max(1, min_threads)
+        self.max_threads = max(self.min_threads, max_threads)
+        self.interval = interval
+
+        start = initial_jobs or max(self.min_jobs, self.max_jobs // 2)
+        self.jobs = min(self.max_jobs, max(self.min_jobs, start))
+        self.threads = self.min_threads
+        # Most recent adjustments; bounded, since watch mode runs for days
+        self.decisions: Deque[Dict[str, Any]] = deque(maxlen=MAX_DECISIONS)
+
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_jobs = 0
+        self._cpu = read_cpu_times()
+        self._last_throughput: Optional[float] = None
+        self._last_action = "start"
+
+    def job_finished(self, input_bytes: int = 0) -> None:
+        """
+        Record a finished job.
+
+        Args:
+            input_bytes: Size of the job's input (0 if unknown)
+        """
+        with self._lock:
+            self._window_jobs += 1
+            self._window_bytes += input_bytes
+
+    def update(self, now: Optional[float] = None) -> bool:
+        """
+        Make a decision if the measuring window has elapsed.
+
+        Args:
+            now: Current ``time.monotonic()`` value (optional)
+
+        Returns:
+            True if a decision was made
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            elapsed = now - self._window_start
+            if elapsed < self.interval or not self._window_jobs:
+                # Long jobs: wait for a completion rather than see zero
+                return False
+            # Bytes make jobs of different sizes comparable
+            done = self._window_bytes or self._window_jobs
+            self._window_start = now
+            self._window_bytes = self._window_jobs = 0
+        throughput = done / elapsed
+
+        cpu_busy, iowait = self._sample_cpu()
+        self.decide(throughput, cpu_busy, iowait)
+        return True
+
+    def _sample_cpu(self) -> Tuple[Optional[float], Optional[float]]:
+        """CPU busy and I/O wait shares since the last sample."""
+        current = read_cpu_times()
+        previous, self._cpu = self._cpu, current
+        if current is None or previous is None:
+            return None, None
+        total = current[2] - previous[2]
+        if total <= 0:
+            return None, None
+        return (
+            (current[0] - previous[0]) / total,
+            (current[1] - previous[1]) / total,
+        )
+
+    def decide(
+        self,
+        throughput: float,
+        cpu_busy: Optional[float],
+        iowait: Optional[float],
+    ) -> str:
+        """
+        Apply one AIMD step.
+
+        Args:
+            throughput: Input bytes (or jobs) finished per second
+            cpu_busy: Share of CPU time busy (None if unknown)
+            iowait: Share of CPU time waiting for I/O (None if unknown)
+
+        Returns:
+            Name of the action taken
+        """
+        previous = self._last_throughput
+        regressed = (
+            previous is not None
+            and previous > 0
+            and self._last_action.startswith("increase")
+            and throughput < previous * (1 - THROUGHPUT_TOLERANCE)
+        )
+
+        if iowait is not None and iowait > IOWAIT_LIMIT:
+            action = self._decrease("storage saturated")
+        elif regressed:
+            action = self._decrease("throughput fell after increase")
+        elif cpu_busy is None or cpu_busy < CPU_TARGET:
+            action = self._increase()
+        elif self.threads > self.min_threads:
+            # CPU is saturated: single-threaded encoders scale better as
+            # separate jobs than as ffmpeg threads
+            self.threads -= 1
+            action = "decrease-threads"
+        else:
+            action = "hold"
+
+        self._last_throughput = throughput
+        self._last_action = action
+        decision = {
+            "action": action,
+            "jobs": self.jobs,
+            "threads": self.threads,
+            "throughput": throughput,
+            "cpu": cpu_busy,
+            "iowait": iowait,
+        }
+        self.decisions.append(decision)
+        logger.info(
+            f"Concurrency {action}: jobs={self.jobs} threads={self.threads} "
+            f"throughput={throughput:.1f}/s cpu={_percent(cpu_busy)} "
+            f"iowait={_percent(iowait)}"
+        )
+        return action
+
+    def _increase(self) -> str:
+        """Additive increase: one more job, or one more thread at the cap."""
+        if self.jobs < self.max_jobs:
+            self.jobs += 1
+            return "increase-jobs"
+        if self.threads < self.max_threads:
+            self.threads += 1
+            return "increase-threads"
+        return "hold"
+
+    def _decrease(self, reason: str) -> str:
+        """Multiplicative decrease of the job count."""
+        self.jobs = max(self.min_jobs, int(self.jobs * DECREASE_FACTOR))
+        self.threads = self.min_threads
+        return f"decrease ({reason})"
+
+
+def _percent(value: Optional[float]) -> str:
+    """Format a share for the decision log."""
+    return "n/a" if value is None else f"{value:.0%}"
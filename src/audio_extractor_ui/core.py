@@ -3,61 +3,638 @@ Core functionality for audio extraction operations.
 Integrates with the audio-extractor submodule for actual processing.
 """
 
+import os
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import (
+    Optional,
+    BinaryIO,
+    Callable,
+    Dict,
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Tuple,
+    Union,
+)
 
-from .integration import get_audio_extractor, is_core_available, get_core_info
+from .integration import get_audio_extractor, get_core_info
+from .capabilities import CapabilityService, get_capability_service
+from .engine import FFmpegEngine
+from .batch import DEFAULT_BATCH_WORKERS, run_batch, summarize_batch
+from .concurrency import ConcurrencyController
+from .scheduling import order_shortest_first
+from .metrics import StageTimer, emit as emit_metrics
+from .metrics import started as job_started
+from .results import BatchResult, ExtractionResult, classify_error
+from .discovery import iter_media_files
+from .inputs import (
+    ArchiveMember,
+    input_label,
+    input_name,
+    is_stream_input,
+    iter_archive_members,
+    open_input,
+    peek_head,
+)
+from .sniff import SNIFF_SIZE, filter_media, sniff_file, sniff_head
+from .staging import DEFAULT_ESTIMATE, StagingArea, estimate_output_bytes
+from .streaming import (
+    DEFAULT_CHUNK_SIZE,
+    EncodedStream,
+    download_command,
+    encode_command,
+)
+from .loudness import (
+    AlbumGain,
+    LoudnessTarget,
+    DEFAULT_OUTPUT_RATE,
+    compute_album_gain,
+    loudnorm_filter,
+    measure_loudness,
+    measurement_key,
+)
+from .pipeline import (
+    CompileContext,
+    CompiledPipeline,
+    Normalize,
+    Pipeline,
+    StreamLayout,
+)
+from .utils import parse_time, validate_file_path, validate_url
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the entry points, not on import
 logger = logging.getLogger(__name__)
 
 
 class AudioExtractor:
     """Core audio extraction functionality using audio-extractor submodule."""
 
-    def __init__(self):
-        """Initialize the audio extractor."""
+    def __init__(
+        self,
+        capabilities: Optional[CapabilityService] = None,
+        staging: Optional[StagingArea] = None,
+    ):
+        """
+        Initialize the audio extractor.
+
+        Args:
+            capabilities: Capability service used for dependency checks and
+                engine choices (optional, the shared service by default)
+            staging: Scratch area outputs are written to before they are
+                published to ``output_dir`` (optional, see staging.py)
+        """
         self.output_dir = Path("output")
         self.output_dir.mkdir(exist_ok=True)
         self.core_extractor = get_audio_extractor()
+        self._capabilities = capabilities
+        self._ffmpeg_engine: Optional[FFmpegEngine] = None
+        # Check file content before spawning ffmpeg (see sniff.py)
+        self.sniff_inputs = True
+        self.staging = staging
+
+    @property
+    def capabilities(self) -> CapabilityService:
+        """Capability service, resolved on first use."""
+        if self._capabilities is None:
+            self._capabilities = get_capability_service()
+        return self._capabilities
+
+    @property
+    def ffmpeg_engine(self) -> FFmpegEngine:
+        """Direct ffmpeg engine, created on first use."""
+        if self._ffmpeg_engine is None:
+            self._ffmpeg_engine = FFmpegEngine(self.capabilities)
+        return self._ffmpeg_engine
 
     def is_available(self) -> bool:
         """Check if the core audio extractor is available."""
-        return is_core_available()
+        return self.core_extractor.is_available()
+
+    def select_engine(self, engine: Optional[str] = None) -> Optional[str]:
+        """
+        Choose the engine for a local extraction.
+
+        Args:
+            engine: Requested engine ("core" or "ffmpeg"); by default the
+                core is used when available, otherwise ffmpeg directly
+
+        Returns:
+            Engine name, or None if the requested engine is unavailable
+        """
+        if engine is None:
+            if self.is_available():
+                return "core"
+            return "ffmpeg" if self.capabilities.has_ffmpeg() else None
+        if engine == "core":
+            return "core" if self.is_available() else None
+        if engine == "ffmpeg":
+            return "ffmpeg" if self.capabilities.has_ffmpeg() else None
+        raise ValueError(f"Unknown engine: {engine}")
 
     def extract_from_file(
         self,
-        input_file: str,
+        input_file: Union[str, bytes, BinaryIO, ArchiveMember],
         output_format: str = "mp3",
         quality: str = "high",
         start_time: Optional[str] = None,
         end_time: Optional[str] = None,
         duration: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        engine: Optional[str] = None,
+        normalize: Union[None, bool, LoudnessTarget, AlbumGain] = None,
+        chunks: Optional[int] = None,
+        threads: Optional[int] = None,
+        pipeline: Optional[Pipeline] = None,
+    ) -> ExtractionResult:
         """
-        Extract audio from a local video file.
+        Extract audio from a local video file, a stream or an archive member.
 
         Args:
-            input_file: Path to the input video file
+            input_file: Path to the input video file; or bytes, a binary
+                file object, ``"-"`` for stdin or an ArchiveMember, which
+                are piped to ffmpeg (see inputs.py)
             output_format: Audio format (mp3, wav, flac, aac)
             quality: Audio quality (high, medium, low)
             start_time: Start time for extraction (optional)
             end_time: End time for extraction (optional)
             duration: Duration for extraction (optional)
+            engine: "core" or "ffmpeg" (optional, see ``select_engine``)
+            normalize: Loudness normalization: True for EBU R128, a
+                LoudnessTarget, or an AlbumGain computed for a batch
+                (optional; requires the ffmpeg engine)
+            chunks: Encode the input as this many segments in parallel and
+                join them; resumes after interruptions (optional; requires
+                the ffmpeg engine, see chunked.py)
+            threads: ffmpeg ``-threads`` value for the ffmpeg engine
+                (optional)
+            pipeline: Post-processing stages applied as one filter graph
+                within the extraction (optional; requires the ffmpeg
+                engine, see pipeline.py; cannot hold a Normalize stage
+                when ``normalize`` is given)
 
         Returns:
-            Dict containing extraction results
+            ExtractionResult (a mapping with the keys of the former result
+            dict, see results.py)
+        """
+        label = input_label(input_file)
+        logger.info(f"Extracting audio from: {label}")
+
+        timings = StageTimer()
+        context: Dict[str, Any] = {}
+        extract: Callable[..., Mapping[str, Any]] = (
+            self._extract_stream if is_stream_input(input_file) else self._extract_file
+        )
+        result = extract(
+            timings,
+            context,
+            input_file,
+            output_format,
+            quality,
+            start_time,
+            end_time,
+            duration,
+            engine,
+            normalize,
+            chunks,
+            threads,
+            pipeline,
+        )
+        return self._attach_metrics(
+            result,
+            timings,
+            context,
+            label,
+            output_format,
+            None if is_stream_input(input_file) else str(input_file),
+        )
+
+    def _extract_file(
+        self,
+        timings: StageTimer,
+        context: Dict[str, Any],
+        input_file: str,
+        output_format: str,
+        quality: str,
+        start_time: Optional[str],
+        end_time: Optional[str],
+        duration: Optional[str],
+        engine: Optional[str],
+        normalize: Union[None, bool, LoudnessTarget, AlbumGain],
+        chunks: Optional[int],
+        threads: Optional[int],
+        pipeline: Optional[Pipeline],
+    ) -> Mapping[str, Any]:
         """
-        logger.info(f"Extracting audio from: {input_file}")
+        Run one file extraction, timing its stages.
+
+        ``context`` receives the engine, code path and media duration used
+        for the metrics (see ``extract_from_file`` for the arguments).
 
-        if not self.is_available():
+        Returns:
+            Engine result dict, or an ExtractionResult for a rejection
+        """
+        if (normalize or chunks or pipeline) and engine is None:
+            # The core CLI cannot apply filters or cut segments
+            engine = "ffmpeg"
+
+        with timings.stage("validation"):
+            selected = self.select_engine(engine)
+            rejection = self._check_input(input_file) if selected else None
+        context["engine"] = selected
+        job_started(
+            {"source": input_file, "format": output_format, "engine": selected}
+        )
+        if selected is None and (normalize or chunks or pipeline):
+            error_msg = (
+                "Loudness normalization, pipelines and chunking require ffmpeg."
+            )
+            logger.error(error_msg)
+            return ExtractionResult.failure(error_msg, "unavailable")
+        if selected is None:
             error_msg = (
                 "Audio extractor core not available. "
                 "Initialize submodule first."
             )
             logger.error(error_msg)
+            return ExtractionResult.failure(error_msg, "unavailable")
+
+        if rejection is not None:
+            logger.error(rejection)
+            return ExtractionResult.failure(rejection, "invalid_input")
+
+        from .cache import get_media_cache
+        from .probe import probe_media
+
+        probe: Optional[Dict[str, Any]]
+        if pipeline or normalize or chunks or self.staging is not None:
+            # Filters and chunks need the source's layout, staging its length
+            with timings.stage("probe"):
+                probe = probe_media(input_file)
+        else:
+            # Only for the metrics: an earlier probe, but no ffprobe run
+            probe = get_media_cache().get(input_file, "probe")
+        context["media_duration"] = self._range_duration(
+            probe, start_time, end_time, duration
+        )
+
+        if selected == "ffmpeg":
+            filters = []
+            # Rate the pipeline leaves the audio at, kept after loudnorm
+            output_rate = None
+            if pipeline:
+                if chunks and chunks > 1:
+                    error_msg = "Pipelines cannot be combined with chunking."
+                    logger.error(error_msg)
+                    return ExtractionResult.failure(error_msg, "invalid_input")
+                if normalize and any(
+                    isinstance(stage, Normalize) for stage in pipeline.stages
+                ):
+                    # Two loudnorm passes would normalize twice
+                    error_msg = "Use either normalize= or a Normalize stage, not both."
+                    logger.error(error_msg)
+                    return ExtractionResult.failure(error_msg, "invalid_input")
+                try:
+                    compiled = self.compile_pipeline(
+                        pipeline, input_file, start_time, end_time, duration, probe
+                    )
+                except ValueError as e:
+                    logger.error(str(e))
+                    return ExtractionResult.failure(str(e), "invalid_input")
+                filters.append(compiled.graph)
+                output_rate = compiled.layout.sample_rate
+            if normalize:
+                from .probe import get_audio_stream
+
+                stream_info = get_audio_stream(probe) or {}
+                output_rate = output_rate or stream_info.get("sample_rate")
+                with timings.stage("analysis"):
+                    filters.append(
+                        self._normalization_filter(
+                            input_file,
+                            normalize,
+                            start_time,
+                            end_time,
+                            duration,
+                            output_rate,
+                        )
+                    )
+            audio_filter = ",".join(f for f in filters if f) or None
+
+            if chunks and chunks > 1:
+                context["path"] = "ffmpeg-chunked"
+                media_duration = context.get("media_duration")
+                with timings.stage("encode"):
+                    return self._write_output(
+                        lambda output_dir: self._extract_chunked(
+                            input_file,
+                            output_dir,
+                            output_format,
+                            quality,
+                            chunks,
+                            start_time,
+                            end_time,
+                            duration,
+                            audio_filter,
+                        ),
+                        output_format,
+                        quality,
+                        # The segments and the joined output coexist
+                        2 * media_duration if media_duration else None,
+                    )
+
+            context["path"] = "ffmpeg"
+            with timings.stage("encode"):
+                return self._write_output(
+                    lambda output_dir: self.ffmpeg_engine.extract(
+                        input_file,
+                        output_dir=output_dir,
+                        format=output_format,
+                        quality=quality,
+                        start_time=start_time,
+                        end_time=end_time,
+                        duration=duration,
+                        audio_filter=audio_filter,
+                        threads=threads,
+                    ),
+                    output_format,
+                    quality,
+                    context.get("media_duration"),
+                )
+
+        # The core decodes, encodes and writes in one process
+        context["path"] = "core"
+        with timings.stage("encode"):
+            return self._write_output(
+                lambda output_dir: self.core_extractor.extract_from_local_file(
+                    input_path=input_file,
+                    output_dir=output_dir,
+                    format=output_format,
+                    quality=quality,
+                    start_time=start_time,
+                    end_time=end_time,
+                    duration=duration,
+                ),
+                output_format,
+                quality,
+                context.get("media_duration"),
+            )
+
+    def _extract_stream(
+        self,
+        timings: StageTimer,
+        context: Dict[str, Any],
+        source: Union[bytes, BinaryIO, str, ArchiveMember],
+        output_format: str,
+        quality: str,
+        start_time: Optional[str],
+        end_time: Optional[str],
+        duration: Optional[str],
+        engine: Optional[str],
+        normalize: Union[None, bool, LoudnessTarget, AlbumGain],
+        chunks: Optional[int],
+        threads: Optional[int],
+        pipeline: Optional[Pipeline],
+    ) -> Mapping[str, Any]:
+        """
+        Run one extraction from a stream input piped to ffmpeg.
+
+        The output is named after the archive member (in the member's
+        folder) or file object ("stdin"/"stream" otherwise). With
+        ``sniff_inputs``, the first bytes are checked before ffmpeg starts
+        and then replayed to it.
+
+        Returns:
+            Engine result dict, or an ExtractionResult for a rejection
+        """
+        label = input_label(source)
+        with timings.stage("validation"):
+            selected = (
+                self.select_engine("ffmpeg") if engine in (None, "ffmpeg") else None
+            )
+        context["engine"] = selected
+        job_started({"source": label, "format": output_format, "engine": selected})
+        if selected is None:
+            error_msg = "Stream and archive inputs require ffmpeg."
+            logger.error(error_msg)
+            return ExtractionResult.failure(error_msg, "unavailable")
+        if normalize or chunks:
+            error_msg = "Loudness normalization and chunking need a file path."
+            logger.error(error_msg)
+            return ExtractionResult.failure(error_msg, "invalid_input")
+        audio_filter = None
+        if pipeline:
+            # Nothing is known about a stream before ffmpeg reads it
+            try:
+                audio_filter = self.compile_pipeline(pipeline).graph
+            except ValueError as e:
+                logger.error(str(e))
+                return ExtractionResult.failure(str(e), "invalid_input")
+
+        context["path"] = "ffmpeg-stdin"
+        folder = source.folder if isinstance(source, ArchiveMember) else ""
+        try:
+            with open_input(source) as stream:
+                if self.sniff_inputs:
+                    with timings.stage("validation"):
+                        head, stream = peek_head(stream, SNIFF_SIZE)
+                    if sniff_head(head) is None:
+                        error_msg = (
+                            f"Not a recognised media stream (or truncated): {label}"
+                        )
+                        logger.error(error_msg)
+                        return ExtractionResult.failure(error_msg, "invalid_input")
+                with timings.stage("encode"):
+                    return self._write_output(
+                        lambda output_dir: self.ffmpeg_engine.extract(
+                            input_name(source),
+                            output_dir=os.path.join(output_dir, folder),
+                            format=output_format,
+                            quality=quality,
+                            start_time=start_time,
+                            end_time=end_time,
+                            duration=duration,
+                            audio_filter=audio_filter,
+                            threads=threads,
+                            input_stream=stream,
+                        ),
+                        output_format,
+                        quality,
+                        None,
+                    )
+        except (KeyError, OSError, ValueError) as e:
+            error_msg = f"Cannot read {label}: {str(e)}"
+            logger.error(error_msg)
+            return ExtractionResult.failure(error_msg, "invalid_input")
+        except Exception as e:
+            # e.g. a corrupt archive member failing its CRC check
+            error_msg = f"Failed to read {label}: {str(e)}"
+            logger.error(error_msg)
+            return ExtractionResult.failure(error_msg)
+
+    def _write_output(
+        self,
+        run: Callable[[str], Dict[str, Any]],
+        output_format: str,
+        quality: str,
+        media_duration: Optional[float],
+        scratch_bytes: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Run an extraction into ``output_dir``, staged if configured.
+
+        With a staging area, ``run`` writes into a scratch directory and
+        the outputs are published to ``output_dir`` only if it succeeds;
+        ``output_path`` and ``outputs`` then name the published files.
+
+        Args:
+            run: Function extracting into the directory it is given
+            output_format: Audio format, for the scratch space estimate
+            quality: Audio quality, for the scratch space estimate
+            media_duration: Seconds of audio extracted, if known
+            scratch_bytes: Other scratch space ``run`` uses in the staging
+                area, reserved together with the outputs
+
+        Returns:
+            Dict containing extraction results
+        """
+        if self.staging is None:
+            return run(str(self.output_dir))
+
+        estimate = estimate_output_bytes(output_format, quality, media_duration)
+        estimate += scratch_bytes
+        with self.staging.stage(self.output_dir, estimate) as job:
+            result = run(str(job.directory))
+            if not result.get("success"):
+                if result.get("outputs"):
+                    # Partial outputs were discarded with the job directory
+                    result["outputs"] = []
+                return result
+            try:
+                published = job.publish()
+            except OSError as e:
+                logger.error(f"Failed to publish output: {e}")
+                failed = dict(
+                    result,
+                    success=False,
+                    error=f"Failed to publish output: {str(e)}",
+                    exit_code=-1,
+                    output_path=None,
+                )
+                if "outputs" in failed:
+                    failed["outputs"] = []
+                return failed
+
+        def final(staged_path: str) -> str:
+            return published.get(staged_path, str(job.final_path(staged_path)))
+
+        staged_path = result.get("output_path")
+        if staged_path:
+            result["output_path"] = final(staged_path)
+        if result.get("outputs"):
+            result["outputs"] = [final(path) for path in result["outputs"]]
+        return result
+
+    def _range_duration(
+        self,
+        probe: Optional[Dict[str, Any]],
+        start_time: Optional[str],
+        end_time: Optional[str],
+        duration: Optional[str],
+    ) -> Optional[float]:
+        """Length in seconds of the extracted range, if known."""
+        total = (probe or {}).get("duration")
+        try:
+            start = parse_time(start_time) or 0.0
+            end = parse_time(end_time)
+            if end is None and duration:
+                end = start + (parse_time(duration) or 0.0)
+        except ValueError:
+            return total
+        if end is None:
+            return total - start if total else None
+        return end - start if total is None else min(end, total) - start
+
+    def _attach_metrics(
+        self,
+        result: Mapping[str, Any],
+        timings: StageTimer,
+        context: Dict[str, Any],
+        source: str,
+        output_format: str,
+        input_path: Optional[str] = None,
+    ) -> ExtractionResult:
+        """
+        Record the metrics of an extraction and emit them to the sinks.
+
+        Args:
+            result: Extraction result (dict or ExtractionResult)
+            timings: Stage times of the extraction
+            context: Engine, code path and media duration of the extraction
+            source: Input path or URL, for the sinks
+            output_format: Audio format (mp3, wav, flac, aac)
+            input_path: Local input file whose size is reported (optional)
+
+        Returns:
+            The result as an ExtractionResult, with its metrics set
+        """
+        with timings.stage("postprocess"):
+            record = ExtractionResult.from_dict(result)
+            if not record.success and record.error_category is None:
+                record.error_category = classify_error(record)
+            if input_path:
+                record.input_bytes = _file_size(input_path)
+            if record.output_path:
+                record.output_bytes = _file_size(record.output_path)
+
+        measured = timings.as_dict()
+        record.stages = measured["stages"]
+        record.elapsed = measured["total"]
+        record.engine = context.get("engine")
+        record.code_path = context.get("path")
+        record.media_duration = context.get("media_duration")
+        emit_metrics(
+            dict(
+                record.metrics or {},
+                resources=record.resources,
+                source=source,
+                format=output_format,
+                success=bool(record.success),
+            )
+        )
+        return record
+
+    def _extract_chunked(
+        self,
+        input_file: str,
+        output_dir: str,
+        output_format: str,
+        quality: str,
+        chunks: int,
+        start_time: Optional[str],
+        end_time: Optional[str],
+        duration: Optional[str],
+        audio_filter: Optional[str],
+    ) -> Dict[str, Any]:
+        """
+        Encode one input as parallel segments (see chunked.py) into
+        ``output_dir``. The segments' work directory is next to the output,
+        or with a staging area in its stable work directory for the final
+        output path, so a failed job resumes where it stopped.
+
+        Returns:
+            Dict containing extraction results
+        """
+        from .chunked import ChunkedEncoder
+        from .probe import get_audio_stream, probe_media
+
+        probe = probe_media(input_file)
+        stream = get_audio_stream(probe)
+        total = (stream or {}).get("duration") or (probe or {}).get("duration")
+        if not stream or not stream.get("sample_rate") or not total:
+            error_msg = f"Cannot chunk {input_file}: duration unknown"
+            logger.error(error_msg)
             return {
                 "success": False,
                 "error": error_msg,
@@ -65,15 +642,327 @@ class AudioExtractor:
                 "exit_code": -1,
             }
 
-        return self.core_extractor.extract_from_local_file(
-            input_path=input_file,
-            output_dir=str(self.output_dir),
-            format=output_format,
-            quality=quality,
+        try:
+            sample_rate = stream["sample_rate"]
+            start = parse_time(start_time) or 0.0
+            end = parse_time(end_time)
+            if end is None and duration:
+                end = start + (parse_time(duration) or 0.0)
+            end = min(end, total) if end is not None else total
+
+            output_path = self.ffmpeg_engine.output_path(
+                input_file, output_dir, output_format
+            )
+            work_dir = None
+            if self.staging is not None:
+                # The job directory is discarded when the job fails
+                work_dir = self.staging.work_dir(
+                    self.ffmpeg_engine.output_path(
+                        input_file, str(self.output_dir), output_format
+                    )
+                )
+            return ChunkedEncoder(self.ffmpeg_engine).extract(
+                input_file,
+                output_path,
+                output_format,
+                quality,
+                sample_rate,
+                int(round(start * sample_rate)),
+                int(round(end * sample_rate)),
+                chunks,
+                audio_filter=audio_filter,
+                work_dir=work_dir,
+            )
+        except (OSError, ValueError) as e:
+            return {
+                "success": False,
+                "error": f"Chunked extraction failed: {str(e)}",
+                "output": "",
+                "exit_code": -1,
+            }
+
+    def compile_pipeline(
+        self,
+        pipeline: Pipeline,
+        input_file: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+        probe: Optional[Dict[str, Any]] = None,
+    ) -> CompiledPipeline:
+        """
+        Compile a pipeline into the filter graph used for one source.
+
+        The source's layout comes from its cached probe, so stages that
+        would not change it are dropped; a Normalize stage uses the cached
+        loudness measurement when the source was measured before and no
+        earlier stage changes the audio. Nothing is decoded.
+
+        Args:
+            pipeline: Stages to compile
+            input_file: Path of the source (optional; without it no stage
+                is dropped)
+            start_time: Start time for extraction (optional)
+            end_time: End time for extraction (optional)
+            duration: Duration for extraction (optional)
+            probe: Probe summary of input_file, if already at hand
+                (optional)
+
+        Returns:
+            CompiledPipeline (``graph`` is the ``-af`` value)
+
+        Raises:
+            ValueError: If ffmpeg lacks a filter the pipeline needs, or a
+                stage cannot be applied to the source
+        """
+        missing = [
+            name for name in pipeline.requires if not self.capabilities.has_filter(name)
+        ]
+        if missing:
+            raise ValueError(f"ffmpeg lacks the filters: {', '.join(missing)}")
+
+        layout = StreamLayout()
+        measurement = None
+        if input_file is not None:
+            from .cache import get_media_cache
+            from .probe import get_audio_stream, probe_media
+
+            probe = probe if probe is not None else probe_media(input_file)
+            stream_info = get_audio_stream(probe) or {}
+            layout = StreamLayout(
+                stream_info.get("sample_rate"),
+                stream_info.get("channels"),
+                self._range_duration(probe, start_time, end_time, duration),
+            )
+            normalize = next(
+                (stage for stage in pipeline.stages if isinstance(stage, Normalize)),
+                None,
+            )
+            if normalize is not None:
+                measurements = get_media_cache().get(input_file, "loudness", {})
+                measurement = measurements.get(
+                    measurement_key(normalize.target, start_time, end_time, duration)
+                )
+
+        compiled = pipeline.compile(
+            layout,
+            CompileContext(
+                soxr=self.capabilities.has_build_flag("libsoxr"),
+                measurement=measurement,
+            ),
+        )
+        if compiled.dropped:
+            logger.debug(f"Dropped no-op stages: {', '.join(compiled.dropped)}")
+        return compiled
+
+    def _normalization_filter(
+        self,
+        input_file: str,
+        normalize: Union[bool, LoudnessTarget, AlbumGain],
+        start_time: Optional[str],
+        end_time: Optional[str],
+        duration: Optional[str],
+        sample_rate: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Build the loudness filter for one extraction.
+
+        The first-pass measurement comes from the media cache when this
+        source (and time range) was measured before. The output is
+        resampled back to ``sample_rate`` (48 kHz if unknown) after
+        loudnorm, which always outputs 192 kHz.
+
+        Returns:
+            ffmpeg filter string, or None to leave the audio unchanged
+        """
+        if isinstance(normalize, AlbumGain):
+            return normalize.to_filter()
+
+        target = normalize if isinstance(normalize, LoudnessTarget) else None
+        measurement = measure_loudness(
+            input_file,
+            self.ffmpeg_engine,
+            target=target,
             start_time=start_time,
             end_time=end_time,
             duration=duration,
         )
+        if measurement is None:
+            logger.warning(f"Extracting {input_file} without normalization")
+            return None
+        return loudnorm_filter(
+            measurement, target, sample_rate or DEFAULT_OUTPUT_RATE
+        )
+
+    def _check_input(self, input_file: str) -> Optional[str]:
+        """
+        Reject unusable inputs before any process is started.
+
+        Returns:
+            Error message, or None if the input looks like media
+        """
+        if not validate_file_path(input_file):
+            return f"Input file not found or not readable: {input_file}"
+        if self.sniff_inputs and sniff_file(input_file) is None:
+            return f"Not a recognised media file (or truncated): {input_file}"
+        return None
+
+    def extract_with_silence(
+        self,
+        input_file: str,
+        output_format: str = "mp3",
+        quality: str = "high",
+        mode: str = "trim",
+        threshold_db: float = -50.0,
+        min_silence: float = 0.5,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extract audio with silence trimmed or split on, in one decode.
+
+        The source is decoded once to float PCM; the PCM is analysed block
+        by block while it is spooled to a scratch file (in the staging
+        area, or the temp directory), and the kept ranges are encoded from
+        the spool instead of decoding the source again. With a staging
+        area, the spool's size is reserved together with the outputs, and
+        the outputs are published once every range is encoded.
+
+        Args:
+            input_file: Path to the input video file
+            output_format: Audio format (mp3, wav, flac, aac)
+            quality: Audio quality (high, medium, low)
+            mode: "trim" (leading/trailing silence) or "split" (one output
+                per non-silent segment)
+            threshold_db: Level (dBFS) below which audio counts as silence
+            min_silence: Minimum silence length in seconds
+            start_time: Start time for extraction (optional)
+            end_time: End time for extraction (optional)
+            duration: Duration for extraction (optional)
+
+        Returns:
+            Dict containing extraction results, with "outputs" (written
+            files) and "silence" (the analysis)
+        """
+        import subprocess
+        import tempfile
+        from .pcm import NUMPY_AVAILABLE, PCMStream, pcm_command
+        from .probe import get_audio_stream, probe_media
+        from .silence import SilenceDetector, plan_segments
+
+        def failure(error_msg: str) -> Dict[str, Any]:
+            logger.error(error_msg)
+            return {
+                "success": False,
+                "error": error_msg,
+                "output": "",
+                "exit_code": -1,
+            }
+
+        if not NUMPY_AVAILABLE:
+            return failure("Silence detection requires NumPy.")
+        if not self.capabilities.has_ffmpeg():
+            return failure("Silence detection requires ffmpeg.")
+        rejection = self._check_input(input_file)
+        if rejection is not None:
+            return failure(rejection)
+
+        engine = self.ffmpeg_engine
+        probe = probe_media(input_file)
+        stream_info = get_audio_stream(probe) or {}
+        sample_rate = stream_info.get("sample_rate") or 48000
+        channels = min(stream_info.get("channels") or 2, 2)
+        seconds = self._range_duration(probe, start_time, end_time, duration)
+        # The float32 spool counts against the staging capacity too
+        spool_bytes = (
+            int(seconds * sample_rate * channels * 4) if seconds else DEFAULT_ESTIMATE
+        )
+
+        stem = Path(input_file).stem
+        raw_args = ["-f", "f32le", "-ar", str(sample_rate), "-ac", str(channels)]
+        extension = Path(engine.output_path(input_file, ".", output_format)).suffix
+
+        def extract(output_dir: str) -> Dict[str, Any]:
+            # Local scratch storage, not the (possibly networked) output folder
+            fd, spool_name = tempfile.mkstemp(
+                suffix=".pcm",
+                prefix=f".{stem}.",
+                dir=str(self.staging.root) if self.staging is not None else None,
+            )
+            os.close(fd)
+            spool_path = Path(spool_name)
+            try:
+                cmd = pcm_command(
+                    engine,
+                    input_file,
+                    sample_rate,
+                    channels,
+                    start_time=start_time,
+                    end_time=end_time,
+                    duration=duration,
+                )
+                detector = SilenceDetector(
+                    sample_rate, threshold_db=threshold_db, min_silence=min_silence
+                )
+                with open(spool_path, "wb") as spool:
+                    with PCMStream(cmd, channels, tee=spool) as stream:
+                        for block in stream.blocks():
+                            detector.feed(block)
+                if stream.returncode != 0:
+                    return failure(f"Failed to decode {input_file}")
+
+                analysis = detector.result()
+                segments = plan_segments(analysis, mode)
+                if not segments:
+                    return failure(
+                        f"No audio above {threshold_db} dBFS in {input_file}"
+                    )
+
+                outputs: List[str] = []
+                for index, (start, end) in enumerate(segments, 1):
+                    if mode == "split":
+                        name = f"{stem}_{index:03d}{extension}"
+                    else:
+                        name = f"{stem}{extension}"
+                    output_path = Path(output_dir) / name
+                    encode = engine.build_command(
+                        str(spool_path),
+                        str(output_path),
+                        output_format=output_format,
+                        quality=quality,
+                        start_time=str(start),
+                        end_time=str(end),
+                        input_args=raw_args,
+                    )
+                    result = subprocess.run(encode, capture_output=True, text=True)
+                    if result.returncode != 0:
+                        return dict(
+                            failure(result.stderr.strip()),
+                            exit_code=result.returncode,
+                            outputs=outputs,
+                        )
+                    outputs.append(str(output_path))
+                return {
+                    "success": True,
+                    "error": "",
+                    "output": f"Wrote {len(outputs)} file(s)",
+                    "exit_code": 0,
+                    "output_path": outputs[0],
+                    "outputs": outputs,
+                    "silence": analysis,
+                }
+            finally:
+                if spool_path.exists():
+                    spool_path.unlink()
+
+        try:
+            # Segments are published together, and only if all succeed
+            return self._write_output(
+                extract, output_format, quality, seconds, scratch_bytes=spool_bytes
+            )
+        except (OSError, ValueError) as e:
+            return failure(f"Silence extraction failed: {str(e)}")
 
     def extract_from_url(
         self,
@@ -83,7 +972,7 @@ class AudioExtractor:
         start_time: Optional[str] = None,
         end_time: Optional[str] = None,
         duration: Optional[str] = None,
-    ) -> Dict[str, Any]:
+    ) -> ExtractionResult:
         """
         Extract audio from a URL (YouTube, etc.).
 
@@ -96,83 +985,787 @@ class AudioExtractor:
             duration: Duration for extraction (optional)
 
         Returns:
-            Dict containing extraction results
+            ExtractionResult (see results.py)
         """
         logger.info(f"Extracting audio from URL: {url}")
 
-        if not self.is_available():
+        timings = StageTimer()
+        with timings.stage("validation"):
+            available = self.is_available()
+        context: Dict[str, Any] = {"engine": "core" if available else None}
+        job_started(
+            {"source": url, "format": output_format, "engine": context["engine"]}
+        )
+
+        if not available:
             error_msg = (
                 "Audio extractor core not available. "
                 "Initialize submodule first."
             )
             logger.error(error_msg)
-            return {
-                "success": False,
-                "error": error_msg,
-                "output": "",
-                "exit_code": -1,
-            }
+            failure = ExtractionResult.failure(error_msg, "unavailable")
+            return self._attach_metrics(failure, timings, context, url, output_format)
+
+        # The core downloads, decodes and encodes in one process, so the
+        # whole run is reported as the download stage
+        context["path"] = "core-url"
+        with timings.stage("download"):
+            result = self._write_output(
+                lambda output_dir: self.core_extractor.extract_from_url(
+                    url=url,
+                    output_dir=output_dir,
+                    format=output_format,
+                    quality=quality,
+                    start_time=start_time,
+                    end_time=end_time,
+                    duration=duration,
+                ),
+                output_format,
+                quality,
+                None,
+            )
+        return self._attach_metrics(result, timings, context, url, output_format)
+
+    def iter_audio(
+        self,
+        source: str,
+        output_format: str = "mp3",
+        quality: str = "high",
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Yield encoded audio straight from ffmpeg's stdout, without files.
+
+        ffmpeg starts on the first ``next()`` and is stopped when the
+        iterator is closed early, so memory stays bounded by one chunk.
+
+        Args:
+            source: Local file path, or URL (downloaded by yt-dlp into
+                ffmpeg through a pipe)
+            output_format: Audio format (mp3, wav, flac, aac, opus)
+            quality: Audio quality (high, medium, low)
+            start_time: Start time for extraction (optional)
+            end_time: End time for extraction (optional)
+            duration: Duration for extraction (optional)
+            chunk_size: Bytes per chunk
+
+        Returns:
+            Iterator of byte chunks
+
+        Raises:
+            ValueError: If the input or format is not usable
+            RuntimeError: If ffmpeg (or yt-dlp for URLs) is missing, or,
+                once the stream ends, if the extraction failed
+        """
+        stream = self._encoded_stream(
+            source, output_format, quality, start_time, end_time, duration, chunk_size
+        )
+
+        def chunks() -> Iterator[bytes]:
+            with stream:
+                yield from stream.chunks()
+            if stream.returncode:
+                raise RuntimeError(
+                    stream.error or f"Extraction failed ({stream.returncode})"
+                )
+
+        return chunks()
+
+    def extract_to_stream(
+        self,
+        source: str,
+        target: BinaryIO,
+        output_format: str = "mp3",
+        quality: str = "high",
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> ExtractionResult:
+        """
+        Write encoded audio to a binary file-like object, without files.
+
+        Args:
+            source: Local file path or URL (see ``iter_audio``)
+            target: Object with a ``write(bytes)`` method
+            output_format: Audio format (mp3, wav, flac, aac, opus)
+            quality: Audio quality (high, medium, low)
+            start_time: Start time for extraction (optional)
+            end_time: End time for extraction (optional)
+            duration: Duration for extraction (optional)
+            chunk_size: Bytes per write
+
+        Returns:
+            ExtractionResult without "output_path"; ``output_bytes`` is
+            the number of bytes written
+        """
+        is_url = validate_url(source)
+        timings = StageTimer()
+        context: Dict[str, Any] = {"engine": "ffmpeg"}
+        with timings.stage("validation"):
+            try:
+                stream = self._encoded_stream(
+                    source,
+                    output_format,
+                    quality,
+                    start_time,
+                    end_time,
+                    duration,
+                    chunk_size,
+                )
+            except ValueError as e:
+                stream, result = None, ExtractionResult.failure(str(e), "invalid_input")
+            except RuntimeError as e:
+                stream, result = None, ExtractionResult.failure(str(e), "unavailable")
+        job_started({"source": source, "format": output_format, "engine": "ffmpeg"})
+        if stream is None:
+            logger.error(result.error)
+            return self._attach_metrics(
+                result, timings, context, source, output_format
+            )
+
+        context["path"] = "ytdlp-pipe" if is_url else "ffmpeg-pipe"
+        try:
+            with timings.stage("download" if is_url else "encode"):
+                with stream:
+                    for chunk in stream.chunks():
+                        target.write(chunk)
+            code = stream.returncode if stream.returncode is not None else -1
+            result = ExtractionResult(
+                success=code == 0,
+                error=stream.error,
+                output=f"Wrote {stream.bytes_read} bytes",
+                exit_code=code,
+            )
+        except OSError as e:
+            result = ExtractionResult.failure(f"Failed to stream audio: {str(e)}")
+        result.output_bytes = stream.bytes_read
+        return self._attach_metrics(
+            result,
+            timings,
+            context,
+            source,
+            output_format,
+            None if is_url else source,
+        )
+
+    def extract_to_bytes(
+        self,
+        source: str,
+        output_format: str = "mp3",
+        quality: str = "high",
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+    ) -> bytes:
+        """
+        Get encoded audio as bytes, without files.
+
+        Args:
+            source: Local file path or URL (see ``iter_audio``)
+            output_format: Audio format (mp3, wav, flac, aac, opus)
+            quality: Audio quality (high, medium, low)
+            start_time: Start time for extraction (optional)
+            end_time: End time for extraction (optional)
+            duration: Duration for extraction (optional)
+
+        Returns:
+            The encoded audio
+
+        Raises:
+            RuntimeError: If the extraction failed
+        """
+        import io
+
+        buffer = io.BytesIO()
+        result = self.extract_to_stream(
+            source, buffer, output_format, quality, start_time, end_time, duration
+        )
+        if not result.success:
+            raise RuntimeError(result.error)
+        return buffer.getvalue()
 
-        return self.core_extractor.extract_from_url(
-            url=url,
-            output_dir=str(self.output_dir),
-            format=output_format,
+    def _encoded_stream(
+        self,
+        source: str,
+        output_format: str,
+        quality: str,
+        start_time: Optional[str],
+        end_time: Optional[str],
+        duration: Optional[str],
+        chunk_size: int,
+    ) -> EncodedStream:
+        """
+        Prepare (but do not start) the processes streaming one source.
+
+        Raises:
+            ValueError: If the input or format is not usable
+            RuntimeError: If ffmpeg, or yt-dlp for a URL, is missing
+        """
+        if not self.capabilities.has_ffmpeg():
+            raise RuntimeError("Streaming output requires ffmpeg.")
+        download_cmd = None
+        input_path = source
+        if validate_url(source):
+            download_cmd = download_command(source)
+            if download_cmd is None:
+                raise RuntimeError("Streaming from URLs requires yt-dlp.")
+            input_path = "pipe:0"
+        else:
+            rejection = self._check_input(source)
+            if rejection is not None:
+                raise ValueError(rejection)
+        cmd = encode_command(
+            self.ffmpeg_engine,
+            input_path,
+            output_format=output_format,
             quality=quality,
             start_time=start_time,
             end_time=end_time,
             duration=duration,
         )
+        return EncodedStream(cmd, download_cmd=download_cmd, chunk_size=chunk_size)
+
+    def extract_to_array(
+        self,
+        input_file: str,
+        sample_rate: Optional[int] = None,
+        channels: Optional[int] = None,
+        dtype: str = "float32",
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+        scratch_dir: Optional[str] = None,
+    ) -> Any:
+        """
+        Decode audio into a NumPy array backed by a memory-mapped file.
+
+        ffmpeg writes raw PCM to a temporary file which is then mapped
+        copy-on-write, so the samples are paged in from disk on access
+        instead of being read into memory up front. The file is unlinked
+        once mapped (on Windows, when the array is garbage collected). In
+        the staging area the file's size is reserved until the array is
+        garbage collected.
+
+        Args:
+            input_file: Path to the input media file
+            sample_rate: Output sample rate in Hz (defaults to the source's)
+            channels: Output channel count (defaults to the source's)
+            dtype: Sample type ("float32", "int16" or "int32")
+            start_time: Start time for extraction (optional)
+            end_time: End time for extraction (optional)
+            duration: Duration for extraction (optional)
+            scratch_dir: Directory of the temporary file (defaults to the
+                staging area, then the temp directory)
+
+        Returns:
+            Array of shape (frames, channels)
+
+        Raises:
+            ImportError: If NumPy is not installed
+            ValueError: If the input or dtype is not usable
+            RuntimeError: If ffmpeg is missing or the decode failed
+        """
+        import subprocess
+        import tempfile
+        import weakref
+        import numpy as np
+        from .pcm import pcm_command
+
+        sample_rate, channels = self._pcm_layout(
+            input_file, sample_rate, channels, dtype
+        )
+        staging = self.staging if scratch_dir is None else None
+        reserved = 0
+        if staging is not None:
+            from .probe import probe_media
+
+            # The mapped file holds its space until the array is collected
+            seconds = self._range_duration(
+                probe_media(input_file), start_time, end_time, duration
+            )
+            frame_bytes = channels * np.dtype(dtype).itemsize
+            reserved = (
+                int(seconds * sample_rate * frame_bytes) + frame_bytes
+                if seconds
+                else DEFAULT_ESTIMATE
+            )
+            staging.reserve(reserved)
+            scratch_dir = str(staging.root)
+        array = None
+        try:
+            fd, path = tempfile.mkstemp(suffix=".pcm", dir=scratch_dir)
+            os.close(fd)
+            try:
+                cmd = pcm_command(
+                    self.ffmpeg_engine,
+                    input_file,
+                    sample_rate,
+                    channels,
+                    dtype,
+                    start_time=start_time,
+                    end_time=end_time,
+                    duration=duration,
+                    output_path=path,
+                )
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                if result.returncode != 0:
+                    raise RuntimeError(
+                        result.stderr.strip() or f"Failed to decode {input_file}"
+                    )
+                frame_bytes = channels * np.dtype(dtype).itemsize
+                frames = os.path.getsize(path) // frame_bytes
+                if frames > 0:
+                    array = np.memmap(
+                        path, dtype=dtype, mode="c", shape=(frames, channels)
+                    )
+            finally:
+                if array is None or os.name != "nt":
+                    os.unlink(path)
+        finally:
+            if staging is not None and array is None:
+                staging.release(reserved)
+        if array is None:
+            return np.empty((0, channels), dtype=dtype)
+        if os.name == "nt":
+            # A mapped file cannot be deleted on Windows
+            weakref.finalize(array, os.unlink, path)
+        if staging is not None:
+            weakref.finalize(array, staging.release, reserved)
+        return array
+
+    def iter_frames(
+        self,
+        input_file: str,
+        frames: Optional[int] = None,
+        sample_rate: Optional[int] = None,
+        channels: Optional[int] = None,
+        dtype: str = "float32",
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+        copy: bool = True,
+    ) -> Iterator[Any]:
+        """
+        Yield decoded audio in fixed-size blocks streamed from ffmpeg.
+
+        ffmpeg starts on the first ``next()`` and is stopped when the
+        iterator is closed early, so memory stays bounded by one block.
+
+        Args:
+            input_file: Path to the input media file
+            frames: Frames per block (the last one may be shorter)
+            sample_rate: Output sample rate in Hz (defaults to the source's)
+            channels: Output channel count (defaults to the source's)
+            dtype: Sample type ("float32", "int16" or "int32")
+            start_time: Start time for extraction (optional)
+            end_time: End time for extraction (optional)
+            duration: Duration for extraction (optional)
+            copy: Yield independent arrays; with False one buffer is reused
+                and each block is only valid until the next is requested
+
+        Returns:
+            Iterator of (frames, channels) arrays
+
+        Raises:
+            ImportError: If NumPy is not installed
+            ValueError: If the input or dtype is not usable
+            RuntimeError: If ffmpeg is missing or, once the stream ends, if
+                the decode failed
+        """
+        from .pcm import DEFAULT_BLOCK_FRAMES, PCMStream, pcm_command
+
+        sample_rate, channels = self._pcm_layout(
+            input_file, sample_rate, channels, dtype
+        )
+        cmd = pcm_command(
+            self.ffmpeg_engine,
+            input_file,
+            sample_rate,
+            channels,
+            dtype,
+            start_time=start_time,
+            end_time=end_time,
+            duration=duration,
+        )
+        stream = PCMStream(cmd, channels, dtype, frames or DEFAULT_BLOCK_FRAMES)
+
+        def blocks() -> Iterator[Any]:
+            with stream:
+                for block in stream.blocks():
+                    yield block.copy() if copy else block
+            if stream.returncode:
+                raise RuntimeError(
+                    f"Failed to decode {input_file} ({stream.returncode})"
+                )
+
+        return blocks()
+
+    def _pcm_layout(
+        self,
+        input_file: str,
+        sample_rate: Optional[int],
+        channels: Optional[int],
+        dtype: str,
+    ) -> Tuple[int, int]:
+        """
+        Check a PCM decode request and fill in the source's layout.
+
+        Returns:
+            Tuple of (sample rate, channels)
+
+        Raises:
+            ImportError: If NumPy is not installed
+            ValueError: If the input or dtype is not usable
+            RuntimeError: If ffmpeg is missing
+        """
+        from .pcm import SAMPLE_FORMATS, require_numpy
+
+        require_numpy()
+        if dtype not in SAMPLE_FORMATS:
+            raise ValueError(
+                f"Unsupported dtype {dtype!r} (use {', '.join(SAMPLE_FORMATS)})"
+            )
+        if not self.capabilities.has_ffmpeg():
+            raise RuntimeError("PCM decoding requires ffmpeg.")
+        rejection = self._check_input(input_file)
+        if rejection is not None:
+            raise ValueError(rejection)
+        if sample_rate is None or channels is None:
+            from .probe import get_audio_stream, probe_media
+
+            stream_info = get_audio_stream(probe_media(input_file)) or {}
+            sample_rate = sample_rate or stream_info.get("sample_rate") or 48000
+            channels = channels or stream_info.get("channels") or 2
+        return sample_rate, channels
 
     def batch_extract(
-        self, input_dir: str, output_format: str = "mp3", quality: str = "high"
-    ) -> Dict[str, Any]:
+        self,
+        input_dir: str,
+        output_format: str = "mp3",
+        quality: str = "high",
+        recursive: bool = False,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        sniff: bool = True,
+        normalize: Union[None, bool, LoudnessTarget] = None,
+        album_gain: bool = False,
+        dedupe: Optional[str] = None,
+        concurrency: Optional[ConcurrencyController] = None,
+        shortest_first: bool = False,
+        pipeline: Optional[Pipeline] = None,
+    ) -> BatchResult:
         """
         Perform batch audio extraction from a directory.
 
+        Files are discovered with a parallel scandir walk and extracted
+        concurrently while the walk is still running. With ``sniff``, every
+        file is classified by content instead of extension, so mislabeled
+        or truncated files are rejected without starting ffmpeg and media
+        with unusual extensions is still processed.
+
         Args:
             input_dir: Directory containing video files
             output_format: Audio format (mp3, wav, flac, aac)
             quality: Audio quality (high, medium, low)
+            recursive: Also process subdirectories
+            include: Glob patterns (relative to input_dir) to include
+            exclude: Glob patterns (relative to input_dir) to exclude
+            max_workers: Number of concurrent jobs (defaults to CPU count)
+            sniff: Select files by content rather than by extension
+            normalize: Normalize loudness: True for EBU R128 or a
+                LoudnessTarget (optional)
+            album_gain: Apply one common gain to the whole batch instead of
+                normalizing each file; sources are measured in parallel
+                before extraction starts
+            dedupe: Handle acoustically identical sources: "skip" extracts
+                only the first of each cluster, "link" also hard-links its
+                output under every duplicate's name (optional; requires
+                NumPy and ffmpeg)
+            concurrency: Controller adapting the number of concurrent jobs
+                and ffmpeg threads within its bounds (optional; overrides
+                ``max_workers``)
+            shortest_first: Probe every file first and extract the cheapest
+                ones first (see scheduling.py), lowering median latency at
+                the cost of not overlapping discovery and extraction
+            pipeline: Post-processing stages applied to every file
+                (optional, see ``extract_from_file``)
 
         Returns:
-            Dict containing batch extraction results
+            BatchResult (see results.py); with ``dedupe`` it also has
+            "duplicates", the clusters found (original first)
         """
         logger.info(f"Batch extracting audio from directory: {input_dir}")
 
-        if not self.is_available():
+        error_msg = self._check_batch(input_dir)
+        if error_msg is not None:
+            return BatchResult.failure(error_msg)
+
+        rejected: List[str] = []
+        files: Iterable[str] = iter_media_files(
+            input_dir,
+            extensions=() if sniff else None,
+            include=include,
+            exclude=exclude,
+            recursive=recursive,
+        )
+        if sniff:
+            files = filter_media(files, rejected=rejected)
+
+        options: Dict[str, Any] = {}
+        if normalize and album_gain:
+            if self.select_engine("ffmpeg") is None:
+                return BatchResult.failure("Loudness normalization requires ffmpeg.")
+            # Album gain needs every measurement before the first encode
+            files = list(files)
+            target = normalize if isinstance(normalize, LoudnessTarget) else None
+            gain = compute_album_gain(
+                files,
+                self.ffmpeg_engine,
+                target=target,
+                max_workers=max_workers or DEFAULT_BATCH_WORKERS,
+            )
+            if gain is not None:
+                options["normalize"] = gain
+        elif normalize:
+            options["normalize"] = normalize
+        if pipeline:
+            options["pipeline"] = pipeline
+
+        if shortest_first:
+            files = order_shortest_first(
+                list(files),
+                output_format,
+                max_workers=max_workers or DEFAULT_BATCH_WORKERS,
+            )
+
+        duplicates = None
+        if dedupe:
+            from .pcm import NUMPY_AVAILABLE
+            from .fingerprint import DuplicateFilter
+
+            if not NUMPY_AVAILABLE or self.select_engine("ffmpeg") is None:
+                return BatchResult.failure(
+                    "Duplicate detection requires NumPy and ffmpeg."
+                )
+            duplicates = DuplicateFilter(self.ffmpeg_engine, mode=dedupe)
+
+        results = list(
+            run_batch(
+                self,
+                files,
+                output_format=output_format,
+                quality=quality,
+                max_workers=max_workers,
+                duplicates=duplicates,
+                controller=concurrency,
+                **options,
+            )
+        )
+        if rejected:
+            logger.info(f"Skipped {len(rejected)} non-media files")
+        if not results:
+            summary = BatchResult.failure(
+                f"No video files found in {input_dir}", exit_code=1
+            )
+            summary.rejected = rejected
+            return summary
+        summary = summarize_batch(results)
+        summary.rejected = rejected
+        if duplicates is not None:
+            summary.duplicates = duplicates.report()
+            skipped = sum(len(cluster) - 1 for cluster in summary.duplicates)
+            if skipped:
+                summary.output += f", {skipped} duplicates reused"
+        return summary
+
+    def iter_batch(
+        self,
+        input_dir: str,
+        output_format: str = "mp3",
+        quality: str = "high",
+        recursive: bool = False,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        sniff: bool = True,
+        normalize: Union[None, bool, LoudnessTarget] = None,
+        concurrency: Optional[ConcurrencyController] = None,
+        rejected: Optional[List[str]] = None,
+        pipeline: Optional[Pipeline] = None,
+    ) -> Iterator[ExtractionResult]:
+        """
+        Extract a directory lazily, yielding each result as it completes.
+
+        Unlike ``batch_extract``, neither the file list nor the results are
+        kept: the walk, the content sniffing and the extraction jobs each
+        run a bounded window ahead of the consumer, so memory stays flat
+        however large the tree is. Closing the iterator (or abandoning it)
+        stops the walk and cancels queued jobs; jobs already running are
+        allowed to finish.
+
+        Args:
+            input_dir: Directory containing video files
+            output_format: Audio format (mp3, wav, flac, aac)
+            quality: Audio quality (high, medium, low)
+            recursive: Also process subdirectories
+            include: Glob patterns (relative to input_dir) to include
+            exclude: Glob patterns (relative to input_dir) to exclude
+            max_workers: Number of concurrent jobs (defaults to CPU count)
+            sniff: Select files by content rather than by extension
+            normalize: Normalize loudness of each file: True for EBU R128
+                or a LoudnessTarget (optional)
+            concurrency: Controller adapting the number of concurrent jobs
+                and ffmpeg threads (optional; overrides ``max_workers``)
+            rejected: List collecting the paths rejected by sniffing
+                (optional)
+            pipeline: Post-processing stages applied to every file
+                (optional, see ``extract_from_file``)
+
+        Returns:
+            Iterator of ExtractionResult, with "input" set, in completion
+            order
+
+        Raises:
+            ValueError: If no engine is available or input_dir is missing
+        """
+        error_msg = self._check_batch(input_dir)
+        if error_msg is not None:
+            raise ValueError(error_msg)
+
+        walk = iter_media_files(
+            input_dir,
+            extensions=() if sniff else None,
+            include=include,
+            exclude=exclude,
+            recursive=recursive,
+        )
+        files = filter_media(walk, rejected=rejected) if sniff else walk
+        options: Dict[str, Any] = {"normalize": normalize} if normalize else {}
+        if pipeline:
+            options["pipeline"] = pipeline
+        jobs = run_batch(
+            self,
+            files,
+            output_format=output_format,
+            quality=quality,
+            max_workers=max_workers,
+            controller=concurrency,
+            **options,
+        )
+
+        def results() -> Iterator[ExtractionResult]:
+            try:
+                yield from jobs
+            finally:
+                # Cancel queued jobs first, then stop sniffing and walking
+                jobs.close()
+                files.close()
+                walk.close()
+
+        return results()
+
+    def extract_archive(
+        self,
+        archive: str,
+        output_format: str = "mp3",
+        quality: str = "high",
+        max_workers: Optional[int] = None,
+    ) -> BatchResult:
+        """
+        Extract every video in a zip or tar archive without unpacking it.
+
+        Each member is decompressed while it is piped to ffmpeg, so the
+        archive is never expanded on disk. Outputs keep the members' names
+        and folders, e.g. ``a/clip.mp4`` becomes ``a/clip.mp3`` in the
+        output directory.
+
+        Args:
+            archive: Path of a .zip or .tar(.gz/.bz2/.xz) file
+            output_format: Audio format (mp3, wav, flac, aac)
+            quality: Audio quality (high, medium, low)
+            max_workers: Number of concurrent jobs (defaults to CPU count)
+
+        Returns:
+            BatchResult whose per-file "input" values are ArchiveMembers
+        """
+        logger.info(f"Extracting audio from archive: {archive}")
+
+        if not os.path.isfile(archive):
+            return BatchResult.failure(f"Archive not found: {archive}")
+        try:
+            members = list(iter_archive_members(archive))
+        except OSError as e:
+            return BatchResult.failure(str(e))
+        if not members:
+            return BatchResult.failure(
+                f"No video files found in {archive}", exit_code=1
+            )
+        results = list(
+            run_batch(
+                self,
+                members,
+                output_format=output_format,
+                quality=quality,
+                max_workers=max_workers,
+            )
+        )
+        return summarize_batch(results)
+
+    def _check_batch(self, input_dir: str) -> Optional[str]:
+        """
+        Check that a batch can start.
+
+        Returns:
+            Error message, or None if an engine and the directory exist
+        """
+        if self.select_engine() is None:
             error_msg = (
                 "Audio extractor core not available. "
                 "Initialize submodule first."
             )
             logger.error(error_msg)
-            return {
-                "success": False,
-                "error": error_msg,
-                "output": "",
-                "exit_code": -1,
-            }
+            return error_msg
+        if not os.path.isdir(input_dir):
+            return f"Input directory not found: {input_dir}"
+        return None
 
-        return self.core_extractor.batch_extract(
-            input_dir=input_dir,
-            output_dir=str(self.output_dir),
-            format=output_format,
-            quality=quality,
-        )
+    def check_dependencies(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Check if all required dependencies are available.
 
-    def check_dependencies(self) -> Dict[str, Any]:
-        """Check if all required dependencies are available."""
-        if not self.is_available():
-            return {
-                "success": False,
-                "error": "Audio extractor core not available",
-                "dependencies": {
-                    "core_available": False,
-                    "ffmpeg": "unknown",
-                    "yt-dlp": "unknown",
-                },
-            }
+        Uses the cached capability matrix instead of running the core, so
+        repeated checks do not spawn any processes.
+
+        Args:
+            refresh: Re-probe ffmpeg and yt-dlp instead of using the cache
+
+        Returns:
+            Dict containing dependency check results and the capability
+            matrix
+        """
+        matrix = self.capabilities.get_matrix(refresh=refresh)
+        dependencies: Dict[str, Any] = {"core_available": self.is_available()}
+        dependencies.update(self.capabilities.get_dependency_versions())
+
+        missing = [
+            name
+            for name in ("ffmpeg", "yt-dlp")
+            if dependencies[name] == "missing"
+        ]
+        if not dependencies["core_available"]:
+            missing.insert(0, "audio extractor core")
 
-        return self.core_extractor.check_dependencies()
+        return {
+            "success": not missing,
+            "error": f"Missing: {', '.join(missing)}" if missing else "",
+            "dependencies": dependencies,
+            "capabilities": matrix,
+        }
 
     def get_supported_formats(self) -> List[str]:
         """Get list of supported audio formats."""
@@ -185,3 +1778,15 @@ class AudioExtractor:
     def get_core_info(self) -> Dict[str, Any]:
         """Get information about the core audio extractor."""
         return get_core_info()
+
+    def get_core_capabilities(self) -> Dict[str, Any]:
+        """Get the subcommands and options offered by the core CLI."""
+        return self.core_extractor.get_capabilities()
+
+
+def _file_size(path: str) -> Optional[int]:
+    """Size of a file in bytes, or None if it cannot be read."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
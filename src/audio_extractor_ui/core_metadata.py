@@ -0,0 +1,227 @@
+"""
+Cached metadata about the audio-extractor core script.
+
+Loading ``extract_audio.py`` imports yt-dlp and click, so the module object,
+its version and the capabilities it offers are memoized per process and
+invalidated when the script file changes on disk.
+"""
+
+import logging
+import sys
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Optional, Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CoreMetadata:
+    """Memoized module, version and capabilities for one core script."""
+
+    def __init__(self, script_path: Path):
+        """
+        Initialize the metadata cache.
+
+        Args:
+            script_path: Path to the core ``extract_audio.py`` script
+        """
+        self.script_path = Path(script_path)
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._module: Optional[ModuleType] = None
+        self._version: Optional[str] = None
+        self._capabilities: Optional[Dict[str, Any]] = None
+
+    def _current_stamp(self) -> Optional[Tuple[int, int]]:
+        """Return the script's (mtime_ns, size), or None if missing."""
+        try:
+            stat = self.script_path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _validate(self) -> Optional[Tuple[int, int]]:
+        """Drop memoized values if the script changed since they were read."""
+        stamp = self._current_stamp()
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._module = None
+            self._version = None
+            self._capabilities = None
+        return stamp
+
+    def invalidate(self) -> None:
+        """Forget all memoized values."""
+        with self._lock:
+            self._stamp = None
+            self._module = None
+            self._version = None
+            self._capabilities = None
+
+    def get_module(self) -> Optional[ModuleType]:
+        """
+        Get the loaded core module, executing the script at most once.
+
+        Returns:
+            The core module, or None if it cannot be loaded
+        """
+        with self._lock:
+            if self._validate() is None:
+                return None
+            if self._module is None:
+                self._module = self._load_module()
+            return self._module
+
+    def _load_module(self) -> Optional[ModuleType]:
+        """Execute the core script as the ``extract_audio`` module."""
+        import importlib.util
+
+        core_dir = str(self.script_path.parent)
+        if core_dir not in sys.path:
+            sys.path.insert(0, core_dir)
+
+        try:
+            spec = importlib.util.spec_from_file_location(
+                "extract_audio", self.script_path
+            )
+            if spec is None or spec.loader is None:
+                return None
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+        except Exception as e:
+            logger.warning(f"Failed to load core module: {e}")
+            return None
+
+    def get_version(self) -> Optional[str]:
+        """
+        Get the core version.
+
+        The version is read statically from a ``__version__`` assignment when
+        possible, so the script does not need to be executed at all.
+
+        Returns:
+            Version string, "unknown" if the core declares none, or None if
+            the core cannot be read
+        """
+        with self._lock:
+            if self._validate() is None:
+                return None
+            if self._version is not None:
+                return self._version
+            version = self._read_static_version()
+
+        if version is None:
+            module = self.get_module()
+            if module is None:
+                return None
+            version = str(getattr(module, "__version__", "unknown"))
+
+        with self._lock:
+            self._version = version
+        return version
+
+    def _read_static_version(self) -> Optional[str]:
+        """Find a literal ``__version__`` assignment in the script source."""
+        import ast
+
+        try:
+            tree = ast.parse(self.script_path.read_text(encoding="utf-8"))
+        except (OSError, SyntaxError, ValueError):
+            return None
+
+        for node in tree.body:
+            if not isinstance(node, ast.Assign):
+                continue
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == "__version__":
+                    if isinstance(node.value, ast.Constant) and isinstance(
+                        node.value.value, str
+                    ):
+                        return node.value.value
+        return None
+
+    def get_capabilities(self) -> Dict[str, Any]:
+        """
+        Get the subcommands and options offered by the core CLI.
+
+        Returns:
+            Dict with "commands" (subcommand name to list of option flags)
+            and "options" (global option flags)
+        """
+        with self._lock:
+            self._validate()
+            if self._capabilities is not None:
+                return self._capabilities
+
+        module = self.get_module()
+        capabilities = introspect_cli(getattr(module, "cli", None))
+
+        with self._lock:
+            self._capabilities = capabilities
+        return capabilities
+
+    def supports_command(self, command: str) -> bool:
+        """Check whether the core CLI offers a subcommand."""
+        return command in self.get_capabilities()["commands"]
+
+    def supports_option(self, option: str, command: Optional[str] = None) -> bool:
+        """
+        Check whether the core CLI accepts an option flag.
+
+        Args:
+            option: Option flag such as "--start-time"
+            command: Subcommand the option belongs to (global if omitted)
+
+        Returns:
+            bool: True if the option is accepted, False otherwise
+        """
+        capabilities = self.get_capabilities()
+        if command is None:
+            return option in capabilities["options"]
+        return option in capabilities["commands"].get(command, [])
+
+
+def _option_flags(params: Any) -> List[str]:
+    """Collect the flags of click parameters that are options."""
+    flags: List[str] = []
+    for param in params or []:
+        if getattr(param, "param_type_name", None) == "option":
+            flags.extend(getattr(param, "opts", []))
+            flags.extend(getattr(param, "secondary_opts", []))
+    return flags
+
+
+def introspect_cli(cli: Any) -> Dict[str, Any]:
+    """
+    Describe a click command group without invoking it.
+
+    Args:
+        cli: The click group exposed by the core (may be None)
+
+    Returns:
+        Dict with "commands" and "options" keys
+    """
+    commands: Dict[str, List[str]] = {}
+    for name, command in (getattr(cli, "commands", None) or {}).items():
+        commands[name] = _option_flags(getattr(command, "params", None))
+
+    return {
+        "commands": commands,
+        "options": _option_flags(getattr(cli, "params", None)),
+    }
+
+
+_metadata_cache: Dict[Path, CoreMetadata] = {}
+_metadata_lock = threading.Lock()
+
+
+def get_core_metadata(script_path: Path) -> CoreMetadata:
+    """Get the shared metadata cache for a core script."""
+    key = Path(script_path).resolve()
+    with _metadata_lock:
+        metadata = _metadata_cache.get(key)
+        if metadata is None:
+            metadata = _metadata_cache[key] = CoreMetadata(key)
+        return metadata
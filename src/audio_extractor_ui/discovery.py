@@ -0,0 +1,200 @@
+"""
+Fast media file discovery for large directory trees.
+
+Directories are listed with ``os.scandir`` on a thread pool, so several
+directories are read concurrently (which matters most on network storage),
+and matching files are yielded as soon as their directory has been read, so
+extraction can be scheduled before the walk finishes.
+"""
+
+import fnmatch
+import logging
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional, Generator, Iterable, List, Set, Tuple
+
+from .utils import VIDEO_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+# Default number of directories listed concurrently
+DEFAULT_WALK_WORKERS = 8
+
+# (st_dev, st_ino) of a directory, used for loop detection
+DirectoryKey = Tuple[int, int]
+
+
+def _compile_globs(patterns: Optional[Iterable[str]]) -> Optional["re.Pattern"]:
+    """Combine glob patterns into a single case-sensitive regex."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+def _normalize_extensions(extensions: Iterable[str]) -> frozenset:
+    """Lower-case extensions and make sure they start with a dot."""
+    return frozenset(
+        (ext if ext.startswith(".") else f".{ext}").lower() for ext in extensions
+    )
+
+
+class _Walker:
+    """State shared by the directory listing tasks of one walk."""
+
+    def __init__(
+        self,
+        root: str,
+        extensions: frozenset,
+        include: Optional["re.Pattern"],
+        exclude: Optional["re.Pattern"],
+        follow_symlinks: bool,
+    ):
+        self.root = root
+        self.prefix_len = len(root.rstrip(os.sep)) + 1
+        self.extensions = extensions
+        self.include = include
+        self.exclude = exclude
+        self.follow_symlinks = follow_symlinks
+
+    def relative(self, path: str) -> str:
+        """Path relative to the walk root, with forward slashes."""
+        relative = path[self.prefix_len:]
+        return relative.replace(os.sep, "/") if os.sep != "/" else relative
+
+    def wants_file(self, name: str, path: str) -> bool:
+        """Check a file against the extension set and globs."""
+        if self.extensions:
+            dot = name.rfind(".")
+            if dot < 0 or name[dot:].lower() not in self.extensions:
+                return False
+        if self.include is None and self.exclude is None:
+            return True
+        relative = self.relative(path)
+        if self.exclude is not None and self.exclude.match(relative):
+            return False
+        return self.include is None or bool(self.include.match(relative))
+
+    def list_directory(
+        self, path: str
+    ) -> Tuple[List[str], List[Tuple[str, Optional[DirectoryKey]]]]:
+        """
+        List one directory.
+
+        Returns:
+            Tuple of (matching file paths, [(subdirectory, key)])
+        """
+        files: List[str] = []
+        subdirs: List[Tuple[str, Optional[DirectoryKey]]] = []
+        try:
+            entries = os.scandir(path)
+        except OSError as e:
+            logger.warning(f"Cannot list {path}: {e}")
+            return files, subdirs
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                        if self.exclude is not None and self.exclude.match(
+                            self.relative(entry.path)
+                        ):
+                            continue
+                        if self.follow_symlinks:
+                            stat = entry.stat(follow_symlinks=True)
+                            key: Optional[DirectoryKey] = (
+                                stat.st_dev,
+                                stat.st_ino,
+                            )
+                        else:
+                            # Without symlinks a tree cannot loop, so the
+                            # extra stat call is skipped
+                            key = None
+                        subdirs.append((entry.path, key))
+                    elif entry.is_file(follow_symlinks=self.follow_symlinks):
+                        if self.wants_file(entry.name, entry.path):
+                            files.append(entry.path)
+                except OSError:
+                    # Broken symlink or entry removed mid-walk
+                    continue
+        return files, subdirs
+
+
+def iter_media_files(
+    root: str,
+    extensions: Optional[Iterable[str]] = None,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    recursive: bool = True,
+    follow_symlinks: bool = False,
+    max_workers: int = DEFAULT_WALK_WORKERS,
+) -> Generator[str, None, None]:
+    """
+    Lazily discover media files below a directory.
+
+    Args:
+        root: Directory to walk
+        extensions: File extensions to accept (defaults to the supported
+            video extensions; an empty collection accepts every file)
+        include: Glob patterns a file's path relative to root must match
+        exclude: Glob patterns excluding files and pruning directories
+        recursive: Walk subdirectories
+        follow_symlinks: Follow symlinked files and directories; symlink
+            loops and directories reached twice are skipped
+        max_workers: Number of directories listed concurrently
+
+    Yields:
+        Paths of matching files, in no particular order
+    """
+    root = os.path.abspath(root)
+    walker = _Walker(
+        root,
+        VIDEO_EXTENSIONS
+        if extensions is None
+        else _normalize_extensions(extensions),
+        _compile_globs(include),
+        _compile_globs(exclude),
+        follow_symlinks,
+    )
+
+    try:
+        root_stat = os.stat(root)
+    except OSError as e:
+        logger.warning(f"Cannot walk {root}: {e}")
+        return
+
+    # Only populated when following symlinks, the one way a walk can loop
+    visited: Set[DirectoryKey] = {(root_stat.st_dev, root_stat.st_ino)}
+
+    if not recursive:
+        files, _ = walker.list_directory(root)
+        yield from files
+        return
+
+    workers = max(1, max_workers)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="walk")
+    # Listings run at most a bounded window ahead of the consumer, and
+    # directories are listed depth-first so the backlog stays small in
+    # wide trees; memory does not grow with the size of the tree
+    backlog: List[str] = [root]
+    pending: Set[Future] = set()
+    try:
+        while backlog or pending:
+            while backlog and len(pending) < 2 * workers:
+                pending.add(executor.submit(walker.list_directory, backlog.pop()))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                for path, key in subdirs:
+                    if key is not None:
+                        if key in visited:
+                            logger.debug(f"Skipping visited directory {path}")
+                            continue
+                        visited.add(key)
+                    backlog.append(path)
+                yield from files
+    finally:
+        # Also reached when the consumer stops iterating early
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
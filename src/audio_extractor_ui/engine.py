@@ -0,0 +1,237 @@
+"""
+Direct ffmpeg extraction engine.
+
+Used alongside the audio-extractor core for work the core CLI cannot
+express. Encoder choices come from the cached capability matrix, so no
+per-job probing is needed.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional, Any, BinaryIO, Dict, List, Tuple
+
+from .capabilities import CapabilityService, get_capability_service
+from .utils import parse_time
+
+logger = logging.getLogger(__name__)
+
+# Audio bitrates per quality level for lossy formats
+QUALITY_BITRATES: Dict[str, Dict[str, str]] = {
+    "mp3": {"high": "320k", "medium": "192k", "low": "128k"},
+    "aac": {"high": "256k", "medium": "192k", "low": "128k"},
+    "opus": {"high": "192k", "medium": "128k", "low": "96k"},
+}
+
+# FLAC compression level per quality level (higher is smaller but slower)
+FLAC_COMPRESSION = {"high": "8", "medium": "5", "low": "0"}
+
+# File extension per output format
+FORMAT_EXTENSIONS = {
+    "mp3": "mp3",
+    "wav": "wav",
+    "flac": "flac",
+    "aac": "aac",
+    "opus": "opus",
+}
+
+
+class FFmpegEngine:
+    """Build and run ffmpeg extraction commands."""
+
+    name = "ffmpeg"
+
+    def __init__(self, capabilities: Optional[CapabilityService] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            capabilities: Capability service to choose encoders from
+                (optional, the shared service by default)
+        """
+        self.capabilities = capabilities or get_capability_service()
+
+    def is_available(self) -> bool:
+        """Check if ffmpeg is available."""
+        return self.capabilities.has_ffmpeg()
+
+    @property
+    def ffmpeg(self) -> str:
+        """Path of the ffmpeg binary the matrix was probed from."""
+        return self.capabilities.get_matrix()["stamps"]["ffmpeg_path"] or "ffmpeg"
+
+    def codec_args(self, output_format: str, quality: str = "high") -> List[str]:
+        """
+        Get the encoder arguments for a format and quality.
+
+        Args:
+            output_format: Audio format (mp3, wav, flac, aac)
+            quality: Audio quality (high, medium, low)
+
+        Returns:
+            List of ffmpeg output arguments
+
+        Raises:
+            ValueError: If no encoder is available for the format
+        """
+        encoder = self.capabilities.select_encoder(output_format)
+        if encoder is None:
+            raise ValueError(f"No ffmpeg encoder available for {output_format}")
+
+        args = ["-c:a", encoder]
+        if output_format in QUALITY_BITRATES:
+            args.extend(["-b:a", QUALITY_BITRATES[output_format][quality]])
+        elif output_format == "flac":
+            args.extend(["-compression_level", FLAC_COMPRESSION[quality]])
+        return args
+
+    def time_args(
+        self,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Get the input seek and output length arguments for a time range.
+
+        The start is applied as an (accurate) input seek, so the end time is
+        converted to a duration relative to it.
+
+        Returns:
+            Tuple of (input arguments, output arguments)
+        """
+        start = parse_time(start_time) or 0.0
+        end = parse_time(end_time)
+        length = parse_time(duration)
+        if end is not None:
+            length = end - start
+            if length <= 0:
+                raise ValueError("End time must be after start time")
+
+        input_args = ["-ss", f"{start:.3f}"] if start else []
+        output_args = ["-t", f"{length:.3f}"] if length is not None else []
+        return input_args, output_args
+
+    def output_path(
+        self, input_path: str, output_dir: str, output_format: str
+    ) -> Path:
+        """Get the output file path used for an input."""
+        extension = FORMAT_EXTENSIONS.get(output_format, output_format)
+        return Path(output_dir) / f"{Path(input_path).stem}.{extension}"
+
+    def build_command(
+        self,
+        input_path: str,
+        output_path: str,
+        output_format: str = "mp3",
+        quality: str = "high",
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+        audio_filter: Optional[str] = None,
+        threads: Optional[int] = None,
+        input_args: Optional[List[str]] = None,
+        output_args: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build an ffmpeg command extracting the audio of one input.
+
+        Args:
+            input_path: Path (or URL/pipe) of the input media
+            output_path: Path (or pipe) to write the audio to
+            output_format: Audio format (mp3, wav, flac, aac)
+            quality: Audio quality (high, medium, low)
+            start_time: Start time for extraction (optional)
+            end_time: End time for extraction (optional)
+            duration: Duration for extraction (optional)
+            audio_filter: ffmpeg audio filter graph (optional)
+            threads: Value for ffmpeg ``-threads`` (optional)
+            input_args: Options placed before ``-i``, e.g. the format of a
+                raw PCM input (optional)
+            output_args: Extra options placed before the output path
+                (optional)
+
+        Returns:
+            Command as a list of arguments
+        """
+        seek_args, length_args = self.time_args(start_time, end_time, duration)
+
+        cmd = [self.ffmpeg, "-hide_banner", "-nostdin", "-y"]
+        cmd.extend(input_args or [])
+        cmd.extend(seek_args)
+        cmd.extend(["-i", input_path, "-vn", "-sn", "-dn"])
+        cmd.extend(length_args)
+        if audio_filter:
+            cmd.extend(["-af", audio_filter])
+        cmd.extend(self.codec_args(output_format, quality))
+        if threads:
+            cmd.extend(["-threads", str(threads)])
+        cmd.extend(output_args or [])
+        cmd.append(output_path)
+        return cmd
+
+    def extract(
+        self,
+        input_path: str,
+        output_dir: str = "output",
+        format: str = "mp3",
+        quality: str = "high",
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        duration: Optional[str] = None,
+        audio_filter: Optional[str] = None,
+        threads: Optional[int] = None,
+        input_stream: Optional[BinaryIO] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extract audio from a local file or URL with ffmpeg.
+
+        Args:
+            input_path: Path of the input media (with ``input_stream``,
+                only the name the output file is derived from)
+            output_dir: Output directory for extracted audio
+            format: Audio format (mp3, wav, flac, aac)
+            quality: Audio quality (high, medium, low)
+            start_time: Start time for extraction (optional)
+            end_time: End time for extraction (optional)
+            duration: Duration for extraction (optional)
+            audio_filter: ffmpeg audio filter graph (optional)
+            threads: Value for ffmpeg ``-threads`` (optional)
+            input_stream: Binary stream piped to ffmpeg's stdin instead of
+                reading input_path (optional)
+
+        Returns:
+            Dict containing extraction result
+        """
+        from .resources import run_measured
+
+        try:
+            output_path = self.output_path(input_path, output_dir, format)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            cmd = self.build_command(
+                input_path if input_stream is None else "pipe:0",
+                str(output_path),
+                output_format=format,
+                quality=quality,
+                start_time=start_time,
+                end_time=end_time,
+                duration=duration,
+                audio_filter=audio_filter,
+                threads=threads,
+            )
+            result, usage = run_measured(cmd, text=True, input=input_stream)
+        except (OSError, ValueError) as e:
+            return {
+                "success": False,
+                "error": f"Failed to run ffmpeg: {str(e)}",
+                "output": "",
+                "exit_code": -1,
+            }
+
+        return {
+            "success": result.returncode == 0,
+            "error": result.stderr if result.returncode != 0 else "",
+            "output": result.stdout,
+            "exit_code": result.returncode,
+            "output_path": str(output_path),
+            "resources": usage,
+        }
@@ -0,0 +1,348 @@
+"""
+Acoustic fingerprints for finding re-uploads of the same content.
+
+A fingerprint is a sequence of 32-bit sub-fingerprints computed from the
+band energies of a short decoded prefix (Haitsma-Kalker style): each bit is
+the sign of an energy difference across neighbouring bands and consecutive
+frames, so it survives re-encoding and container changes. Fingerprints are
+stored in the media cache, and an inverted index of sub-fingerprint values
+finds candidate matches without comparing against every known source.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Optional, Any, Dict, List, Tuple
+
+from .cache import MediaCache, get_media_cache
+from .pcm import NUMPY_AVAILABLE, PCMStream, pcm_command, require_numpy
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Length of the decoded prefix in seconds
+FINGERPRINT_SECONDS = 30
+
+# Decoding parameters and analysis frames
+FINGERPRINT_SAMPLE_RATE = 11025
+FRAME_SIZE = 2048
+HOP_SIZE = 1024
+
+# 33 log-spaced bands between these frequencies give 32 bits per frame
+BAND_RANGE = (300.0, 2000.0)
+BAND_COUNT = 33
+
+# Bit error rate at or below which two fingerprints are duplicates
+DEFAULT_MAX_BER = 0.35
+
+# Minimum number of overlapping frames for a comparison
+MIN_OVERLAP = 50
+
+# Bumped whenever the fingerprint computation changes
+FINGERPRINT_VERSION = 1
+
+
+def compute_fingerprint(samples: "np.ndarray", sample_rate: int) -> List[int]:
+    """
+    Compute the sub-fingerprints of mono audio.
+
+    Args:
+        samples: 1-D float array
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        One 32-bit integer per analysis frame (after the first)
+    """
+    require_numpy()
+    frame_count = 1 + (len(samples) - FRAME_SIZE) // HOP_SIZE
+    if frame_count < 2:
+        return []
+
+    starts = np.arange(frame_count) * HOP_SIZE
+    frames = samples[starts[:, None] + np.arange(FRAME_SIZE)]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(FRAME_SIZE), axis=1)) ** 2
+
+    edges = np.geomspace(BAND_RANGE[0], BAND_RANGE[1], BAND_COUNT + 1)
+    bins = np.round(edges * FRAME_SIZE / sample_rate).astype(np.int64)
+    energy = np.add.reduceat(spectrum, bins[:-1], axis=1)[:, :BAND_COUNT]
+
+    band_diff = energy[:, :-1] - energy[:, 1:]
+    bits = (band_diff[1:] - band_diff[:-1]) > 0
+    weights = (1 << np.arange(BAND_COUNT - 2, -1, -1)).astype(np.uint64)
+    return [int(code) for code in bits.astype(np.uint64) @ weights]
+
+
+def bit_error_rate(a: List[int], b: List[int], offset: int = 0) -> float:
+    """
+    Fraction of differing bits between two aligned fingerprints.
+
+    Args:
+        a: First fingerprint
+        b: Second fingerprint
+        offset: Position in ``b`` aligned with the start of ``a``
+
+    Returns:
+        Bit error rate, or 1.0 if the overlap is too short
+    """
+    start_a = max(0, -offset)
+    start_b = max(0, offset)
+    length = min(len(a) - start_a, len(b) - start_b)
+    if length < MIN_OVERLAP:
+        return 1.0
+    x = np.asarray(a[start_a:start_a + length], dtype=np.uint32)
+    y = np.asarray(b[start_b:start_b + length], dtype=np.uint32)
+    differing = np.unpackbits((x ^ y).view(np.uint8)).sum()
+    return float(differing) / (32 * length)
+
+
+def get_fingerprint(
+    path: str, engine: Any, cache: Optional[MediaCache] = None
+) -> Optional[List[int]]:
+    """
+    Get a source's fingerprint, decoding its prefix when not cached.
+
+    Args:
+        path: Path to the source
+        engine: FFmpegEngine used to decode the source
+        cache: Media cache (optional, the shared cache by default)
+
+    Returns:
+        Fingerprint, or None if the source could not be decoded
+    """
+    require_numpy()
+    cache = cache or get_media_cache()
+    cached = cache.get(path, "fingerprint")
+    if cached and cached.get("version") == FINGERPRINT_VERSION:
+        return cached["codes"]
+
+    cmd = pcm_command(
+        engine,
+        path,
+        FINGERPRINT_SAMPLE_RATE,
+        1,
+        duration=str(FINGERPRINT_SECONDS),
+    )
+    try:
+        with PCMStream(cmd, 1) as stream:
+            blocks = [block[:, 0].copy() for block in stream.blocks()]
+    except OSError as e:
+        logger.warning(f"Fingerprinting failed for {path}: {e}")
+        return None
+    if stream.returncode != 0:
+        logger.warning(f"Fingerprinting failed for {path}")
+        return None
+
+    samples = np.concatenate(blocks) if blocks else np.zeros(0, np.float32)
+    codes = compute_fingerprint(samples, FINGERPRINT_SAMPLE_RATE)
+    cache.set(
+        path, "fingerprint", {"version": FINGERPRINT_VERSION, "codes": codes}
+    )
+    return codes
+
+
+class FingerprintIndex:
+    """
+    Inverted index from sub-fingerprint values to sources.
+
+    A lookup only compares the query against sources sharing at least one
+    exact sub-fingerprint, at the alignments those shared values suggest.
+    """
+
+    def __init__(self, max_ber: float = DEFAULT_MAX_BER, candidates: int = 5):
+        """
+        Initialize the index.
+
+        Args:
+            max_ber: Bit error rate at or below which sources match
+            candidates: Number of best (source, offset) pairs verified
+        """
+        self.max_ber = max_ber
+        self.candidates = candidates
+        self._codes: Dict[int, List[Tuple[str, int]]] = defaultdict(list)
+        self._fingerprints: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def add(self, key: str, fingerprint: List[int]) -> None:
+        """Index a source's fingerprint."""
+        self._fingerprints[key] = fingerprint
+        for position, code in enumerate(fingerprint):
+            # All-equal bits come from silence and match everything
+            if code not in (0, 0xFFFFFFFF):
+                self._codes[code].append((key, position))
+
+    def query(self, fingerprint: List[int]) -> Optional[Tuple[str, float]]:
+        """
+        Find the best matching indexed source.
+
+        Args:
+            fingerprint: Fingerprint to look up
+
+        Returns:
+            Tuple of (key, bit error rate), or None if nothing matches
+        """
+        votes: Counter = Counter()
+        for position, code in enumerate(fingerprint):
+            for key, other in self._codes.get(code, ()):
+                votes[(key, other - position)] += 1
+
+        best: Optional[Tuple[str, float]] = None
+        for (key, offset), _ in votes.most_common(self.candidates):
+            ber = bit_error_rate(fingerprint, self._fingerprints[key], offset)
+            if ber <= self.max_ber and (best is None or ber < best[1]):
+                best = (key, ber)
+        return best
+
+
+class _Original:
+    """Extraction state of the first source of a duplicate cluster."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Dict[str, Any] = {}
+
+
+class DuplicateFilter:
+    """
+    Skip or hard-link extractions of near-duplicate sources in a batch.
+
+    The first source of each cluster is extracted normally; later ones wait
+    for it and then either skip extraction ("skip") or hard-link its output
+    under their own name ("link", copying across filesystems).
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        mode: str = "skip",
+        max_ber: float = DEFAULT_MAX_BER,
+        cache: Optional[MediaCache] = None,
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            engine: FFmpegEngine used to decode fingerprint prefixes
+            mode: "skip" or "link"
+            max_ber: Bit error rate at or below which sources are duplicates
+            cache: Media cache (optional, the shared cache by default)
+        """
+        if mode not in ("skip", "link"):
+            raise ValueError(f"Unknown duplicate mode: {mode}")
+        require_numpy()
+        self.engine = engine
+        self.mode = mode
+        self.cache = cache
+        self.index = FingerprintIndex(max_ber)
+        self.clusters: Dict[str, List[str]] = {}
+        self._originals: Dict[str, _Original] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, path: str) -> Optional[str]:
+        """
+        Register a source.
+
+        Returns:
+            Path of the source it duplicates, or None if it is new
+        """
+        fingerprint = get_fingerprint(path, self.engine, self.cache)
+        with self._lock:
+            match = self.index.query(fingerprint) if fingerprint else None
+            if match is not None:
+                original = match[0]
+                self.clusters[original].append(path)
+                logger.info(
+                    f"{path} duplicates {original} "
+                    f"(bit error rate {match[1]:.2f})"
+                )
+                return original
+            if fingerprint:
+                self.index.add(path, fingerprint)
+            self.clusters[path] = []
+            self._originals[path] = _Original()
+            return None
+
+    def extract(
+        self,
+        extractor: Any,
+        path: str,
+        output_format: str,
+        quality: str,
+        **options: Any,
+    ) -> Dict[str, Any]:
+        """
+        Extract one batch file unless it duplicates an earlier one.
+
+        Returns:
+            Extraction result; results of duplicates carry "duplicate_of"
+        """
+        original = self.claim(path)
+        if original is None:
+            state = self._originals[path]
+            try:
+                state.result = extractor.extract_from_file(
+                    path, output_format, quality, **options
+                )
+            finally:
+                state.done.set()
+            return state.result
+
+        state = self._originals[original]
+        state.done.wait()
+        if not state.result.get("success"):
+            # Nothing to reuse; extract this copy on its own
+            return extractor.extract_from_file(
+                path, output_format, quality, **options
+            )
+
+        result = {
+            "success": True,
+            "error": "",
+            "output": f"Skipped duplicate of {original}",
+            "exit_code": 0,
+            "duplicate_of": original,
+        }
+        if self.mode == "link":
+            source = state.result.get("output_path") or str(
+                self.engine.output_path(
+                    original, str(extractor.output_dir), output_format
+                )
+            )
+            target = self.engine.output_path(
+                path, str(extractor.output_dir), output_format
+            )
+            try:
+                _link_or_copy(source, target)
+            except OSError as e:
+                result.update(success=False, error=str(e), exit_code=-1)
+                return result
+            result["output"] = f"Linked output of duplicate {original}"
+            result["output_path"] = str(target)
+        return result
+
+    def report(self) -> List[List[str]]:
+        """Get the clusters found so far (original first)."""
+        with self._lock:
+            return [
+                [original] + copies
+                for original, copies in self.clusters.items()
+                if copies
+            ]
+
+
+def _link_or_copy(source: str, target: Path) -> None:
+    """Hard-link a file, copying when linking is not possible."""
+    if os.path.abspath(source) == os.path.abspath(target):
+        return
+    if target.exists():
+        target.unlink()
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
@@ -2,7 +2,10 @@
 GUI interface for the audio extractor.
 """
 
+import queue
 import sys
+import threading
+from collections.abc import Mapping
 from pathlib import Path
 
 try:
@@ -14,14 +17,152 @@ except ImportError:
     GUI_AVAILABLE = False
 
 from .core import AudioExtractor
+from .scheduling import get_job_queue
 from .utils import (
     validate_file_path,
     validate_url,
     is_video_file,
     sanitize_filename,
+    format_time,
 )
 
 
+class WaveformView:
+    """Waveform canvas with drag-to-select time ranges."""
+
+    HEIGHT = 100
+
+    def __init__(self, parent, extractor, on_select):
+        """
+        Create the waveform view.
+
+        Args:
+            parent: Parent widget
+            extractor: AudioExtractor whose ffmpeg engine decodes sources
+            on_select: Called with (start, end) seconds of a selection
+        """
+        self.extractor = extractor
+        self.on_select = on_select
+        self.waveform = None
+        self.drag_start = None
+        self.results = queue.Queue()
+        # Number of the latest load; results of earlier loads are dropped
+        self.load_token = 0
+        self.poll_id = None
+
+        self.frame = ttk.Frame(parent)
+        self.canvas = tk.Canvas(
+            self.frame, height=self.HEIGHT, background="#1e1e1e",
+            highlightthickness=0,
+        )
+        self.canvas.pack(fill="x")
+        self.status = ttk.Label(self.frame, text="Select a file to see its waveform")
+        self.status.pack(anchor="w")
+
+        self.canvas.bind("<Configure>", lambda event: self.draw())
+        self.canvas.bind("<ButtonPress-1>", self.on_press)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_release)
+
+    def load(self, file_path):
+        """Load a source's waveform in the background."""
+        from .pcm import NUMPY_AVAILABLE
+
+        self.load_token += 1
+        token = self.load_token
+        if self.poll_id is not None:
+            self.canvas.after_cancel(self.poll_id)
+            self.poll_id = None
+        self.waveform = None
+        self.canvas.delete("all")
+        if not NUMPY_AVAILABLE:
+            self.status.config(text="Waveform requires NumPy")
+            return
+        self.status.config(text="Loading waveform...")
+
+        def work():
+            from .waveform import load_waveform
+
+            try:
+                waveform = load_waveform(file_path, self.extractor.ffmpeg_engine)
+            except Exception as e:
+                waveform = e
+            self.results.put((token, file_path, waveform))
+
+        threading.Thread(target=work, daemon=True).start()
+        self.poll_id = self.canvas.after(100, self.poll)
+
+    def poll(self):
+        """Pick up the latest load once it finishes."""
+        while True:
+            try:
+                token, file_path, waveform = self.results.get_nowait()
+            except queue.Empty:
+                self.poll_id = self.canvas.after(100, self.poll)
+                return
+            if token == self.load_token:
+                break
+        self.poll_id = None
+
+        if isinstance(waveform, Exception) or waveform is None:
+            self.status.config(
+                text=f"Could not load waveform of {Path(file_path).name}"
+            )
+            return
+        self.waveform = waveform
+        self.status.config(
+            text=f"{format_time(waveform.duration)} - drag to select a range"
+        )
+        self.draw()
+
+    def draw(self):
+        """Draw the waveform scaled to the canvas width."""
+        self.canvas.delete("wave")
+        if self.waveform is None:
+            return
+        width = max(1, self.canvas.winfo_width())
+        minimums, maximums = self.waveform.peaks(0, self.waveform.duration, width)
+        middle = self.HEIGHT / 2
+        step = width / max(1, len(minimums))
+        for x, (low, high) in enumerate(zip(minimums, maximums)):
+            self.canvas.create_line(
+                x * step, middle - high * middle,
+                x * step, middle - low * middle + 1,
+                fill="#4fc3f7", tags="wave",
+            )
+
+    def time_at(self, x):
+        """Convert a canvas x coordinate to seconds."""
+        width = max(1, self.canvas.winfo_width())
+        return min(max(x, 0), width) / width * self.waveform.duration
+
+    def on_press(self, event):
+        """Start a selection."""
+        if self.waveform is None:
+            return
+        self.drag_start = event.x
+        self.canvas.delete("selection")
+
+    def on_drag(self, event):
+        """Show the selection while dragging."""
+        if self.drag_start is None:
+            return
+        self.canvas.delete("selection")
+        self.canvas.create_rectangle(
+            self.drag_start, 0, event.x, self.HEIGHT,
+            outline="#ffb74d", tags="selection",
+        )
+
+    def on_release(self, event):
+        """Finish a selection and report its time range."""
+        if self.drag_start is None:
+            return
+        start, end = sorted((self.time_at(self.drag_start), self.time_at(event.x)))
+        self.drag_start = None
+        if end - start > 0.01:
+            self.on_select(start, end)
+
+
 class AudioExtractorGUI:
     """Main GUI application class."""
 
@@ -124,7 +265,13 @@ class AudioExtractorGUI:
         ttk.Label(
             parent, 
             text="Format: HH:MM:SS.mmm, MM:SS.mmm, or seconds (e.g., 1:30.500, 90.250). Use End OR Duration, not both."
-        ).pack(anchor="w", pady=(0, 10))
+        ).pack(anchor="w", pady=(0, 5))
+
+        # Waveform (drag to select the time range)
+        self.waveform_view = WaveformView(
+            parent, self.extractor, self.set_file_time_range
+        )
+        self.waveform_view.frame.pack(fill="x", pady=(0, 10))
 
         # Output path selection
         ttk.Label(parent, text="Output Path (optional):").pack(
@@ -304,6 +451,7 @@ class AudioExtractorGUI:
 
         if filename:
             self.file_path_var.set(filename)
+            self.waveform_view.load(filename)
             # Auto-populate output path if empty
             if not self.file_output_path_var.get():
                 input_path = Path(filename)
@@ -313,6 +461,12 @@ class AudioExtractorGUI:
                 )
                 self.file_output_path_var.set(str(suggested_path))
 
+    def set_file_time_range(self, start, end):
+        """Fill the file tab's time range from a waveform selection."""
+        self.file_start_time_var.set(format_time(start))
+        self.file_end_time_var.set(format_time(end))
+        self.file_duration_var.set("")
+
     def browse_output_path_file(self):
         """Open save file dialog for file tab output path."""
         # Get current path or suggest one
@@ -373,6 +527,46 @@ class AudioExtractorGUI:
         if filepath:
             self.url_output_path_var.set(filepath)
 
+    def run_job(self, on_done, func, *args, **kwargs):
+        """
+        Run an extraction in the interactive lane of the job queue.
+
+        The Tk thread is not blocked: the job's future is polled with
+        ``after()`` and passed to ``on_done`` once it has finished.
+        """
+        future = get_job_queue().submit(func, *args, interactive=True, **kwargs)
+        self.poll_job(future, on_done)
+
+    def poll_job(self, future, on_done):
+        """Check a running job, calling ``on_done`` once it has finished."""
+        if future.done():
+            on_done(future)
+        else:
+            self.root.after(100, self.poll_job, future, on_done)
+
+    def finish_job(self, future, status, progress, saved_to=None):
+        """Report the outcome of a finished extraction job."""
+        progress.stop()
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            status.config(text="Error occurred")
+            return
+
+        if isinstance(result, Mapping) and result.get("success", False):
+            success_msg = "Audio extraction completed successfully!"
+            if saved_to:
+                success_msg += f"\nSaved to: {saved_to}"
+            messagebox.showinfo("Success", success_msg)
+            status.config(text="Extraction completed")
+        else:
+            error_msg = "Audio extraction failed"
+            if isinstance(result, Mapping) and result.get("error"):
+                error_msg += f": {result['error']}"
+            messagebox.showerror("Error", error_msg)
+            status.config(text="Extraction failed")
+
     def extract_from_file(self):
         """Extract audio from selected file."""
         file_path = self.file_path_var.get()
@@ -422,6 +616,8 @@ class AudioExtractorGUI:
             # Get custom output path
             custom_output_path = self.file_output_path_var.get().strip()
             format_ext = self.format_var.get()
+            temp_extractor = AudioExtractor()
+            saved_to = None
 
             if custom_output_path:
                 # Use the specified output path
@@ -437,52 +633,26 @@ class AudioExtractorGUI:
                 # Create directory if it doesn't exist
                 output_path.parent.mkdir(parents=True, exist_ok=True)
 
-                # Use custom output directory and filename
-                temp_extractor = AudioExtractor()
+                # Use custom output directory
                 temp_extractor.output_dir = output_path.parent
-
-                # For custom paths, we'll handle the naming manually
-                result = temp_extractor.extract_from_file(
-                    file_path, 
-                    self.format_var.get(), 
-                    self.quality_var.get(),
-                    start_time=start_time,
-                    end_time=end_time,
-                    duration=duration
-                )
-
-                final_output_path = str(output_path)
-            else:
-                # Use default behavior - let core module handle everything
-                temp_extractor = AudioExtractor()
-                result = temp_extractor.extract_from_file(
-                    file_path, 
-                    self.format_var.get(), 
-                    self.quality_var.get(),
-                    start_time=start_time,
-                    end_time=end_time,
-                    duration=duration
-                )
-                final_output_path = "output directory"
-
-            if isinstance(result, dict) and result.get("success", False):
-                success_msg = "Audio extraction completed successfully!"
-                if custom_output_path:
-                    success_msg += f"\nSaved to: {final_output_path}"
-                messagebox.showinfo("Success", success_msg)
-                self.file_status.config(text="Extraction completed")
-            else:
-                error_msg = "Audio extraction failed"
-                if isinstance(result, dict) and result.get("error"):
-                    error_msg += f": {result['error']}"
-                messagebox.showerror("Error", error_msg)
-                self.file_status.config(text="Extraction failed")
+                saved_to = str(output_path)
+
+            self.run_job(
+                lambda future: self.finish_job(
+                    future, self.file_status, self.file_progress, saved_to
+                ),
+                temp_extractor.extract_from_file,
+                file_path,
+                self.format_var.get(),
+                self.quality_var.get(),
+                start_time=start_time,
+                end_time=end_time,
+                duration=duration,
+            )
 
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
             self.file_status.config(text="Error occurred")
-
-        finally:
             self.file_progress.stop()
 
     def extract_from_url(self):
@@ -527,6 +697,8 @@ class AudioExtractorGUI:
             # Get custom output path
             custom_output_path = self.url_output_path_var.get().strip()
             format_ext = self.url_format_var.get()
+            temp_extractor = AudioExtractor()
+            saved_to = None
 
             if custom_output_path:
                 # Use the specified output path
@@ -543,50 +715,25 @@ class AudioExtractorGUI:
                 output_path.parent.mkdir(parents=True, exist_ok=True)
 
                 # Use custom output directory
-                temp_extractor = AudioExtractor()
                 temp_extractor.output_dir = output_path.parent
-
-                result = temp_extractor.extract_from_url(
-                    url, 
-                    self.url_format_var.get(), 
-                    self.url_quality_var.get(),
-                    start_time=start_time,
-                    end_time=end_time,
-                    duration=duration
-                )
-
-                final_output_path = str(output_path)
-            else:
-                # Use default behavior - let core module handle everything
-                temp_extractor = AudioExtractor()
-                result = temp_extractor.extract_from_url(
-                    url, 
-                    self.url_format_var.get(), 
-                    self.url_quality_var.get(),
-                    start_time=start_time,
-                    end_time=end_time,
-                    duration=duration
-                )
-                final_output_path = "output directory"
-
-            if isinstance(result, dict) and result.get("success", False):
-                success_msg = "Audio extraction completed successfully!"
-                if custom_output_path:
-                    success_msg += f"\nSaved to: {final_output_path}"
-                messagebox.showinfo("Success", success_msg)
-                self.url_status.config(text="Extraction completed")
-            else:
-                error_msg = "Audio extraction failed"
-                if isinstance(result, dict) and result.get("error"):
-                    error_msg += f": {result['error']}"
-                messagebox.showerror("Error", error_msg)
-                self.url_status.config(text="Extraction failed")
+                saved_to = str(output_path)
+
+            self.run_job(
+                lambda future: self.finish_job(
+                    future, self.url_status, self.url_progress, saved_to
+                ),
+                temp_extractor.extract_from_url,
+                url,
+                self.url_format_var.get(),
+                self.url_quality_var.get(),
+                start_time=start_time,
+                end_time=end_time,
+                duration=duration,
+            )
 
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
             self.url_status.config(text="Error occurred")
-
-        finally:
             self.url_progress.stop()
 
     def run(self):
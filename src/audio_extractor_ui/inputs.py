@@ -0,0 +1,246 @@
+"""
+Non-file inputs: bytes, readable streams, stdin and archive members.
+
+These are fed to ffmpeg through its stdin pipe, so nothing is copied to
+disk first; zip members are decompressed on the fly while ffmpeg reads
+them, which halves the disk traffic of unpacking a bundle before
+extracting.
+
+ffmpeg cannot seek in a pipe. Containers that keep their index at the end
+(MP4/MOV written without "faststart") may therefore fail to decode from a
+stream even though the same file works from a path.
+"""
+
+import io
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import PurePosixPath
+from typing import Optional, Any, BinaryIO, Iterator, Tuple, Union, cast
+
+from .utils import VIDEO_EXTENSIONS
+
+# Name stdin is given on the command line and in output file names
+STDIN = "-"
+
+
+class ArchiveMember:
+    """A file inside a zip or tar archive, read without unpacking."""
+
+    __slots__ = ("archive", "member")
+
+    def __init__(self, archive: Union[str, "os.PathLike[str]"], member: str):
+        """
+        Initialize the member reference.
+
+        Args:
+            archive: Path of the .zip or .tar(.gz/.bz2/.xz) file
+            member: Name of the member inside the archive
+        """
+        self.archive = os.fspath(archive)
+        self.member = member
+
+    @property
+    def name(self) -> str:
+        """Base name of the member."""
+        return PurePosixPath(self.member).name
+
+    @property
+    def folder(self) -> str:
+        """
+        Directory of the member inside the archive ("" at the top level).
+
+        Outputs are written to the same folder below the output
+        directory, so members with equal base names do not collide. Root
+        and ".." components are dropped to keep it inside that directory.
+        """
+        parts = PurePosixPath(self.member).parent.parts
+        return "/".join(part for part in parts if part not in ("/", ".", ".."))
+
+    @contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        """
+        Open the member for streaming.
+
+        Every call opens the archive separately, so members of one zip can
+        be read concurrently. Members of compressed tar archives are found
+        by decompressing from the start, so zip or plain tar bundles are
+        much cheaper to process member by member.
+
+        Yields:
+            Binary file object of the member's content
+
+        Raises:
+            KeyError: If the archive has no such member
+            OSError: If the archive cannot be read
+        """
+        # Deferred: zipfile and tarfile are comparatively slow to import
+        import tarfile
+        import zipfile
+
+        if zipfile.is_zipfile(self.archive):
+            with zipfile.ZipFile(self.archive) as bundle:
+                with bundle.open(self.member) as entry:
+                    yield cast(BinaryIO, entry)
+            return
+        try:
+            tarball = tarfile.open(self.archive, "r:*")
+        except tarfile.TarError as e:
+            raise OSError(f"Cannot read archive {self.archive}: {e}") from e
+        with tarball:
+            member = tarball.extractfile(self.member)
+            if member is None:
+                raise KeyError(f"{self.member} is not a regular file")
+            with member:
+                yield cast(BinaryIO, member)
+
+    def __str__(self) -> str:
+        return f"{self.archive}!{self.member}"
+
+    def __repr__(self) -> str:
+        return f"ArchiveMember({self.archive!r}, {self.member!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, ArchiveMember)
+            and self.archive == other.archive
+            and self.member == other.member
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.archive, self.member))
+
+
+def iter_archive_members(
+    archive: Union[str, "os.PathLike[str]"], extensions: Optional[frozenset] = None
+) -> Iterator[ArchiveMember]:
+    """
+    List the media files in an archive without extracting anything.
+
+    Args:
+        archive: Path of a .zip or .tar(.gz/.bz2/.xz) file
+        extensions: Member extensions to accept (defaults to the supported
+            video extensions)
+
+    Yields:
+        ArchiveMember per matching regular file, in archive order
+
+    Raises:
+        OSError: If the archive cannot be read
+    """
+    import tarfile
+    import zipfile
+
+    extensions = VIDEO_EXTENSIONS if extensions is None else extensions
+    path = os.fspath(archive)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as bundle:
+            names = [info.filename for info in bundle.infolist() if not info.is_dir()]
+    else:
+        try:
+            with tarfile.open(path, "r:*") as bundle:
+                names = [info.name for info in bundle.getmembers() if info.isfile()]
+        except tarfile.TarError as e:
+            raise OSError(f"Cannot read archive {path}: {e}") from e
+    for name in names:
+        if PurePosixPath(name).suffix.lower() in extensions:
+            yield ArchiveMember(path, name)
+
+
+def is_stream_input(source: Any) -> bool:
+    """Check whether an input must be fed to ffmpeg through a pipe."""
+    if isinstance(source, str):
+        return source == STDIN
+    return not isinstance(source, os.PathLike)
+
+
+def input_name(source: Any) -> str:
+    """
+    Name used for a stream input's output file and in logs.
+
+    Returns:
+        The member or file name, "stdin" or "stream"
+    """
+    if isinstance(source, ArchiveMember):
+        return source.name
+    if isinstance(source, str) and source == STDIN:
+        return "stdin"
+    name = getattr(source, "name", None)
+    if isinstance(name, str) and not name.startswith("<"):
+        return os.path.basename(name)
+    return "stream"
+
+
+def input_label(source: Any) -> str:
+    """Short description of any input for logs and metrics."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<{len(source)} bytes>"
+    if is_stream_input(source) and not isinstance(source, ArchiveMember):
+        return f"<{input_name(source)}>"
+    return str(source)
+
+
+@contextmanager
+def open_input(source: Any) -> Iterator[BinaryIO]:
+    """
+    Open a stream input for reading.
+
+    Args:
+        source: bytes-like object, binary file object, ``"-"`` for stdin
+            or ArchiveMember
+
+    Yields:
+        Binary file object (caller-supplied streams are not closed)
+    """
+    if isinstance(source, ArchiveMember):
+        with source.open() as stream:
+            yield stream
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, str) and source == STDIN:
+        yield sys.stdin.buffer
+    elif hasattr(source, "read"):
+        yield source
+    else:
+        raise ValueError(f"Unsupported input: {type(source).__name__}")
+
+
+class PrefixedReader(io.RawIOBase):
+    """A stream with bytes already read from its start put back in front."""
+
+    def __init__(self, head: bytes, stream: BinaryIO):
+        self._head = memoryview(head)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        if self._head:
+            count = min(len(buffer), len(self._head))
+            buffer[:count] = self._head[:count]
+            self._head = self._head[count:]
+            return count
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def peek_head(stream: BinaryIO, size: int) -> Tuple[bytes, BinaryIO]:
+    """
+    Read the start of a stream without losing it.
+
+    Returns:
+        Tuple of (up to ``size`` leading bytes, stream yielding everything
+        including them)
+    """
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        data = stream.read(remaining)
+        if not data:
+            break
+        chunks.append(data)
+        remaining -= len(data)
+    head = b"".join(chunks)
+    return head, io.BufferedReader(PrefixedReader(head, stream))
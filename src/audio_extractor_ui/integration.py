@@ -7,19 +7,44 @@ within the UI components.
 """
 
 import sys
-import subprocess
 from pathlib import Path
 from typing import Optional, Dict, Any, List
-import importlib.util
+
+from .core_metadata import CoreMetadata, get_core_metadata
 
 
 class AudioExtractorCore:
     """Interface to the core audio-extractor functionality."""
 
-    def __init__(self):
-        """Initialize the audio extractor core interface."""
-        self.core_path = self._find_core_path()
-        self.core_available = self._check_core_availability()
+    def __init__(self, core_path: Optional[Path] = None):
+        """
+        Initialize the audio extractor core interface.
+
+        Core discovery is deferred until the core is first used, so that
+        constructing the interface costs nothing at startup.
+
+        Args:
+            core_path: Explicit path to the core ``src`` directory
+                (optional, discovered from the submodule by default)
+        """
+        self._core_path = core_path
+        self._core_path_resolved = core_path is not None
+        self._core_available: Optional[bool] = None
+
+    @property
+    def core_path(self) -> Optional[Path]:
+        """Path to the core module directory, discovered on first access."""
+        if not self._core_path_resolved:
+            self._core_path = self._find_core_path()
+            self._core_path_resolved = True
+        return self._core_path
+
+    @property
+    def core_available(self) -> bool:
+        """Whether the core is available, checked on first access."""
+        if self._core_available is None:
+            self._core_available = self._check_core_availability()
+        return self._core_available
 
     def _find_core_path(self) -> Optional[Path]:
         """Find the path to the audio-extractor core module."""
@@ -46,32 +71,31 @@ class AudioExtractorCore:
         """Check if the core audio extractor is available."""
         return self.core_available
 
-    def get_core_version(self) -> Optional[str]:
-        """Get the version of the core audio extractor."""
+    @property
+    def metadata(self) -> Optional[CoreMetadata]:
+        """Cached metadata for the core script, if the core is available."""
         if not self.is_available():
             return None
+        return get_core_metadata(self.core_path / "extract_audio.py")
 
-        try:
-            # Add the core path to sys.path temporarily
-            if str(self.core_path) not in sys.path:
-                sys.path.insert(0, str(self.core_path))
-
-            # Try to import and get version info
-            spec = importlib.util.spec_from_file_location(
-                "extract_audio", self.core_path / "extract_audio.py"
-            )
-            extract_audio = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(extract_audio)
-
-            # Look for version information
-            if hasattr(extract_audio, "__version__"):
-                return extract_audio.__version__
+    def get_core_version(self) -> Optional[str]:
+        """Get the version of the core audio extractor."""
+        metadata = self.metadata
+        if metadata is None:
+            return None
+        return metadata.get_version()
 
-            # If no version attribute, try to get it from git or other means
-            return "unknown"
+    def get_capabilities(self) -> Dict[str, Any]:
+        """
+        Get the subcommands and options offered by the core CLI.
 
-        except Exception:
-            return None
+        Returns:
+            Dict with "commands" and "options" keys (empty if unavailable)
+        """
+        metadata = self.metadata
+        if metadata is None:
+            return {"commands": {}, "options": []}
+        return metadata.get_capabilities()
 
     def run_core_command(self, args: List[str]) -> Dict[str, Any]:
         """
@@ -91,16 +115,18 @@ class AudioExtractorCore:
                 "exit_code": -1,
             }
 
+        # Deferred: subprocess is comparatively expensive to import
+        from .resources import run_measured
+
         try:
             # Build the command
             python_exe = sys.executable
             core_script = self.core_path / "extract_audio.py"
             cmd = [python_exe, str(core_script)] + args
 
-            # Run the command
-            result = subprocess.run(
+            # Run the command, measuring it and its ffmpeg/yt-dlp children
+            result, usage = run_measured(
                 cmd,
-                capture_output=True,
                 text=True,
                 cwd=str(self.core_path.parent),
             )
@@ -110,6 +136,7 @@ class AudioExtractorCore:
                 "error": result.stderr if result.returncode != 0 else "",
                 "output": result.stdout,
                 "exit_code": result.returncode,
+                "resources": usage,
             }
 
         except Exception as e:
@@ -255,22 +282,33 @@ class AudioExtractorCore:
         return self.run_core_command(args)
 
 
-# Global instance for easy access
-audio_extractor = AudioExtractorCore()
+# Global instance for easy access, created on first use
+_audio_extractor: Optional[AudioExtractorCore] = None
 
 
 def get_audio_extractor() -> AudioExtractorCore:
     """Get the global audio extractor instance."""
-    return audio_extractor
+    global _audio_extractor
+    if _audio_extractor is None:
+        _audio_extractor = AudioExtractorCore()
+    return _audio_extractor
+
+
+def __getattr__(name: str) -> Any:
+    """Keep ``integration.audio_extractor`` working without eager creation."""
+    if name == "audio_extractor":
+        return get_audio_extractor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def is_core_available() -> bool:
     """Check if the audio extractor core is available."""
-    return audio_extractor.is_available()
+    return get_audio_extractor().is_available()
 
 
 def get_core_info() -> Dict[str, Any]:
     """Get information about the core audio extractor."""
+    audio_extractor = get_audio_extractor()
     return {
         "available": audio_extractor.is_available(),
         "version": audio_extractor.get_core_version(),
@@ -0,0 +1,326 @@
+"""
+EBU R128 loudness normalization with cached first-pass measurements.
+
+Two-pass ``loudnorm`` decodes every source twice. The first-pass
+measurements depend on the source, the time range and (through the target
+offset) the target levels, so they are stored in the media cache under all
+three: re-extractions and extractions to other formats of the same source
+run the second, single pass straight away. Album (batch) gain
+applies one common gain to every file so their relative levels are kept.
+"""
+
+import json
+import logging
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+
+from .cache import MediaCache, get_media_cache
+
+logger = logging.getLogger(__name__)
+
+# Integrated loudness below which a source is treated as silent
+SILENCE_LUFS = -70.0
+
+# Default number of sources measured concurrently in album mode
+DEFAULT_MEASURE_WORKERS = 4
+
+# Output rate used after loudnorm (which always outputs 192 kHz) when the
+# source rate is unknown
+DEFAULT_OUTPUT_RATE = 48000
+
+
+class LoudnessTarget:
+    """Target levels for loudness normalization."""
+
+    def __init__(
+        self,
+        integrated: float = -23.0,
+        true_peak: float = -1.0,
+        lra: float = 7.0,
+    ):
+        """
+        Initialize the target (EBU R128 defaults).
+
+        Args:
+            integrated: Integrated loudness in LUFS
+            true_peak: Maximum true peak in dBTP
+            lra: Loudness range in LU
+        """
+        self.integrated = integrated
+        self.true_peak = true_peak
+        self.lra = lra
+
+    def __repr__(self) -> str:
+        return (
+            f"LoudnessTarget(integrated={self.integrated}, "
+            f"true_peak={self.true_peak}, lra={self.lra})"
+        )
+
+
+class AlbumGain:
+    """A common gain applied to every file of a batch."""
+
+    def __init__(self, gain_db: float, target: LoudnessTarget):
+        """
+        Initialize the album gain.
+
+        Args:
+            gain_db: Gain to apply in dB
+            target: Target whose true-peak limit is enforced
+        """
+        self.gain_db = gain_db
+        self.target = target
+
+    def to_filter(self) -> str:
+        """Build the ffmpeg filter applying the gain with a peak limiter."""
+        limit = 10 ** (self.target.true_peak / 20)
+        return (
+            f"volume={self.gain_db:.2f}dB,"
+            f"alimiter=limit={limit:.4f}:level=false"
+        )
+
+    def __repr__(self) -> str:
+        return f"AlbumGain(gain_db={self.gain_db:.2f})"
+
+
+def range_key(
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    duration: Optional[str] = None,
+) -> str:
+    """Key identifying the time range a measurement was taken over."""
+    return f"{start_time or ''}|{end_time or ''}|{duration or ''}"
+
+
+def measurement_key(
+    target: Optional[LoudnessTarget] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    duration: Optional[str] = None,
+) -> str:
+    """
+    Key identifying a cached measurement.
+
+    The input levels only depend on the range, but loudnorm's
+    ``target_offset`` also depends on the target levels.
+    """
+    target = target or LoudnessTarget()
+    return (
+        f"{range_key(start_time, end_time, duration)}|"
+        f"{target.integrated}|{target.true_peak}|{target.lra}"
+    )
+
+
+def _parse_clock(value: str) -> float:
+    """Parse an ffmpeg HH:MM:SS.xx progress time."""
+    hours, minutes, seconds = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def parse_loudnorm_output(stderr: str) -> Optional[Dict[str, float]]:
+    """
+    Extract the first-pass measurement from ffmpeg's stderr.
+
+    Args:
+        stderr: stderr of an ffmpeg run with ``loudnorm=print_format=json``
+
+    Returns:
+        Dict with input_i, input_tp, input_lra, input_thresh (and
+        target_offset and duration when present), or None if not found
+    """
+    end = stderr.rfind("}")
+    start = stderr.rfind("{", 0, end)
+    if start < 0 or end < 0:
+        return None
+    try:
+        data = json.loads(stderr[start:end + 1])
+        measurement = {
+            key: float(data[key])
+            for key in ("input_i", "input_tp", "input_lra", "input_thresh")
+        }
+    except (KeyError, ValueError):
+        return None
+    try:
+        measurement["target_offset"] = float(data["target_offset"])
+    except (KeyError, ValueError):
+        pass
+
+    times = re.findall(r"time=(\d+:\d+:\d+(?:\.\d+)?)", stderr)
+    if times:
+        measurement["duration"] = _parse_clock(times[-1])
+    return measurement
+
+
+def measure_loudness(
+    input_file: str,
+    engine: Any,
+    target: Optional[LoudnessTarget] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    duration: Optional[str] = None,
+    cache: Optional[MediaCache] = None,
+) -> Optional[Dict[str, float]]:
+    """
+    Measure a source's loudness (the loudnorm first pass), with caching.
+
+    Args:
+        input_file: Path to the source
+        engine: FFmpegEngine used to run ffmpeg
+        target: Target levels (part of the cache key, since the measured
+            target offset depends on them)
+        start_time: Start time of the measured range (optional)
+        end_time: End time of the measured range (optional)
+        duration: Duration of the measured range (optional)
+        cache: Media cache (optional, the shared cache by default)
+
+    Returns:
+        Measurement dict, or None if measuring failed
+    """
+    import subprocess
+
+    target = target or LoudnessTarget()
+    cache = cache or get_media_cache()
+    key = measurement_key(target, start_time, end_time, duration)
+
+    measurements: Dict[str, Dict[str, float]] = cache.get(input_file, "loudness", {})
+    if key in measurements:
+        return measurements[key]
+
+    seek_args, length_args = engine.time_args(start_time, end_time, duration)
+    cmd = [engine.ffmpeg, "-hide_banner", "-nostdin"]
+    cmd.extend(seek_args)
+    cmd.extend(["-i", input_file, "-vn", "-sn", "-dn"])
+    cmd.extend(length_args)
+    cmd.extend(
+        [
+            "-af",
+            f"loudnorm=I={target.integrated}:TP={target.true_peak}:"
+            f"LRA={target.lra}:print_format=json",
+            "-f",
+            "null",
+            "-",
+        ]
+    )
+
+    logger.info(f"Measuring loudness of {input_file}")
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except OSError as e:
+        logger.error(f"Loudness measurement failed for {input_file}: {e}")
+        return None
+
+    measurement = parse_loudnorm_output(result.stderr)
+    if result.returncode != 0 or measurement is None:
+        logger.error(f"Loudness measurement failed for {input_file}")
+        return None
+
+    measurements = dict(cache.get(input_file, "loudness", {}))
+    measurements[key] = measurement
+    cache.set(input_file, "loudness", measurements)
+    return measurement
+
+
+def loudnorm_filter(
+    measurement: Dict[str, float],
+    target: Optional[LoudnessTarget] = None,
+    sample_rate: Optional[int] = None,
+) -> Optional[str]:
+    """
+    Build the second-pass loudnorm filter from a measurement.
+
+    loudnorm always outputs 192 kHz, so unless the caller resamples
+    itself, an ``aresample`` back to the source rate is appended.
+
+    Args:
+        measurement: First-pass measurement
+        target: Target levels (EBU R128 by default)
+        sample_rate: Rate to resample to after loudnorm (optional;
+            ``None`` leaves the output at 192 kHz for the caller to
+            resample)
+
+    Returns:
+        ffmpeg filter string, or None for silent sources
+    """
+    target = target or LoudnessTarget()
+    if measurement["input_i"] <= SILENCE_LUFS:
+        return None
+    graph = (
+        f"loudnorm=I={target.integrated}:TP={target.true_peak}:"
+        f"LRA={target.lra}:measured_I={measurement['input_i']}:"
+        f"measured_TP={measurement['input_tp']}:"
+        f"measured_LRA={measurement['input_lra']}:"
+        f"measured_thresh={measurement['input_thresh']}:"
+    )
+    if "target_offset" in measurement:
+        graph += f"offset={measurement['target_offset']}:"
+    graph += "linear=true"
+    if sample_rate is not None:
+        graph += f",aresample={sample_rate}"
+    return graph
+
+
+def album_loudness(measurements: List[Dict[str, float]]) -> Optional[float]:
+    """
+    Combine per-file integrated loudness into one album loudness.
+
+    Loudness is averaged in the energy domain, weighted by duration
+    (unweighted when durations are unknown); silent files are ignored.
+
+    Args:
+        measurements: Per-file measurements
+
+    Returns:
+        Album loudness in LUFS, or None if every file is silent
+    """
+    energy = 0.0
+    weight = 0.0
+    for measurement in measurements:
+        if measurement["input_i"] <= SILENCE_LUFS:
+            continue
+        length = measurement.get("duration") or 1.0
+        energy += length * 10 ** (measurement["input_i"] / 10)
+        weight += length
+    if weight == 0:
+        return None
+    return 10 * math.log10(energy / weight)
+
+
+def compute_album_gain(
+    input_files: List[str],
+    engine: Any,
+    target: Optional[LoudnessTarget] = None,
+    max_workers: int = DEFAULT_MEASURE_WORKERS,
+    cache: Optional[MediaCache] = None,
+) -> Optional[AlbumGain]:
+    """
+    Measure a batch in parallel and compute its common gain.
+
+    Args:
+        input_files: Paths of the batch's sources
+        engine: FFmpegEngine used to run ffmpeg
+        target: Target levels (EBU R128 by default)
+        max_workers: Number of sources measured concurrently
+        cache: Media cache (optional, the shared cache by default)
+
+    Returns:
+        AlbumGain, or None if no source could be measured
+    """
+    target = target or LoudnessTarget()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        measured = list(
+            executor.map(
+                lambda path: measure_loudness(
+                    path, engine, target=target, cache=cache
+                ),
+                input_files,
+            )
+        )
+
+    loudness = album_loudness([m for m in measured if m is not None])
+    if loudness is None:
+        return None
+    gain = AlbumGain(target.integrated - loudness, target)
+    logger.info(f"Album loudness {loudness:.1f} LUFS, applying {gain}")
+    return gain
@@ -4,6 +4,7 @@ Main entry point for the Audio Extractor UI package.
 """
 
 import sys
+import logging
 import argparse
 from pathlib import Path
 
@@ -15,14 +16,8 @@ audio_extractor_path = project_root / "audio-extractor" / "src"
 if audio_extractor_path.exists():
     sys.path.insert(0, str(audio_extractor_path))
 
-from .core import AudioExtractor
-from .cli import run_cli as cli_main
-
-try:
-    from .gui import AudioExtractorGUI
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
+# Interface modules are imported inside main() so that each mode only pays
+# for what it uses (in particular, CLI runs never import tkinter).
 
 
 def main():
@@ -32,7 +27,7 @@ def main():
     )
     parser.add_argument(
         "--mode",
-        choices=["gui", "cli", "core-cli"],
+        choices=["gui", "cli", "core-cli", "watch"],
         default="gui",
         help="Interface mode (default: gui)"
     )
@@ -57,6 +52,13 @@ def main():
         dest="mode",
         help="Use core CLI directly"
     )
+    parser.add_argument(
+        "--watch",
+        action="store_const",
+        const="watch",
+        dest="mode",
+        help="Watch a folder and extract audio from new media files"
+    )
     parser.add_argument(
         "--version",
         action="version",
@@ -66,7 +68,14 @@ def main():
     # Parse known args to allow core CLI args to pass through
     args, remaining = parser.parse_known_args()
 
+    logging.basicConfig(level=logging.INFO)
+
     if args.mode == "gui":
+        try:
+            from .gui import AudioExtractorGUI, GUI_AVAILABLE
+        except ImportError:
+            GUI_AVAILABLE = False
+
         if not GUI_AVAILABLE:
             print("Error: GUI not available. Please install tkinter or use --cli mode.")
             sys.exit(1)
@@ -76,8 +85,16 @@ def main():
     
     elif args.mode == "cli":
         # Use our CLI interface
+        from .cli import run_cli as cli_main
+
         cli_main(remaining)
     
+    elif args.mode == "watch":
+        # Hot-folder mode; remaining args are parsed by the watcher
+        from .watch import run_watch
+
+        run_watch(remaining)
+    
     elif args.mode == "core-cli":
         # Import and run the core CLI directly
         try:
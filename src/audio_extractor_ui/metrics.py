@@ -0,0 +1,189 @@
+"""
+Per-stage timing of extractions and pluggable metrics sinks.
+
+Every extraction result carries a "metrics" dict with the time spent per
+stage, byte counts, the realtime speed factor and the engine and code path
+used. The same record is passed to every registered sink, so it can be
+logged, appended to a JSONL file or forwarded elsewhere.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Stage names, in pipeline order
+STAGES = (
+    "validation",
+    "probe",
+    "download",
+    "analysis",
+    "encode",
+    "postprocess",
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+class StageTimer:
+    """Accumulate wall-clock time per named stage."""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as (part of) a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    @property
+    def total(self) -> float:
+        """Seconds since the timer was created."""
+        return time.perf_counter() - self._started
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Stage times rounded for reporting."""
+        return {
+            "stages": {name: round(value, 6) for name, value in self.stages.items()},
+            "total": round(self.total, 6),
+        }
+
+
+class LoggingSink:
+    """Write metric records to the log."""
+
+    def __init__(self, level: int = logging.DEBUG):
+        self.level = level
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        logger.log(self.level, f"metrics: {json.dumps(record, default=str)}")
+
+
+class JsonlSink:
+    """Append metric records to a JSON Lines file."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize the sink.
+
+        Args:
+            path: File the records are appended to
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str, separators=(",", ":"))
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class MemorySink:
+    """Keep metric records in a list (useful in tests)."""
+
+    def __init__(self) -> None:
+        self.records: List[Dict[str, Any]] = []
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+
+
+_sinks: List[Any] = []
+_sinks_lock = threading.Lock()
+
+
+def add_sink(sink: Any) -> None:
+    """
+    Register a sink: any object with an ``emit(record)`` method, and
+    optionally a ``started(record)`` method.
+    """
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def remove_sink(sink: Any) -> None:
+    """Unregister a sink."""
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def _dispatch(method: str, record: Dict[str, Any]) -> None:
+    """Call a method on every registered sink that has it."""
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        handler = getattr(sink, method, None)
+        if handler is None:
+            continue
+        try:
+            handler(record)
+        except Exception as e:
+            logger.warning(f"Metrics sink {type(sink).__name__} failed: {e}")
+
+
+def emit(record: Dict[str, Any]) -> None:
+    """
+    Send a finished job's record to every registered sink.
+
+    A failing sink is logged and skipped, never failing the extraction.
+    """
+    _dispatch("emit", record)
+
+
+def started(record: Dict[str, Any]) -> None:
+    """
+    Announce a job to the sinks that count starts (``started(record)``).
+
+    Args:
+        record: Dict with "source", "format" and "engine"
+    """
+    _dispatch("started", record)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_timings(results: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate the stage times of many results.
+
+    Args:
+        results: Extraction results carrying "metrics"
+
+    Returns:
+        Dict mapping each stage (and "total") to count and p50/p95/p99
+        seconds
+    """
+    samples: Dict[str, List[float]] = {}
+    for result in results:
+        metrics = result.get("metrics")
+        if not metrics:
+            continue
+        for name, value in metrics.get("stages", {}).items():
+            samples.setdefault(name, []).append(value)
+        samples.setdefault("total", []).append(metrics.get("total", 0.0))
+
+    summary: Dict[str, Dict[str, float]] = {}
+    for name, values in samples.items():
+        summary[name] = {"count": len(values)}
+        for pct in PERCENTILES:
+            summary[name][f"p{pct}"] = round(percentile(values, pct), 6)
+    return summary
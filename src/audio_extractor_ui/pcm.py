@@ -0,0 +1,205 @@
+"""
+Streaming decoded PCM from ffmpeg into fixed-size NumPy buffers.
+
+Audio is decoded by an ffmpeg child process and read from its stdout pipe
+block by block, so arbitrarily long sources can be analysed with constant
+memory. NumPy is optional; callers should check ``NUMPY_AVAILABLE``.
+"""
+
+import logging
+from typing import Optional, Any, BinaryIO, Iterator, List
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Default number of frames per block (about 1.4 s at 48 kHz)
+DEFAULT_BLOCK_FRAMES = 65536
+
+# Raw sample formats by NumPy dtype name
+SAMPLE_FORMATS = {"float32": "f32le", "int16": "s16le", "int32": "s32le"}
+
+
+def require_numpy() -> None:
+    """
+    Make sure NumPy is installed.
+
+    Raises:
+        ImportError: If NumPy is not available
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError(
+            "NumPy is required for audio analysis "
+            "(pip install audio-extractor-ui[analysis])"
+        )
+
+
+def pcm_command(
+    engine: Any,
+    input_path: str,
+    sample_rate: int,
+    channels: int,
+    dtype: str = "float32",
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    duration: Optional[str] = None,
+    audio_filter: Optional[str] = None,
+    output_path: str = "pipe:1",
+) -> List[str]:
+    """
+    Build an ffmpeg command decoding audio to raw PCM on stdout.
+
+    Args:
+        engine: FFmpegEngine providing the binary and time arguments
+        input_path: Path (or pipe) of the input media
+        sample_rate: Output sample rate in Hz
+        channels: Output channel count
+        dtype: Sample type ("float32", "int16" or "int32")
+        start_time: Start time (optional)
+        end_time: End time (optional)
+        duration: Duration (optional)
+        audio_filter: ffmpeg audio filter graph (optional)
+        output_path: File to write instead of stdout (optional; replaced
+            if it exists)
+
+    Returns:
+        Command as a list of arguments
+    """
+    seek_args, length_args = engine.time_args(start_time, end_time, duration)
+    cmd = [engine.ffmpeg, "-hide_banner", "-nostdin", "-y", "-v", "error"]
+    cmd.extend(seek_args)
+    cmd.extend(["-i", input_path, "-vn", "-sn", "-dn"])
+    cmd.extend(length_args)
+    if audio_filter:
+        cmd.extend(["-af", audio_filter])
+    cmd.extend(
+        [
+            "-ac",
+            str(channels),
+            "-ar",
+            str(sample_rate),
+            "-f",
+            SAMPLE_FORMATS[dtype],
+            output_path,
+        ]
+    )
+    return cmd
+
+
+class PCMStream:
+    """An ffmpeg decoder whose output is read in fixed-size blocks."""
+
+    def __init__(
+        self,
+        cmd: List[str],
+        channels: int,
+        dtype: str = "float32",
+        block_frames: int = DEFAULT_BLOCK_FRAMES,
+        tee: Optional[BinaryIO] = None,
+        stdin: Any = None,
+    ):
+        """
+        Initialize the stream (the process starts on ``open``/``with``).
+
+        Args:
+            cmd: ffmpeg command writing raw PCM to stdout
+            channels: Channel count of the PCM
+            dtype: NumPy sample type matching the command's format
+            block_frames: Frames per block
+            tee: Binary file also receiving every decoded byte (optional)
+            stdin: stdin for the ffmpeg process (optional)
+        """
+        require_numpy()
+        self.cmd = cmd
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.block_frames = block_frames
+        self.tee = tee
+        self.stdin = stdin
+        self.process: Any = None
+        self._stderr: Any = None
+        self.frames_read = 0
+        self.returncode: Optional[int] = None
+        self._eof = False
+
+    def open(self) -> "PCMStream":
+        """Start the decoder process."""
+        import subprocess
+        from .resources import StderrDrain
+
+        self.process = subprocess.Popen(
+            self.cmd,
+            stdin=self.stdin if self.stdin is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._stderr = StderrDrain(self.process.stderr)
+        return self
+
+    def __enter__(self) -> "PCMStream":
+        return self.open()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def blocks(self) -> Iterator["np.ndarray"]:
+        """
+        Yield decoded audio as (frames, channels) arrays.
+
+        The same buffer is reused for every block, so each yielded array is
+        only valid until the next one is requested; copy it to keep it.
+
+        Yields:
+            Arrays of at most ``block_frames`` frames
+        """
+        if self.process is None:
+            self.open()
+
+        buffer = np.empty((self.block_frames, self.channels), dtype=self.dtype)
+        raw = memoryview(buffer).cast("B")
+        frame_size = self.channels * self.dtype.itemsize
+        stdout = self.process.stdout
+
+        while True:
+            filled = 0
+            while filled < len(raw):
+                count = stdout.readinto(raw[filled:])
+                if not count:
+                    break
+                filled += count
+            frames = filled // frame_size
+            if frames == 0:
+                self._eof = True
+                break
+            if self.tee is not None:
+                self.tee.write(raw[:frames * frame_size])
+            self.frames_read += frames
+            yield buffer[:frames]
+            if filled < len(raw):
+                self._eof = True
+                break
+
+    def close(self) -> int:
+        """
+        Stop the decoder and collect its exit status.
+
+        Returns:
+            ffmpeg's exit code
+        """
+        if self.process is None:
+            return 0
+        if not self._eof and self.process.poll() is None:
+            # Stopped early: the rest of the decode is not needed
+            self.process.kill()
+        self.process.stdout.close()
+        code = self.process.wait()
+        stderr = self._stderr.output()
+        if code not in (0, -9) and stderr:
+            logger.error(stderr.decode(errors="replace").strip())
+        self.returncode = code
+        return code
@@ -0,0 +1,476 @@
+"""
+Post-processing pipelines compiled into a single ffmpeg filter graph.
+
+A Pipeline is an ordered list of stages (resample, downmix, trim, fade,
+normalize, high-pass). Instead of running one ffmpeg pass per stage, the
+stages are compiled into one ``-af`` graph applied by the extraction
+itself, so every job decodes and encodes exactly once however many stages
+are chained.
+
+Compiling tracks the stream layout (sample rate, channels, length) from
+stage to stage, starting from the probe of the source. Stages that would
+not change the audio, such as a resample to the rate the stream already
+has or a downmix of a mono source, are dropped from the graph.
+"""
+
+import logging
+from typing import Optional, Dict, Iterable, List, Tuple, Union
+
+from .loudness import LoudnessTarget, loudnorm_filter
+from .utils import parse_time
+
+logger = logging.getLogger(__name__)
+
+# Resampler settings per quality: soxr precision in bits, or swresample
+# filter length and phase shift (swresample's defaults are 32 and 10)
+RESAMPLER_QUALITIES = ("fast", "balanced", "high")
+SOXR_PRECISION = {"fast": 16, "balanced": 20, "high": 28}
+SWR_OPTIONS = {
+    "fast": "filter_size=16:phase_shift=8",
+    "balanced": "",
+    "high": "filter_size=64:phase_shift=12:cutoff=0.97",
+}
+
+# Channel layout names per channel count, for downmixing
+CHANNEL_LAYOUTS = {1: "mono", 2: "stereo", 6: "5.1", 8: "7.1"}
+
+# loudnorm upsamples to this rate internally and outputs it
+LOUDNORM_RATE = 192000
+
+
+class StreamLayout:
+    """Properties of the audio at one point of a pipeline (None if unknown)."""
+
+    def __init__(
+        self,
+        sample_rate: Optional[int] = None,
+        channels: Optional[int] = None,
+        duration: Optional[float] = None,
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.duration = duration
+
+    def copy(self, **changes: Optional[float]) -> "StreamLayout":
+        """Get a copy with some properties replaced."""
+        layout = StreamLayout(self.sample_rate, self.channels, self.duration)
+        for name, value in changes.items():
+            setattr(layout, name, value)
+        return layout
+
+    def __repr__(self) -> str:
+        return (
+            f"StreamLayout(sample_rate={self.sample_rate}, "
+            f"channels={self.channels}, duration={self.duration})"
+        )
+
+
+class CompileContext:
+    """What the compiler may use besides the layout."""
+
+    def __init__(
+        self,
+        soxr: bool = False,
+        measurement: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize the context.
+
+        Args:
+            soxr: ffmpeg was built with libsoxr
+            measurement: Cached first-pass loudness measurement of the
+                source, if any (see loudness.py)
+        """
+        self.soxr = soxr
+        self.measurement = measurement
+
+
+class Stage:
+    """One post-processing step."""
+
+    name = "stage"
+
+    # ffmpeg filters the stage may emit
+    requires: Tuple[str, ...] = ()
+
+    def compile(
+        self, layout: StreamLayout, context: CompileContext
+    ) -> Tuple[List[str], StreamLayout]:
+        """
+        Build the filters of this stage.
+
+        Args:
+            layout: Layout of the audio entering the stage
+            context: Compiler context
+
+        Returns:
+            Tuple of (filters, possibly empty for a no-op; layout of the
+            audio leaving the stage)
+
+        Raises:
+            ValueError: If the stage cannot be applied to this audio
+        """
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+
+def resample_filter(rate: int, quality: str, soxr: bool) -> str:
+    """
+    Build an aresample filter for a quality/speed trade-off.
+
+    soxr is preferred when available: it is both faster and more accurate
+    than swresample's default filter at every setting.
+    """
+    if soxr:
+        return (
+            f"aresample={rate}:resampler=soxr:precision={SOXR_PRECISION[quality]}"
+        )
+    options = SWR_OPTIONS[quality]
+    return f"aresample={rate}:{options}" if options else f"aresample={rate}"
+
+
+class Resample(Stage):
+    """Convert to another sample rate."""
+
+    name = "resample"
+    requires = ("aresample",)
+
+    def __init__(self, sample_rate: int, quality: str = "balanced"):
+        """
+        Initialize the stage.
+
+        Args:
+            sample_rate: Output sample rate in Hz
+            quality: "fast", "balanced" or "high"
+        """
+        if sample_rate <= 0:
+            raise ValueError(f"Invalid sample rate: {sample_rate}")
+        if quality not in RESAMPLER_QUALITIES:
+            raise ValueError(f"Unknown resampler quality: {quality}")
+        self.sample_rate = sample_rate
+        self.quality = quality
+
+    def compile(
+        self, layout: StreamLayout, context: CompileContext
+    ) -> Tuple[List[str], StreamLayout]:
+        if layout.sample_rate == self.sample_rate:
+            return [], layout
+        return (
+            [resample_filter(self.sample_rate, self.quality, context.soxr)],
+            layout.copy(sample_rate=self.sample_rate),
+        )
+
+
+class Downmix(Stage):
+    """Reduce the number of channels."""
+
+    name = "downmix"
+    requires = ("aformat",)
+
+    def __init__(self, channels: int = 1):
+        """
+        Initialize the stage.
+
+        Args:
+            channels: Output channel count (1, 2, 6 or 8)
+        """
+        if channels not in CHANNEL_LAYOUTS:
+            raise ValueError(f"Unsupported channel count: {channels}")
+        self.channels = channels
+
+    def compile(
+        self, layout: StreamLayout, context: CompileContext
+    ) -> Tuple[List[str], StreamLayout]:
+        if layout.channels is not None and layout.channels <= self.channels:
+            return [], layout
+        return (
+            [f"aformat=channel_layouts={CHANNEL_LAYOUTS[self.channels]}"],
+            layout.copy(channels=self.channels),
+        )
+
+
+class Trim(Stage):
+    """Keep part of the audio (times relative to the extracted range)."""
+
+    name = "trim"
+    requires = ("atrim", "asetpts")
+
+    def __init__(
+        self,
+        start: Union[None, str, float] = None,
+        end: Union[None, str, float] = None,
+    ):
+        """
+        Initialize the stage.
+
+        Args:
+            start: Start time in seconds or as HH:MM:SS (optional)
+            end: End time in seconds or as HH:MM:SS (optional)
+        """
+        self.start = parse_time(start) or 0.0
+        self.end = parse_time(end)
+        if self.end is not None and self.end <= self.start:
+            raise ValueError("Trim end must be after its start")
+
+    def compile(
+        self, layout: StreamLayout, context: CompileContext
+    ) -> Tuple[List[str], StreamLayout]:
+        total = layout.duration
+        end = self.end
+        if end is not None and total is not None and end >= total:
+            end = None
+        if not self.start and end is None:
+            return [], layout
+        if total is not None and self.start >= total:
+            raise ValueError(f"Trim start {self.start:g}s is past the end")
+
+        options = []
+        if self.start:
+            options.append(f"start={self.start:.3f}")
+        if end is not None:
+            options.append(f"end={end:.3f}")
+        stop = end if end is not None else total
+        length = stop - self.start if stop is not None else None
+        return (
+            [f"atrim={':'.join(options)}", "asetpts=PTS-STARTPTS"],
+            layout.copy(duration=length),
+        )
+
+
+class Fade(Stage):
+    """Fade in at the start and/or out at the end."""
+
+    name = "fade"
+    requires = ("afade",)
+
+    def __init__(self, fade_in: float = 0.0, fade_out: float = 0.0):
+        """
+        Initialize the stage.
+
+        Args:
+            fade_in: Fade-in length in seconds
+            fade_out: Fade-out length in seconds (needs a known length)
+        """
+        if fade_in < 0 or fade_out < 0:
+            raise ValueError("Fade lengths cannot be negative")
+        self.fade_in = fade_in
+        self.fade_out = fade_out
+
+    def compile(
+        self, layout: StreamLayout, context: CompileContext
+    ) -> Tuple[List[str], StreamLayout]:
+        filters = []
+        if self.fade_in:
+            filters.append(f"afade=t=in:d={self.fade_in:.3f}")
+        if self.fade_out:
+            if layout.duration is None:
+                raise ValueError("A fade-out needs the length of the audio")
+            start = max(0.0, layout.duration - self.fade_out)
+            filters.append(f"afade=t=out:st={start:.3f}:d={self.fade_out:.3f}")
+        return filters, layout
+
+
+class Normalize(Stage):
+    """
+    Normalize loudness (EBU R128).
+
+    With a cached first-pass measurement of the source the linear loudnorm
+    is used, provided no earlier stage changed the audio; otherwise
+    loudnorm runs in its single-pass dynamic mode rather than decoding the
+    source a second time to measure it.
+    """
+
+    name = "normalize"
+    requires = ("loudnorm",)
+
+    def __init__(self, target: Optional[LoudnessTarget] = None):
+        """
+        Initialize the stage.
+
+        Args:
+            target: Target levels (EBU R128 by default)
+        """
+        self.target = target or LoudnessTarget()
+
+    def compile(
+        self, layout: StreamLayout, context: CompileContext
+    ) -> Tuple[List[str], StreamLayout]:
+        target = self.target
+        if context.measurement is not None:
+            graph = loudnorm_filter(context.measurement, target)
+            if graph is None:
+                # Silent source: nothing to normalize
+                return [], layout
+        else:
+            graph = (
+                f"loudnorm=I={target.integrated}:TP={target.true_peak}:"
+                f"LRA={target.lra}"
+            )
+        return [graph], layout.copy(sample_rate=LOUDNORM_RATE)
+
+
+class HighPass(Stage):
+    """Remove rumble below a cutoff frequency."""
+
+    name = "highpass"
+    requires = ("highpass",)
+
+    def __init__(self, frequency: float = 80.0, poles: int = 2):
+        """
+        Initialize the stage.
+
+        Args:
+            frequency: Cutoff frequency in Hz (0 disables the stage)
+            poles: 1 (6 dB/octave) or 2 (12 dB/octave)
+        """
+        if frequency < 0:
+            raise ValueError("Cutoff frequency cannot be negative")
+        if poles not in (1, 2):
+            raise ValueError("poles must be 1 or 2")
+        self.frequency = frequency
+        self.poles = poles
+
+    def compile(
+        self, layout: StreamLayout, context: CompileContext
+    ) -> Tuple[List[str], StreamLayout]:
+        if not self.frequency:
+            return [], layout
+        return [f"highpass=f={self.frequency:g}:poles={self.poles}"], layout
+
+
+class CompiledPipeline:
+    """The filter graph of a pipeline for one source."""
+
+    def __init__(
+        self,
+        filters: List[str],
+        layout: StreamLayout,
+        applied: List[str],
+        dropped: List[str],
+    ):
+        self.filters = filters
+        self.layout = layout
+        self.applied = applied
+        self.dropped = dropped
+
+    @property
+    def graph(self) -> Optional[str]:
+        """The ``-af`` value, or None when every stage was a no-op."""
+        return ",".join(self.filters) or None
+
+
+class Pipeline:
+    """
+    An immutable, ordered chain of post-processing stages.
+
+    Usage:
+        pipeline = Pipeline().highpass(80).downmix(1).resample(16000)
+        extractor.extract_from_file(path, "flac", pipeline=pipeline)
+
+    Each builder method returns a new pipeline, so a common base can be
+    extended in different ways; pipelines are also joined with ``+``.
+    """
+
+    def __init__(self, stages: Iterable[Stage] = ()):
+        self.stages: Tuple[Stage, ...] = tuple(stages)
+
+    def then(self, stage: Stage) -> "Pipeline":
+        """Get a pipeline with a stage appended."""
+        return Pipeline(self.stages + (stage,))
+
+    def resample(self, sample_rate: int, quality: str = "balanced") -> "Pipeline":
+        """Append a Resample stage."""
+        return self.then(Resample(sample_rate, quality))
+
+    def downmix(self, channels: int = 1) -> "Pipeline":
+        """Append a Downmix stage."""
+        return self.then(Downmix(channels))
+
+    def trim(
+        self,
+        start: Union[None, str, float] = None,
+        end: Union[None, str, float] = None,
+    ) -> "Pipeline":
+        """Append a Trim stage."""
+        return self.then(Trim(start, end))
+
+    def fade(self, fade_in: float = 0.0, fade_out: float = 0.0) -> "Pipeline":
+        """Append a Fade stage."""
+        return self.then(Fade(fade_in, fade_out))
+
+    def normalize(self, target: Optional[LoudnessTarget] = None) -> "Pipeline":
+        """Append a Normalize stage."""
+        return self.then(Normalize(target))
+
+    def highpass(self, frequency: float = 80.0, poles: int = 2) -> "Pipeline":
+        """Append a HighPass stage."""
+        return self.then(HighPass(frequency, poles))
+
+    @property
+    def requires(self) -> List[str]:
+        """ffmpeg filters the pipeline may need, without duplicates."""
+        names: Dict[str, None] = {}
+        for stage in self.stages:
+            names.update(dict.fromkeys(stage.requires))
+        if any(isinstance(stage, Normalize) for stage in self.stages):
+            names["aresample"] = None
+        return list(names)
+
+    def compile(
+        self,
+        layout: Optional[StreamLayout] = None,
+        context: Optional[CompileContext] = None,
+    ) -> CompiledPipeline:
+        """
+        Compile the stages into one filter graph.
+
+        Args:
+            layout: Layout of the source (optional; with nothing known,
+                no stage is dropped)
+            context: Compiler context (optional)
+
+        Returns:
+            CompiledPipeline
+
+        Raises:
+            ValueError: If a stage cannot be applied to this source
+        """
+        layout = layout or StreamLayout()
+        context = context or CompileContext()
+        # The rate the output should have, which loudnorm does not keep
+        output_rate = layout.sample_rate
+        filters: List[str] = []
+        applied: List[str] = []
+        dropped: List[str] = []
+        for stage in self.stages:
+            if filters and context.measurement is not None:
+                # The measurement is of the source, not of what the
+                # stages so far made of it
+                context = CompileContext(context.soxr)
+            stage_filters, layout = stage.compile(layout, context)
+            if isinstance(stage, Resample):
+                output_rate = stage.sample_rate
+            if stage_filters:
+                filters.extend(stage_filters)
+                applied.append(stage.name)
+            else:
+                dropped.append(stage.name)
+        if layout.sample_rate == LOUDNORM_RATE and output_rate != LOUDNORM_RATE:
+            # Return to the requested rate (48 kHz if the source's is
+            # unknown)
+            rate = output_rate or 48000
+            filters.append(resample_filter(rate, "balanced", context.soxr))
+            layout = layout.copy(sample_rate=rate)
+        return CompiledPipeline(filters, layout, applied, dropped)
+
+    def __add__(self, other: "Pipeline") -> "Pipeline":
+        return Pipeline(self.stages + other.stages)
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    def __repr__(self) -> str:
+        return f"Pipeline({list(self.stages)!r})"
@@ -0,0 +1,111 @@
+"""
+Media probing with ffprobe, cached per source in the media cache.
+"""
+
+import json
+import logging
+from typing import Optional, Dict, Any
+
+from .cache import MediaCache, get_media_cache
+from .capabilities import find_ffprobe
+
+logger = logging.getLogger(__name__)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """Convert an ffprobe number string, tolerating "N/A"."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def summarize_probe(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce raw ffprobe JSON to the fields the extractor uses.
+
+    Args:
+        data: Output of ``ffprobe -show_format -show_streams -of json``
+
+    Returns:
+        Dict with duration, container, audio stream and video flag
+    """
+    streams = data.get("streams", [])
+    fmt = data.get("format", {})
+    audio = [
+        {
+            "index": stream.get("index"),
+            "codec": stream.get("codec_name"),
+            "sample_rate": int(stream.get("sample_rate") or 0) or None,
+            "channels": stream.get("channels"),
+            "channel_layout": stream.get("channel_layout"),
+            "bit_rate": int(stream.get("bit_rate") or 0) or None,
+            "duration": _to_float(stream.get("duration")),
+        }
+        for stream in streams
+        if stream.get("codec_type") == "audio"
+    ]
+    return {
+        "format": fmt.get("format_name"),
+        "duration": _to_float(fmt.get("duration")),
+        "size": int(fmt.get("size") or 0) or None,
+        "bit_rate": int(fmt.get("bit_rate") or 0) or None,
+        "audio": audio,
+        "has_video": any(s.get("codec_type") == "video" for s in streams),
+    }
+
+
+def probe_media(
+    path: str, cache: Optional[MediaCache] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Probe a media file, reusing the cached result when available.
+
+    Args:
+        path: Path to the media file
+        cache: Media cache to use (optional, the shared cache by default)
+
+    Returns:
+        Probe summary (see ``summarize_probe``), or None if probing failed
+    """
+    import subprocess
+
+    cache = cache or get_media_cache()
+    cached = cache.get(path, "probe")
+    if cached is not None:
+        return cached
+
+    ffprobe = find_ffprobe()
+    if not ffprobe:
+        logger.warning("ffprobe not found; cannot probe media")
+        return None
+
+    cmd = [
+        ffprobe,
+        "-v",
+        "error",
+        "-show_format",
+        "-show_streams",
+        "-of",
+        "json",
+        path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        if result.returncode != 0:
+            logger.warning(f"ffprobe failed for {path}: {result.stderr.strip()}")
+            return None
+        summary = summarize_probe(json.loads(result.stdout or "{}"))
+    except (OSError, ValueError, subprocess.SubprocessError) as e:
+        logger.warning(f"ffprobe failed for {path}: {e}")
+        return None
+
+    cache.set(path, "probe", summary)
+    return summary
+
+
+def get_audio_stream(probe: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Get the first audio stream of a probe summary."""
+    if not probe or not probe.get("audio"):
+        return None
+    return probe["audio"][0]
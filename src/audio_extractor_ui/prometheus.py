@@ -0,0 +1,508 @@
+"""
+Prometheus metrics registry and text-exposition endpoint.
+
+Long-running modes (watch mode, anything serving jobs) can expose their
+counters for scraping with ``start_http_server``; nothing external is
+needed. Counters and histograms are sharded per thread: a thread only ever
+writes its own shard, so updates on the extraction path take no lock, and
+the shards are only merged when the endpoint is scraped.
+"""
+
+import bisect
+import logging
+import math
+import threading
+from typing import (
+    Optional,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+    TypedDict,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Job latency buckets, in seconds
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+LabelKey = Tuple[str, ...]
+
+# Labels every job-level metric carries
+JobLabels = TypedDict("JobLabels", {"format": str, "engine": str})
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the exposition format."""
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str]) -> str:
+    """Render a label set, e.g. ``{format="mp3"}``."""
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Base class: name, help text and label handling."""
+
+    kind = "untyped"
+    # Appended to the name in the HELP and TYPE lines
+    family_suffix = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ):
+        """
+        Initialize the metric.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the metric's labels
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, "
+                f"got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Current samples as (suffix, label text, value)."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Exposition lines for this metric."""
+        family = self.name + self.family_suffix
+        lines = [
+            f"# HELP {family} {self.documentation}",
+            f"# TYPE {family} {self.kind}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class _ShardedMetric(_Metric):
+    """Metric whose values live in per-thread shards."""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, Dict[LabelKey, Any]]] = []
+        # Values of threads that have exited
+        self._retired: Dict[LabelKey, Any] = {}
+
+    def _shard(self) -> Dict[LabelKey, Any]:
+        """The calling thread's shard."""
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _merge(self, total: Any, value: Any) -> Any:
+        raise NotImplementedError
+
+    def _collect(self) -> Dict[LabelKey, Any]:
+        """Merge all shards (retiring those of finished threads)."""
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    # A finished thread no longer writes its shard
+                    for key, value in shard.items():
+                        retired = self._retired.get(key)
+                        self._retired[key] = self._merge(retired, value)
+            self._shards = live
+            merged = dict(self._retired)
+            shards = [shard for _, shard in live]
+
+        for shard in shards:
+            # Copying a dict is atomic under the GIL
+            for key, value in list(shard.items()):
+                merged[key] = self._merge(merged.get(key), value)
+        return merged
+
+
+class Counter(_ShardedMetric):
+    """Monotonically increasing count (exposed as ``<name>_total``)."""
+
+    kind = "counter"
+    # As client_python does, the family is named after its _total sample
+    family_suffix = "_total"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Add to the counter for a label set."""
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def _merge(self, total: Any, value: Any) -> Any:
+        return value if total is None else total + value
+
+    def values(self) -> Dict[LabelKey, float]:
+        """Current totals by label values."""
+        return self._collect()
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [
+            ("_total", _label_text(self.labelnames, key), value)
+            for key, value in sorted(self._collect().items())
+        ]
+
+
+class Histogram(_ShardedMetric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize the histogram.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the metric's labels
+            buckets: Upper bounds of the buckets (+Inf is added)
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation."""
+        shard = self._shard()
+        key = self._key(labels)
+        entry = shard.get(key)
+        if entry is None:
+            entry = shard[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def _merge(self, total: Any, value: Any) -> Any:
+        counts, total_sum, count = value
+        if total is None:
+            return [list(counts), total_sum, count]
+        return [
+            [a + b for a, b in zip(total[0], counts)],
+            total[1] + total_sum,
+            total[2] + count,
+        ]
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        samples = []
+        bounds = [_format_value(float(b)) for b in self.buckets] + ["+Inf"]
+        names = self.labelnames + ("le",)
+        for key, (counts, total_sum, count) in sorted(self._collect().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                labels = _label_text(names, key + (bound,))
+                samples.append(("_bucket", labels, cumulative))
+            labels = _label_text(self.labelnames, key)
+            samples.append(("_sum", labels, total_sum))
+            samples.append(("_count", labels, count))
+        return samples
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or is read when scraped."""
+
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+        self._function: Optional[Callable[[], Any]] = None
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the gauge for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Optional[Callable[[], Any]]) -> None:
+        """
+        Compute the gauge when scraped.
+
+        Args:
+            function: Callable returning the value, or (for labelled
+                gauges) a dict mapping label-value tuples to values; None
+                to go back to set values
+        """
+        self._function = function
+
+    def values(self) -> Dict[LabelKey, float]:
+        """Current values by label values."""
+        function = self._function
+        if function is None:
+            with self._lock:
+                return dict(self._values)
+        try:
+            value = function()
+        except Exception as e:
+            logger.warning(f"Gauge {self.name} callback failed: {e}")
+            return {}
+        if isinstance(value, dict):
+            return {tuple(str(v) for v in key): val for key, val in value.items()}
+        return {(): value}
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [
+            ("", _label_text(self.labelnames, key), value)
+            for key, value in sorted(self.values().items())
+        ]
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class Registry:
+    """A set of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: MetricT) -> MetricT:
+        """Add a metric (names must be unique)."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+JOBS_STARTED = REGISTRY.counter(
+    "audio_extractor_jobs_started", "Extraction jobs started", ("format", "engine")
+)
+JOBS_COMPLETED = REGISTRY.counter(
+    "audio_extractor_jobs_completed",
+    "Extraction jobs that succeeded",
+    ("format", "engine"),
+)
+JOBS_FAILED = REGISTRY.counter(
+    "audio_extractor_jobs_failed",
+    "Extraction jobs that failed",
+    ("format", "engine"),
+)
+JOB_DURATION = REGISTRY.histogram(
+    "audio_extractor_job_duration_seconds",
+    "Wall-clock time of extraction jobs",
+    ("format", "engine"),
+)
+STAGE_DURATION = REGISTRY.histogram(
+    "audio_extractor_stage_duration_seconds",
+    "Wall-clock time of extraction stages",
+    ("stage",),
+)
+BYTES_PROCESSED = REGISTRY.counter(
+    "audio_extractor_bytes",
+    "Bytes read from inputs and written to outputs",
+    ("direction",),
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "audio_extractor_cache_lookups",
+    "Media cache lookups by field and result",
+    ("field", "result"),
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "audio_extractor_cache_hit_ratio",
+    "Share of media cache lookups that hit",
+    ("field",),
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "audio_extractor_queue_depth", "Jobs waiting to run", ("lane",)
+)
+IN_FLIGHT = REGISTRY.gauge("audio_extractor_jobs_in_flight", "Jobs currently running")
+
+
+def _cache_hit_ratio() -> Dict[LabelKey, float]:
+    """Hit ratio per cache field, from the lookup counter."""
+    lookups: Dict[str, Dict[str, float]] = {}
+    for (field, result), count in CACHE_LOOKUPS.values().items():
+        lookups.setdefault(field, {})[result] = count
+    return {
+        (field,): counts.get("hit", 0) / sum(counts.values())
+        for field, counts in lookups.items()
+    }
+
+
+CACHE_HIT_RATIO.set_function(_cache_hit_ratio)
+
+
+class PrometheusSink:
+    """Metrics sink (see metrics.py) feeding the job counters."""
+
+    def started(self, record: Dict[str, Any]) -> None:
+        JOBS_STARTED.inc(**_job_labels(record))
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        labels = _job_labels(record)
+        if record.get("success"):
+            JOBS_COMPLETED.inc(**labels)
+        else:
+            JOBS_FAILED.inc(**labels)
+        JOB_DURATION.observe(record.get("total") or 0.0, **labels)
+        for stage, seconds in (record.get("stages") or {}).items():
+            STAGE_DURATION.observe(seconds, stage=stage)
+        if record.get("input_bytes"):
+            BYTES_PROCESSED.inc(record["input_bytes"], direction="in")
+        if record.get("output_bytes"):
+            BYTES_PROCESSED.inc(record["output_bytes"], direction="out")
+
+
+def _job_labels(record: Dict[str, Any]) -> JobLabels:
+    return {
+        "format": record.get("format") or "unknown",
+        "engine": record.get("engine") or "none",
+    }
+
+
+_sink: Optional[PrometheusSink] = None
+_sink_lock = threading.Lock()
+
+
+def install_sink() -> PrometheusSink:
+    """Register the job-counter sink once."""
+    global _sink
+    from .metrics import add_sink
+
+    with _sink_lock:
+        if _sink is None:
+            _sink = PrometheusSink()
+            add_sink(_sink)
+        return _sink
+
+
+def expose_queue(
+    depth: Callable[[], Dict[str, int]], in_flight: Callable[[], int]
+) -> None:
+    """
+    Report a job queue's depth and running jobs when scraped.
+
+    Args:
+        depth: Callable returning the number of waiting jobs per lane
+        in_flight: Callable returning the number of running jobs
+    """
+    QUEUE_DEPTH.set_function(
+        lambda: {(lane,): count for lane, count in depth().items()}
+    )
+    IN_FLIGHT.set_function(in_flight)
+
+
+def start_http_server(
+    port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY
+) -> Any:
+    """
+    Serve ``/metrics`` from a background thread.
+
+    Also installs the sink that counts jobs.
+
+    Args:
+        port: TCP port (0 picks a free one)
+        host: Address to bind
+        registry: Metrics to serve
+
+    Returns:
+        The running ``ThreadingHTTPServer``; its ``server_address`` holds
+        the bound port and ``shutdown()`` stops it
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug(f"metrics endpoint: {format % args}")
+
+    install_sink()
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name="metrics-http", daemon=True
+    )
+    thread.start()
+    port = server.server_address[1]
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
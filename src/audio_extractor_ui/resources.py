@@ -0,0 +1,465 @@
+"""
+Resource accounting for extraction processes.
+
+A job's process (the core CLI, ffmpeg or yt-dlp) and everything it spawns
+are measured in two ways:
+
+* ``os.wait4`` returns the CPU time and peak RSS of the process and of the
+  descendants it waited for.
+* While it runs, ``/proc`` is sampled for the whole process tree: the
+  summed RSS of all processes alive at the same time and the bytes each
+  process read and wrote. One shared thread samples the trees of all
+  running jobs, and descendants are found through
+  ``/proc/<pid>/task/<tid>/children`` where the kernel provides it, so
+  ``/proc`` is not listed per job and sample.
+
+Where neither is available (non-Linux hosts), commands run normally and no
+usage is reported.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from typing import Optional, Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between /proc samples of a running process tree
+SAMPLE_INTERVAL = 0.2
+
+# Bytes per block in ru_inblock/ru_oublock
+BLOCK_SIZE = 512
+
+# Bytes per write when copying a stream to a process's stdin
+STDIN_CHUNK_SIZE = 1024 * 1024
+
+# Bytes of a process's stderr kept by StderrDrain (the end is kept)
+STDERR_TAIL_SIZE = 64 * 1024
+
+PROC = "/proc"
+
+USAGE_FIELDS = (
+    "cpu_user",
+    "cpu_system",
+    "max_rss",
+    "peak_tree_rss",
+    "read_bytes",
+    "write_bytes",
+    "processes",
+)
+
+
+# Whether /proc/<pid>/task/<tid>/children exists (None until checked)
+_TASK_CHILDREN: Optional[bool] = None
+
+
+def _read_children() -> Dict[int, List[int]]:
+    """Map every process ID to its children, from ``/proc/<pid>/stat``."""
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir(PROC)
+    except OSError:
+        return children
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"{PROC}/{entry}/stat", "r", encoding="ascii") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields resume after ")"
+        fields = stat[stat.rfind(")") + 2:].split()
+        if len(fields) > 1:
+            children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def _task_children(pid: int) -> List[int]:
+    """Children of a process, from ``/proc/<pid>/task/*/children``."""
+    children: List[int] = []
+    try:
+        tasks = os.listdir(f"{PROC}/{pid}/task")
+    except OSError:
+        return children
+    for task in tasks:
+        try:
+            with open(f"{PROC}/{pid}/task/{task}/children", "r", encoding="ascii") as f:
+                children.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            # The thread exited meanwhile
+            continue
+    return children
+
+
+def _children_lookup() -> Callable[[int], Sequence[int]]:
+    """
+    Get a function listing the children of a process.
+
+    The per-process children files are only compiled into some kernels
+    (CONFIG_PROC_CHILDREN); without them every process's stat file is
+    read once and the result is reused for all lookups.
+    """
+    global _TASK_CHILDREN
+    if _TASK_CHILDREN is None:
+        pid = os.getpid()
+        _TASK_CHILDREN = os.path.exists(f"{PROC}/{pid}/task/{pid}/children")
+    if _TASK_CHILDREN:
+        return _task_children
+    children = _read_children()
+    return lambda pid: children.get(pid, ())
+
+
+def process_tree(
+    pid: int, children: Optional[Callable[[int], Sequence[int]]] = None
+) -> List[int]:
+    """
+    List a process and its live descendants.
+
+    Args:
+        pid: Root process ID
+        children: Function listing a process's children (optional, see
+            ``_children_lookup``)
+
+    Returns:
+        Process IDs, the root first
+    """
+    children = children or _children_lookup()
+    tree = [pid]
+    index = 0
+    while index < len(tree):
+        tree.extend(children(tree[index]))
+        index += 1
+    return tree
+
+
+def _read_rss(pid: int) -> int:
+    """Resident set size of a process in bytes (0 if it is gone)."""
+    try:
+        with open(f"{PROC}/{pid}/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _read_io(pid: int) -> Optional[Tuple[int, int]]:
+    """Bytes read and written by a process, from ``/proc/<pid>/io``."""
+    values = {}
+    try:
+        with open(f"{PROC}/{pid}/io", "r", encoding="ascii") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                values[name] = int(value)
+    except (OSError, ValueError):
+        return None
+    # Storage I/O where accounted, character I/O otherwise
+    read = values.get("read_bytes") or values.get("rchar", 0)
+    written = values.get("write_bytes") or values.get("wchar", 0)
+    return read, written
+
+
+class TreeSampler:
+    """RSS and I/O counters of a process tree, sampled in the background."""
+
+    def __init__(self, pid: int):
+        """
+        Initialize the sampler.
+
+        Args:
+            pid: Root process ID
+        """
+        self.pid = pid
+        self.peak_rss = 0
+        self.io: Dict[int, Tuple[int, int]] = {}
+
+    def sample(self, children: Optional[Callable[[int], Sequence[int]]] = None) -> None:
+        """Take one sample (``children`` as for ``process_tree``)."""
+        rss = 0
+        for pid in process_tree(self.pid, children):
+            rss += _read_rss(pid)
+            counters = _read_io(pid)
+            if counters is not None:
+                # Counters only grow; keep the last value seen per process
+                self.io[pid] = counters
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def start(self) -> None:
+        """Sample now and then every ``SAMPLE_INTERVAL`` seconds."""
+        _get_monitor().add(self)
+
+    def stop(self) -> None:
+        """Stop sampling (waits for a sample in progress)."""
+        _get_monitor().remove(self)
+
+    @property
+    def read_bytes(self) -> int:
+        return sum(read for read, _ in self.io.values())
+
+    @property
+    def write_bytes(self) -> int:
+        return sum(written for _, written in self.io.values())
+
+
+class _TreeMonitor(threading.Thread):
+    """One thread sampling the process trees of all running jobs."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        super().__init__(name="resources", daemon=True)
+        self.interval = interval
+        self._samplers: List[TreeSampler] = []
+        self._condition = threading.Condition()
+
+    def add(self, sampler: TreeSampler) -> None:
+        with self._condition:
+            self._samplers.append(sampler)
+            # Sample the new tree right away, short processes included
+            self._condition.notify()
+
+    def remove(self, sampler: TreeSampler) -> None:
+        # Samples are taken holding the lock, so none is in progress here
+        with self._condition:
+            self._samplers.remove(sampler)
+
+    def run(self) -> None:
+        with self._condition:
+            while True:
+                if not self._samplers:
+                    self._condition.wait()
+                    continue
+                # One children lookup serves every tree of this round
+                children = _children_lookup()
+                for sampler in self._samplers:
+                    sampler.sample(children)
+                self._condition.wait(self.interval)
+
+
+_monitor: Optional[_TreeMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def _get_monitor() -> _TreeMonitor:
+    """Get the shared sampling thread, starting it on first use."""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = _TreeMonitor()
+            _monitor.start()
+        return _monitor
+
+
+class StderrDrain(threading.Thread):
+    """
+    Read a process's stderr pipe in the background.
+
+    A process whose stdout is consumed chunk by chunk blocks once the
+    stderr pipe buffer (about 64 KB) is full; if stderr were only read
+    after stdout ends, both sides would wait forever. Only the last
+    ``STDERR_TAIL_SIZE`` bytes are kept for the error message.
+    """
+
+    def __init__(self, stream: Any):
+        super().__init__(name="stderr-drain", daemon=True)
+        self.stream = stream
+        self._tail = bytearray()
+        self.start()
+
+    def run(self) -> None:
+        try:
+            while True:
+                data = self.stream.read1(65536)
+                if not data:
+                    break
+                self._tail += data
+                if len(self._tail) > 2 * STDERR_TAIL_SIZE:
+                    del self._tail[:-STDERR_TAIL_SIZE]
+        except (OSError, ValueError):
+            # Closed while reading
+            pass
+
+    def output(self) -> bytes:
+        """Wait for the pipe to close and get the end of what was written."""
+        self.join()
+        self.stream.close()
+        return bytes(self._tail[-STDERR_TAIL_SIZE:])
+
+
+def usage_from_rusage(rusage: Any) -> Dict[str, Any]:
+    """
+    Convert a ``resource.struct_rusage`` to a usage dict.
+
+    Args:
+        rusage: Value returned by ``os.wait4``
+
+    Returns:
+        Dict with the fields of ``USAGE_FIELDS``
+    """
+    return {
+        "cpu_user": round(rusage.ru_utime, 6),
+        "cpu_system": round(rusage.ru_stime, 6),
+        # ru_maxrss is in kilobytes on Linux
+        "max_rss": rusage.ru_maxrss * 1024,
+        "peak_tree_rss": None,
+        "read_bytes": rusage.ru_inblock * BLOCK_SIZE,
+        "write_bytes": rusage.ru_oublock * BLOCK_SIZE,
+        "processes": 1,
+    }
+
+
+def combine_usage(
+    first: Optional[Dict[str, Any]], second: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Combine the usage of two jobs run one after another or in parallel.
+
+    CPU time, bytes and process counts add up; memory peaks do not, so the
+    larger one is kept.
+
+    Returns:
+        Combined usage, or whichever is not None
+    """
+    if first is None or second is None:
+        return first if second is None else second
+    combined = {}
+    for name in USAGE_FIELDS:
+        a, b = first.get(name), second.get(name)
+        if a is None or b is None:
+            combined[name] = a if b is None else b
+        elif name in ("max_rss", "peak_tree_rss"):
+            combined[name] = max(a, b)
+        else:
+            combined[name] = a + b
+    return combined
+
+
+def summarize_resources(results: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate the resource usage of a batch, for sizing workers.
+
+    Args:
+        results: Extraction results carrying "resources"
+
+    Returns:
+        Dict with the total usage ("total") and the p50/p95/max peak RSS of
+        a single job, or an empty dict if nothing was measured
+    """
+    from .metrics import percentile
+
+    usages = [r["resources"] for r in results if r.get("resources")]
+    if not usages:
+        return {}
+    total = None
+    for usage in usages:
+        total = combine_usage(total, usage)
+    peaks = [u.get("peak_tree_rss") or u.get("max_rss") or 0 for u in usages]
+    return {
+        "jobs": len(usages),
+        "total": total,
+        "rss_p50": percentile(peaks, 50),
+        "rss_p95": percentile(peaks, 95),
+        "rss_max": max(peaks),
+    }
+
+
+def run_measured(
+    cmd: List[str], **kwargs: Any
+) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """
+    Run a command like ``subprocess.run(capture_output=True)`` and measure it.
+
+    Args:
+        cmd: Command line
+        **kwargs: Further ``subprocess.Popen`` arguments (e.g. ``text``,
+            ``cwd``), or ``input``: data for stdin, or a binary stream
+            copied to stdin in chunks
+
+    Returns:
+        Tuple of the ``subprocess.CompletedProcess`` and the usage dict
+        (None where the platform cannot measure it)
+    """
+    import subprocess
+
+    if not hasattr(os, "wait4") and not hasattr(kwargs.get("input"), "read"):
+        return subprocess.run(cmd, capture_output=True, **kwargs), None
+
+    data = kwargs.pop("input", None)
+    if data is not None:
+        kwargs["stdin"] = subprocess.PIPE
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs
+    )
+    # Piped above, so never None
+    stdin, stdout, stderr = process.stdin, process.stdout, process.stderr
+    assert stdout is not None and stderr is not None
+    sampler = TreeSampler(process.pid)
+    sampler.start()
+
+    # Drain the pipes without letting Popen reap the process, so that
+    # wait4 can still collect its rusage
+    output: Dict[str, Any] = {}
+
+    def drain(name: str, stream: Any) -> None:
+        output[name] = stream.read()
+
+    readers = [
+        threading.Thread(target=drain, args=(name, stream), daemon=True)
+        for name, stream in (("stdout", stdout), ("stderr", stderr))
+    ]
+    for reader in readers:
+        reader.start()
+    if data is not None:
+        assert stdin is not None
+        try:
+            if hasattr(data, "read"):
+                sink = getattr(stdin, "buffer", stdin)
+                shutil.copyfileobj(data, sink, STDIN_CHUNK_SIZE)
+            else:
+                stdin.write(data)
+        except BrokenPipeError:
+            # The process stopped reading; its exit status tells why
+            pass
+        except BaseException:
+            # Reading the input failed: stop the process before re-raising
+            process.kill()
+            for reader in readers:
+                reader.join()
+            process.wait()
+            sampler.stop()
+            raise
+        finally:
+            try:
+                stdin.close()
+            except BrokenPipeError:
+                pass
+    for reader in readers:
+        reader.join()
+
+    if not hasattr(os, "wait4"):
+        process.wait()
+        sampler.stop()
+        completed = subprocess.CompletedProcess(
+            cmd, process.returncode, output.get("stdout"), output.get("stderr")
+        )
+        return completed, None
+
+    # Reap the process ourselves; the sampler keeps running until then
+    _, status, rusage = os.wait4(process.pid, 0)
+    sampler.stop()
+    process.returncode = (
+        -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    )
+    stdout.close()
+    stderr.close()
+
+    usage = usage_from_rusage(rusage)
+    if sampler.io or sampler.peak_rss:
+        usage["peak_tree_rss"] = sampler.peak_rss
+        usage["read_bytes"] = max(usage["read_bytes"], sampler.read_bytes)
+        usage["write_bytes"] = max(usage["write_bytes"], sampler.write_bytes)
+        usage["processes"] = max(1, len(sampler.io))
+
+    logger.debug(f"Resource usage of {cmd[0]}: {usage}")
+    completed = subprocess.CompletedProcess(
+        cmd, process.returncode, output.get("stdout"), output.get("stderr")
+    )
+    return completed, usage
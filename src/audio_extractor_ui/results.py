@@ -0,0 +1,458 @@
+"""
+Compact extraction and batch result records.
+
+Results used to be plain dicts. A 100k-file batch keeps every per-file
+result until it is summarized, and a dict per result (plus a nested
+"metrics" dict and a "stages" dict inside that) costs several hundred
+bytes each. ``ExtractionResult`` and ``BatchResult`` use ``__slots__``
+and store the stage times as a tuple, but still behave as mutable
+mappings with the keys the dicts had, so ``result["success"]``,
+``result.get("output_path")`` and ``result["metrics"]["total"]`` keep
+working and a result compares equal to the dict it replaces.
+
+Results can be written to and read back from JSON Lines files, one result
+per line.
+"""
+
+import json
+from pathlib import Path
+from typing import (
+    Optional,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from .metrics import STAGES
+
+# Why an extraction failed
+ERROR_CATEGORIES = (
+    "unavailable",  # No engine (or a required tool) is installed
+    "invalid_input",  # Rejected before any process was started
+    "process",  # ffmpeg / the core exited with an error
+    "killed",  # The process was terminated by a signal
+    "error",  # Anything else (an exception in this package)
+)
+
+# Compact separators and no ASCII escaping keep lines short and fast
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+_STAGE_INDEX = {name: index for index, name in enumerate(STAGES)}
+
+# Keys of the "metrics" dict stored in dedicated slots
+_METRIC_FIELDS = (
+    ("engine", "engine"),
+    ("path", "code_path"),
+    ("input_bytes", "input_bytes"),
+    ("output_bytes", "output_bytes"),
+    ("media_duration", "media_duration"),
+)
+
+
+def classify_error(result: Mapping[str, Any]) -> Optional[str]:
+    """
+    Categorize a failed result (see ERROR_CATEGORIES).
+
+    Args:
+        result: Extraction result
+
+    Returns:
+        Category name, or None for a successful result
+    """
+    if result.get("success"):
+        return None
+    category = result.get("error_category")
+    if category:
+        return str(category)
+    exit_code = result.get("exit_code")
+    if isinstance(exit_code, int) and exit_code > 0:
+        return "process"
+    if isinstance(exit_code, int) and exit_code < -1:
+        return "killed"
+    return "error"
+
+
+class _Record(MutableMapping[str, Any]):
+    """
+    Slotted mapping over fixed fields plus an overflow dict.
+
+    Subclasses list their mapping keys in ``_KEYS`` and which of those are
+    always present in ``_REQUIRED``; the other keys are present when their
+    value is not None. Keys without a slot go to ``extra``.
+    """
+
+    __slots__ = ()
+
+    _KEYS: Tuple[str, ...] = ()
+    _REQUIRED: Tuple[str, ...] = ()
+
+    # Keys without a slot (None while there are none)
+    extra: Optional[Dict[str, Any]]
+
+    def _get_field(self, key: str) -> Any:
+        return getattr(self, key)
+
+    def _set_field(self, key: str, value: Any) -> None:
+        setattr(self, key, value)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._KEYS:
+            value = self._get_field(key)
+            if value is None and key not in self._REQUIRED:
+                raise KeyError(key)
+            return value
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._KEYS:
+            self._set_field(key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._KEYS:
+            if key in self._REQUIRED or self._get_field(key) is None:
+                raise KeyError(key)
+            self._set_field(key, None)
+        elif self.extra is None:
+            raise KeyError(key)
+        else:
+            del self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._KEYS:
+            if key in self._REQUIRED or self._get_field(key) is not None:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict with the same keys and values."""
+        return {key: self[key] for key in self}
+
+    def to_json(self) -> str:
+        """Compact single-line JSON."""
+        return _ENCODER.encode(self.to_dict())
+
+
+class ExtractionResult(_Record):
+    """
+    Result of one extraction.
+
+    Mapping keys: "success", "error", "output", "exit_code" (always),
+    "output_path", "input", "error_category", "resources", "metrics" and
+    any extra keys (when set). The "metrics" dict is rebuilt on access from
+    the slots below; assigning one stores its fields in them. Resource
+    usage is only the top-level "resources" entry (a "resources" entry in
+    an assigned metrics dict, as older results had, is moved there).
+
+    Attributes:
+        output_path: Written file (None on failure)
+        input: Input path or URL (set by batches)
+        engine: Engine used ("ffmpeg" or "core")
+        code_path: Code path ("ffmpeg", "ffmpeg-chunked", "core", ...)
+        elapsed: Total seconds spent
+        media_duration: Seconds of media extracted, if known
+        input_bytes: Size of the input file, if local
+        output_bytes: Size of the output file
+        error_category: Failure category (see ERROR_CATEGORIES)
+        resources: CPU, memory and I/O usage (see resources.py)
+    """
+
+    __slots__ = (
+        "success",
+        "error",
+        "output",
+        "exit_code",
+        "output_path",
+        "input",
+        "error_category",
+        "resources",
+        "engine",
+        "code_path",
+        "elapsed",
+        "media_duration",
+        "input_bytes",
+        "output_bytes",
+        "_stages",
+        "extra",
+    )
+
+    _KEYS = (
+        "success",
+        "error",
+        "output",
+        "exit_code",
+        "output_path",
+        "input",
+        "error_category",
+        "resources",
+        "metrics",
+    )
+    _REQUIRED = ("success", "error", "output", "exit_code")
+
+    def __init__(
+        self,
+        success: bool = False,
+        error: str = "",
+        output: str = "",
+        exit_code: int = -1,
+        output_path: Optional[str] = None,
+        input: Optional[str] = None,
+        error_category: Optional[str] = None,
+        resources: Optional[Dict[str, Any]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.success = success
+        self.error = error
+        self.output = output
+        self.exit_code = exit_code
+        self.output_path = output_path
+        self.input = input
+        self.error_category = error_category
+        self.resources = resources
+        self.engine: Optional[str] = None
+        self.code_path: Optional[str] = None
+        self.elapsed: Optional[float] = None
+        self.media_duration: Optional[float] = None
+        self.input_bytes: Optional[int] = None
+        self.output_bytes: Optional[int] = None
+        # Times in STAGES order, or a dict when other stages were timed
+        self._stages: Union[None, Tuple[Optional[float], ...], Dict[str, float]] = None
+        self.extra = extra or None
+
+    @classmethod
+    def failure(
+        cls, error: str, category: str = "error", exit_code: int = -1
+    ) -> "ExtractionResult":
+        """A failed result that never started a process."""
+        return cls(error=error, exit_code=exit_code, error_category=category)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ExtractionResult":
+        """
+        Convert a result dict (or return an ExtractionResult unchanged).
+
+        Args:
+            data: Result mapping, e.g. from an engine or ``read_jsonl``
+
+        Returns:
+            ExtractionResult with the same keys
+        """
+        if isinstance(data, cls):
+            return data
+        result = cls()
+        for key, value in data.items():
+            result[key] = value
+        if not result.success and result.error_category is None:
+            result.error_category = classify_error(result)
+        return result
+
+    @property
+    def stages(self) -> Dict[str, float]:
+        """Seconds per stage (see metrics.STAGES)."""
+        if self._stages is None:
+            return {}
+        if isinstance(self._stages, dict):
+            return dict(self._stages)
+        return {
+            name: value
+            for name, value in zip(STAGES, self._stages)
+            if value is not None
+        }
+
+    @stages.setter
+    def stages(self, stages: Optional[Mapping[str, float]]) -> None:
+        if stages is None:
+            self._stages = None
+        elif all(name in _STAGE_INDEX for name in stages):
+            times: List[Optional[float]] = [None] * len(STAGES)
+            for name, value in stages.items():
+                times[_STAGE_INDEX[name]] = value
+            self._stages = tuple(times)
+        else:
+            # Stage names outside STAGES need the general representation
+            self._stages = dict(stages)
+
+    @property
+    def speed(self) -> Optional[float]:
+        """Realtime factor: media seconds per second of encoding/download."""
+        stages = self.stages
+        work = stages.get("encode") or stages.get("download")
+        if not self.media_duration or not work:
+            return None
+        return round(self.media_duration / work, 3)
+
+    @property
+    def metrics(self) -> Optional[Dict[str, Any]]:
+        """The "metrics" dict (see metrics.py), or None if not measured."""
+        if self._stages is None and self.elapsed is None:
+            return None
+        metrics: Dict[str, Any] = {
+            "stages": self.stages,
+            "total": self.elapsed,
+        }
+        for key, slot in _METRIC_FIELDS:
+            metrics[key] = getattr(self, slot)
+        metrics["speed"] = self.speed
+        return metrics
+
+    @metrics.setter
+    def metrics(self, metrics: Optional[Mapping[str, Any]]) -> None:
+        metrics = metrics or {}
+        self.stages = metrics.get("stages") if metrics else None
+        self.elapsed = metrics.get("total")
+        for key, slot in _METRIC_FIELDS:
+            setattr(self, slot, metrics.get(key))
+        if self.resources is None:
+            self.resources = metrics.get("resources")
+
+
+class BatchResult(_Record):
+    """
+    Result of a batch: counts, aggregated metrics and per-file results.
+
+    Mapping keys: "success", "error", "output", "exit_code" (always),
+    "processed", "failed", "timings", "resources", "rejected",
+    "duplicates", "results" and any extra keys (when set).
+    """
+
+    __slots__ = (
+        "success",
+        "error",
+        "output",
+        "exit_code",
+        "processed",
+        "failed",
+        "timings",
+        "resources",
+        "rejected",
+        "duplicates",
+        "results",
+        "extra",
+    )
+
+    _KEYS = __slots__[:-1]
+    _REQUIRED = ("success", "error", "output", "exit_code")
+
+    def __init__(
+        self,
+        success: bool = False,
+        error: str = "",
+        output: str = "",
+        exit_code: int = -1,
+        processed: Optional[int] = None,
+        failed: Optional[int] = None,
+        timings: Optional[Dict[str, Any]] = None,
+        resources: Optional[Dict[str, Any]] = None,
+        rejected: Optional[List[str]] = None,
+        duplicates: Optional[List[List[str]]] = None,
+        results: Optional[List[ExtractionResult]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.success = success
+        self.error = error
+        self.output = output
+        self.exit_code = exit_code
+        self.processed = processed
+        self.failed = failed
+        self.timings = timings
+        self.resources = resources
+        self.rejected = rejected
+        self.duplicates = duplicates
+        self.results = results
+        self.extra = extra or None
+
+    @classmethod
+    def failure(cls, error: str, exit_code: int = -1) -> "BatchResult":
+        """A batch that could not start."""
+        return cls(error=error, exit_code=exit_code)
+
+    def error_counts(self) -> Dict[str, int]:
+        """Number of failed files per error category."""
+        counts: Dict[str, int] = {}
+        for result in self.results or ():
+            category = classify_error(result)
+            if category is not None:
+                counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    def to_json(self) -> str:
+        """Compact single-line JSON without the per-file results."""
+        summary = self.to_dict()
+        summary.pop("results", None)
+        return _ENCODER.encode(summary)
+
+    def write_jsonl(self, target: Union[str, Path, TextIO]) -> int:
+        """Write the per-file results as JSON Lines (see ``write_jsonl``)."""
+        return write_jsonl(self.results or (), target)
+
+
+def write_jsonl(
+    results: Iterable[Mapping[str, Any]], target: Union[str, Path, TextIO]
+) -> int:
+    """
+    Write results as JSON Lines, one compact object per line.
+
+    Args:
+        results: Result records or dicts (consumed lazily)
+        target: File path (overwritten) or text file object
+
+    Returns:
+        Number of lines written
+    """
+    if isinstance(target, (str, Path)):
+        with open(target, "w", encoding="utf-8", buffering=1 << 20) as f:
+            return write_jsonl(results, f)
+
+    count = 0
+    lines: List[str] = []
+    for result in results:
+        data = result.to_dict() if isinstance(result, _Record) else dict(result)
+        lines.append(_ENCODER.encode(data))
+        count += 1
+        if len(lines) >= 1024:
+            lines.append("")
+            target.write("\n".join(lines))
+            lines.clear()
+    if lines:
+        lines.append("")
+        target.write("\n".join(lines))
+    return count
+
+
+def read_jsonl(source: Union[str, Path, TextIO]) -> Iterator[ExtractionResult]:
+    """
+    Read results written by ``write_jsonl``.
+
+    Args:
+        source: File path or text file object
+
+    Yields:
+        ExtractionResult per non-empty line
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "r", encoding="utf-8") as f:
+            yield from read_jsonl(f)
+        return
+    decode = json.JSONDecoder().decode
+    for line in source:
+        if line.strip():
+            yield ExtractionResult.from_dict(decode(line))
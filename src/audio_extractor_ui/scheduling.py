@@ -0,0 +1,311 @@
+"""
+Cost-based job scheduling: shortest job first, with aging and an
+interactive lane.
+
+A job's cost is estimated from its probed duration and the target codec.
+Background jobs run cheapest first; aging lowers a waiting job's effective
+cost so long jobs still run eventually. Batch and watch jobs share one
+worker pool with the GUI, whose interactive jobs always go ahead of
+background work.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Relative encode cost per second of audio for each target format
+CODEC_COST = {
+    "mp3": 1.0,
+    "aac": 0.8,
+    "opus": 0.9,
+    "flac": 0.5,
+    "wav": 0.2,
+}
+
+# Fixed per-job cost (process start-up, probing), in cost seconds
+JOB_OVERHEAD = 2.0
+
+# Assumed bitrate (bytes per second) when the duration cannot be probed
+FALLBACK_BYTES_PER_SECOND = 250_000
+
+# Cost seconds a waiting job gains per second of waiting
+DEFAULT_AGING_RATE = 0.5
+
+# Lanes, in the order they are served
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+def estimate_cost(
+    path: str,
+    output_format: str = "mp3",
+    probe: Optional[Dict[str, Any]] = None,
+) -> float:
+    """
+    Estimate the relative cost of extracting one file.
+
+    Args:
+        path: Path to the source
+        output_format: Audio format (mp3, wav, flac, aac)
+        probe: Probe summary (optional; probed through the cache if None)
+
+    Returns:
+        Estimated cost, roughly in seconds of single-core work
+    """
+    if probe is None:
+        from .probe import probe_media
+
+        probe = probe_media(path)
+
+    duration = (probe or {}).get("duration")
+    if not duration:
+        try:
+            duration = os.path.getsize(path) / FALLBACK_BYTES_PER_SECOND
+        except OSError:
+            duration = 0.0
+
+    return JOB_OVERHEAD + duration * CODEC_COST.get(output_format, 1.0)
+
+
+def order_shortest_first(
+    paths: List[str], output_format: str = "mp3", max_workers: int = 8
+) -> List[str]:
+    """
+    Sort a batch by estimated cost, probing the files concurrently.
+
+    Args:
+        paths: Source paths
+        output_format: Audio format (mp3, wav, flac, aac)
+        max_workers: Number of concurrent probes
+
+    Returns:
+        Paths, cheapest first
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        costs = list(
+            executor.map(lambda path: estimate_cost(path, output_format), paths)
+        )
+    order = sorted(range(len(paths)), key=costs.__getitem__)
+    return [paths[index] for index in order]
+
+
+class JobScheduler:
+    """
+    Thread-safe two-lane priority queue.
+
+    Within a lane, entries are ordered by ``cost - aging_rate * waited``.
+    Every entry ages at the same rate, so the order only depends on
+    ``cost + aging_rate * enqueued_at`` and a plain heap keeps it.
+    """
+
+    def __init__(self, aging_rate: float = DEFAULT_AGING_RATE):
+        """
+        Initialize the scheduler.
+
+        Args:
+            aging_rate: Cost a waiting job gains per second of waiting
+        """
+        self.aging_rate = aging_rate
+        self._lanes: Dict[str, List[Tuple[float, int, Any]]] = {
+            INTERACTIVE: [],
+            BACKGROUND: [],
+        }
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return sum(len(lane) for lane in self._lanes.values())
+
+    def push(
+        self,
+        item: Any,
+        cost: float = 0.0,
+        interactive: bool = False,
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Queue an item.
+
+        Args:
+            item: The job
+            cost: Estimated cost (see ``estimate_cost``)
+            interactive: Put the job in the interactive lane
+            now: Enqueue time (optional, ``time.monotonic()`` by default)
+        """
+        now = time.monotonic() if now is None else now
+        lane = INTERACTIVE if interactive else BACKGROUND
+        key = cost + self.aging_rate * now
+        with self._condition:
+            heapq.heappush(self._lanes[lane], (key, next(self._counter), item))
+            self._condition.notify()
+
+    def pop(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Take the next item, waiting for one if the queue is empty.
+
+        Args:
+            timeout: Seconds to wait (optional, forever by default; 0 to
+                not wait)
+
+        Returns:
+            The item, or None on timeout
+        """
+        with self._condition:
+            if not self._condition.wait_for(self._has_items, timeout):
+                return None
+            for lane in (INTERACTIVE, BACKGROUND):
+                if self._lanes[lane]:
+                    return heapq.heappop(self._lanes[lane])[2]
+        return None
+
+    def _has_items(self) -> bool:
+        return any(self._lanes.values())
+
+    def depth(self) -> Dict[str, int]:
+        """Number of queued items per lane."""
+        with self._condition:
+            return {name: len(lane) for name, lane in self._lanes.items()}
+
+
+class JobQueue:
+    """Worker threads running scheduled jobs."""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        aging_rate: float = DEFAULT_AGING_RATE,
+    ):
+        """
+        Initialize the queue (workers start on the first submission).
+
+        Args:
+            max_workers: Number of jobs run concurrently
+            aging_rate: Cost a waiting job gains per second of waiting
+        """
+        self.max_workers = max(1, max_workers)
+        self.scheduler = JobScheduler(aging_rate)
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._running = 0
+        self._shutdown = False
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        cost: float = 0.0,
+        interactive: bool = False,
+        **kwargs: Any,
+    ) -> Future:
+        """
+        Schedule a call.
+
+        Args:
+            func: Callable to run
+            *args: Positional arguments for ``func``
+            cost: Estimated cost (see ``estimate_cost``)
+            interactive: Run ahead of all background jobs
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            Future resolving to the call's result
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Job queue is shut down")
+            self._start_workers()
+        self.scheduler.push((future, func, args, kwargs), cost, interactive)
+        return future
+
+    def reserve(self, workers: int) -> None:
+        """
+        Grow the pool to at least ``workers`` threads (it never shrinks).
+
+        Args:
+            workers: Number of jobs the caller wants to run concurrently
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Job queue is shut down")
+            self.max_workers = max(self.max_workers, workers)
+            self._start_workers()
+
+    def _start_workers(self) -> None:
+        """Start the worker threads (caller holds the lock)."""
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._work,
+                name=f"job-queue-{len(self._workers)}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self) -> None:
+        """Run jobs until shut down."""
+        while True:
+            job = self.scheduler.pop(timeout=0.5)
+            if job is None:
+                if self._shutdown:
+                    return
+                continue
+            future, func, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self._running += 1
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs currently running."""
+        with self._lock:
+            return self._running
+
+    def depth(self) -> Dict[str, int]:
+        """Number of queued jobs per lane."""
+        return self.scheduler.depth()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the workers once the queue is drained.
+
+        Args:
+            wait: Wait for the workers to exit
+        """
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Get the job queue shared by the GUI, batches and watch mode."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
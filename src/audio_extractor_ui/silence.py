@@ -0,0 +1,195 @@
+"""
+Vectorized silence detection on streamed PCM.
+
+The windowed RMS level is computed with NumPy block by block while the
+audio is decoded, so leading, trailing and internal silence are found in a
+single decode with constant memory (one boolean per window is kept).
+"""
+
+import logging
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+
+from .pcm import NUMPY_AVAILABLE, require_numpy
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Defaults for silence detection
+DEFAULT_THRESHOLD_DB = -50.0
+DEFAULT_MIN_SILENCE = 0.5
+DEFAULT_WINDOW = 0.02
+
+# (start, end) in seconds
+Interval = Tuple[float, float]
+
+
+class SilenceDetector:
+    """Incremental windowed-RMS silence detector."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        threshold_db: float = DEFAULT_THRESHOLD_DB,
+        min_silence: float = DEFAULT_MIN_SILENCE,
+        window: float = DEFAULT_WINDOW,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            sample_rate: Sample rate of the PCM fed to ``feed``
+            threshold_db: RMS level (dBFS) below which a window is silent
+            min_silence: Minimum length in seconds of a reported silence
+            window: RMS window length in seconds
+        """
+        require_numpy()
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.min_silence = min_silence
+        self.window_frames = max(1, int(round(window * sample_rate)))
+        # Compare mean squares against the threshold instead of taking logs
+        self._threshold_ms = 10 ** (threshold_db / 10)
+        self._carry: Optional["np.ndarray"] = None
+        self._silent: List["np.ndarray"] = []
+        self.total_frames = 0
+
+    def feed(self, block: "np.ndarray") -> None:
+        """
+        Add a (frames, channels) block of float samples.
+
+        Args:
+            block: Decoded audio; it may be reused by the caller afterwards
+        """
+        self.total_frames += len(block)
+        samples = block.astype(np.float32, copy=False)
+        if self._carry is not None and len(self._carry):
+            samples = np.concatenate([self._carry, samples])
+
+        windows = len(samples) // self.window_frames
+        used = windows * self.window_frames
+        if windows:
+            framed = samples[:used].reshape(windows, -1)
+            mean_square = np.einsum("ij,ij->i", framed, framed) / framed.shape[1]
+            self._silent.append(mean_square < self._threshold_ms)
+        self._carry = samples[used:].copy()
+
+    def _silent_windows(self) -> "np.ndarray":
+        """Silence flags of every window, including a final partial one."""
+        flags = list(self._silent)
+        if self._carry is not None and len(self._carry):
+            tail = self._carry.reshape(1, -1)
+            mean_square = float(np.mean(tail * tail))
+            flags.append(np.array([mean_square < self._threshold_ms]))
+        if not flags:
+            return np.zeros(0, dtype=bool)
+        return np.concatenate(flags)
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Summarize the silence found so far.
+
+        Returns:
+            Dict with "duration", "leading" and "trailing" silence lengths,
+            "silences" (every silent interval of at least min_silence) and
+            "internal" (those not touching either end), times in seconds
+        """
+        silent = self._silent_windows()
+        duration = self.total_frames / self.sample_rate
+        window = self.window_frames / self.sample_rate
+
+        # Run boundaries from the edges of the padded flag array
+        edges = np.diff(np.concatenate([[0], silent.astype(np.int8), [0]]))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        silences: List[Interval] = []
+        for start, end in zip(starts, ends):
+            begin = start * window
+            finish = min(end * window, duration)
+            touches_edge = start == 0 or end == len(silent)
+            if finish - begin >= self.min_silence or touches_edge:
+                silences.append((round(begin, 6), round(finish, 6)))
+
+        leading = silences[0][1] if silences and silences[0][0] == 0 else 0.0
+        trailing = 0.0
+        if silences and len(silent) and ends[-1] == len(silent):
+            trailing = duration - silences[-1][0]
+        if len(silent) and silent.all():
+            trailing = 0.0
+
+        internal = [
+            interval
+            for interval in silences
+            if interval[0] > 0 and interval[1] < duration
+        ]
+        return {
+            "duration": duration,
+            "leading": leading,
+            "trailing": round(trailing, 6),
+            "silences": silences,
+            "internal": internal,
+        }
+
+
+def detect_silence(
+    blocks: Iterable["np.ndarray"],
+    sample_rate: int,
+    threshold_db: float = DEFAULT_THRESHOLD_DB,
+    min_silence: float = DEFAULT_MIN_SILENCE,
+    window: float = DEFAULT_WINDOW,
+) -> Dict[str, Any]:
+    """
+    Detect silence in a stream of PCM blocks.
+
+    Args:
+        blocks: Iterable of (frames, channels) float arrays
+        sample_rate: Sample rate in Hz
+        threshold_db: RMS level (dBFS) below which a window is silent
+        min_silence: Minimum length in seconds of a reported silence
+        window: RMS window length in seconds
+
+    Returns:
+        Silence summary (see ``SilenceDetector.result``)
+    """
+    detector = SilenceDetector(sample_rate, threshold_db, min_silence, window)
+    for block in blocks:
+        detector.feed(block)
+    return detector.result()
+
+
+def plan_segments(
+    analysis: Dict[str, Any], mode: str = "trim", min_segment: float = 1.0
+) -> List[Interval]:
+    """
+    Turn a silence analysis into the audio ranges to keep.
+
+    Args:
+        analysis: Result of ``detect_silence``
+        mode: "trim" removes leading/trailing silence and keeps one range;
+            "split" also cuts at internal silences
+        min_segment: Drop split segments shorter than this (seconds)
+
+    Returns:
+        List of (start, end) ranges in seconds
+    """
+    duration = analysis["duration"]
+    start = analysis["leading"]
+    end = duration - analysis["trailing"]
+    if end <= start:
+        return []
+    if mode == "trim":
+        return [(start, end)]
+    if mode != "split":
+        raise ValueError(f"Unknown silence mode: {mode}")
+
+    segments = []
+    cursor = start
+    for silence_start, silence_end in analysis["internal"]:
+        if silence_start > cursor:
+            segments.append((cursor, silence_start))
+        cursor = max(cursor, silence_end)
+    if end > cursor:
+        segments.append((cursor, end))
+    return [(a, b) for a, b in segments if b - a >= min_segment]
@@ -0,0 +1,331 @@
+"""
+Content-based media container detection.
+
+Reads the first few KB of a file and recognises container signatures
+("magic bytes"), so mislabeled, truncated or non-media files can be rejected
+before any ffmpeg process is started, and real media with unusual
+extensions is still picked up.
+"""
+
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional, Dict, Generator, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Number of bytes read from the start of each file
+SNIFF_SIZE = 4096
+
+# Files shorter than this cannot hold a usable media stream
+MIN_MEDIA_SIZE = 128
+
+# Default number of files sniffed concurrently
+DEFAULT_SNIFF_WORKERS = 16
+
+_ASF_GUID = bytes.fromhex("3026B2758E66CF11A6D900AA0062CE6C")
+
+# Top-level QuickTime boxes a file without an ftyp box may start with
+_QT_BOXES = (b"moov", b"mdat", b"free", b"wide", b"skip")
+
+# Largest leading box size accepted without an ftyp box. Any size whose
+# first byte is printable ASCII is larger, so text that happens to have
+# "free" or "mdat" at offset 4 is not taken for a movie
+_QT_MAX_BOX = 2**29 - 1
+
+_FTYP_BRANDS: Dict[bytes, str] = {
+    b"qt  ": "mov",
+    b"M4A ": "m4a",
+    b"M4B ": "m4a",
+    b"3gp4": "3gp",
+    b"3gp5": "3gp",
+    b"3gp6": "3gp",
+    b"3g2a": "3gp",
+}
+
+
+# MPEG audio bitrates in kbit/s by bitrate index (0 is free format, 15 is
+# invalid), for MPEG-1 layers I-III and MPEG-2/2.5 layer I and layers II-III
+_MPEG_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# MPEG-1 sample rates; MPEG-2 halves them and MPEG-2.5 quarters them
+_MPEG_SAMPLE_RATES = (44100, 48000, 32000)
+
+
+def _mpeg_audio_frame_size(data: bytes, offset: int = 0) -> int:
+    """
+    Length of the MPEG audio frame whose header starts at ``offset``.
+
+    Returns:
+        Frame length in bytes, or 0 if there is no valid header there
+        (free-format streams are not recognised)
+    """
+    header = data[offset : offset + 4]
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return 0
+    version_bits = (header[1] >> 3) & 0x03
+    layer = 4 - ((header[1] >> 1) & 0x03)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version_bits == 1 or layer == 4 or rate_index == 3:
+        return 0
+    if bitrate_index in (0, 15):
+        return 0
+
+    mpeg1 = version_bits == 3
+    table = (1, layer) if mpeg1 else (2, 1 if layer == 1 else 2)
+    bitrate = _MPEG_BITRATES[table][bitrate_index] * 1000
+    sample_rate = _MPEG_SAMPLE_RATES[rate_index]
+    if not mpeg1:
+        sample_rate //= 2 if version_bits == 2 else 4
+    padding = (header[2] >> 1) & 0x01
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4
+    if layer == 3 and not mpeg1:
+        return 72 * bitrate // sample_rate + padding
+    return 144 * bitrate // sample_rate + padding
+
+
+def _is_mpeg_audio(data: bytes) -> bool:
+    """Check for an MPEG audio frame header followed by a second one."""
+    size = _mpeg_audio_frame_size(data)
+    if not size:
+        return False
+    if size + 4 > len(data):
+        # The next frame is beyond the sniffed bytes
+        return True
+    return _mpeg_audio_frame_size(data, size) > 0
+
+
+def _is_mpegts(data: bytes, packet_size: int, offset: int) -> bool:
+    """Check for three consecutive MPEG-TS sync bytes."""
+    positions = [offset + packet_size * i for i in range(3)]
+    return len(data) > positions[-1] and all(data[p] == 0x47 for p in positions)
+
+
+def _is_quicktime_box(data: bytes) -> bool:
+    """Check for a plausible leading QuickTime box (type and size)."""
+    box = data[4:8]
+    if box not in _QT_BOXES:
+        return False
+    size = int.from_bytes(data[:4], "big")
+    if box == b"mdat" and size in (0, 1):
+        # Extends to the end of the file, or has a 64-bit size
+        return True
+    return 8 <= size <= _QT_MAX_BOX
+
+
+def _id3_size(data: bytes) -> int:
+    """Total size of a leading ID3v2 tag (0 if there is none)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def sniff_bytes(data: bytes) -> Optional[str]:
+    """
+    Identify a media container from its leading bytes.
+
+    Args:
+        data: The first bytes of the file (a few KB is enough)
+
+    Returns:
+        Container name (e.g. "mp4", "matroska", "mpegts", "mp3"), or None
+        if no media signature was recognised
+    """
+    if len(data) < 12:
+        return None
+
+    if data[4:8] == b"ftyp":
+        brand = data[8:12]
+        if brand.startswith(b"3g"):
+            return "3gp"
+        return _FTYP_BRANDS.get(brand, "mp4")
+    if _is_quicktime_box(data):
+        # Old QuickTime files without an ftyp box
+        return "mov"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm" if b"webm" in data[:64] else "matroska"
+    if data[:4] == b"RIFF":
+        form = data[8:12]
+        if form == b"AVI ":
+            return "avi"
+        if form == b"WAVE":
+            return "wav"
+        return None
+    if data[:3] == b"FLV":
+        return "flv"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:16] == _ASF_GUID:
+        return "asf"
+    if data[:4] == b"\x00\x00\x01\xba":
+        return "mpeg-ps"
+    if data[:4] == b"\x00\x00\x01\xb3":
+        return "mpeg-video"
+    if _is_mpegts(data, 188, 0):
+        return "mpegts"
+    if _is_mpegts(data, 192, 4):
+        # M2TS: 4-byte timecode before each packet
+        return "mpegts"
+    if data[:4] == b"fLaC":
+        return "flac"
+    if data[:4] == b"FORM" and data[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if data[:5] == b"#!AMR":
+        return "amr"
+    if data[:4] == b"MAC ":
+        return "ape"
+    if data[:4] == b"wvpk":
+        return "wavpack"
+    if data[:4] == b"caff":
+        return "caf"
+    if data[0] == 0xFF:
+        if data[1] & 0xF6 == 0xF0:
+            return "aac"
+        if _is_mpeg_audio(data):
+            return "mp3"
+    return None
+
+
+def sniff_head(data: bytes) -> Optional[str]:
+    """
+    Identify the media container from the start of a stream.
+
+    For inputs that cannot be re-read, such as pipes and archive members.
+
+    Args:
+        data: The first ``SNIFF_SIZE`` bytes (fewer if the stream is
+            shorter)
+
+    Returns:
+        Container name, or None if truncated or not recognised
+    """
+    if len(data) < MIN_MEDIA_SIZE:
+        return None
+    tag_size = _id3_size(data)
+    if tag_size:
+        container = sniff_bytes(data[tag_size:]) if tag_size + 12 <= len(data) else None
+        # An ID3 tag on its own is still most likely an MP3
+        return container or "mp3"
+    return sniff_bytes(data)
+
+
+def sniff_file(path: str) -> Optional[str]:
+    """
+    Identify the media container of a file from its content.
+
+    A leading ID3 tag is skipped so tagged MP3/AAC files are recognised.
+    Files too short to hold any media are rejected as truncated.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Container name, or None if the file is unreadable, truncated or not
+        a recognised media container
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except OSError:
+        return None
+
+    try:
+        data = os.read(fd, SNIFF_SIZE)
+        if len(data) < MIN_MEDIA_SIZE:
+            return None
+
+        tag_size = _id3_size(data)
+        if tag_size:
+            if tag_size + 12 <= len(data):
+                data = data[tag_size:]
+            else:
+                os.lseek(fd, tag_size, os.SEEK_SET)
+                data = os.read(fd, SNIFF_SIZE)
+            container = sniff_bytes(data)
+            # An ID3 tag on its own is still most likely an MP3
+            return container if container else ("mp3" if data else None)
+
+        return sniff_bytes(data)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def sniff_paths(
+    paths: Iterable[str], max_workers: int = DEFAULT_SNIFF_WORKERS
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Sniff many files concurrently.
+
+    Paths are consumed lazily and at most a bounded number of reads are in
+    flight, so this can sit between a directory walk and the job scheduler.
+
+    Args:
+        paths: Iterable of file paths
+        max_workers: Number of concurrent reads
+
+    Yields:
+        (path, container or None) tuples, in completion order
+    """
+    workers = max(1, max_workers)
+    window = 4 * workers
+    iterator = iter(paths)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sniff")
+    pending: Dict[Future, str] = {}
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                path = next(iterator, None)
+                if path is None:
+                    exhausted = True
+                    break
+                pending[executor.submit(sniff_file, path)] = path
+
+            if not pending:
+                break
+
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def filter_media(
+    paths: Iterable[str],
+    rejected: Optional[List[str]] = None,
+    max_workers: int = DEFAULT_SNIFF_WORKERS,
+) -> Generator[str, None, None]:
+    """
+    Keep only the files whose content is a recognised media container.
+
+    Args:
+        paths: Iterable of file paths
+        rejected: List collecting the paths that were rejected (optional)
+        max_workers: Number of concurrent reads
+
+    Yields:
+        Paths of media files
+    """
+    for path, container in sniff_paths(paths, max_workers=max_workers):
+        if container is not None:
+            yield path
+        else:
+            logger.debug(f"Rejected non-media file {path}")
+            if rejected is not None:
+                rejected.append(path)
@@ -0,0 +1,269 @@
+"""
+Output staging on fast scratch storage.
+
+Encoders write their output in many small chunks, which is slow on network
+storage and leaves partial files behind when a job fails. With a
+StagingArea, each job writes into its own directory on local scratch
+storage (tmpfs, NVMe) and its files are published to the real output
+directory only once it succeeds: with a rename when both are on the same
+file system, or otherwise with one sequential copy to a hidden temporary
+name that is then renamed into place. Either way a destination file is
+never visible half-written.
+
+Scratch space is bounded: every job reserves its estimated output size
+first and waits while the reservations of running jobs would exceed the
+capacity.
+"""
+
+import errno
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Any, Dict, Iterator, Union
+
+from .engine import QUALITY_BITRATES
+
+logger = logging.getLogger(__name__)
+
+# Environment variable naming the scratch directory (see run_watch)
+SCRATCH_DIR_ENV = "AUDIO_EXTRACTOR_SCRATCH_DIR"
+
+# Share of the scratch file system's free space used when no capacity is
+# given
+DEFAULT_CAPACITY_SHARE = 0.5
+
+# Reservation for jobs whose output size cannot be estimated
+DEFAULT_ESTIMATE = 64 * 1024 * 1024
+
+# Bytes per second of 48 kHz stereo 16-bit PCM
+_PCM_RATE = 48000 * 2 * 2
+
+
+def estimate_output_bytes(
+    output_format: str, quality: str, seconds: Optional[float]
+) -> int:
+    """
+    Estimate the size of an encoded output, erring on the large side.
+
+    Args:
+        output_format: Audio format (mp3, wav, flac, aac, opus)
+        quality: Audio quality (high, medium, low)
+        seconds: Length of the extracted audio (None if unknown)
+
+    Returns:
+        Estimated size in bytes
+    """
+    if not seconds:
+        return DEFAULT_ESTIMATE
+    bitrate = QUALITY_BITRATES.get(output_format, {}).get(quality)
+    if bitrate is not None:
+        rate = int(bitrate.rstrip("k")) * 1000 // 8
+    elif output_format == "flac":
+        # Lossless compression rarely saves less than a third
+        rate = _PCM_RATE * 3 // 4
+    else:
+        rate = _PCM_RATE
+    # Container overhead and VBR peaks
+    return int(seconds * rate * 1.1) + 64 * 1024
+
+
+class StagedJob:
+    """Scratch directory of one job and its publishing."""
+
+    def __init__(self, directory: Path, output_dir: Path):
+        self.directory = directory
+        self.output_dir = output_dir
+
+    def final_path(self, staged_path: Union[str, Path]) -> Path:
+        """Destination of a file written into the job directory."""
+        return self.output_dir / Path(staged_path).relative_to(self.directory)
+
+    def publish(self) -> Dict[str, str]:
+        """
+        Move every file of the job to the output directory.
+
+        Returns:
+            Dict mapping staged paths to published paths
+
+        Raises:
+            OSError: If a file could not be published; files published
+                before it stay in place, the failed one leaves nothing
+        """
+        published: Dict[str, str] = {}
+        for folder, _, names in os.walk(self.directory):
+            for name in sorted(names):
+                staged = Path(folder) / name
+                final = self.final_path(staged)
+                publish_file(staged, final)
+                published[str(staged)] = str(final)
+        return published
+
+
+def publish_file(source: Path, destination: Path) -> None:
+    """
+    Atomically move a file, across file systems if needed.
+
+    A rename is tried first. Across file systems the file is copied in one
+    pass to a hidden name next to the destination, flushed to disk and
+    renamed over the destination, so readers see the old file or the
+    complete new one and never a partial copy.
+
+    Args:
+        source: File to move
+        destination: Final path (replaced if it exists)
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(source, destination)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    import uuid
+
+    partial = destination.with_name(
+        f".{destination.name}.{uuid.uuid4().hex[:8]}.partial"
+    )
+    try:
+        # copyfile uses sendfile/copy_file_range where available
+        shutil.copyfile(source, partial)
+        with open(partial, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(partial, destination)
+    except BaseException:
+        try:
+            os.unlink(partial)
+        except OSError:
+            pass
+        raise
+    os.unlink(source)
+
+
+class StagingArea:
+    """
+    Bounded scratch space in which jobs write their outputs.
+
+    Usage:
+        staging = StagingArea("/mnt/nvme/scratch", capacity=20 * 2**30)
+        with staging.stage(output_dir, estimate) as job:
+            ...encode into job.directory...
+            job.publish()
+    """
+
+    def __init__(
+        self,
+        scratch_dir: Union[None, str, Path] = None,
+        capacity: Optional[int] = None,
+    ):
+        """
+        Initialize the staging area.
+
+        Args:
+            scratch_dir: Fast local directory (defaults to
+                ``AUDIO_EXTRACTOR_SCRATCH_DIR`` or the temp directory); a
+                private subdirectory is created in it
+            capacity: Maximum bytes reserved at once (defaults to half of
+                the free space of the scratch file system)
+        """
+        root = Path(
+            scratch_dir or os.environ.get(SCRATCH_DIR_ENV) or tempfile.gettempdir()
+        )
+        root.mkdir(parents=True, exist_ok=True)
+        self.scratch_dir = root
+        self.root = Path(tempfile.mkdtemp(prefix="audio-extractor-", dir=root))
+        if capacity is None:
+            free = shutil.disk_usage(self.root).free
+            capacity = int(free * DEFAULT_CAPACITY_SHARE)
+        self.capacity = max(1, capacity)
+        self.reserved = 0
+        self._condition = threading.Condition()
+
+    def reserve(self, nbytes: int, timeout: Optional[float] = None) -> bool:
+        """
+        Reserve scratch space, waiting while the area is full.
+
+        A job larger than the whole capacity is admitted once nothing else
+        is reserved, so it is delayed but never blocked forever.
+
+        Args:
+            nbytes: Bytes to reserve
+            timeout: Seconds to wait at most (optional)
+
+        Returns:
+            True if reserved, False on timeout
+        """
+        with self._condition:
+            admitted = self._condition.wait_for(
+                lambda: self.reserved == 0
+                or self.reserved + nbytes <= self.capacity,
+                timeout,
+            )
+            if admitted:
+                self.reserved += nbytes
+            return admitted
+
+    def release(self, nbytes: int) -> None:
+        """Return reserved space and wake waiting jobs."""
+        with self._condition:
+            self.reserved = max(0, self.reserved - nbytes)
+            self._condition.notify_all()
+
+    @contextmanager
+    def stage(
+        self, output_dir: Union[str, Path], estimate: int = DEFAULT_ESTIMATE
+    ) -> Iterator[StagedJob]:
+        """
+        Reserve space and provide a private directory for one job.
+
+        Files still in the directory when the block exits (nothing was
+        published, or the job failed) are deleted.
+
+        Args:
+            output_dir: Directory the job's files are published to
+            estimate: Expected output size in bytes
+
+        Yields:
+            StagedJob
+        """
+        self.reserve(estimate)
+        directory = Path(tempfile.mkdtemp(prefix="job-", dir=self.root))
+        try:
+            yield StagedJob(directory, Path(output_dir))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+            self.release(estimate)
+
+    def work_dir(self, output_path: Union[str, Path]) -> Path:
+        """
+        Stable scratch directory for resumable work on one output.
+
+        It is named after the output's absolute path and lies outside the
+        private root, so a retry or a restart writing the same output
+        finds it again (``close()`` leaves it alone).
+
+        Args:
+            output_path: Final path of the output
+
+        Returns:
+            Directory path (not created)
+        """
+        import hashlib
+
+        path = Path(output_path).absolute()
+        digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:16]
+        return self.scratch_dir / "audio-extractor-work" / f"{path.name}.{digest}"
+
+    def close(self) -> None:
+        """Remove the scratch directory."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> "StagingArea":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
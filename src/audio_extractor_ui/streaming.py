@@ -0,0 +1,253 @@
+"""
+Encoding audio straight to memory, without output files.
+
+ffmpeg writes the encoded stream to its stdout pipe, which is read in
+fixed-size chunks: the pipe blocks ffmpeg while the consumer is busy, so
+memory stays bounded however long the source is. URLs are downloaded by
+yt-dlp writing to its stdout (``-o -``), piped into ffmpeg's stdin, so
+nothing is written to disk at either end.
+
+Formats whose container needs seeking back to finish (MP4/M4A) cannot be
+written to a pipe; AAC is streamed as ADTS and WAV with an open-ended
+header.
+"""
+
+import logging
+import shutil
+import sys
+from typing import Optional, Any, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# Default bytes per chunk read from ffmpeg
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Muxer per output format that can be written to a pipe
+PIPE_MUXERS = {
+    "mp3": "mp3",
+    "wav": "wav",
+    "flac": "flac",
+    "aac": "adts",
+    "opus": "opus",
+}
+
+
+def ytdlp_command() -> Optional[List[str]]:
+    """Command running yt-dlp: the executable on PATH, or the package."""
+    binary = shutil.which("yt-dlp")
+    if binary:
+        return [binary]
+    import importlib.util
+
+    try:
+        spec = importlib.util.find_spec("yt_dlp")
+    except (ImportError, ValueError):
+        spec = None
+    return [sys.executable, "-m", "yt_dlp"] if spec is not None else None
+
+
+def download_command(url: str) -> Optional[List[str]]:
+    """
+    Build a yt-dlp command writing the best audio of a URL to stdout.
+
+    Returns:
+        Command as a list of arguments, or None if yt-dlp is missing
+    """
+    base = ytdlp_command()
+    if base is None:
+        return None
+    return base + [
+        "--quiet",
+        "--no-progress",
+        "--no-playlist",
+        "-f",
+        "bestaudio/best",
+        "-o",
+        "-",
+        url,
+    ]
+
+
+def encode_command(
+    engine: Any,
+    input_path: str,
+    output_format: str = "mp3",
+    quality: str = "high",
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    duration: Optional[str] = None,
+    audio_filter: Optional[str] = None,
+    threads: Optional[int] = None,
+) -> List[str]:
+    """
+    Build an ffmpeg command writing encoded audio to stdout.
+
+    Args:
+        engine: FFmpegEngine providing the binary and encoder arguments
+        input_path: Path (or ``pipe:0``) of the input media
+        output_format: Audio format (mp3, wav, flac, aac, opus)
+        quality: Audio quality (high, medium, low)
+        start_time: Start time (optional)
+        end_time: End time (optional)
+        duration: Duration (optional)
+        audio_filter: ffmpeg audio filter graph (optional)
+        threads: Value for ffmpeg ``-threads`` (optional)
+
+    Returns:
+        Command as a list of arguments
+
+    Raises:
+        ValueError: If the format cannot be written to a pipe
+    """
+    muxer = PIPE_MUXERS.get(output_format)
+    if muxer is None:
+        raise ValueError(f"Cannot stream {output_format} output")
+    return engine.build_command(
+        input_path,
+        "pipe:1",
+        output_format=output_format,
+        quality=quality,
+        start_time=start_time,
+        end_time=end_time,
+        duration=duration,
+        audio_filter=audio_filter,
+        threads=threads,
+        # Errors only: stderr is kept for the failure message
+        input_args=["-v", "error"],
+        output_args=["-f", muxer],
+    )
+
+
+class EncodedStream:
+    """An ffmpeg encoder (optionally fed by yt-dlp) read in chunks."""
+
+    def __init__(
+        self,
+        cmd: List[str],
+        download_cmd: Optional[List[str]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        stdin: Any = None,
+    ):
+        """
+        Initialize the stream (the processes start on ``open``/``with``).
+
+        Args:
+            cmd: ffmpeg command writing to stdout (reading ``pipe:0`` when
+                fed by a download or ``stdin``)
+            download_cmd: Command writing the input media to stdout, piped
+                into ffmpeg (optional)
+            chunk_size: Bytes per chunk
+            stdin: stdin for ffmpeg when there is no download (optional)
+        """
+        self.cmd = cmd
+        self.download_cmd = download_cmd
+        self.chunk_size = chunk_size
+        self.stdin = stdin
+        self.process: Any = None
+        self.downloader: Any = None
+        self.bytes_read = 0
+        self.returncode: Optional[int] = None
+        self.error = ""
+        self._eof = False
+        self._stderr: Any = None
+        self._download_stderr: Any = None
+
+    def open(self) -> "EncodedStream":
+        """Start the download (if any) and the encoder."""
+        import subprocess
+        from .resources import StderrDrain
+
+        stdin = self.stdin if self.stdin is not None else subprocess.DEVNULL
+        if self.download_cmd is not None:
+            self.downloader = subprocess.Popen(
+                self.download_cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            stdin = self.downloader.stdout
+            self._download_stderr = StderrDrain(self.downloader.stderr)
+        try:
+            self.process = subprocess.Popen(
+                self.cmd,
+                stdin=stdin,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except OSError:
+            if self.downloader is not None:
+                self.downloader.kill()
+                self.downloader.wait()
+                self._download_stderr.output()
+            raise
+        # Both stderr pipes are drained while stdout is read, so neither
+        # process can block on a full stderr buffer
+        self._stderr = StderrDrain(self.process.stderr)
+        if self.downloader is not None:
+            # ffmpeg holds the read end now; closing ours lets yt-dlp see
+            # a broken pipe if ffmpeg exits early
+            self.downloader.stdout.close()
+        return self
+
+    def __enter__(self) -> "EncodedStream":
+        return self.open()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def chunks(self) -> Iterator[bytes]:
+        """
+        Yield the encoded audio.
+
+        Yields:
+            Chunks of at most ``chunk_size`` bytes
+        """
+        if self.process is None:
+            self.open()
+        read = self.process.stdout.read
+        while True:
+            chunk = read(self.chunk_size)
+            if not chunk:
+                self._eof = True
+                return
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def close(self) -> int:
+        """
+        Stop the processes and collect their exit status.
+
+        Returns:
+            0 if the download and the encode succeeded, otherwise the
+            failing exit code (``error`` has its message)
+        """
+        if self.process is None:
+            return 0
+        stopped = not self._eof and self.process.poll() is None
+        if stopped:
+            # Stopped early: the rest of the encode is not needed
+            self.process.kill()
+        self.process.stdout.close()
+        code = self.process.wait()
+        stderr = self._stderr.output()
+
+        download_code = 0
+        download_stderr = b""
+        if self.downloader is not None:
+            if stopped and self.downloader.poll() is None:
+                self.downloader.kill()
+            download_code = self.downloader.wait()
+            download_stderr = self._download_stderr.output()
+
+        if stopped:
+            code = 0
+        elif download_code != 0:
+            # A failed download can still leave ffmpeg a valid, short input
+            code = download_code
+            self.error = download_stderr.decode(errors="replace").strip()
+        elif code != 0:
+            self.error = stderr.decode(errors="replace").strip()
+        if self.error:
+            logger.error(self.error)
+        self.returncode = code
+        return code
@@ -6,7 +6,7 @@ import os
 import re
 import logging
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +52,24 @@ def validate_url(url: str) -> bool:
     return url_pattern.match(url) is not None
 
 
+# Supported video file extensions, in display order
+_VIDEO_EXTENSION_LIST = (
+    ".mp4",
+    ".avi",
+    ".mkv",
+    ".mov",
+    ".wmv",
+    ".flv",
+    ".webm",
+    ".m4v",
+    ".3gp",
+    ".ogv",
+)
+
+# Set form for constant-time membership checks
+VIDEO_EXTENSIONS = frozenset(_VIDEO_EXTENSION_LIST)
+
+
 def get_video_extensions() -> List[str]:
     """
     Get list of supported video file extensions.
@@ -59,18 +77,7 @@ def get_video_extensions() -> List[str]:
     Returns:
         List of video file extensions
     """
-    return [
-        ".mp4",
-        ".avi",
-        ".mkv",
-        ".mov",
-        ".wmv",
-        ".flv",
-        ".webm",
-        ".m4v",
-        ".3gp",
-        ".ogv",
-    ]
+    return list(_VIDEO_EXTENSION_LIST)
 
 
 def is_video_file(file_path: str) -> bool:
@@ -83,7 +90,58 @@ def is_video_file(file_path: str) -> bool:
     Returns:
         bool: True if file has a video extension, False otherwise
     """
-    return Path(file_path).suffix.lower() in get_video_extensions()
+    return os.path.splitext(file_path)[1].lower() in VIDEO_EXTENSIONS
+
+
+def parse_time(value: Union[None, str, float]) -> Optional[float]:
+    """
+    Parse a time value into seconds.
+
+    Args:
+        value: Time as HH:MM:SS.mmm, MM:SS.mmm or (decimal) seconds,
+            as a string or a number
+
+    Returns:
+        Number of seconds, or None if value is empty
+
+    Raises:
+        ValueError: If the value is not a valid time
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+
+    parts = value.split(":")
+    if len(parts) > 3:
+        raise ValueError(f"Invalid time value: {value}")
+
+    seconds = 0.0
+    for part in parts:
+        if not part:
+            raise ValueError(f"Invalid time value: {value}")
+        seconds = seconds * 60 + float(part)
+
+    if seconds < 0:
+        raise ValueError(f"Invalid time value: {value}")
+    return seconds
+
+
+def format_time(seconds: float) -> str:
+    """
+    Format seconds as HH:MM:SS.mmm.
+
+    Args:
+        seconds: Number of seconds
+
+    Returns:
+        str: Time accepted by ``parse_time`` and the time range inputs
+    """
+    millis = int(round(max(0.0, seconds) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    return f"{hours:02d}:{minutes:02d}:{millis / 1000:06.3f}"
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -0,0 +1,717 @@
+"""
+Hot-folder watch mode: extract audio from media files as they appear.
+
+New files are picked up through inotify on Linux (with a polling fallback
+elsewhere, or on network shares where inotify sees no remote writes),
+debounced, checked for stability so files still being written are left
+alone, and extracted shortest first in the background lane of the shared
+job queue (see scheduling.py). Processed files are recorded
+on disk so a restart does not reprocess the folder; failed files are
+retried a bounded number of times, with a growing delay between attempts.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, wait as wait_for_all
+from functools import partial
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable, Tuple, Iterator
+
+from .cache import read_json, write_json_atomic
+from .discovery import iter_media_files
+from .scheduling import JobQueue, JobScheduler, estimate_cost, get_job_queue
+from .utils import is_video_file
+
+logger = logging.getLogger(__name__)
+
+# (size, mtime_ns) of a file, used to detect changes
+FileSignature = Tuple[int, int]
+
+# Name of the processed-files record kept in the output directory
+STATE_FILENAME = ".watch-state.json"
+
+# Failed attempts after which an unchanged file is no longer retried
+MAX_ATTEMPTS = 3
+
+# Seconds before a failed file is retried, doubled after each failure
+RETRY_BACKOFF = 30.0
+
+# Longest delay before a retry, in seconds
+MAX_RETRY_BACKOFF = 600.0
+
+
+def _signature(path: str) -> Optional[FileSignature]:
+    """Get the (size, mtime_ns) signature of a file, or None if gone."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _iter_files(root: str, recursive: bool) -> Iterator[str]:
+    """Yield the paths of all files below a directory."""
+    return iter_media_files(root, extensions=(), recursive=recursive)
+
+
+class ProcessedRecord:
+    """
+    Persisted record of the files already extracted.
+
+    Each outcome is appended as one line to a journal next to the state
+    file, so recording a job costs the same however many files are known.
+    The journal is folded into the state file when the record is loaded
+    and on ``compact()``.
+    """
+
+    def __init__(self, path: Path, max_attempts: int = MAX_ATTEMPTS):
+        """
+        Initialize the record, loading any previous state.
+
+        Args:
+            path: Path of the JSON state file
+            max_attempts: Failed attempts after which an unchanged file
+                counts as processed
+        """
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + ".log")
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        data = read_json(self.path)
+        self._entries: Dict[str, Dict[str, Any]] = (
+            data.get("files", {}) if isinstance(data, dict) else {}
+        )
+        if self._replay_journal():
+            self.compact()
+
+    def _replay_journal(self) -> bool:
+        """Apply the journal to the entries; True if it had any lines."""
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Ignoring unreadable watch journal: {e}")
+            return False
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                self._entries[entry.pop("path")] = entry
+            except (ValueError, KeyError, AttributeError):
+                # Torn last line after a crash
+                continue
+        return bool(lines)
+
+    def is_processed(self, path: str, signature: FileSignature) -> bool:
+        """
+        Check whether a file needs no (further) extraction.
+
+        True if it was extracted with the same signature, or failed
+        ``max_attempts`` times with it.
+        """
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+        if entry is None or tuple(entry["signature"]) != signature:
+            return False
+        if entry.get("success"):
+            return True
+        return int(entry.get("attempts", 1)) >= self.max_attempts
+
+    def failures(self, path: str, signature: FileSignature) -> int:
+        """Number of failed attempts at a file with this signature."""
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+        if (
+            entry is None
+            or entry.get("success")
+            or tuple(entry["signature"]) != signature
+        ):
+            return 0
+        return int(entry.get("attempts", 1))
+
+    def mark(
+        self, path: str, signature: FileSignature, result: Dict[str, Any]
+    ) -> None:
+        """Record the outcome of an extraction and append it to the journal."""
+        key = os.path.abspath(path)
+        success = bool(result.get("success"))
+        with self._lock:
+            previous = self._entries.get(key)
+            attempts = 1
+            if (
+                not success
+                and previous is not None
+                and not previous.get("success")
+                and tuple(previous["signature"]) == signature
+            ):
+                attempts = previous.get("attempts", 1) + 1
+            entry = {
+                "signature": list(signature),
+                "success": success,
+                "attempts": attempts,
+                "processed_at": time.time(),
+            }
+            self._entries[key] = entry
+            try:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(dict(entry, path=key)) + "\n")
+            except OSError as e:
+                logger.warning(f"Could not persist watch state: {e}")
+
+    def compact(self) -> None:
+        """Rewrite the state file from the entries and empty the journal."""
+        with self._lock:
+            try:
+                write_json_atomic(self.path, {"files": dict(self._entries)})
+                self.journal_path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not compact watch state: {e}")
+
+
+class PollingSource:
+    """Change source that rescans the folder periodically."""
+
+    def __init__(self, root: str, recursive: bool = False, interval: float = 2.0):
+        """
+        Initialize the polling source.
+
+        Args:
+            root: Directory to watch
+            recursive: Also watch subdirectories
+            interval: Seconds between scans
+        """
+        self.root = root
+        self.recursive = recursive
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, FileSignature]:
+        """Take a signature snapshot of the folder."""
+        snapshot = {}
+        for path in _iter_files(self.root, self.recursive):
+            signature = _signature(path)
+            if signature is not None:
+                snapshot[path] = signature
+        return snapshot
+
+    def poll(self, stop_event: threading.Event) -> List[str]:
+        """Wait one interval and return the paths that changed."""
+        if stop_event.wait(self.interval):
+            return []
+        snapshot = self._scan()
+        changed = [
+            path
+            for path, signature in snapshot.items()
+            if self._snapshot.get(path) != signature
+        ]
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        """Release resources (nothing to do for polling)."""
+
+
+class InotifySource:
+    """Change source backed by Linux inotify (via ctypes)."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, root: str, recursive: bool = False, interval: float = 1.0):
+        """
+        Initialize the inotify source.
+
+        Args:
+            root: Directory to watch
+            recursive: Also watch subdirectories
+            interval: Maximum seconds to block waiting for events
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+
+        self.root = root
+        self.recursive = recursive
+        self.interval = interval
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, str] = {}
+        self._add_watch(root)
+        if recursive:
+            for dirpath, _, _ in os.walk(root):
+                if dirpath != root:
+                    self._add_watch(dirpath)
+
+    def _add_watch(self, directory: str) -> None:
+        """Start watching a directory."""
+        import ctypes
+
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), self.WATCH_MASK
+        )
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {directory}")
+        self._watches[wd] = directory
+
+    def poll(self, stop_event: threading.Event) -> List[str]:
+        """Wait for events and return the paths they refer to."""
+        import select
+        import struct
+
+        readable, _, _ = select.select([self._fd], [], [], self.interval)
+        if not readable or stop_event.is_set():
+            return []
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed: List[str] = []
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+            raw_name = data[offset + 16:offset + 16 + length].rstrip(b"\0")
+            offset += 16 + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were dropped; fall back to a full rescan
+                return list(_iter_files(self.root, self.recursive))
+
+            directory = self._watches.get(wd)
+            if directory is None or not raw_name:
+                continue
+            path = os.path.join(directory, os.fsdecode(raw_name))
+
+            if mask & self.IN_ISDIR:
+                if self.recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        self._add_watch(path)
+                    except OSError as e:
+                        logger.warning(str(e))
+                    changed.extend(_iter_files(path, True))
+                continue
+            changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        """Close the inotify descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_event_source(
+    root: str,
+    recursive: bool = False,
+    force_polling: bool = False,
+    poll_interval: float = 2.0,
+) -> Any:
+    """
+    Create the best available change source for a directory.
+
+    Args:
+        root: Directory to watch
+        recursive: Also watch subdirectories
+        force_polling: Use polling even if inotify is available
+        poll_interval: Seconds between scans when polling
+
+    Returns:
+        An InotifySource, or a PollingSource as fallback
+    """
+    if not force_polling:
+        try:
+            return InotifySource(root, recursive=recursive)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify unavailable ({e}); falling back to polling")
+    return PollingSource(root, recursive=recursive, interval=poll_interval)
+
+
+class _PendingFile:
+    """Bookkeeping for a file waiting to become stable."""
+
+    __slots__ = ("last_event", "signature", "stable_since")
+
+    def __init__(self, now: float):
+        self.last_event = now
+        self.signature: Optional[FileSignature] = None
+        self.stable_since = now
+
+
+class FolderWatcher:
+    """Watch a folder and extract audio from new media files."""
+
+    def __init__(
+        self,
+        watch_dir: str,
+        extractor: Any = None,
+        output_format: str = "mp3",
+        quality: str = "high",
+        file_filter: Optional[Callable[[str], bool]] = None,
+        max_workers: int = 2,
+        debounce: float = 1.0,
+        stability_interval: float = 2.0,
+        state_path: Optional[str] = None,
+        recursive: bool = False,
+        force_polling: bool = False,
+        poll_interval: float = 2.0,
+        controller: Optional[Any] = None,
+        queue: Optional[JobQueue] = None,
+        retry_backoff: float = RETRY_BACKOFF,
+    ):
+        """
+        Initialize the folder watcher.
+
+        Args:
+            watch_dir: Directory to watch
+            extractor: AudioExtractor to run jobs with (optional)
+            output_format: Audio format (mp3, wav, flac, aac)
+            quality: Audio quality (high, medium, low)
+            file_filter: Predicate selecting files to process
+                (defaults to ``utils.is_video_file``)
+            max_workers: Maximum number of concurrent extractions
+            debounce: Seconds without events before a file is considered
+            stability_interval: Seconds a file's size and mtime must stay
+                unchanged before it is extracted
+            state_path: Path of the processed-files record (defaults to
+                ``.watch-state.json`` in the output directory)
+            recursive: Also watch subdirectories
+            force_polling: Use polling even if inotify is available
+            poll_interval: Seconds between scans when polling
+            controller: ConcurrencyController adapting the number of
+                concurrent extractions (up to its maximum) and their ffmpeg
+                threads (optional; replaces ``max_workers``)
+            queue: JobQueue running the extractions (optional, the shared
+                queue by default)
+            retry_backoff: Seconds before a failed file is tried again
+                (doubled after each failure, up to ``MAX_RETRY_BACKOFF``)
+        """
+        if extractor is None:
+            from .core import AudioExtractor
+
+            extractor = AudioExtractor()
+
+        self.watch_dir = os.path.abspath(watch_dir)
+        self.extractor = extractor
+        self.output_format = output_format
+        self.quality = quality
+        self.file_filter = file_filter or is_video_file
+        self.controller = controller
+        self.max_workers = max(1, max_workers)
+        if controller is not None:
+            self.max_workers = controller.max_jobs
+        self.debounce = debounce
+        self.stability_interval = stability_interval
+        self.recursive = recursive
+        self.force_polling = force_polling
+        self.poll_interval = poll_interval
+        self.queue = queue
+        self.retry_backoff = retry_backoff
+
+        if state_path is None:
+            state_path = str(Path(extractor.output_dir) / STATE_FILENAME)
+        self.record = ProcessedRecord(Path(state_path))
+
+        self._stop_event = threading.Event()
+        self._pending: Dict[str, _PendingFile] = {}
+        # Stable files waiting for a worker, shortest first (with aging)
+        self._ready = JobScheduler()
+        self._in_flight: Dict[str, Future] = {}
+        # Failed files to try again, with the monotonic time they are due
+        self._retries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._source: Any = None
+
+    def start(self) -> None:
+        """Open the change source and queue the files already present."""
+        self._stop_event.clear()
+        if self.queue is None:
+            self.queue = get_job_queue()
+        self.queue.reserve(self.max_workers)
+        self._source = create_event_source(
+            self.watch_dir,
+            recursive=self.recursive,
+            force_polling=self.force_polling,
+            poll_interval=self.poll_interval,
+        )
+        self.add_candidates(_iter_files(self.watch_dir, self.recursive))
+        logger.info(
+            f"Watching {self.watch_dir} with {type(self._source).__name__}"
+        )
+
+    def add_candidates(self, paths: Any) -> None:
+        """Register changed paths, restarting their debounce timer."""
+        now = time.monotonic()
+        for path in paths:
+            if not self.file_filter(path):
+                continue
+            entry = self._pending.get(path)
+            if entry is None:
+                self._pending[path] = _PendingFile(now)
+            else:
+                entry.last_event = now
+
+    def tick(self) -> None:
+        """Promote stable pending files and dispatch them to the pool."""
+        now = time.monotonic()
+        with self._lock:
+            due = [path for path, at in self._retries.items() if at <= now]
+            for path in due:
+                del self._retries[path]
+        for path in due:
+            # Checked for stability again, in case it is still being copied
+            self._pending.setdefault(path, _PendingFile(now))
+
+        for path, entry in list(self._pending.items()):
+            if now - entry.last_event < self.debounce:
+                continue
+
+            signature = _signature(path)
+            if signature is None:
+                del self._pending[path]
+                continue
+            if signature != entry.signature or signature[0] == 0:
+                entry.signature = signature
+                entry.stable_since = now
+                continue
+            if now - entry.stable_since < self.stability_interval:
+                continue
+
+            with self._lock:
+                if path in self._in_flight:
+                    # Changed while being extracted; retry once it finishes
+                    continue
+            del self._pending[path]
+            if not self.record.is_processed(path, signature):
+                cost = estimate_cost(path, self.output_format)
+                self._ready.push((path, signature, cost), cost)
+
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Submit ready files to the job queue while below the job limit."""
+        queue = self.queue
+        if queue is None:
+            raise RuntimeError("Watcher is not started")
+        limit = self.max_workers
+        if self.controller is not None:
+            self.controller.update()
+            limit = self.controller.jobs
+        while len(self._ready):
+            with self._lock:
+                if len(self._in_flight) >= limit:
+                    return
+                job = self._ready.pop(timeout=0)
+                if job is None:
+                    return
+                path, signature, cost = job
+                future = queue.submit(self._process, path, signature, cost=cost)
+                self._in_flight[path] = future
+            future.add_done_callback(partial(self._finished, path))
+
+    def _finished(self, path: str, future: Future) -> None:
+        """Release the worker slot of a finished job."""
+        with self._lock:
+            self._in_flight.pop(path, None)
+
+    def _process(self, path: str, signature: FileSignature) -> Dict[str, Any]:
+        """Extract one file and record the outcome."""
+        logger.info(f"Watch: extracting {path}")
+        options = {}
+        if self.controller is not None:
+            options["threads"] = self.controller.threads
+        result: Dict[str, Any]
+        try:
+            result = self.extractor.extract_from_file(
+                path, self.output_format, self.quality, **options
+            )
+        except Exception as e:
+            result = {
+                "success": False,
+                "error": str(e),
+                "output": "",
+                "exit_code": -1,
+            }
+
+        if self.controller is not None:
+            self.controller.job_finished(signature[0])
+        if result.get("success"):
+            logger.info(f"Watch: finished {path}")
+        else:
+            logger.error(f"Watch: failed {path}: {result.get('error')}")
+        self.record.mark(path, signature, result)
+        if not self.record.is_processed(path, signature):
+            self._schedule_retry(path, self.record.failures(path, signature))
+        return result
+
+    def _schedule_retry(self, path: str, failures: int) -> None:
+        """Try a failed file again once its backoff has passed."""
+        delay = min(MAX_RETRY_BACKOFF, self.retry_backoff * 2 ** max(0, failures - 1))
+        logger.info(f"Watch: retrying {path} in {delay:.0f}s")
+        with self._lock:
+            self._retries[path] = time.monotonic() + delay
+
+    def run(self) -> None:
+        """Watch until ``stop()`` is called (or Ctrl+C)."""
+        self.start()
+        try:
+            while not self._stop_event.is_set():
+                self.add_candidates(self._source.poll(self._stop_event))
+                self.tick()
+        except KeyboardInterrupt:
+            logger.info("Watch interrupted")
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        """Ask a running watcher to stop."""
+        self._stop_event.set()
+
+    def close(self, wait: bool = True) -> None:
+        """Close the change source and wait for in-flight jobs."""
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+        if wait:
+            with self._lock:
+                futures = list(self._in_flight.values())
+            wait_for_all(futures)
+        self.record.compact()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of extractions currently running."""
+        with self._lock:
+            return len(self._in_flight)
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Number of stable files waiting for a worker, per lane."""
+        return self._ready.depth()
+
+
+def run_watch(argv: Optional[List[str]] = None) -> None:
+    """Run watch mode from command-line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="audio-extractor-ui --mode watch",
+        description="Watch a folder and extract audio from new media files",
+    )
+    parser.add_argument("folder", help="Folder to watch")
+    parser.add_argument("--output", default="output", help="Output directory")
+    parser.add_argument("--format", default="mp3", help="Audio format")
+    parser.add_argument("--quality", default="high", help="Audio quality")
+    parser.add_argument(
+        "--workers", type=int, default=2, help="Concurrent extractions"
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=1.0, help="Quiet seconds per file"
+    )
+    parser.add_argument(
+        "--stability",
+        type=float,
+        default=2.0,
+        help="Seconds size/mtime must stay unchanged",
+    )
+    parser.add_argument("--recursive", action="store_true", help="Watch subfolders")
+    parser.add_argument(
+        "--poll", action="store_true", help="Force polling (e.g. network shares)"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=2.0, help="Seconds between scans"
+    )
+    parser.add_argument("--state-file", help="Processed-files record path")
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Adapt concurrent jobs (up to --workers) and ffmpeg threads",
+    )
+    parser.add_argument(
+        "--max-threads", type=int, default=4, help="Adaptive: ffmpeg threads cap"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on this port (at /metrics)",
+    )
+    parser.add_argument(
+        "--metrics-host", default="127.0.0.1", help="Metrics endpoint address"
+    )
+    parser.add_argument(
+        "--scratch-dir",
+        help="Encode on this fast local directory, then publish to --output",
+    )
+    parser.add_argument(
+        "--scratch-size",
+        type=int,
+        help="Scratch space to use at most, in MiB (with --scratch-dir)",
+    )
+    args = parser.parse_args(argv)
+
+    from .core import AudioExtractor
+
+    staging = None
+    if args.scratch_dir:
+        from .staging import StagingArea
+
+        staging = StagingArea(
+            args.scratch_dir,
+            capacity=args.scratch_size * 1024 * 1024 if args.scratch_size else None,
+        )
+
+    extractor = AudioExtractor(staging=staging)
+    extractor.output_dir = Path(args.output)
+    extractor.output_dir.mkdir(parents=True, exist_ok=True)
+
+    controller = None
+    if args.adaptive:
+        from .concurrency import ConcurrencyController
+
+        controller = ConcurrencyController(
+            max_jobs=args.workers, max_threads=args.max_threads
+        )
+
+    watcher = FolderWatcher(
+        args.folder,
+        extractor=extractor,
+        output_format=args.format,
+        quality=args.quality,
+        max_workers=args.workers,
+        debounce=args.debounce,
+        stability_interval=args.stability,
+        state_path=args.state_file,
+        recursive=args.recursive,
+        force_polling=args.poll,
+        poll_interval=args.poll_interval,
+        controller=controller,
+    )
+    if args.metrics_port is not None:
+        from .prometheus import expose_queue, start_http_server
+
+        expose_queue(watcher.queue_depth, lambda: watcher.in_flight)
+        start_http_server(args.metrics_port, args.metrics_host)
+    try:
+        watcher.run()
+    finally:
+        if staging is not None:
+            staging.close()
@@ -0,0 +1,364 @@
+"""
+Waveform peaks computed from streamed PCM, cached in binary peak files.
+
+The source is decoded once to low-rate mono PCM and reduced to min/max
+pairs per bucket while it streams, so memory does not grow with the PCM.
+Coarser zoom levels are derived from the finest one, and all levels are
+written to a compact peak file (8-bit min/max pairs) in the user cache.
+The file is registered in the media cache, so it is dropped automatically
+when the source changes; reopening a source memory-maps the peak file
+instead of decoding anything.
+"""
+
+import hashlib
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Optional, Any, Callable, Dict, Iterable, Tuple
+
+from .cache import MediaCache, get_cache_dir, get_media_cache
+from .pcm import NUMPY_AVAILABLE, PCMStream, pcm_command, require_numpy
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sample rate the source is decoded at for peak generation
+PEAK_SAMPLE_RATE = 8000
+
+# Frames per bucket of the finest zoom level (125 peaks per second)
+BASE_BUCKET = 64
+
+# Each zoom level groups this many buckets of the previous one
+LEVEL_FACTOR = 4
+
+# Number of zoom levels stored
+LEVEL_COUNT = 5
+
+# Peak file layout: header, one (bucket, count) entry per level, then the
+# int8 min/max pairs of every level in order
+PEAK_MAGIC = b"AXPK"
+PEAK_VERSION = 1
+_HEADER = struct.Struct("<4sHHIQ")
+_LEVEL = struct.Struct("<II")
+
+
+class Waveform:
+    """Min/max peaks of a source at several zoom levels."""
+
+    def __init__(self, sample_rate: int, frames: int, levels: Dict[int, Any]):
+        """
+        Initialize the waveform.
+
+        Args:
+            sample_rate: Sample rate the peaks were computed at
+            frames: Number of frames of the decoded audio
+            levels: Arrays of (min, max) int8 pairs keyed by frames per bucket
+        """
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self.levels = levels
+
+    @property
+    def duration(self) -> float:
+        """Duration of the audio in seconds."""
+        return self.frames / self.sample_rate
+
+    def level_for(self, start: float, end: float, width: int) -> int:
+        """
+        Choose the coarsest level with at least one bucket per pixel.
+
+        Args:
+            start: Start of the visible range in seconds
+            end: End of the visible range in seconds
+            width: Width of the view in pixels
+
+        Returns:
+            Frames per bucket of the chosen level
+        """
+        frames_per_pixel = (end - start) * self.sample_rate / max(1, width)
+        chosen = min(self.levels)
+        for bucket in sorted(self.levels):
+            if bucket <= frames_per_pixel:
+                chosen = bucket
+        return chosen
+
+    def peaks(
+        self, start: float, end: float, width: int
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Get one min/max pair per pixel for a time range.
+
+        Args:
+            start: Start of the range in seconds
+            end: End of the range in seconds
+            width: Number of pixels
+
+        Returns:
+            Tuple of (minimums, maximums) float arrays in [-1, 1]; empty when
+            the range holds no audio
+        """
+        bucket = self.level_for(start, end, width)
+        level = self.levels[bucket]
+        first = max(0, int(start * self.sample_rate / bucket))
+        last = min(len(level), int(np.ceil(end * self.sample_rate / bucket)))
+        if last <= first:
+            empty = np.zeros(0, dtype=np.float32)
+            return empty, empty
+
+        visible = level[first:last]
+        edges = np.linspace(0, len(visible), min(width, len(visible)) + 1)
+        starts = np.unique(edges[:-1].astype(np.int64))
+        minimums = np.minimum.reduceat(visible[:, 0], starts)
+        maximums = np.maximum.reduceat(visible[:, 1], starts)
+        return minimums / 127.0, maximums / 127.0
+
+
+class PeakBuilder:
+    """Reduce streamed PCM blocks to min/max pairs per bucket."""
+
+    def __init__(self, bucket: int = BASE_BUCKET):
+        """
+        Initialize the builder.
+
+        Args:
+            bucket: Frames per bucket of the finest level
+        """
+        require_numpy()
+        self.bucket = bucket
+        self.frames = 0
+        self._carry = np.zeros((0, 2), dtype=np.float32)
+        self._chunks = []
+
+    def feed(self, block: "np.ndarray") -> None:
+        """
+        Add a block of samples.
+
+        Args:
+            block: (frames, channels) or (frames,) float array; it may be
+                reused by the caller afterwards
+        """
+        lows = block.min(axis=1) if block.ndim > 1 else block
+        highs = block.max(axis=1) if block.ndim > 1 else block
+        self.frames += len(highs)
+
+        # Keep min and max streams side by side so both use one carry
+        pairs = np.stack([lows, highs], axis=1).astype(np.float32)
+        if len(self._carry):
+            pairs = np.concatenate([self._carry, pairs])
+        count = len(pairs) // self.bucket
+        used = count * self.bucket
+        if count:
+            grouped = pairs[:used].reshape(count, self.bucket, 2)
+            minimums = grouped[:, :, 0].min(axis=1)
+            maximums = grouped[:, :, 1].max(axis=1)
+            self._chunks.append(_quantize(minimums, maximums))
+        self._carry = pairs[used:].copy()
+
+    def finish(self, sample_rate: int) -> Waveform:
+        """
+        Build the waveform with all zoom levels.
+
+        Args:
+            sample_rate: Sample rate of the fed PCM
+
+        Returns:
+            Waveform
+        """
+        chunks = list(self._chunks)
+        if len(self._carry):
+            chunks.append(
+                _quantize(
+                    self._carry[:, 0].min(keepdims=True),
+                    self._carry[:, 1].max(keepdims=True),
+                )
+            )
+        base = (
+            np.concatenate(chunks)
+            if chunks
+            else np.zeros((0, 2), dtype=np.int8)
+        )
+
+        levels = {self.bucket: base}
+        level, bucket = base, self.bucket
+        for _ in range(LEVEL_COUNT - 1):
+            level = _coarsen(level, LEVEL_FACTOR)
+            bucket *= LEVEL_FACTOR
+            levels[bucket] = level
+        return Waveform(sample_rate, self.frames, levels)
+
+
+def _quantize(minimums: "np.ndarray", maximums: "np.ndarray") -> "np.ndarray":
+    """Convert float min/max values to int8 pairs."""
+    pairs = np.stack([minimums, maximums], axis=1)
+    return np.clip(np.round(pairs * 127.0), -127, 127).astype(np.int8)
+
+
+def _coarsen(level: "np.ndarray", factor: int) -> "np.ndarray":
+    """Merge every ``factor`` buckets of a level into one."""
+    if not len(level):
+        return level
+    starts = np.arange(0, len(level), factor)
+    return np.stack(
+        [
+            np.minimum.reduceat(level[:, 0], starts),
+            np.maximum.reduceat(level[:, 1], starts),
+        ],
+        axis=1,
+    )
+
+
+def compute_peaks(
+    blocks: Iterable["np.ndarray"],
+    sample_rate: int,
+    bucket: int = BASE_BUCKET,
+) -> Waveform:
+    """
+    Compute a waveform from a stream of PCM blocks.
+
+    Args:
+        blocks: Iterable of float sample arrays
+        sample_rate: Sample rate in Hz
+        bucket: Frames per bucket of the finest level
+
+    Returns:
+        Waveform
+    """
+    builder = PeakBuilder(bucket)
+    for block in blocks:
+        builder.feed(block)
+    return builder.finish(sample_rate)
+
+
+def write_peak_file(path: Path, waveform: Waveform) -> None:
+    """
+    Write a waveform to a peak file atomically.
+
+    Args:
+        path: Destination path
+        waveform: Waveform to store
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    buckets = sorted(waveform.levels)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    PEAK_MAGIC,
+                    PEAK_VERSION,
+                    len(buckets),
+                    waveform.sample_rate,
+                    waveform.frames,
+                )
+            )
+            for bucket in buckets:
+                f.write(_LEVEL.pack(bucket, len(waveform.levels[bucket])))
+            for bucket in buckets:
+                f.write(np.ascontiguousarray(waveform.levels[bucket]).tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_peak_file(path: Path) -> Optional[Waveform]:
+    """
+    Open a peak file without reading the peaks into memory.
+
+    Args:
+        path: Path to the peak file
+
+    Returns:
+        Waveform backed by a memory map, or None if the file is missing,
+        of another version or truncated
+    """
+    require_numpy()
+    try:
+        with open(path, "rb") as f:
+            magic, version, count, sample_rate, frames = _HEADER.unpack(
+                f.read(_HEADER.size)
+            )
+            if magic != PEAK_MAGIC or version != PEAK_VERSION:
+                return None
+            entries = [_LEVEL.unpack(f.read(_LEVEL.size)) for _ in range(count)]
+        offset = _HEADER.size + count * _LEVEL.size
+        expected = offset + sum(2 * length for _, length in entries)
+        if os.path.getsize(path) != expected:
+            return None
+
+        levels = {}
+        for bucket, length in entries:
+            if length:
+                levels[bucket] = np.memmap(
+                    path, dtype=np.int8, mode="r", offset=offset,
+                    shape=(length, 2),
+                )
+            else:
+                levels[bucket] = np.zeros((0, 2), dtype=np.int8)
+            offset += 2 * length
+    except (OSError, struct.error, ValueError) as e:
+        logger.warning(f"Ignoring unreadable peak file {path}: {e}")
+        return None
+    return Waveform(sample_rate, frames, levels)
+
+
+def load_waveform(
+    input_file: str,
+    engine: Any,
+    cache: Optional[MediaCache] = None,
+    progress: Optional[Callable[[float], None]] = None,
+) -> Optional[Waveform]:
+    """
+    Get the waveform of a source, computing and caching it when needed.
+
+    Args:
+        input_file: Path to the source
+        engine: FFmpegEngine used to decode the source
+        cache: Media cache (optional, the shared cache by default)
+        progress: Called with the decoded duration in seconds (optional)
+
+    Returns:
+        Waveform, or None if the source could not be decoded
+    """
+    require_numpy()
+    cache = cache or get_media_cache()
+    peaks_dir = get_cache_dir() / "peaks"
+
+    name = cache.get(input_file, "peaks")
+    if name:
+        waveform = read_peak_file(peaks_dir / name)
+        if waveform is not None:
+            return waveform
+
+    cmd = pcm_command(engine, input_file, PEAK_SAMPLE_RATE, 1)
+    builder = PeakBuilder()
+    logger.info(f"Computing waveform of {input_file}")
+    try:
+        with PCMStream(cmd, 1) as stream:
+            for block in stream.blocks():
+                builder.feed(block)
+                if progress is not None:
+                    progress(builder.frames / PEAK_SAMPLE_RATE)
+    except OSError as e:
+        logger.error(f"Waveform generation failed for {input_file}: {e}")
+        return None
+    if stream.returncode != 0:
+        logger.error(f"Waveform generation failed for {input_file}")
+        return None
+
+    waveform = builder.finish(PEAK_SAMPLE_RATE)
+    stamp = f"{os.path.abspath(input_file)}|{os.stat(input_file).st_mtime_ns}"
+    name = f"{hashlib.sha1(os.fsencode(stamp)).hexdigest()}.peaks"
+    try:
+        write_peak_file(peaks_dir / name, waveform)
+        cache.set(input_file, "peaks", name)
+    except OSError as e:
+        logger.warning(f"Could not write peak file: {e}")
+    return waveform
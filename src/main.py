@@ -5,6 +5,7 @@ Integrates with the audio-extractor submodule for core functionality.
 """
 
 import sys
+import logging
 import argparse
 from pathlib import Path
 
@@ -95,6 +96,8 @@ def main():
     # Normal argument parsing for UI options
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO)
+
     if args.cli:
         try:
             from audio_extractor_ui.cli import run_cli
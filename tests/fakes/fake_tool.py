@@ -0,0 +1,293 @@
+"""
+Stand-in for ffmpeg, ffprobe, yt-dlp and the core extract_audio.py.
+
+Each fake executable written by ``FakeToolchain`` calls ``main(<tool>)``.
+Behaviour comes from the JSON profile named by ``FAKE_TOOLS_PROFILE``,
+which is re-read on every invocation so a running simulation can be
+reconfigured. Random choices are seeded from the profile seed and the
+command line, so a given job behaves the same in every run.
+
+Only the standard library is used and heavier modules are imported where
+needed, so the fakes start quickly and need nothing installed.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import time
+
+PROFILE_ENV = "FAKE_TOOLS_PROFILE"
+
+ENCODERS = ["aac", "libmp3lame", "flac", "pcm_s16le", "libopus"]
+FILTERS = [
+    "loudnorm",
+    "atrim",
+    "asetpts",
+    "silencedetect",
+    "aresample",
+    "aformat",
+    "afade",
+    "highpass",
+]
+
+
+def load_profile():
+    """Read the profile named by the environment."""
+    path = os.environ.get(PROFILE_ENV)
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def job_random(seed, argv):
+    """Random generator seeded from the profile seed and the command line."""
+    digest = hashlib.sha1(json.dumps([seed, argv]).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def sample_latency(spec, rng):
+    """Draw a latency (seconds) from a distribution spec."""
+    kind = spec.get("dist", "fixed")
+    if kind == "uniform":
+        return rng.uniform(spec.get("low", 0.0), spec.get("high", 0.0))
+    if kind == "lognormal":
+        median = spec.get("median", 0.0)
+        if median <= 0:
+            return 0.0
+        return rng.lognormvariate(math.log(median), spec.get("sigma", 0.5))
+    if kind == "exponential":
+        mean = spec.get("mean", 0.0)
+        return rng.expovariate(1 / mean) if mean > 0 else 0.0
+    return spec.get("value", 0.0)
+
+
+def behave(profile, tool, argv):
+    """
+    Apply the latency, failure and hang settings of one invocation.
+
+    Returns:
+        Tuple of (settings, latency); exits the process on failure or hang
+    """
+    settings = profile.get(tool, {})
+    rng = job_random(profile.get("seed", 0), [tool] + argv)
+    latency = sample_latency(settings.get("latency", {}), rng)
+
+    roll = rng.random()
+    hang_rate = settings.get("hang_rate", 0.0)
+    if roll < hang_rate:
+        time.sleep(settings.get("hang_seconds", 3600))
+        sys.stderr.write(f"{tool}: simulated hang\n")
+        sys.exit(255)
+    if roll < hang_rate + settings.get("failure_rate", 0.0):
+        time.sleep(latency * rng.random())
+        sys.stderr.write(f"{tool}: simulated failure\n")
+        sys.exit(settings.get("failure_code", 1))
+    noise = settings.get("stderr_bytes", 0)
+    if noise:
+        # Warnings written before any output, e.g. for a damaged input
+        line = f"{tool}: simulated warning".ljust(79) + "\n"
+        sys.stderr.write(line * (noise // len(line) + 1))
+        sys.stderr.flush()
+    return settings, latency
+
+
+def emit_progress(settings, latency, duration, target):
+    """Sleep for ``latency`` while writing ffmpeg-style progress."""
+    steps = settings.get("progress_steps", 0)
+    if not steps:
+        time.sleep(latency)
+        return
+    for step in range(1, steps + 1):
+        time.sleep(latency / steps)
+        position = duration * step / steps
+        if target is None:
+            hours, rest = divmod(position, 3600)
+            minutes, seconds = divmod(rest, 60)
+            sys.stderr.write(
+                f"size=N/A time={int(hours):02d}:{int(minutes):02d}:"
+                f"{seconds:05.2f} bitrate=N/A speed=N/A\n"
+            )
+            sys.stderr.flush()
+        else:
+            target.write(
+                f"out_time_ms={int(position * 1e6)}\n"
+                f"progress={'end' if step == steps else 'continue'}\n"
+            )
+            target.flush()
+
+
+def write_output(path, size):
+    """Write ``size`` bytes to a path, or to stdout for ``-`` / ``pipe:``."""
+    data = b"\0" * size
+    if path in ("-", "pipe:", "pipe:1"):
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def run_ffmpeg(profile, argv):
+    """Fake ffmpeg: capability listings, or a simulated encode."""
+    if "-version" in argv:
+        print("ffmpeg version 6.1-fake Copyright (c) fake")
+        print("configuration: --enable-libmp3lame --enable-libopus")
+        return 0
+    if "-encoders" in argv:
+        print("Encoders:\n A..... = Audio\n ------")
+        for name in ENCODERS:
+            print(f" A....D {name:20} {name}")
+        return 0
+    if "-filters" in argv:
+        for name in FILTERS:
+            print(f" ... {name:18} A->A       {name}")
+        return 0
+    if "-hwaccels" in argv:
+        print("Hardware acceleration methods:")
+        return 0
+
+    settings, latency = behave(profile, "ffmpeg", argv)
+    if "-i" in argv and argv[argv.index("-i") + 1] in ("-", "pipe:", "pipe:0"):
+        # Consume piped input like a real decoder
+        while sys.stdin.buffer.read(65536):
+            pass
+    target = None
+    if "-progress" in argv:
+        destination = argv[argv.index("-progress") + 1]
+        target = sys.stdout if destination == "pipe:1" else sys.stderr
+    emit_progress(settings, latency, profile.get("duration", 60.0), target)
+    write_output(argv[-1], settings.get("output_bytes", 1024))
+    return 0
+
+
+def run_ffprobe(profile, argv):
+    """Fake ffprobe: a fixed single-audio-stream description."""
+    behave(profile, "ffprobe", argv)
+    duration = profile.get("duration", 60.0)
+    print(
+        json.dumps(
+            {
+                "format": {
+                    "format_name": "mov,mp4,m4a,3gp,3g2,mj2",
+                    "duration": str(duration),
+                    "size": "1000000",
+                },
+                "streams": [
+                    {
+                        "index": 0,
+                        "codec_type": "audio",
+                        "codec_name": "aac",
+                        "sample_rate": "48000",
+                        "channels": 2,
+                        "duration": str(duration),
+                    }
+                ],
+            }
+        )
+    )
+    return 0
+
+
+def run_ytdlp(profile, argv):
+    """Fake yt-dlp: download the URL (e.g. from the fixture server)."""
+    if "--version" in argv:
+        print("2024.01.01-fake")
+        return 0
+    import urllib.request
+
+    settings, latency = behave(profile, "yt-dlp", argv)
+    url = next(arg for arg in argv if "://" in arg)
+    output = argv[argv.index("-o") + 1] if "-o" in argv else "download.bin"
+    with urllib.request.urlopen(url, timeout=30) as response:
+        data = response.read()
+    # Progress goes to stderr when stdout carries the media
+    log = sys.stderr if output == "-" else sys.stdout
+    steps = max(1, settings.get("progress_steps", 1))
+    for step in range(1, steps + 1):
+        time.sleep(latency / steps)
+        log.write(f"[download] {100 * step / steps:5.1f}% of {len(data)}B\n")
+        log.flush()
+    if output == "-":
+        sys.stdout.buffer.write(data)
+    else:
+        with open(output, "wb") as f:
+            f.write(data)
+    return 0
+
+
+def run_core(profile, argv):
+    """Fake core CLI: parse its arguments and run the fake tools."""
+    options = {}
+    positional = []
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        if arg.startswith("--") and index + 1 < len(argv):
+            options[arg] = argv[index + 1]
+            index += 2
+            continue
+        positional.append(arg)
+        index += 1
+    if not positional:
+        sys.stderr.write("usage: extract_audio.py [options] command ...\n")
+        return 2
+    command = positional[0]
+    if command == "check-dependencies":
+        print("ffmpeg: ok\nyt-dlp: ok")
+        return 0
+
+    import subprocess
+
+    behave(profile, "core", argv)
+    tools = profile["bin"]
+    output_dir = options.get("--output", "output")
+    extension = options.get("--format", "mp3")
+    source = positional[1]
+    stem = os.path.splitext(os.path.basename(source.rstrip("/")))[0] or "download"
+
+    if command == "url":
+        downloaded = os.path.join(output_dir, f".{stem}.download")
+        os.makedirs(output_dir, exist_ok=True)
+        result = subprocess.run(
+            [os.path.join(tools, "yt-dlp"), source, "-o", downloaded],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            sys.stderr.write(result.stderr)
+            return result.returncode
+        source = downloaded
+
+    output = os.path.join(output_dir, f"{stem}.{extension}")
+    result = subprocess.run(
+        [os.path.join(tools, "ffmpeg"), "-y", "-i", source, output],
+        capture_output=True,
+        text=True,
+    )
+    if command == "url":
+        os.unlink(source)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        return result.returncode
+    print(f"Extracted audio to {output}")
+    return 0
+
+
+TOOLS = {
+    "ffmpeg": run_ffmpeg,
+    "ffprobe": run_ffprobe,
+    "yt-dlp": run_ytdlp,
+    "core": run_core,
+}
+
+
+def main(tool):
+    """Entry point of the fake executables."""
+    sys.exit(TOOLS[tool](load_profile(), sys.argv[1:]))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Scale-simulation harness driving the extractor through fake tools.
+
+Runs thousands of jobs against the fake ffmpeg/yt-dlp/core (see
+fake_tool.py) to measure the scheduling, queueing and pooling overhead of
+the extractor itself, and reports throughput, tail latency and memory
+growth. Nothing is encoded, so 10k-100k job runs are cheap and
+reproducible offline.
+
+Examples:
+    python tests/fakes/harness.py --jobs 10000 --mode batch --workers 16
+    python tests/fakes/harness.py --jobs 2000 --mode url --failure-rate 0.02
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from http_fixture import FixtureServer  # noqa: E402
+from toolchain import MP4_HEADER, FakeToolchain  # noqa: E402
+
+MODES = ("file", "core", "batch", "queue", "url")
+
+
+def current_rss():
+    """Resident set size of this process in bytes (0 where unknown)."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+class MemoryTracker:
+    """Sample this process's RSS as jobs complete."""
+
+    def __init__(self, jobs, samples=50):
+        self.every = max(1, jobs // samples)
+        self.start = current_rss()
+        self.peak = self.start
+        self.samples = []
+
+    def completed(self, done):
+        if done % self.every == 0:
+            rss = current_rss()
+            self.peak = max(self.peak, rss)
+            self.samples.append((done, rss))
+
+    def report(self, jobs):
+        end = current_rss()
+        # Growth after the first tenth excludes warm-up allocations
+        warm = next(
+            (rss for done, rss in self.samples if done >= jobs // 10), self.start
+        )
+        return {
+            "rss_start": self.start,
+            "rss_peak": max(self.peak, end),
+            "rss_end": end,
+            "growth_per_1k_jobs": round((end - warm) / max(1, jobs * 0.9) * 1000),
+        }
+
+
+def simulate(toolchain, jobs, mode="file", workers=8, output_format="mp3"):
+    """
+    Run ``jobs`` extractions through the fakes.
+
+    Args:
+        toolchain: Active FakeToolchain (inside its ``with`` block)
+        jobs: Number of jobs
+        mode: "file" (ffmpeg engine), "core" (core CLI), "batch"
+            (``batch_extract``), "queue" (``JobQueue``) or "url"
+        workers: Concurrent jobs
+        output_format: Audio format
+
+    Returns:
+        Dict with counts, throughput, service-time percentiles, the p99
+        time from submission to completion (except in batch mode) and
+        memory
+    """
+    from audio_extractor_ui.metrics import percentile
+
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    extractor = toolchain.extractor()
+    # Sniffing reads every input; keep it, it is part of the real cost
+    inputs = toolchain.make_inputs(jobs, size=256) if mode != "url" else []
+    memory = MemoryTracker(jobs)
+    # Service time of each job, and time from submission to completion
+    latencies = []
+    sojourns = []
+    failures = 0
+    server = None
+
+    started = time.perf_counter()
+    if mode == "batch":
+        result = extractor.batch_extract(
+            str(Path(inputs[0]).parent), output_format, max_workers=workers
+        )
+        for done, item in enumerate(result["results"], 1):
+            latencies.append((item.get("metrics") or {}).get("total", 0.0))
+            failures += not item.get("success")
+            memory.completed(done)
+    else:
+        if mode == "url":
+            server = FixtureServer().start()
+            body = MP4_HEADER + b"\0" * 256
+            for index in range(jobs):
+                server.add(f"/clip_{index:06d}.mp4", body)
+            inputs = [server.url(f"/clip_{i:06d}.mp4") for i in range(jobs)]
+
+        def run(source):
+            if mode == "url":
+                return extractor.extract_from_url(source, output_format)
+            engine = "core" if mode == "core" else "ffmpeg"
+            return extractor.extract_from_file(source, output_format, engine=engine)
+
+        def timed(source, submitted):
+            begun = time.perf_counter()
+            result = run(source)
+            finished = time.perf_counter()
+            return result, finished - begun, finished - submitted
+
+        if mode == "queue":
+            from audio_extractor_ui.scheduling import JobQueue
+
+            pool = JobQueue(max_workers=workers)
+            futures = [
+                pool.submit(timed, path, time.perf_counter(), cost=index % 7)
+                for index, path in enumerate(inputs)
+            ]
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers)
+            futures = [pool.submit(timed, path, time.perf_counter()) for path in inputs]
+        for done, future in enumerate(as_completed(futures), 1):
+            result, latency, sojourn = future.result()
+            latencies.append(latency)
+            sojourns.append(sojourn)
+            failures += not result.get("success")
+            memory.completed(done)
+        pool.shutdown()
+    wall = time.perf_counter() - started
+
+    report = {
+        "mode": mode,
+        "jobs": jobs,
+        "workers": workers,
+        "succeeded": jobs - failures,
+        "failed": failures,
+        "wall": round(wall, 3),
+        "throughput": round(jobs / wall, 2) if wall else None,
+    }
+    for pct in (50, 95, 99):
+        report[f"latency_p{pct}"] = round(percentile(latencies, pct), 4)
+    report["latency_max"] = round(max(latencies), 4)
+    if sojourns:
+        report["sojourn_p99"] = round(percentile(sojourns, 99), 4)
+    report.update(memory.report(jobs))
+    if server is not None:
+        report["http_requests"] = server.requests
+        server.stop()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate extraction at scale")
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--mode", choices=MODES, default="file")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--format", default="mp3")
+    parser.add_argument(
+        "--latency-median", type=float, default=0.02, help="Median tool latency (s)"
+    )
+    parser.add_argument("--sigma", type=float, default=0.5, help="Lognormal sigma")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=5.0)
+    parser.add_argument("--progress-steps", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report here")
+    args = parser.parse_args()
+
+    tool = {
+        "latency": {
+            "dist": "lognormal",
+            "median": args.latency_median,
+            "sigma": args.sigma,
+        },
+        "failure_rate": args.failure_rate,
+        "hang_rate": args.hang_rate,
+        "hang_seconds": args.hang_seconds,
+        "progress_steps": args.progress_steps,
+    }
+    profile = {"seed": args.seed, "ffmpeg": tool, "yt-dlp": tool}
+
+    with FakeToolchain(profile) as toolchain:
+        report = simulate(toolchain, args.jobs, args.mode, args.workers, args.format)
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
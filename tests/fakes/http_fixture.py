@@ -0,0 +1,84 @@
+"""
+Local HTTP server serving fixture media for URL flows.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FixtureServer:
+    """
+    Serve in-memory files on localhost.
+
+    Usage:
+        with FixtureServer({"/clip.mp4": data}, delay=0.01) as server:
+            url = server.url("/clip.mp4")
+    """
+
+    def __init__(self, files=None, delay=0.0, chunk_size=65536, chunk_delay=0.0):
+        """
+        Initialize the server.
+
+        Args:
+            files: Dict mapping paths to bytes
+            delay: Seconds before a response starts
+            chunk_size: Bytes written per chunk
+            chunk_delay: Seconds between chunks (throttles the transfer)
+        """
+        self.files = dict(files or {})
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def add(self, path, data):
+        """Serve ``data`` at ``path``."""
+        self.files[path] = data
+
+    def url(self, path):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def start(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fixture._lock:
+                    fixture.requests += 1
+                data = fixture.files.get(self.path.split("?")[0])
+                if data is None:
+                    self.send_error(404)
+                    return
+                time.sleep(fixture.delay)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                for start in range(0, len(data), fixture.chunk_size):
+                    self.wfile.write(data[start : start + fixture.chunk_size])
+                    if fixture.chunk_delay:
+                        time.sleep(fixture.chunk_delay)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,162 @@
+"""
+Fake ffmpeg/ffprobe/yt-dlp/core installation for tests and simulations.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+FAKES_DIR = Path(__file__).parent
+SRC_DIR = FAKES_DIR.parent.parent / "src"
+
+# Start of an MP4 file, so that inputs pass content sniffing
+MP4_HEADER = b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2"
+
+LAUNCHER = """#!{python} -S
+import sys
+sys.path.insert(0, {fakes!r})
+import fake_tool
+fake_tool.main({tool!r})
+"""
+
+# Behaviour of every tool when the profile does not override it
+DEFAULT_PROFILE = {
+    "seed": 0,
+    "duration": 60.0,
+    "ffmpeg": {"latency": {"dist": "fixed", "value": 0.0}},
+    "ffprobe": {"latency": {"dist": "fixed", "value": 0.0}},
+    "yt-dlp": {"latency": {"dist": "fixed", "value": 0.0}},
+    "core": {"latency": {"dist": "fixed", "value": 0.0}},
+}
+
+
+class FakeToolchain:
+    """
+    A temporary directory holding fake tools and a profile.
+
+    While active (as a context manager), ``AUDIO_EXTRACTOR_FFMPEG`` points
+    at the fake ffmpeg (ffprobe is found next to it), the fake yt-dlp is
+    first on ``PATH`` and the cache directory is private.
+
+    Profile settings per tool ("ffmpeg", "ffprobe", "yt-dlp", "core"):
+        latency: {"dist": "fixed"|"uniform"|"lognormal"|"exponential", ...}
+        failure_rate: Share of invocations exiting with ``failure_code``
+        hang_rate: Share of invocations sleeping ``hang_seconds`` first
+        progress_steps: Number of progress lines written while working
+        output_bytes: Size of the output written by ffmpeg
+        stderr_bytes: Bytes of warnings written to stderr before any output
+    """
+
+    def __init__(self, profile=None, root=None):
+        self._tempdir = None
+        if root is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix="fake-tools-")
+            root = self._tempdir.name
+        self.root = Path(root)
+        self.bin_dir = self.root / "bin"
+        self.core_dir = self.root / "core" / "src"
+        self.cache_dir = self.root / "cache"
+        self.profile_path = self.root / "profile.json"
+        self._saved_env = None
+        self._saved_cache = None
+
+        self.bin_dir.mkdir(parents=True, exist_ok=True)
+        self.core_dir.mkdir(parents=True, exist_ok=True)
+        for tool in ("ffmpeg", "ffprobe", "yt-dlp"):
+            self._write_launcher(self.bin_dir / tool, tool)
+        self._write_launcher(
+            self.core_dir / "extract_audio.py",
+            "core",
+            header='__version__ = "0.0-fake"\n',
+        )
+        self.configure(profile or {})
+
+    def _write_launcher(self, path, tool, header=""):
+        text = LAUNCHER.format(python=sys.executable, fakes=str(FAKES_DIR), tool=tool)
+        first, rest = text.split("\n", 1)
+        path.write_text(f"{first}\n{header}{rest}", encoding="utf-8")
+        path.chmod(0o755)
+
+    @property
+    def ffmpeg(self):
+        return str(self.bin_dir / "ffmpeg")
+
+    def configure(self, profile):
+        """Replace the profile (takes effect for the next invocation)."""
+        merged = json.loads(json.dumps(DEFAULT_PROFILE))
+        for key, value in profile.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key].update(value)
+            else:
+                merged[key] = value
+        merged["bin"] = str(self.bin_dir)
+        temporary = self.profile_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(merged), encoding="utf-8")
+        os.replace(temporary, self.profile_path)
+        self.profile = merged
+
+    def make_inputs(self, count, directory=None, size=4096):
+        """Create ``count`` small files that sniff as MP4."""
+        directory = Path(directory or self.root / "inputs")
+        directory.mkdir(parents=True, exist_ok=True)
+        body = MP4_HEADER + b"\0" * max(0, size - len(MP4_HEADER))
+        paths = []
+        for index in range(count):
+            path = directory / f"clip_{index:06d}.mp4"
+            path.write_bytes(body)
+            paths.append(str(path))
+        return paths
+
+    def environ(self):
+        """Environment variables that route the extractor to the fakes."""
+        return {
+            "AUDIO_EXTRACTOR_FFMPEG": self.ffmpeg,
+            "AUDIO_EXTRACTOR_CACHE_DIR": str(self.cache_dir),
+            "FAKE_TOOLS_PROFILE": str(self.profile_path),
+            "PATH": f"{self.bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        }
+
+    def __enter__(self):
+        self._saved_env = {name: os.environ.get(name) for name in self.environ()}
+        os.environ.update(self.environ())
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        if self._saved_cache is not None:
+            from audio_extractor_ui import cache as cache_module
+
+            cache_module._media_cache = self._saved_cache[0]
+        self.close()
+
+    def close(self):
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
+
+    def extractor(self, output_dir=None):
+        """An AudioExtractor wired to the fakes (use inside the context)."""
+        if str(SRC_DIR) not in sys.path:
+            sys.path.insert(0, str(SRC_DIR))
+        from audio_extractor_ui import cache as cache_module
+        from audio_extractor_ui.cache import MediaCache
+        from audio_extractor_ui.capabilities import CapabilityService
+        from audio_extractor_ui.core import AudioExtractor
+        from audio_extractor_ui.integration import AudioExtractorCore
+
+        # The shared media cache may already point at the real cache
+        if self._saved_cache is None:
+            self._saved_cache = (cache_module._media_cache,)
+        cache_module._media_cache = MediaCache(self.cache_dir / "media")
+        capabilities = CapabilityService(cache_path=self.cache_dir / "caps.json")
+        extractor = AudioExtractor(capabilities=capabilities)
+        extractor.core_extractor = AudioExtractorCore(core_path=self.core_dir)
+        extractor.output_dir = Path(output_dir or self.root / "output")
+        extractor.output_dir.mkdir(parents=True, exist_ok=True)
+        return extractor
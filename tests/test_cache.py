@@ -0,0 +1,86 @@
+"""
+Tests for the on-disk cache helpers and the media metadata cache.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.cache import MediaCache, read_json, write_json_atomic
+
+
+class TestJsonHelpers(unittest.TestCase):
+    """Test cases for the JSON cache helpers."""
+
+    def test_round_trip(self):
+        """Test atomic write followed by read."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "nested" / "data.json"
+            write_json_atomic(path, {"a": [1, 2]})
+            self.assertEqual(read_json(path), {"a": [1, 2]})
+            self.assertEqual(os.listdir(path.parent), ["data.json"])
+
+    def test_missing_and_corrupt(self):
+        """Test that unreadable files read as None."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.json"
+            self.assertIsNone(read_json(path))
+            path.write_text("{not json")
+            self.assertIsNone(read_json(path))
+
+
+class TestMediaCache(unittest.TestCase):
+    """Test cases for MediaCache."""
+
+    def setUp(self):
+        """Set up a source file and a private cache directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = Path(self.tmpdir.name)
+        self.source = root / "clip.mp4"
+        self.source.write_bytes(b"x" * 100)
+        self.cache_root = root / "cache"
+
+    def tearDown(self):
+        """Remove temporary files."""
+        self.tmpdir.cleanup()
+
+    def test_fields_persist(self):
+        """Test that fields are shared across cache instances."""
+        MediaCache(self.cache_root).set(str(self.source), "probe", {"duration": 1.5})
+        MediaCache(self.cache_root).set(str(self.source), "loudness", {"k": 1})
+
+        fields = MediaCache(self.cache_root).load(str(self.source))
+        self.assertEqual(fields, {"probe": {"duration": 1.5}, "loudness": {"k": 1}})
+
+    def test_invalidated_when_source_changes(self):
+        """Test that a modified source has no cached fields."""
+        cache = MediaCache(self.cache_root)
+        cache.set(str(self.source), "probe", {"duration": 1.5})
+        self.source.write_bytes(b"y" * 200)
+
+        self.assertIsNone(cache.get(str(self.source), "probe"))
+        self.assertIsNone(MediaCache(self.cache_root).get(str(self.source), "probe"))
+
+    def test_memory_is_bounded(self):
+        """Test that only the most recently used records stay in memory."""
+        cache = MediaCache(self.cache_root, max_memory=2)
+        sources = []
+        for index in range(3):
+            source = self.source.with_name(f"clip{index}.mp4")
+            source.write_bytes(b"x" * index)
+            cache.set(str(source), "probe", {"duration": index})
+            sources.append(str(source))
+
+        self.assertEqual(len(cache._memory), 2)
+        # The evicted record is read back from disk
+        self.assertEqual(cache.get(sources[0], "probe"), {"duration": 0})
+        self.assertEqual(len(cache._memory), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
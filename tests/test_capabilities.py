@@ -0,0 +1,148 @@
+"""
+Tests for the cached dependency and encoder capability matrix.
+"""
+
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.capabilities import (
+    FFMPEG_ENV,
+    CapabilityService,
+    parse_encoders,
+    parse_filters,
+    parse_hwaccels,
+)
+
+ENCODERS_OUTPUT = textwrap.dedent("""\
+    Encoders:
+     V..... = Video
+     A..... = Audio
+     ------
+     V....D libx264              libx264 H.264
+     A....D aac                  AAC (Advanced Audio Coding)
+     A....D libmp3lame           libmp3lame MP3 (MPEG audio layer 3)
+     A....D flac                 FLAC (Free Lossless Audio Codec)
+    """)
+
+FAKE_FFMPEG = textwrap.dedent("""\
+    #!/bin/sh
+    echo "$@" >> "$(dirname "$0")/calls.log"
+    case "$*" in
+      *-version*) echo "ffmpeg version 6.1-test Copyright";
+                  echo "configuration: --enable-libsoxr" ;;
+      *-encoders*) cat "$(dirname "$0")/encoders.txt" ;;
+      *-hwaccels*) printf 'Hardware acceleration methods:\\nvaapi\\n' ;;
+      *-filters*) echo " ... loudnorm          A->A       EBU R128" ;;
+    esac
+    """)
+
+
+class TestParsers(unittest.TestCase):
+    """Test cases for ffmpeg output parsers."""
+
+    def test_parse_encoders(self):
+        """Test that only audio encoders are collected."""
+        self.assertEqual(parse_encoders(ENCODERS_OUTPUT), ["aac", "libmp3lame", "flac"])
+
+    def test_parse_hwaccels(self):
+        """Test hwaccel listing."""
+        output = "Hardware acceleration methods:\nvdpau\ncuda\n"
+        self.assertEqual(parse_hwaccels(output), ["vdpau", "cuda"])
+
+    def test_parse_filters(self):
+        """Test filter listing."""
+        output = " TSC aresample         A->A       Resample audio.\n"
+        self.assertEqual(parse_filters(output), ["aresample"])
+
+
+@unittest.skipIf(sys.platform == "win32", "fake ffmpeg is a shell script")
+class TestCapabilityService(unittest.TestCase):
+    """Test cases for CapabilityService caching."""
+
+    def setUp(self):
+        """Set up a fake ffmpeg binary and a private cache file."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = Path(self.tmpdir.name)
+        self.ffmpeg = root / "ffmpeg"
+        self.ffmpeg.write_text(FAKE_FFMPEG)
+        self.ffmpeg.chmod(0o755)
+        (root / "encoders.txt").write_text(ENCODERS_OUTPUT)
+        self.calls = root / "calls.log"
+        self.cache_path = root / "capabilities.json"
+
+        patcher = mock.patch.dict(os.environ, {FFMPEG_ENV: str(self.ffmpeg)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Remove the fake binary."""
+        self.tmpdir.cleanup()
+
+    def probe_count(self):
+        """Number of fake ffmpeg invocations so far."""
+        if not self.calls.exists():
+            return 0
+        return len(self.calls.read_text().splitlines())
+
+    def test_matrix_contents(self):
+        """Test the probed matrix."""
+        service = CapabilityService(cache_path=self.cache_path)
+        matrix = service.get_matrix()
+        self.assertEqual(matrix["ffmpeg"], "6.1-test")
+        self.assertTrue(matrix["encoders"]["libmp3lame"])
+        self.assertFalse(matrix["encoders"]["libfdk_aac"])
+        self.assertEqual(matrix["hwaccels"], ["vaapi"])
+        self.assertIn("loudnorm", matrix["filters"])
+        self.assertIn("libsoxr", matrix["configuration"])
+        self.assertEqual(service.select_encoder("aac"), "aac")
+        self.assertIsNone(service.select_encoder("opus"))
+
+    def test_disk_cache_is_reused(self):
+        """Test that a second service reads the matrix from disk."""
+        CapabilityService(cache_path=self.cache_path).get_matrix()
+        probes = self.probe_count()
+
+        CapabilityService(cache_path=self.cache_path).get_matrix()
+        self.assertEqual(self.probe_count(), probes)
+
+    def test_ttl_expiry(self):
+        """Test that an expired matrix is probed again."""
+        CapabilityService(cache_path=self.cache_path).get_matrix()
+        probes = self.probe_count()
+
+        CapabilityService(cache_path=self.cache_path, ttl=-1).get_matrix()
+        self.assertGreater(self.probe_count(), probes)
+
+    def test_binary_change_invalidates(self):
+        """Test that replacing the ffmpeg binary triggers a new probe."""
+        service = CapabilityService(cache_path=self.cache_path, revalidate_interval=0)
+        service.get_matrix()
+        probes = self.probe_count()
+
+        stat = self.ffmpeg.stat()
+        os.utime(self.ffmpeg, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        service.get_matrix()
+        self.assertGreater(self.probe_count(), probes)
+
+    def test_stamps_checked_once_per_interval(self):
+        """Test that repeated lookups do not stat the binaries each time."""
+        service = CapabilityService(cache_path=self.cache_path)
+        service.get_matrix()
+        with mock.patch.object(
+            service, "_stamps", side_effect=AssertionError("stamped")
+        ):
+            for _ in range(100):
+                service.has_ffmpeg()
+                service.select_encoder("mp3")
+
+
+if __name__ == "__main__":
+    unittest.main()
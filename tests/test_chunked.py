@@ -0,0 +1,171 @@
+"""
+Tests for split-and-parallel encoding.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui import chunked
+from audio_extractor_ui.chunked import MANIFEST_NAME, ChunkedEncoder, plan_chunks
+from audio_extractor_ui.engine import FFmpegEngine
+
+
+class FakeCapabilities:
+    """Capability service offering fixed encoders."""
+
+    def select_encoder(self, output_format):
+        return {"mp3": "libmp3lame", "flac": "flac", "opus": "libopus"}.get(
+            output_format
+        )
+
+
+class FakeEngine(FFmpegEngine):
+    """FFmpegEngine running a fake ffmpeg script."""
+
+    def __init__(self, ffmpeg):
+        self._ffmpeg = ffmpeg
+        self.capabilities = FakeCapabilities()
+
+    @property
+    def ffmpeg(self):
+        return self._ffmpeg
+
+
+class TestPlanChunks(unittest.TestCase):
+    """Test cases for segment boundaries."""
+
+    def test_even_split(self):
+        self.assertEqual(plan_chunks(0, 100, 4), [0, 25, 50, 75, 100])
+        self.assertEqual(plan_chunks(10, 20, 1), [10, 20])
+
+    def test_aligned_boundaries(self):
+        boundaries = plan_chunks(-1105, 48000 * 600, 8, align=1152)
+        for boundary in boundaries[1:-1]:
+            self.assertEqual((boundary + 1105) % 1152, 0)
+        self.assertEqual(boundaries[-1], 48000 * 600)
+
+
+@unittest.skipIf(sys.platform == "win32", "fake ffmpeg is a shell script")
+class TestChunkedEncoder(unittest.TestCase):
+    """Test cases for segment encoding, joining and resuming."""
+
+    def setUp(self):
+        """Set up a fake ffmpeg that fails while a marker file exists."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.calls = self.root / "calls.log"
+        self.fail = self.root / "fail"
+        ffmpeg = self.root / "ffmpeg"
+        ffmpeg.write_text(
+            "#!/bin/sh\n"
+            'dir="$(dirname "$0")"\n'
+            "for last; do :; done\n"
+            'echo "$*" >> "$dir/calls.log"\n'
+            'case "$last" in *chunk_0002*) [ -e "$dir/fail" ] && exit 1;; esac\n'
+            'echo data > "$last"\n'
+        )
+        ffmpeg.chmod(0o755)
+        self.engine = FakeEngine(str(ffmpeg))
+        self.source = self.root / "long.mkv"
+        self.source.write_bytes(b"x" * 1000)
+        self.output = self.root / "long.flac"
+
+    def tearDown(self):
+        """Remove temporary files."""
+        self.tmpdir.cleanup()
+
+    def calls_to(self, text):
+        return [line for line in self.calls.read_text().splitlines() if text in line]
+
+    def run_encoder(self, output_format="flac"):
+        return ChunkedEncoder(self.engine, max_workers=2).extract(
+            str(self.source),
+            self.output,
+            output_format,
+            "high",
+            48000,
+            0,
+            48000 * 600,
+            4,
+        )
+
+    def test_resume_after_failure(self):
+        self.fail.touch()
+        result = self.run_encoder()
+        self.assertFalse(result["success"])
+        work_dir = self.root / ".long.flac.chunks"
+        self.assertTrue((work_dir / MANIFEST_NAME).exists())
+
+        self.fail.unlink()
+        result = self.run_encoder()
+        self.assertTrue(result["success"])
+        self.assertTrue(self.output.exists())
+        self.assertFalse(work_dir.exists())
+        # Segments 0, 1 and 3 were encoded once, segment 2 twice
+        self.assertEqual(len(self.calls_to("chunk_0000")), 1)
+        self.assertEqual(len(self.calls_to("chunk_0002")), 2)
+        self.assertEqual(len(self.calls_to("-f concat")), 1)
+
+    def test_segment_commands(self):
+        self.assertTrue(self.run_encoder("mp3")["success"])
+        second = self.calls_to("chunk_0001.mp3")[0]
+        self.assertIn("-write_xing 0", second)
+        self.assertIn("-threads 1", second)
+
+        self.calls.unlink()
+        self.output = self.root / "long.opus"
+        self.assertTrue(self.run_encoder("opus")["success"])
+        self.assertTrue(self.calls_to("chunk_0000.flac"))
+        self.assertIn("-c:a libopus", self.calls_to("-f concat")[0])
+
+    def test_jobs_share_segment_slots(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+        run_measured = chunked.run_measured
+
+        def counted(cmd, **kwargs):
+            if "chunk_" not in cmd[-1]:
+                # The join runs outside the slots
+                return run_measured(cmd, **kwargs)
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+            return run_measured(cmd, **kwargs)
+
+        def run(name):
+            ChunkedEncoder(self.engine, max_workers=4).extract(
+                str(self.source),
+                self.root / name,
+                "flac",
+                "high",
+                48000,
+                0,
+                48000 * 600,
+                4,
+            )
+
+        with mock.patch.object(
+            chunked, "_segment_slots", threading.BoundedSemaphore(2)
+        ), mock.patch.object(chunked, "run_measured", side_effect=counted):
+            jobs = [threading.Thread(target=run, args=(f"{i}.flac",)) for i in "ab"]
+            for job in jobs:
+                job.start()
+            for job in jobs:
+                job.join()
+        # Two jobs of four workers each, but only two slots
+        self.assertEqual(state["peak"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
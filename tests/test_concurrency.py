@@ -0,0 +1,105 @@
+"""
+Tests for the adaptive concurrency controller.
+"""
+
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.batch import run_batch
+from audio_extractor_ui.concurrency import MAX_DECISIONS, ConcurrencyController
+from audio_extractor_ui.inputs import ArchiveMember
+
+
+class TestConcurrencyController(unittest.TestCase):
+    """Test cases for AIMD decisions."""
+
+    def setUp(self):
+        self.controller = ConcurrencyController(
+            min_jobs=1, max_jobs=4, max_threads=3, initial_jobs=2
+        )
+
+    def test_additive_increase_then_threads(self):
+        self.assertEqual(self.controller.decide(10, 0.5, 0.0), "increase-jobs")
+        self.assertEqual(self.controller.decide(12, 0.5, 0.0), "increase-jobs")
+        self.assertEqual(self.controller.jobs, 4)
+        self.assertEqual(self.controller.decide(13, 0.5, 0.0), "increase-threads")
+        self.assertEqual(self.controller.threads, 2)
+
+    def test_multiplicative_decrease(self):
+        self.controller.decide(10, 0.5, 0.0)
+        self.controller.decide(12, 0.5, 0.0)
+        action = self.controller.decide(12, 0.5, 0.5)
+        self.assertTrue(action.startswith("decrease"))
+        self.assertEqual(self.controller.jobs, 2)
+
+        # Throughput falling right after an increase backs off
+        self.controller.decide(20, 0.5, 0.0)
+        action = self.controller.decide(10, 0.5, 0.0)
+        self.assertIn("throughput fell", action)
+
+    def test_saturated_cpu_prefers_jobs_over_threads(self):
+        self.controller.threads = 3
+        self.assertEqual(self.controller.decide(10, 0.99, 0.0), "decrease-threads")
+        self.assertEqual(self.controller.threads, 2)
+        self.assertEqual(len(self.controller.decisions), 1)
+
+    def test_decision_history_is_bounded(self):
+        for _ in range(MAX_DECISIONS + 50):
+            self.controller.decide(10, 0.5, 0.0)
+        self.assertEqual(len(self.controller.decisions), MAX_DECISIONS)
+
+    def test_update_waits_for_completions(self):
+        controller = ConcurrencyController(max_jobs=4, interval=0)
+        self.assertFalse(controller.update())
+        controller.job_finished(1000)
+        self.assertTrue(controller.update())
+
+
+class TestControlledBatch(unittest.TestCase):
+    """Test cases for run_batch with a controller."""
+
+    def test_jobs_limit_and_threads(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0, "threads": set()}
+
+        class Extractor:
+            def extract_from_file(self, path, output_format, quality, threads=None):
+                with lock:
+                    state["running"] += 1
+                    state["peak"] = max(state["peak"], state["running"])
+                    state["threads"].add(threads)
+                with lock:
+                    state["running"] -= 1
+                return {"success": True}
+
+        controller = ConcurrencyController(
+            max_jobs=8, initial_jobs=2, max_threads=2, interval=3600
+        )
+        controller.threads = 2
+        results = list(
+            run_batch(Extractor(), [f"f{i}" for i in range(20)], controller=controller)
+        )
+        self.assertEqual(len(results), 20)
+        self.assertLessEqual(state["peak"], 2)
+        self.assertEqual(state["threads"], {2})
+
+    def test_non_path_inputs(self):
+        class Extractor:
+            def extract_from_file(self, source, output_format, quality, threads=None):
+                return {"success": True, "metrics": {"input_bytes": 500}}
+
+        controller = ConcurrencyController(max_jobs=2, interval=3600)
+        members = [ArchiveMember("clips.zip", f"clip{i}.mp4") for i in range(3)]
+        results = list(run_batch(Extractor(), members, controller=controller))
+        self.assertTrue(all(result["success"] for result in results))
+        # Sizes come from the results, not from stat() on the inputs
+        self.assertEqual(controller._window_bytes, 1500)
+
+
+if __name__ == "__main__":
+    unittest.main()
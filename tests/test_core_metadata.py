@@ -0,0 +1,93 @@
+"""
+Tests for the cached core metadata layer.
+"""
+
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.core_metadata import CoreMetadata
+
+# A stand-in core script; the click objects are mimicked with plain
+# namespaces so the test does not need click installed.
+CORE_SCRIPT = textwrap.dedent("""
+    from types import SimpleNamespace
+
+    LOADS = []
+    LOADS.append(1)
+
+    def _option(*opts):
+        return SimpleNamespace(
+            param_type_name="option", opts=list(opts), secondary_opts=[]
+        )
+
+    cli = SimpleNamespace(
+        params=[_option("--format"), _option("--quality")],
+        commands={
+            "local": SimpleNamespace(params=[_option("--start-time")]),
+            "batch": SimpleNamespace(params=[]),
+        },
+    )
+    """)
+
+
+class TestCoreMetadata(unittest.TestCase):
+    """Test cases for CoreMetadata."""
+
+    def setUp(self):
+        """Set up a temporary core script."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.script = Path(self.tmpdir.name) / "extract_audio.py"
+        self.script.write_text('__version__ = "1.2.3"\n' + CORE_SCRIPT)
+        self.metadata = CoreMetadata(self.script)
+
+    def tearDown(self):
+        """Remove the temporary core script."""
+        self.tmpdir.cleanup()
+
+    def test_static_version_does_not_execute(self):
+        """Test that a literal version is read without loading the module."""
+        self.assertEqual(self.metadata.get_version(), "1.2.3")
+        self.assertIsNone(self.metadata._module)
+
+    def test_module_is_memoized(self):
+        """Test that the core script is executed only once."""
+        first = self.metadata.get_module()
+        second = self.metadata.get_module()
+        self.assertIs(first, second)
+        self.assertEqual(first.LOADS, [1])
+
+    def test_capabilities(self):
+        """Test introspection of subcommands and options."""
+        capabilities = self.metadata.get_capabilities()
+        self.assertEqual(set(capabilities["commands"]), {"local", "batch"})
+        self.assertIn("--format", capabilities["options"])
+        self.assertTrue(self.metadata.supports_command("local"))
+        self.assertTrue(self.metadata.supports_option("--start-time", "local"))
+        self.assertFalse(self.metadata.supports_option("--start-time", "batch"))
+
+    def test_invalidated_by_mtime(self):
+        """Test that editing the script drops memoized values."""
+        first = self.metadata.get_module()
+        self.script.write_text('__version__ = "2.0.0"\n' + CORE_SCRIPT)
+        stat = self.script.stat()
+        os.utime(self.script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertEqual(self.metadata.get_version(), "2.0.0")
+        self.assertIsNot(self.metadata.get_module(), first)
+
+    def test_missing_script(self):
+        """Test behaviour when the core script does not exist."""
+        metadata = CoreMetadata(Path(self.tmpdir.name) / "missing.py")
+        self.assertIsNone(metadata.get_version())
+        self.assertIsNone(metadata.get_module())
+
+
+if __name__ == "__main__":
+    unittest.main()
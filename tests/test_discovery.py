@@ -0,0 +1,193 @@
+"""
+Tests for media file discovery and parallel batch extraction.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.batch import run_batch, summarize_batch
+from audio_extractor_ui.core import AudioExtractor
+from audio_extractor_ui.discovery import iter_media_files
+
+
+class TestIterMediaFiles(unittest.TestCase):
+    """Test cases for iter_media_files."""
+
+    def setUp(self):
+        """Create a small media tree."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        for relative in [
+            "a.mp4",
+            "b.MKV",
+            "notes.txt",
+            "season1/ep1.mp4",
+            "season1/ep2.avi",
+            "season1/extras/trailer.mp4",
+            "tmp/partial.mp4",
+        ]:
+            path = self.root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"")
+
+    def tearDown(self):
+        """Remove the media tree."""
+        self.tmpdir.cleanup()
+
+    def walk(self, **kwargs):
+        """Walk the tree and return sorted relative paths."""
+        return sorted(
+            Path(p).relative_to(self.root).as_posix()
+            for p in iter_media_files(str(self.root), **kwargs)
+        )
+
+    def test_recursive_walk(self):
+        """Test recursive discovery by extension."""
+        self.assertEqual(
+            self.walk(),
+            [
+                "a.mp4",
+                "b.MKV",
+                "season1/ep1.mp4",
+                "season1/ep2.avi",
+                "season1/extras/trailer.mp4",
+                "tmp/partial.mp4",
+            ],
+        )
+
+    def test_non_recursive_walk(self):
+        """Test that subdirectories can be skipped."""
+        self.assertEqual(self.walk(recursive=False), ["a.mp4", "b.MKV"])
+
+    def test_globs(self):
+        """Test include and exclude patterns."""
+        self.assertEqual(
+            self.walk(include=["season1/*"], exclude=["*/extras", "tmp"]),
+            ["season1/ep1.mp4", "season1/ep2.avi"],
+        )
+
+    def test_custom_extensions(self):
+        """Test overriding the extension set."""
+        self.assertEqual(self.walk(extensions=["txt"]), ["notes.txt"])
+        self.assertEqual(len(self.walk(extensions=())), 7)
+
+    @unittest.skipIf(sys.platform == "win32", "symlinks need privileges")
+    def test_symlink_loop(self):
+        """Test that a symlink back to an ancestor is walked only once."""
+        os.symlink(self.root, self.root / "season1" / "loop")
+        os.symlink(self.root / "a.mp4", self.root / "link.mp4")
+
+        self.assertNotIn("link.mp4", self.walk())
+        followed = self.walk(follow_symlinks=True)
+        self.assertIn("link.mp4", followed)
+        self.assertEqual(len(followed), 7)
+
+    def test_early_stop(self):
+        """Test that the generator can be abandoned mid-walk."""
+        walk = iter_media_files(str(self.root), max_workers=2)
+        self.assertIsNotNone(next(walk))
+        walk.close()
+
+
+class FakeExtractor:
+    """Succeeds for every input except names containing "bad"."""
+
+    def extract_from_file(self, input_file, output_format, quality):
+        ok = "bad" not in input_file
+        return {
+            "success": ok,
+            "error": "" if ok else "boom",
+            "output": "",
+            "exit_code": 0 if ok else 1,
+        }
+
+
+class TestRunBatch(unittest.TestCase):
+    """Test cases for run_batch."""
+
+    def test_results_and_summary(self):
+        """Test that every input yields one result."""
+        inputs = [f"clip{i}.mp4" for i in range(20)] + ["bad.mp4"]
+        results = list(run_batch(FakeExtractor(), iter(inputs), max_workers=3))
+        self.assertEqual(sorted(r["input"] for r in results), sorted(inputs))
+
+        summary = summarize_batch(results)
+        self.assertFalse(summary["success"])
+        self.assertEqual(summary["processed"], 21)
+        self.assertEqual(summary["failed"], 1)
+        self.assertIn("bad.mp4: boom", summary["error"])
+
+
+class CountingExtractor(AudioExtractor):
+    """AudioExtractor whose jobs only count calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def select_engine(self, engine=None):
+        return "ffmpeg"
+
+    def extract_from_file(self, input_file, output_format, quality, **options):
+        with self._lock:
+            self.calls += 1
+        return FakeExtractor().extract_from_file(input_file, output_format, quality)
+
+
+class TestIterBatch(unittest.TestCase):
+    """Test cases for AudioExtractor.iter_batch."""
+
+    def setUp(self):
+        """Create a tree of 10 directories with 30 files each."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        for d in range(10):
+            directory = self.root / f"d{d}"
+            directory.mkdir()
+            for f in range(30):
+                (directory / f"clip{f}.mp4").write_bytes(b"")
+
+    def tearDown(self):
+        """Remove the tree."""
+        self.tmpdir.cleanup()
+
+    def test_yields_every_file(self):
+        """Test that a full iteration extracts each file once."""
+        extractor = CountingExtractor()
+        results = list(
+            extractor.iter_batch(
+                str(self.root), recursive=True, sniff=False, max_workers=2
+            )
+        )
+        self.assertEqual(len(results), 300)
+        self.assertEqual(len({r["input"] for r in results}), 300)
+        self.assertEqual(extractor.calls, 300)
+
+    def test_early_stop_cancels_remaining_jobs(self):
+        """Test that closing the iterator stops scheduling jobs."""
+        extractor = CountingExtractor()
+        results = extractor.iter_batch(
+            str(self.root), recursive=True, sniff=False, max_workers=2
+        )
+        for _ in range(3):
+            next(results)
+        results.close()
+        # At most the in-flight window (twice max_workers) ran past the stop
+        self.assertLessEqual(extractor.calls, 3 + 4)
+
+    def test_missing_directory(self):
+        """Test that setup errors are raised when the iterator is created."""
+        with self.assertRaises(ValueError):
+            CountingExtractor().iter_batch(str(self.root / "missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for the fake tool stand-ins and the scale-simulation harness.
+"""
+
+import subprocess
+import sys
+import unittest
+import urllib.request
+from pathlib import Path
+
+# Add src and the fakes to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent / "fakes"))
+
+from harness import simulate
+from http_fixture import FixtureServer
+from toolchain import FakeToolchain
+
+
+@unittest.skipIf(sys.platform == "win32", "fake tools are shebang scripts")
+class TestFakeTools(unittest.TestCase):
+    """Test cases for the fake executables."""
+
+    def test_failures_are_deterministic(self):
+        with FakeToolchain({"seed": 3, "ffmpeg": {"failure_rate": 0.5}}) as tools:
+            outcomes = []
+            for _ in range(2):
+                outcomes.append(
+                    [
+                        subprocess.run(
+                            [tools.ffmpeg, "-i", f"in{i}.mp4", str(tools.root / "o")],
+                            capture_output=True,
+                        ).returncode
+                        for i in range(10)
+                    ]
+                )
+        self.assertEqual(outcomes[0], outcomes[1])
+        self.assertIn(0, outcomes[0])
+        self.assertIn(1, outcomes[0])
+
+    def test_progress_and_output(self):
+        profile = {"ffmpeg": {"progress_steps": 3, "output_bytes": 10}}
+        with FakeToolchain(profile) as tools:
+            output = tools.root / "out.mp3"
+            result = subprocess.run(
+                [tools.ffmpeg, "-progress", "pipe:1", "-i", "x", str(output)],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(output.stat().st_size, 10)
+        self.assertEqual(result.stdout.count("out_time_ms="), 3)
+        self.assertTrue(result.stdout.rstrip().endswith("progress=end"))
+
+    def test_fixture_server(self):
+        with FixtureServer({"/a.mp4": b"data"}) as server:
+            with urllib.request.urlopen(server.url("/a.mp4")) as response:
+                self.assertEqual(response.read(), b"data")
+        self.assertEqual(server.requests, 1)
+
+
+@unittest.skipIf(sys.platform == "win32", "fake tools are shebang scripts")
+class TestHarness(unittest.TestCase):
+    """Test cases for simulated runs through the extractor."""
+
+    def test_file_and_url_modes(self):
+        profile = {"ffmpeg": {"failure_rate": 0.2}}
+        with FakeToolchain(profile) as tools:
+            for mode in ("file", "core", "url"):
+                with self.subTest(mode=mode):
+                    report = simulate(tools, 12, mode=mode, workers=4)
+                    self.assertEqual(report["jobs"], 12)
+                    self.assertEqual(report["succeeded"] + report["failed"], 12)
+                    self.assertGreater(report["succeeded"], 0)
+                    self.assertGreater(report["throughput"], 0)
+                    self.assertGreaterEqual(
+                        report["latency_p99"], report["latency_p50"]
+                    )
+            self.assertEqual(report["http_requests"], 12)
+
+    def test_batch_mode(self):
+        with FakeToolchain() as tools:
+            report = simulate(tools, 10, mode="batch", workers=4)
+        self.assertEqual(report["succeeded"], 10)
+        self.assertIn("growth_per_1k_jobs", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests for acoustic fingerprints and batch duplicate detection.
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.cache import MediaCache
+from audio_extractor_ui.engine import FFmpegEngine
+from audio_extractor_ui.fingerprint import (
+    FINGERPRINT_SAMPLE_RATE,
+    FINGERPRINT_VERSION,
+    HOP_SIZE,
+    DuplicateFilter,
+    FingerprintIndex,
+    bit_error_rate,
+    compute_fingerprint,
+)
+from audio_extractor_ui.pcm import NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+RATE = FINGERPRINT_SAMPLE_RATE
+
+
+def signal(seed: int, seconds: float = 10.0) -> "np.ndarray":
+    return np.random.default_rng(seed).standard_normal(int(seconds * RATE))
+
+
+class FakeExtractor:
+    """Records extractions and writes a dummy output file."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.extracted = []
+
+    def extract_from_file(self, path, output_format, quality, **options):
+        self.extracted.append(path)
+        output = self.output_dir / f"{Path(path).stem}.{output_format}"
+        output.write_bytes(b"audio")
+        return {"success": True, "output_path": str(output)}
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestFingerprint(unittest.TestCase):
+    """Test cases for fingerprint computation and lookup."""
+
+    def test_reencoded_copy_matches(self):
+        original = signal(1)
+        noisy = 0.5 * original + 0.02 * signal(2)
+        a = compute_fingerprint(original, RATE)
+        b = compute_fingerprint(noisy, RATE)
+        self.assertLess(bit_error_rate(a, b), 0.2)
+        self.assertGreater(
+            bit_error_rate(a, compute_fingerprint(signal(3), RATE)), 0.35
+        )
+
+    def test_index_finds_shifted_copy(self):
+        index = FingerprintIndex()
+        index.add("a", compute_fingerprint(signal(1), RATE))
+        index.add("b", compute_fingerprint(signal(4), RATE))
+
+        shifted = compute_fingerprint(signal(1)[3 * HOP_SIZE :], RATE)
+        key, ber = index.query(shifted)
+        self.assertEqual(key, "a")
+        self.assertLess(ber, 0.1)
+        self.assertIsNone(index.query(compute_fingerprint(signal(5), RATE)))
+
+    def test_duplicate_filter(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            cache = MediaCache(tmp / "cache")
+            output_dir = tmp / "output"
+            output_dir.mkdir()
+            sources = {"one": 1, "one_copy": 1, "two": 2}
+            for name, seed in sources.items():
+                path = tmp / f"{name}.mp4"
+                path.write_bytes(name.encode())
+                codes = compute_fingerprint(signal(seed), RATE)
+                cache.set(
+                    str(path),
+                    "fingerprint",
+                    {"version": FINGERPRINT_VERSION, "codes": codes},
+                )
+
+            extractor = FakeExtractor(output_dir)
+            duplicates = DuplicateFilter(FFmpegEngine(), mode="link", cache=cache)
+            results = [
+                duplicates.extract(extractor, str(tmp / f"{name}.mp4"), "mp3", "high")
+                for name in sources
+            ]
+
+            self.assertEqual(len(extractor.extracted), 2)
+            self.assertEqual(results[1]["duplicate_of"], str(tmp / "one.mp4"))
+            linked = output_dir / "one_copy.mp3"
+            self.assertEqual(
+                linked.stat().st_ino, (output_dir / "one.mp3").stat().st_ino
+            )
+            self.assertEqual(
+                duplicates.report(),
+                [[str(tmp / "one.mp4"), str(tmp / "one_copy.mp4")]],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests for stream, stdin and archive member inputs.
+"""
+
+import io
+import sys
+import tarfile
+import unittest
+import zipfile
+from pathlib import Path
+
+# Add src and the fakes to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent / "fakes"))
+
+from toolchain import MP4_HEADER, FakeToolchain
+
+from audio_extractor_ui.inputs import (
+    ArchiveMember,
+    input_label,
+    input_name,
+    is_stream_input,
+    iter_archive_members,
+    peek_head,
+)
+
+BODY = MP4_HEADER + b"\0" * 200000
+
+
+class TestInputs(unittest.TestCase):
+    """Test cases for input helpers."""
+
+    def test_kinds_and_names(self):
+        self.assertFalse(is_stream_input("clip.mp4"))
+        self.assertFalse(is_stream_input(Path("clip.mp4")))
+        self.assertTrue(is_stream_input("-"))
+        self.assertTrue(is_stream_input(b"data"))
+        self.assertEqual(input_name("-"), "stdin")
+        self.assertEqual(input_name(ArchiveMember("a.zip", "x/clip.mkv")), "clip.mkv")
+        self.assertEqual(input_label(b"abc"), "<3 bytes>")
+        self.assertEqual(str(ArchiveMember("a.zip", "x/clip.mkv")), "a.zip!x/clip.mkv")
+
+    def test_peek_head_replays_bytes(self):
+        head, stream = peek_head(io.BytesIO(b"0123456789"), 4)
+        self.assertEqual(head, b"0123")
+        self.assertEqual(stream.read(3), b"012")
+        self.assertEqual(stream.read(), b"3456789")
+
+
+@unittest.skipIf(sys.platform == "win32", "fake tools are shebang scripts")
+class TestStreamExtraction(unittest.TestCase):
+    """Test cases for extracting from streams and archives."""
+
+    def setUp(self):
+        self.tools = FakeToolchain()
+        self.tools.__enter__()
+        self.extractor = self.tools.extractor()
+
+    def tearDown(self):
+        self.tools.__exit__(None, None, None)
+
+    def test_bytes_and_file_objects(self):
+        result = self.extractor.extract_from_file(BODY, engine="ffmpeg")
+        self.assertTrue(result["success"], result["error"])
+        self.assertEqual(Path(result["output_path"]).name, "stream.mp3")
+        self.assertEqual(result["metrics"]["path"], "ffmpeg-stdin")
+
+        rejected = self.extractor.extract_from_file(io.BytesIO(b"junk" * 100))
+        self.assertEqual(rejected.error_category, "invalid_input")
+        normalized = self.extractor.extract_from_file(BODY, normalize=True)
+        self.assertEqual(normalized.error_category, "invalid_input")
+
+    def test_archives(self):
+        bundle = self.tools.root / "bundle.zip"
+        with zipfile.ZipFile(bundle, "w", zipfile.ZIP_DEFLATED) as archive:
+            for index in range(3):
+                archive.writestr(f"videos/clip{index}.mp4", BODY)
+            archive.writestr("readme.txt", "notes")
+            # Same base name in two folders
+            archive.writestr("a/clip.mp4", BODY)
+            archive.writestr("../b/clip.mp4", BODY)
+        tarball = self.tools.root / "bundle.tar.gz"
+        with tarfile.open(tarball, "w:gz") as archive:
+            info = tarfile.TarInfo("videos/extra.mkv")
+            info.size = len(BODY)
+            archive.addfile(info, io.BytesIO(BODY))
+
+        members = list(iter_archive_members(bundle))
+        self.assertEqual(
+            [m.member for m in members],
+            [f"videos/clip{i}.mp4" for i in range(3)] + ["a/clip.mp4", "../b/clip.mp4"],
+        )
+        self.assertEqual(members[-1].folder, "b")
+        summary = self.extractor.extract_archive(str(bundle), max_workers=2)
+        self.assertTrue(summary["success"], summary["error"])
+        output_dir = self.extractor.output_dir
+        self.assertEqual(
+            sorted(
+                Path(r["output_path"]).relative_to(output_dir).as_posix()
+                for r in summary["results"]
+            ),
+            [
+                "a/clip.mp3",
+                "b/clip.mp3",
+                "videos/clip0.mp3",
+                "videos/clip1.mp3",
+                "videos/clip2.mp3",
+            ],
+        )
+        result = self.extractor.extract_from_file(
+            ArchiveMember(tarball, "videos/extra.mkv")
+        )
+        self.assertTrue(result["success"], result["error"])
+        missing = self.extractor.extract_from_file(ArchiveMember(bundle, "nope.mp4"))
+        self.assertEqual(missing.error_category, "invalid_input")
+        # Nothing was unpacked next to the archives
+        self.assertEqual(sorted(p.name for p in self.tools.root.glob("*.mp4")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
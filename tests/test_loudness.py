@@ -0,0 +1,135 @@
+"""
+Tests for loudness normalization and cached measurements.
+"""
+
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.cache import MediaCache
+from audio_extractor_ui.engine import FFmpegEngine
+from audio_extractor_ui.loudness import (
+    AlbumGain,
+    LoudnessTarget,
+    album_loudness,
+    loudnorm_filter,
+    measure_loudness,
+    parse_loudnorm_output,
+)
+
+LOUDNORM_STDERR = textwrap.dedent("""\
+    size=N/A time=00:01:30.50 bitrate=N/A speed= 400x
+    [Parsed_loudnorm_0 @ 0x55d0]
+    {
+    \t"input_i" : "-18.20",
+    \t"input_tp" : "-0.40",
+    \t"input_lra" : "6.10",
+    \t"input_thresh" : "-28.50",
+    \t"output_i" : "-23.00",
+    \t"target_offset" : "0.10"
+    }
+    """)
+
+
+class FakeEngine(FFmpegEngine):
+    """FFmpegEngine running a fake ffmpeg script."""
+
+    def __init__(self, ffmpeg):
+        self._ffmpeg = ffmpeg
+
+    @property
+    def ffmpeg(self):
+        return self._ffmpeg
+
+
+class TestLoudnormParsing(unittest.TestCase):
+    """Test cases for measurement parsing and filter building."""
+
+    def test_parse(self):
+        """Test parsing of the loudnorm JSON block and duration."""
+        measurement = parse_loudnorm_output(LOUDNORM_STDERR)
+        self.assertEqual(measurement["input_i"], -18.2)
+        self.assertEqual(measurement["input_thresh"], -28.5)
+        self.assertEqual(measurement["duration"], 90.5)
+        self.assertIsNone(parse_loudnorm_output("no json here"))
+
+    def test_second_pass_filter(self):
+        """Test the measured loudnorm filter."""
+        measurement = parse_loudnorm_output(LOUDNORM_STDERR)
+        graph = loudnorm_filter(measurement, LoudnessTarget(integrated=-16))
+        self.assertIn("I=-16", graph)
+        self.assertIn("measured_I=-18.2", graph)
+        self.assertIn("offset=0.1:linear=true", graph)
+        self.assertNotIn("aresample", graph)
+        # loudnorm outputs 192 kHz: resample back when asked to
+        graph = loudnorm_filter(measurement, sample_rate=44100)
+        self.assertTrue(graph.endswith(",aresample=44100"))
+
+        silent = dict(measurement, input_i=float("-inf"))
+        self.assertIsNone(loudnorm_filter(silent))
+
+    def test_album_loudness(self):
+        """Test energy-domain averaging weighted by duration."""
+        same = [{"input_i": -20.0, "duration": 10}, {"input_i": -20.0, "duration": 30}]
+        self.assertAlmostEqual(album_loudness(same), -20.0)
+
+        mixed = [{"input_i": -10.0, "duration": 1}, {"input_i": -30.0, "duration": 1}]
+        self.assertAlmostEqual(album_loudness(mixed), -12.97, places=2)
+        self.assertIsNone(album_loudness([{"input_i": -80.0}]))
+
+        gain = AlbumGain(-3.0, LoudnessTarget())
+        self.assertTrue(gain.to_filter().startswith("volume=-3.00dB,alimiter"))
+
+
+@unittest.skipIf(sys.platform == "win32", "fake ffmpeg is a shell script")
+class TestMeasurementCache(unittest.TestCase):
+    """Test cases for cached first-pass measurements."""
+
+    def setUp(self):
+        """Set up a fake ffmpeg and a private media cache."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = Path(self.tmpdir.name)
+        (root / "stderr.txt").write_text(LOUDNORM_STDERR)
+        self.calls = root / "calls.log"
+        ffmpeg = root / "ffmpeg"
+        ffmpeg.write_text(
+            "#!/bin/sh\n"
+            'echo run >> "$(dirname "$0")/calls.log"\n'
+            'cat "$(dirname "$0")/stderr.txt" >&2\n'
+        )
+        ffmpeg.chmod(0o755)
+        self.engine = FakeEngine(str(ffmpeg))
+        self.cache = MediaCache(root / "cache")
+        self.source = root / "talk.mkv"
+        self.source.write_bytes(b"x" * 1000)
+
+    def tearDown(self):
+        """Remove temporary files."""
+        self.tmpdir.cleanup()
+
+    def test_measured_once_per_range_and_target(self):
+        """Test that repeated measurements reuse the cache."""
+        source = str(self.source)
+        first = measure_loudness(source, self.engine, cache=self.cache)
+        again = measure_loudness(
+            source, self.engine, target=LoudnessTarget(), cache=self.cache
+        )
+        self.assertEqual(first, again)
+        self.assertEqual(len(self.calls.read_text().splitlines()), 1)
+
+        measure_loudness(source, self.engine, start_time="10", cache=self.cache)
+        self.assertEqual(len(self.calls.read_text().splitlines()), 2)
+        # The target offset depends on the target, so it is measured again
+        measure_loudness(
+            source, self.engine, target=LoudnessTarget(-16), cache=self.cache
+        )
+        self.assertEqual(len(self.calls.read_text().splitlines()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tests for per-stage timings and metrics sinks.
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src and the fakes to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent / "fakes"))
+
+from toolchain import FakeToolchain
+
+from audio_extractor_ui.batch import summarize_batch
+from audio_extractor_ui.core import AudioExtractor
+from audio_extractor_ui.metrics import (
+    JsonlSink,
+    MemorySink,
+    StageTimer,
+    add_sink,
+    emit,
+    percentile,
+    remove_sink,
+    summarize_timings,
+)
+from audio_extractor_ui.probe import probe_media
+
+
+class FailingSink:
+    def emit(self, record):
+        raise RuntimeError("sink down")
+
+
+class TestStageTimer(unittest.TestCase):
+    """Test cases for stage timing."""
+
+    def test_stages_accumulate(self):
+        timer = StageTimer()
+        with timer.stage("probe"):
+            pass
+        with timer.stage("probe"):
+            pass
+        with self.assertRaises(ValueError):
+            with timer.stage("encode"):
+                raise ValueError("failed")
+
+        report = timer.as_dict()
+        self.assertEqual(set(report["stages"]), {"probe", "encode"})
+        self.assertGreaterEqual(report["total"], report["stages"]["probe"])
+
+
+class TestSinks(unittest.TestCase):
+    """Test cases for the sink registry."""
+
+    def test_emit_to_sinks(self):
+        memory = MemorySink()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "metrics.jsonl"
+            sinks = (FailingSink(), memory, JsonlSink(path))
+            for sink in sinks:
+                add_sink(sink)
+            try:
+                emit({"total": 1.5})
+                emit({"total": 2.5})
+            finally:
+                for sink in sinks:
+                    remove_sink(sink)
+
+            lines = path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual([json.loads(line)["total"] for line in lines], [1.5, 2.5])
+        self.assertEqual(len(memory.records), 2)
+
+    def test_extraction_result_carries_metrics(self):
+        memory = MemorySink()
+        add_sink(memory)
+        try:
+            result = AudioExtractor().extract_from_url(
+                "https://example.com/v", output_format="flac"
+            )
+        finally:
+            remove_sink(memory)
+
+        metrics = result["metrics"]
+        self.assertIn("validation", metrics["stages"])
+        for key in ("engine", "path", "input_bytes", "output_bytes", "speed"):
+            self.assertIn(key, metrics)
+        self.assertEqual(len(memory.records), 1)
+        record = memory.records[0]
+        self.assertEqual(record["source"], "https://example.com/v")
+        self.assertEqual(record["format"], "flac")
+        self.assertEqual(record["success"], result["success"])
+
+    @unittest.skipIf(sys.platform == "win32", "fake tools are shebang scripts")
+    def test_media_duration_without_probing(self):
+        with FakeToolchain() as tools:
+            extractor = tools.extractor()
+            source = tools.make_inputs(1)[0]
+            plain = extractor.extract_from_file(source, engine="ffmpeg")
+            self.assertTrue(plain["success"], plain["error"])
+            # ffprobe is not run just for the metrics
+            self.assertNotIn("probe", plain["metrics"]["stages"])
+            self.assertIsNone(plain.media_duration)
+            self.assertEqual(
+                extractor.extract_from_file(source, duration="5").media_duration, 5.0
+            )
+            # An earlier probe is reused
+            probe_media(source)
+            cached = extractor.extract_from_file(source, engine="ffmpeg")
+            self.assertNotIn("probe", cached["metrics"]["stages"])
+            self.assertEqual(cached.media_duration, 60.0)
+
+
+class TestSummaries(unittest.TestCase):
+    """Test cases for batch percentiles."""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+
+    def test_summarize(self):
+        results = [
+            {
+                "input": f"{index}.mp4",
+                "success": True,
+                "metrics": {"stages": {"encode": float(index)}, "total": index + 1.0},
+            }
+            for index in range(1, 21)
+        ]
+        results.append({"input": "x.mp4", "success": False, "error": "bad"})
+
+        summary = summarize_timings(results)
+        self.assertEqual(summary["encode"]["count"], 20)
+        self.assertEqual(summary["encode"]["p50"], 10.0)
+        self.assertEqual(summary["encode"]["p95"], 19.0)
+        self.assertEqual(summary["total"]["p99"], 21.0)
+        self.assertEqual(summarize_batch(results)["timings"], summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for decoding audio into NumPy arrays.
+"""
+
+import gc
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Add src and the fakes to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent / "fakes"))
+
+from toolchain import FakeToolchain
+
+from audio_extractor_ui.pcm import NUMPY_AVAILABLE
+from audio_extractor_ui.staging import StagingArea
+
+
+@unittest.skipIf(sys.platform == "win32", "fake tools are shebang scripts")
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestPCMArrays(unittest.TestCase):
+    """Test cases for extract_to_array and iter_frames."""
+
+    def setUp(self):
+        # 8000 bytes: 1000 stereo float32 frames
+        self.tools = FakeToolchain({"ffmpeg": {"output_bytes": 8000}})
+        self.tools.__enter__()
+        self.extractor = self.tools.extractor()
+        self.input = self.tools.make_inputs(1)[0]
+        self.scratch = self.tools.root / "scratch"
+        self.scratch.mkdir()
+
+    def tearDown(self):
+        self.tools.__exit__(None, None, None)
+
+    def test_extract_to_array(self):
+        array = self.extractor.extract_to_array(
+            self.input, start_time="1", duration="2", scratch_dir=str(self.scratch)
+        )
+        self.assertEqual(array.shape, (1000, 2))
+        self.assertEqual(str(array.dtype), "float32")
+        self.assertEqual(float(abs(array).sum()), 0.0)
+        # Writes stay private to the mapping
+        array[0, 0] = 1.0
+        if os.name != "nt":
+            self.assertEqual(os.listdir(self.scratch), [])
+
+        mono = self.extractor.extract_to_array(self.input, channels=1, dtype="int16")
+        self.assertEqual(mono.shape, (4000, 1))
+
+    def test_empty_and_staged(self):
+        self.tools.configure({"ffmpeg": {"output_bytes": 0}})
+        empty = self.extractor.extract_to_array(
+            self.input, scratch_dir=str(self.scratch)
+        )
+        self.assertEqual(empty.shape, (0, 2))
+        self.assertEqual(os.listdir(self.scratch), [])
+
+        self.tools.configure({"ffmpeg": {"output_bytes": 8000}})
+        with StagingArea(self.scratch, capacity=2**30) as area:
+            self.extractor.staging = area
+            array = self.extractor.extract_to_array(self.input, duration="2")
+            # 2 s of 48 kHz stereo float32, held while the array is alive
+            self.assertGreaterEqual(area.reserved, 2 * 48000 * 8)
+            del array
+            gc.collect()
+            self.assertEqual(area.reserved, 0)
+
+    def test_iter_frames(self):
+        blocks = list(self.extractor.iter_frames(self.input, frames=300))
+        self.assertEqual([len(b) for b in blocks], [300, 300, 300, 100])
+        # Copies own their data instead of viewing the shared buffer
+        self.assertIsNone(blocks[0].base)
+
+        early = self.extractor.iter_frames(self.input, frames=10)
+        self.assertEqual(next(early).shape, (10, 2))
+        early.close()
+
+    def test_noisy_stderr(self):
+        # More warnings than a pipe buffer holds, before any audio
+        self.tools.configure({"ffmpeg": {"output_bytes": 8000, "stderr_bytes": 200000}})
+        blocks = list(self.extractor.iter_frames(self.input, frames=500))
+        self.assertEqual([len(b) for b in blocks], [500, 500])
+
+    def test_failures(self):
+        with self.assertRaises(ValueError):
+            self.extractor.iter_frames(self.input, dtype="float64")
+        with self.assertRaises(ValueError):
+            self.extractor.extract_to_array(str(self.scratch / "missing.mp4"))
+        self.tools.configure({"ffmpeg": {"failure_rate": 1.0}})
+        with self.assertRaises(RuntimeError):
+            self.extractor.extract_to_array(self.input, scratch_dir=str(self.scratch))
+        self.assertEqual(os.listdir(self.scratch), [])
+        with self.assertRaises(RuntimeError):
+            list(self.extractor.iter_frames(self.input))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+Tests for post-processing pipelines compiled to one filter graph.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add src and the fakes to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent / "fakes"))
+
+from toolchain import MP4_HEADER, FakeToolchain
+
+from audio_extractor_ui import core, resources
+from audio_extractor_ui.pipeline import (
+    CompileContext,
+    Pipeline,
+    Resample,
+    StreamLayout,
+)
+
+SOURCE = StreamLayout(sample_rate=48000, channels=2, duration=60.0)
+
+
+class TestPipelineCompile(unittest.TestCase):
+    """Test cases for Pipeline.compile."""
+
+    def test_chain_and_no_ops(self):
+        pipeline = (
+            Pipeline()
+            .resample(48000)
+            .highpass(80)
+            .downmix(1)
+            .trim(5, 20)
+            .fade(fade_in=1, fade_out=2)
+        )
+        compiled = pipeline.compile(SOURCE)
+        self.assertEqual(compiled.dropped, ["resample"])
+        self.assertEqual(
+            compiled.graph,
+            "highpass=f=80:poles=2,aformat=channel_layouts=mono,"
+            "atrim=start=5.000:end=20.000,asetpts=PTS-STARTPTS,"
+            "afade=t=in:d=1.000,afade=t=out:st=13.000:d=2.000",
+        )
+        self.assertEqual(compiled.layout.channels, 1)
+        self.assertEqual(compiled.layout.duration, 15.0)
+
+        # Nothing to do for a mono 16 kHz source
+        mono = StreamLayout(sample_rate=16000, channels=1, duration=60.0)
+        compiled = Pipeline().resample(16000).downmix(1).trim(0, 90).compile(mono)
+        self.assertIsNone(compiled.graph)
+        self.assertEqual(len(compiled.dropped), 3)
+
+    def test_resampler_and_normalize(self):
+        resample = Pipeline([Resample(16000, "high")])
+        soxr = resample.compile(SOURCE, CompileContext(soxr=True))
+        self.assertIn("resampler=soxr:precision=28", soxr.graph)
+        self.assertIn("filter_size=64", resample.compile(SOURCE).graph)
+
+        # loudnorm outputs 192 kHz, so the source rate is restored after it
+        compiled = Pipeline().normalize().compile(SOURCE)
+        self.assertTrue(compiled.graph.startswith("loudnorm=I=-23.0"))
+        self.assertTrue(compiled.graph.endswith("aresample=48000"))
+        measured = {
+            "input_i": -30.0,
+            "input_tp": -5.0,
+            "input_lra": 4.0,
+            "input_thresh": -40.0,
+        }
+        compiled = (
+            Pipeline()
+            .normalize()
+            .resample(22050)
+            .compile(SOURCE, CompileContext(measurement=measured))
+        )
+        self.assertIn("linear=true", compiled.graph)
+        self.assertEqual(compiled.graph.count("aresample"), 1)
+
+        # Once an earlier stage changed the audio the measurement is stale
+        compiled = (
+            Pipeline()
+            .highpass(80)
+            .normalize()
+            .compile(SOURCE, CompileContext(measurement=measured))
+        )
+        self.assertNotIn("measured_I", compiled.graph)
+        self.assertNotIn("linear=true", compiled.graph)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Pipeline().fade(fade_out=1).compile(StreamLayout())
+        with self.assertRaises(ValueError):
+            Pipeline().trim(90).compile(SOURCE)
+        with self.assertRaises(ValueError):
+            Pipeline().downmix(3)
+        with self.assertRaises(ValueError):
+            Pipeline().resample(16000, quality="best")
+
+
+@unittest.skipIf(sys.platform == "win32", "fake tools are shebang scripts")
+class TestPipelineExtraction(unittest.TestCase):
+    """Test cases for pipelines applied by extract_from_file."""
+
+    def setUp(self):
+        self.tools = FakeToolchain()
+        self.tools.__enter__()
+        self.extractor = self.tools.extractor()
+        self.input = self.tools.make_inputs(1)[0]
+
+    def tearDown(self):
+        self.tools.__exit__(None, None, None)
+
+    def test_single_pass(self):
+        commands = []
+        run_measured = resources.run_measured
+
+        def record(cmd, **kwargs):
+            commands.append(cmd)
+            return run_measured(cmd, **kwargs)
+
+        pipeline = Pipeline().resample(48000).downmix(1).highpass(60).fade(0.5, 0.5)
+        with mock.patch.object(resources, "run_measured", side_effect=record):
+            result = self.extractor.extract_from_file(
+                self.input, "flac", duration="10", pipeline=pipeline
+            )
+        self.assertTrue(result["success"], result["error"])
+        self.assertEqual(result["metrics"]["path"], "ffmpeg")
+        # One ffmpeg run decodes, filters and encodes
+        self.assertEqual(len(commands), 1)
+        graph = commands[0][commands[0].index("-af") + 1]
+        self.assertNotIn("aresample", graph)
+        self.assertIn("afade=t=out:st=9.500", graph)
+
+    def test_normalize_keeps_pipeline_rate(self):
+        commands = []
+        run_measured = resources.run_measured
+
+        def record(cmd, **kwargs):
+            commands.append(cmd)
+            return run_measured(cmd, **kwargs)
+
+        measured = {
+            "input_i": -30.0,
+            "input_tp": -5.0,
+            "input_lra": 4.0,
+            "input_thresh": -40.0,
+        }
+        with mock.patch.object(
+            core, "measure_loudness", return_value=measured
+        ), mock.patch.object(resources, "run_measured", side_effect=record):
+            result = self.extractor.extract_from_file(
+                self.input,
+                "flac",
+                pipeline=Pipeline().resample(16000),
+                normalize=True,
+            )
+        self.assertTrue(result["success"], result["error"])
+        graph = commands[0][commands[0].index("-af") + 1]
+        # loudnorm's 192 kHz goes back to the pipeline's rate, not the source's
+        self.assertTrue(graph.endswith(",aresample=16000"), graph)
+        self.assertNotIn("48000", graph)
+
+    def test_rejections(self):
+        result = self.extractor.extract_from_file(
+            self.input, pipeline=Pipeline().highpass(), chunks=4
+        )
+        self.assertEqual(result.error_category, "invalid_input")
+        result = self.extractor.extract_from_file(
+            MP4_HEADER, pipeline=Pipeline().fade(fade_out=1)
+        )
+        # A stream's length is unknown, so it cannot be faded out
+        self.assertEqual(result.error_category, "invalid_input")
+        self.assertIn("fade-out", result.error)
+        result = self.extractor.extract_from_file(
+            self.input, pipeline=Pipeline().normalize(), normalize=True
+        )
+        self.assertEqual(result.error_category, "invalid_input")
+
+
+if __name__ == "__main__":
+    unittest.main()
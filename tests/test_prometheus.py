@@ -0,0 +1,160 @@
+"""
+Tests for the Prometheus metrics registry and endpoint.
+"""
+
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui import metrics
+from audio_extractor_ui.cache import MediaCache
+from audio_extractor_ui.prometheus import (
+    CACHE_LOOKUPS,
+    JOBS_COMPLETED,
+    JOBS_FAILED,
+    JOBS_STARTED,
+    Registry,
+    expose_queue,
+    start_http_server,
+)
+
+
+def parse(text):
+    """Map "name{labels}" to values, ignoring comments."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestRegistry(unittest.TestCase):
+    """Test cases for sharded metrics and rendering."""
+
+    def test_counter_shards_from_threads(self):
+        registry = Registry()
+        counter = registry.counter("jobs", "Jobs", ("format",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc(format="mp3")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        # Scrape while the workers run, then again once they have exited
+        registry.render()
+        for thread in threads:
+            thread.join()
+        counter.inc(2, format="wav")
+
+        text = registry.render()
+        self.assertIn("# TYPE jobs_total counter\n", text)
+        samples = parse(text)
+        self.assertEqual(samples['jobs_total{format="mp3"}'], 8000)
+        self.assertEqual(samples['jobs_total{format="wav"}'], 2)
+        self.assertEqual(parse(registry.render()), samples)
+
+    def test_histogram(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=[1, 5])
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        samples = parse(registry.render())
+        self.assertEqual(samples['latency_seconds_bucket{le="1.0"}'], 2)
+        self.assertEqual(samples['latency_seconds_bucket{le="5.0"}'], 3)
+        self.assertEqual(samples['latency_seconds_bucket{le="+Inf"}'], 4)
+        self.assertEqual(samples["latency_seconds_sum"], 14.5)
+        self.assertEqual(samples["latency_seconds_count"], 4)
+
+    def test_gauge_and_labels(self):
+        registry = Registry()
+        gauge = registry.gauge("depth", "Depth", ("lane",))
+        gauge.set(3, lane='a"b')
+        self.assertIn('depth{lane="a\\"b"} 3', registry.render())
+        gauge.set_function(lambda: {("interactive",): 1})
+        self.assertEqual(parse(registry.render()), {'depth{lane="interactive"}': 1})
+        with self.assertRaises(ValueError):
+            gauge.set(1, other="x")
+        with self.assertRaises(ValueError):
+            registry.gauge("depth", "Again")
+
+
+class TestEndpoint(unittest.TestCase):
+    """Test cases for scraping the HTTP endpoint."""
+
+    def setUp(self):
+        self.server = start_http_server(0)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def scrape(self):
+        url = f"{self.url}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            content_type = response.headers["Content-Type"]
+            self.assertTrue(content_type.startswith("text/plain"))
+            return parse(response.read().decode("utf-8"))
+
+    def test_job_metrics(self):
+        labels = {"format": "flac", "engine": "ffmpeg"}
+        before = (
+            JOBS_STARTED.values().get(("flac", "ffmpeg"), 0),
+            JOBS_COMPLETED.values().get(("flac", "ffmpeg"), 0),
+            JOBS_FAILED.values().get(("flac", "ffmpeg"), 0),
+        )
+        record = dict(labels, total=0.3, stages={"encode": 0.2}, input_bytes=1000)
+        metrics.started(dict(labels, source="a.mp4"))
+        metrics.emit(dict(record, success=True))
+        metrics.started(dict(labels, source="b.mp4"))
+        metrics.emit(dict(record, success=False))
+        expose_queue(lambda: {"background": 4}, lambda: 2)
+        self.addCleanup(expose_queue, dict, int)
+
+        samples = self.scrape()
+        key = '{format="flac",engine="ffmpeg"}'
+        for name, count in zip(("started", "completed", "failed"), before):
+            self.assertEqual(
+                samples[f"audio_extractor_jobs_{name}_total{key}"],
+                count + (2 if name == "started" else 1),
+            )
+        self.assertIn(
+            'audio_extractor_stage_duration_seconds_count{stage="encode"}', samples
+        )
+        self.assertEqual(samples['audio_extractor_queue_depth{lane="background"}'], 4)
+        self.assertEqual(samples["audio_extractor_jobs_in_flight"], 2)
+
+    def test_cache_hit_ratio(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = Path(temp_dir) / "a.mp4"
+            source.write_bytes(b"media")
+            cache = MediaCache(Path(temp_dir) / "cache")
+            cache.get(str(source), "test-field")
+            cache.set(str(source), "test-field", 1)
+            for _ in range(3):
+                cache.get(str(source), "test-field")
+
+        self.assertEqual(CACHE_LOOKUPS.values()[("test-field", "hit")], 3)
+        samples = self.scrape()
+        self.assertEqual(
+            samples['audio_extractor_cache_hit_ratio{field="test-field"}'], 0.75
+        )
+
+    def test_unknown_path(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(f"{self.url}/other", timeout=5)
+        self.assertEqual(raised.exception.code, 404)
+        raised.exception.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Tests for process resource accounting.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui import resources
+from audio_extractor_ui.resources import (
+    TreeSampler,
+    combine_usage,
+    process_tree,
+    run_measured,
+    summarize_resources,
+)
+
+PROC_AVAILABLE = hasattr(os, "wait4") and os.path.exists("/proc/self/io")
+
+# Parent process that starts a child allocating memory and writing a file
+TREE_SCRIPT = """
+import subprocess, sys
+child = (
+    "import sys, time\\n"
+    "block = bytearray(40 * 1024 * 1024)\\n"
+    "open(sys.argv[1], 'wb').write(bytes(2 * 1024 * 1024))\\n"
+    "time.sleep(0.6)\\n"
+)
+subprocess.run([sys.executable, "-c", child, sys.argv[1]], check=True)
+print(sys.stdin.read().upper())
+sys.exit(3)
+"""
+
+
+@unittest.skipUnless(PROC_AVAILABLE, "requires os.wait4 and /proc")
+class TestRunMeasured(unittest.TestCase):
+    """Test cases for measuring a process tree."""
+
+    def test_process_tree_usage(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = str(Path(temp_dir) / "out.bin")
+            result, usage = run_measured(
+                [sys.executable, "-c", TREE_SCRIPT, target],
+                text=True,
+                input="hello",
+            )
+
+        self.assertEqual(result.returncode, 3)
+        self.assertEqual(result.stdout.strip(), "HELLO")
+        self.assertGreater(usage["cpu_user"] + usage["cpu_system"], 0)
+        # The child's 40 MiB are visible in both the rusage and the samples
+        self.assertGreater(usage["max_rss"], 40 * 1024 * 1024)
+        self.assertGreater(usage["peak_tree_rss"], 40 * 1024 * 1024)
+        self.assertGreaterEqual(usage["write_bytes"], 2 * 1024 * 1024)
+        self.assertGreaterEqual(usage["processes"], 2)
+
+    def test_signal_exit(self):
+        result, _ = run_measured(["sh", "-c", "kill -TERM $$"])
+        self.assertEqual(result.returncode, -15)
+
+    def test_one_thread_samples_all_trees(self):
+        samplers = [TreeSampler(os.getpid()) for _ in range(3)]
+        for sampler in samplers:
+            sampler.start()
+        try:
+            names = [thread.name for thread in threading.enumerate()]
+            self.assertEqual(names.count("resources"), 1)
+            deadline = time.monotonic() + 5
+            while not all(s.peak_rss for s in samplers):
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+        finally:
+            for sampler in samplers:
+                sampler.stop()
+
+
+class TestProcessTree(unittest.TestCase):
+    """Test cases for finding a process's descendants."""
+
+    def write(self, path, text):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    def test_task_children_files(self):
+        with tempfile.TemporaryDirectory() as proc:
+            root = Path(proc)
+            # Process 10 has two threads; 11 and 12 are their children
+            self.write(root / "10/task/10/children", "11 ")
+            self.write(root / "10/task/13/children", "12 ")
+            self.write(root / "11/task/11/children", "14 ")
+            self.write(root / "12/task/12/children", "")
+            self.write(root / "14/task/14/children", "")
+            with mock.patch.multiple(resources, PROC=proc, _TASK_CHILDREN=True):
+                with mock.patch.object(
+                    resources, "_read_children", side_effect=AssertionError
+                ):
+                    self.assertEqual(sorted(process_tree(10)), [10, 11, 12, 14])
+
+    def test_stat_fallback(self):
+        with tempfile.TemporaryDirectory() as proc:
+            root = Path(proc)
+            self.write(root / "10/stat", "10 (ff mpeg) S 1 10")
+            self.write(root / "11/stat", "11 (sh) S 10 10")
+            self.write(root / "12/stat", "12 (x) S 11 10")
+            self.write(root / "13/stat", "13 (y) S 1 13")
+            with mock.patch.multiple(resources, PROC=proc, _TASK_CHILDREN=False):
+                self.assertEqual(process_tree(10), [10, 11, 12])
+
+
+class TestAggregation(unittest.TestCase):
+    """Test cases for combining and summarizing usage."""
+
+    def usage(self, cpu, rss):
+        return {
+            "cpu_user": cpu,
+            "cpu_system": 0.0,
+            "max_rss": rss,
+            "peak_tree_rss": None,
+            "read_bytes": 10,
+            "write_bytes": 20,
+            "processes": 1,
+        }
+
+    def test_combine(self):
+        combined = combine_usage(self.usage(1.0, 100), self.usage(2.0, 300))
+        self.assertEqual(combined["cpu_user"], 3.0)
+        self.assertEqual(combined["max_rss"], 300)
+        self.assertEqual(combined["write_bytes"], 40)
+        self.assertIsNone(combined["peak_tree_rss"])
+        self.assertEqual(combine_usage(None, self.usage(1.0, 1))["max_rss"], 1)
+
+    def test_summarize(self):
+        results = [{"resources": self.usage(1.0, rss)} for rss in range(1, 21)]
+        results.append({"success": False})
+        summary = summarize_resources(results)
+        self.assertEqual(summary["jobs"], 20)
+        self.assertEqual(summary["total"]["cpu_user"], 20.0)
+        self.assertEqual(summary["rss_p95"], 19)
+        self.assertEqual(summary["rss_max"], 20)
+        self.assertEqual(summarize_resources([{}]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
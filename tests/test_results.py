@@ -0,0 +1,136 @@
+"""
+Tests for the compact result records.
+"""
+
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.batch import summarize_batch
+from audio_extractor_ui.results import (
+    BatchResult,
+    ExtractionResult,
+    classify_error,
+    read_jsonl,
+    write_jsonl,
+)
+
+METRICS = {
+    "stages": {"validation": 0.01, "encode": 2.0, "postprocess": 0.001},
+    "total": 2.5,
+    "engine": "ffmpeg",
+    "path": "ffmpeg",
+    "input_bytes": 1000,
+    "output_bytes": 200,
+    "media_duration": 10.0,
+    "speed": 5.0,
+}
+
+LEGACY = {
+    "success": True,
+    "error": "",
+    "output": "done",
+    "exit_code": 0,
+    "output_path": "/out/a.mp3",
+    "resources": {"cpu_user": 1.0},
+    "metrics": METRICS,
+}
+
+
+class TestExtractionResult(unittest.TestCase):
+    """Test cases for ExtractionResult."""
+
+    def test_round_trips_legacy_dict(self):
+        result = ExtractionResult.from_dict(LEGACY)
+        self.assertEqual(result, LEGACY)
+        self.assertEqual(result.to_dict(), LEGACY)
+        self.assertEqual(result["metrics"]["total"], 2.5)
+        self.assertEqual(result.engine, "ffmpeg")
+        self.assertEqual(result.stages["encode"], 2.0)
+        self.assertFalse(hasattr(result, "__dict__"))
+
+    def test_resources_only_at_top_level(self):
+        # Older results repeated the usage inside "metrics"
+        nested = dict(LEGACY, metrics=dict(METRICS, resources={"cpu_user": 1.0}))
+        del nested["resources"]
+        result = ExtractionResult.from_dict(nested)
+        self.assertEqual(result.to_dict(), LEGACY)
+        self.assertNotIn("resources", result["metrics"])
+
+    def test_mapping_access(self):
+        result = ExtractionResult.failure("missing", "invalid_input")
+        self.assertFalse(result["success"])
+        self.assertIsNone(result.get("output_path"))
+        self.assertNotIn("metrics", result)
+        self.assertNotIn("output_path", result)
+        result["duplicate_of"] = "/in/b.mp4"
+        self.assertEqual(result["duplicate_of"], "/in/b.mp4")
+        self.assertEqual(
+            list(result),
+            ["success", "error", "output", "exit_code", "error_category"]
+            + ["duplicate_of"],
+        )
+        with self.assertRaises(KeyError):
+            result["outputs"]
+
+    def test_unknown_stages_are_kept(self):
+        result = ExtractionResult()
+        result.stages = {"encode": 1.0, "upload": 3.0}
+        self.assertEqual(result.stages, {"encode": 1.0, "upload": 3.0})
+
+    def test_error_categories(self):
+        self.assertIsNone(classify_error(LEGACY))
+        failed = {"success": False, "error": "x", "output": "", "exit_code": 1}
+        self.assertEqual(ExtractionResult.from_dict(failed).error_category, "process")
+        failed["exit_code"] = -9
+        self.assertEqual(classify_error(failed), "killed")
+        failed["exit_code"] = -1
+        self.assertEqual(classify_error(failed), "error")
+
+
+class TestJsonLines(unittest.TestCase):
+    """Test cases for JSON Lines serialization."""
+
+    def test_write_and_read(self):
+        results = [
+            ExtractionResult.from_dict(dict(LEGACY, input=f"/in/{i}.mp4"))
+            for i in range(2500)
+        ]
+        results.append(ExtractionResult.failure("bad", "invalid_input"))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "results.jsonl"
+            self.assertEqual(write_jsonl(results, path), 2501)
+            lines = path.read_text(encoding="utf-8").splitlines()
+            loaded = list(read_jsonl(path))
+        self.assertEqual(len(lines), 2501)
+        self.assertNotIn(" ", lines[0])
+        self.assertEqual(loaded, results)
+        self.assertEqual(loaded[-1].error_category, "invalid_input")
+
+    def test_batch_result(self):
+        results = [
+            ExtractionResult.from_dict(dict(LEGACY, input="/in/a.mp4")),
+            ExtractionResult.from_dict(
+                {"success": False, "error": "x", "output": "", "exit_code": 1}
+            ),
+        ]
+        results[1].input = "/in/b.mp4"
+        summary = summarize_batch(results)
+        self.assertIsInstance(summary, BatchResult)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["timings"]["encode"]["count"], 1)
+        self.assertEqual(summary.error_counts(), {"process": 1})
+        self.assertNotIn("results", summary.to_json())
+
+        buffer = io.StringIO()
+        self.assertEqual(summary.write_jsonl(buffer), 2)
+        self.assertEqual(buffer.getvalue().count("\n"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
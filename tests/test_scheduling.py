@@ -0,0 +1,137 @@
+"""
+Tests for cost-based job scheduling.
+"""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.batch import run_batch
+from audio_extractor_ui.scheduling import JobQueue, JobScheduler, estimate_cost
+
+
+def probe(duration, codec="aac"):
+    return {"duration": duration, "audio": [{"codec": codec}]}
+
+
+class TestCostEstimate(unittest.TestCase):
+    """Test cases for job cost estimates."""
+
+    def test_duration_and_codec(self):
+        short = estimate_cost("a.mp4", "mp3", probe=probe(30))
+        long = estimate_cost("b.mp4", "mp3", probe=probe(6 * 3600))
+        self.assertLess(short, long)
+        self.assertLess(
+            estimate_cost("b.mp4", "wav", probe=probe(600)),
+            estimate_cost("b.mp4", "mp3", probe=probe(600)),
+        )
+
+    def test_no_copy_discount(self):
+        # Sources are always re-encoded, even into their own codec
+        self.assertEqual(
+            estimate_cost("a.m4a", "aac", probe=probe(600, "aac")),
+            estimate_cost("a.mp4", "aac", probe=probe(600, "opus")),
+        )
+
+
+class TestJobScheduler(unittest.TestCase):
+    """Test cases for shortest-first ordering, aging and lanes."""
+
+    def test_shortest_first(self):
+        scheduler = JobScheduler(aging_rate=0.0)
+        for name, cost in (("long", 100), ("short", 1), ("mid", 10)):
+            scheduler.push(name, cost, now=0)
+        order = [scheduler.pop(timeout=0) for _ in range(3)]
+        self.assertEqual(order, ["short", "mid", "long"])
+        self.assertIsNone(scheduler.pop(timeout=0))
+
+    def test_aging(self):
+        scheduler = JobScheduler(aging_rate=1.0)
+        scheduler.push("long", 100, now=0)
+        scheduler.push("short", 1, now=50)
+        self.assertEqual(scheduler.pop(timeout=0), "short")
+        # After waiting long enough the long job overtakes new short ones
+        scheduler.push("late", 1, now=200)
+        self.assertEqual(scheduler.pop(timeout=0), "long")
+
+    def test_interactive_lane(self):
+        scheduler = JobScheduler()
+        scheduler.push("batch", 0, now=0)
+        scheduler.push("gui", 1000, interactive=True, now=10)
+        self.assertEqual(scheduler.depth(), {"interactive": 1, "background": 1})
+        self.assertEqual(scheduler.pop(timeout=0), "gui")
+
+
+class TestJobQueue(unittest.TestCase):
+    """Test cases for the worker queue."""
+
+    def test_runs_jobs_in_cost_order(self):
+        queue = JobQueue(max_workers=1)
+        gate = threading.Event()
+        order = []
+
+        blocker = queue.submit(gate.wait)
+        futures = [
+            queue.submit(order.append, name, cost=cost)
+            for name, cost in (("slow", 50), ("fast", 1))
+        ]
+        futures.append(queue.submit(order.append, "gui", cost=99, interactive=True))
+        gate.set()
+        for future in [blocker] + futures:
+            future.result(timeout=5)
+        queue.shutdown()
+
+        self.assertEqual(order, ["gui", "fast", "slow"])
+
+    def test_exceptions_reach_the_future(self):
+        queue = JobQueue(max_workers=1)
+        future = queue.submit(int, "not a number")
+        with self.assertRaises(ValueError):
+            future.result(timeout=5)
+        queue.shutdown()
+
+    def test_batch_jobs_yield_to_interactive_ones(self):
+        queue = JobQueue(max_workers=1)
+        gate = threading.Event()
+        order = []
+
+        class Extractor:
+            def extract_from_file(self, path, output_format, quality):
+                order.append(path)
+                return {"success": True}
+
+        blocker = queue.submit(gate.wait)
+        batch = threading.Thread(
+            target=lambda: list(
+                run_batch(Extractor(), ["a", "b"], max_workers=1, queue=queue)
+            )
+        )
+        batch.start()
+        deadline = time.monotonic() + 5
+        while queue.depth()["background"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        gui = queue.submit(order.append, "gui", cost=99, interactive=True)
+        gate.set()
+        blocker.result(timeout=5)
+        gui.result(timeout=5)
+        batch.join(timeout=5)
+        queue.shutdown()
+
+        self.assertEqual(order, ["gui", "a", "b"])
+
+    def test_reserve(self):
+        queue = JobQueue(max_workers=1)
+        queue.reserve(3)
+        queue.reserve(2)
+        self.assertEqual(queue.max_workers, 3)
+        self.assertEqual(queue.submit(sum, [1, 2]).result(timeout=5), 3)
+        queue.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
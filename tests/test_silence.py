@@ -0,0 +1,100 @@
+"""
+Tests for vectorized silence detection.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add src and the fakes to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent / "fakes"))
+
+from toolchain import FakeToolchain
+
+from audio_extractor_ui.pcm import NUMPY_AVAILABLE
+from audio_extractor_ui.silence import detect_silence, plan_segments
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+RATE = 1000
+
+
+def tone(seconds: float) -> "np.ndarray":
+    frames = int(seconds * RATE)
+    samples = 0.5 * np.sin(np.arange(frames) * 0.3, dtype=np.float32)
+    return np.stack([samples, samples], axis=1)
+
+
+def silence(seconds: float) -> "np.ndarray":
+    return np.zeros((int(seconds * RATE), 2), dtype=np.float32)
+
+
+def in_blocks(audio: "np.ndarray", size: int = 333):
+    for start in range(0, len(audio), size):
+        yield audio[start : start + size]
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestDetectSilence(unittest.TestCase):
+    """Test cases for detect_silence and plan_segments."""
+
+    def test_leading_trailing_and_internal(self):
+        audio = np.concatenate(
+            [silence(1.0), tone(2.0), silence(1.0), tone(2.0), silence(0.5)]
+        )
+        analysis = detect_silence(in_blocks(audio), RATE, min_silence=0.5)
+
+        self.assertAlmostEqual(analysis["duration"], 6.5)
+        self.assertAlmostEqual(analysis["leading"], 1.0, places=2)
+        self.assertAlmostEqual(analysis["trailing"], 0.5, places=2)
+        self.assertEqual(len(analysis["internal"]), 1)
+        start, end = analysis["internal"][0]
+        self.assertAlmostEqual(start, 3.0, places=2)
+        self.assertAlmostEqual(end, 4.0, places=2)
+
+    def test_short_gaps_are_ignored(self):
+        audio = np.concatenate([tone(1.0), silence(0.2), tone(1.0)])
+        analysis = detect_silence(in_blocks(audio), RATE, min_silence=0.5)
+
+        self.assertEqual(analysis["leading"], 0.0)
+        self.assertEqual(analysis["trailing"], 0.0)
+        self.assertEqual(analysis["internal"], [])
+
+    def test_plan_segments(self):
+        audio = np.concatenate(
+            [silence(1.0), tone(2.0), silence(1.0), tone(2.0), silence(0.5)]
+        )
+        analysis = detect_silence(in_blocks(audio), RATE)
+
+        (trim,) = plan_segments(analysis, "trim")
+        self.assertAlmostEqual(trim[0], 1.0, places=2)
+        self.assertAlmostEqual(trim[1], 6.0, places=2)
+        self.assertEqual(len(plan_segments(analysis, "split")), 2)
+
+    def test_all_silent(self):
+        analysis = detect_silence(in_blocks(silence(2.0)), RATE)
+        self.assertEqual(plan_segments(analysis, "trim"), [])
+
+
+@unittest.skipIf(sys.platform == "win32", "fake tools are shebang scripts")
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestExtractWithSilence(unittest.TestCase):
+    """Test cases for extract_with_silence."""
+
+    def test_spool_stays_out_of_output_dir(self):
+        with FakeToolchain({"ffmpeg": {"output_bytes": 8000}}) as tools:
+            extractor = tools.extractor()
+            source = tools.make_inputs(1)[0]
+            result = extractor.extract_with_silence(source)
+            self.assertTrue(result["success"], result["error"])
+            # Only the encoded file lands next to the user's outputs
+            self.assertEqual(
+                sorted(p.name for p in extractor.output_dir.iterdir()),
+                [Path(result["output_path"]).name],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
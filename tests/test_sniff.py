@@ -0,0 +1,138 @@
+"""
+Tests for content-based media container detection.
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.sniff import filter_media, sniff_bytes, sniff_file
+
+
+def pad(header: bytes, size: int = 1024) -> bytes:
+    """Pad a header with zero bytes."""
+    return header + b"\0" * (size - len(header))
+
+
+SAMPLES = {
+    "mp4": pad(b"\0\0\0\x20ftypisom\0\0\x02\0"),
+    "mov": pad(b"\0\0\0\x14ftypqt  \0\0\0\0"),
+    "m4a": pad(b"\0\0\0\x20ftypM4A \0\0\0\0"),
+    "matroska": pad(b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\x82\x88matroska"),
+    "webm": pad(b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\x82\x84webm"),
+    "avi": pad(b"RIFF\0\0\0\0AVI LIST"),
+    "wav": pad(b"RIFF\0\0\0\0WAVEfmt "),
+    "flv": pad(b"FLV\x01\x05\0\0\0\x09"),
+    "ogg": pad(b"OggS\0\x02"),
+    "asf": pad(bytes.fromhex("3026B2758E66CF11A6D900AA0062CE6C")),
+    "flac": pad(b"fLaC\0\0\0\x22"),
+    "aac": pad(b"\xff\xf1\x50\x80"),
+    # Two 417-byte frames: MPEG-1 layer III, 128 kbit/s, 44.1 kHz
+    "mp3": pad(pad(b"\xff\xfb\x90\x64", 417) + b"\xff\xfb\x90\x64"),
+}
+
+# Text starting with a UTF-16LE byte order mark
+UTF16_TEXT = "Meeting notes, not a song.\n".encode("utf-16-le") * 40
+
+# QuickTime files without an ftyp box
+OLD_MOVIES = [
+    pad(b"\0\0\0\x08wide\0\x10\0\0mdat"),
+    pad(b"\0\0\0\0mdat"),
+    pad(b"\0\0\x12\x34moov\0\0\0\x6cmvhd"),
+]
+
+
+class TestSniffBytes(unittest.TestCase):
+    """Test cases for sniff_bytes."""
+
+    def test_known_containers(self):
+        """Test recognition of every supported signature."""
+        for expected, data in SAMPLES.items():
+            with self.subTest(container=expected):
+                self.assertEqual(sniff_bytes(data), expected)
+
+    def test_mpegts(self):
+        """Test MPEG-TS detection from packet sync bytes."""
+        packet = b"\x47" + b"\0" * 187
+        self.assertEqual(sniff_bytes(packet * 4), "mpegts")
+
+    def test_non_media(self):
+        """Test that text and random data are rejected."""
+        self.assertIsNone(sniff_bytes(pad(b"hello, this is a text file")))
+        self.assertIsNone(sniff_bytes(pad(b"%PDF-1.7")))
+        self.assertIsNone(sniff_bytes(b"short"))
+        self.assertIsNone(sniff_bytes(pad(b"The free software movement")))
+        self.assertIsNone(sniff_bytes(pad(b"\0\0\0\x02skip")))
+
+    def test_mp3_frame_checks(self):
+        """Test that bytes merely starting with an MPEG sync are rejected."""
+        self.assertIsNone(sniff_bytes(b"\xff\xfe" + UTF16_TEXT))
+        self.assertIsNone(sniff_bytes(pad(b"\xff\xfe\x00\x00")))
+        # Invalid bitrate index 15 and sample-rate index 3
+        self.assertIsNone(sniff_bytes(pad(b"\xff\xfb\xf0\x64")))
+        self.assertIsNone(sniff_bytes(pad(b"\xff\xfb\x9c\x64")))
+        # A single frame header, with no second one where it should be
+        self.assertIsNone(sniff_bytes(pad(b"\xff\xfb\x90\x64")))
+
+    def test_quicktime_without_ftyp(self):
+        """Test old QuickTime files recognised by a plausible first box."""
+        for data in OLD_MOVIES:
+            self.assertEqual(sniff_bytes(data), "mov")
+
+
+class TestSniffFile(unittest.TestCase):
+    """Test cases for file-level sniffing."""
+
+    def setUp(self):
+        """Create sample files."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        """Remove sample files."""
+        self.tmpdir.cleanup()
+
+    def write(self, name: str, data: bytes) -> str:
+        path = self.root / name
+        path.write_bytes(data)
+        return str(path)
+
+    def test_mislabeled_and_truncated(self):
+        """Test extension-independent detection."""
+        odd_name = self.write("recording.dat", SAMPLES["matroska"])
+        fake_video = self.write("fake.mp4", pad(b"not really a video"))
+        truncated = self.write("cut.mp4", b"\0\0\0\x20ftypisom")
+
+        self.assertEqual(sniff_file(odd_name), "matroska")
+        self.assertIsNone(sniff_file(fake_video))
+        self.assertIsNone(sniff_file(truncated))
+        self.assertIsNone(sniff_file(str(self.root / "missing.mp4")))
+
+    def test_id3_tag_is_skipped(self):
+        """Test that a large ID3 tag does not hide the audio stream."""
+        tag_size = 6000
+        size_bytes = bytes((tag_size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+        tag = b"ID3\x04\0\0" + size_bytes + b"\0" * tag_size
+        path = self.write("song.bin", tag + SAMPLES["aac"])
+        self.assertEqual(sniff_file(path), "aac")
+
+    def test_filter_media(self):
+        """Test bulk filtering with rejected paths collected."""
+        good = [self.write(f"{name}.bin", data) for name, data in SAMPLES.items()]
+        bad = [
+            self.write("readme.mp4", pad(b"# README")),
+            self.write("notes.mp3", b"\xff\xfe" + UTF16_TEXT),
+        ]
+        rejected = []
+
+        accepted = list(filter_media(good + bad, rejected=rejected, max_workers=4))
+        self.assertEqual(sorted(accepted), sorted(good))
+        self.assertEqual(sorted(rejected), sorted(bad))
+
+
+if __name__ == "__main__":
+    unittest.main()
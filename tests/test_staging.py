@@ -0,0 +1,211 @@
+"""
+Tests for output staging and atomic publishing.
+"""
+
+import errno
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add src and the fakes to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent / "fakes"))
+
+from toolchain import FakeToolchain
+
+from audio_extractor_ui import chunked, staging
+from audio_extractor_ui.pcm import NUMPY_AVAILABLE
+from audio_extractor_ui.staging import (
+    DEFAULT_ESTIMATE,
+    StagingArea,
+    estimate_output_bytes,
+    publish_file,
+)
+
+
+class TestStagingArea(unittest.TestCase):
+    """Test cases for StagingArea."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_estimate(self):
+        self.assertEqual(estimate_output_bytes("mp3", "high", None), DEFAULT_ESTIMATE)
+        mp3 = estimate_output_bytes("mp3", "high", 60)
+        self.assertGreater(mp3, 60 * 40000)
+        self.assertGreater(estimate_output_bytes("wav", "high", 60), mp3)
+
+    def test_reservations_wait_for_space(self):
+        area = StagingArea(self.root / "scratch", capacity=100)
+        self.assertTrue(area.reserve(80))
+        self.assertFalse(area.reserve(40, timeout=0.05))
+
+        admitted = threading.Event()
+        waiter = threading.Thread(target=lambda: area.reserve(40) and admitted.set())
+        waiter.start()
+        self.assertFalse(admitted.wait(0.05))
+        area.release(80)
+        waiter.join(5)
+        self.assertTrue(admitted.is_set())
+        # An oversized job is admitted once the area is empty
+        area.release(40)
+        self.assertTrue(area.reserve(1000, timeout=0.05))
+        area.close()
+        self.assertFalse(area.root.exists())
+
+    def test_stage_publishes_and_cleans_up(self):
+        output_dir = self.root / "output"
+        with StagingArea(self.root / "scratch", capacity=10) as area:
+            with area.stage(output_dir, 5) as job:
+                (job.directory / "a.mp3").write_bytes(b"audio")
+                published = job.publish()
+            with area.stage(output_dir, 5) as failed:
+                (failed.directory / "b.mp3").write_bytes(b"part")
+            self.assertEqual(area.reserved, 0)
+            self.assertEqual(list(area.root.iterdir()), [])
+        self.assertEqual(
+            published, {str(job.directory / "a.mp3"): str(output_dir / "a.mp3")}
+        )
+        self.assertEqual(sorted(os.listdir(output_dir)), ["a.mp3"])
+
+    def test_publish_across_file_systems(self):
+        source = self.root / "staged.mp3"
+        source.write_bytes(b"audio")
+        destination = self.root / "out" / "final.mp3"
+        cross_device = OSError(errno.EXDEV, "Invalid cross-device link")
+        real_replace = os.replace
+        calls = []
+
+        def replace(src, dst):
+            calls.append(Path(src).name)
+            if len(calls) == 1:
+                raise cross_device
+            return real_replace(src, dst)
+
+        with mock.patch.object(staging.os, "replace", side_effect=replace):
+            publish_file(source, destination)
+        self.assertEqual(destination.read_bytes(), b"audio")
+        self.assertFalse(source.exists())
+        # The copy was renamed into place from a hidden partial file
+        self.assertTrue(calls[1].startswith(".final.mp3."))
+        self.assertTrue(calls[1].endswith(".partial"))
+        self.assertEqual(os.listdir(destination.parent), ["final.mp3"])
+
+
+@unittest.skipIf(sys.platform == "win32", "fake tools are shebang scripts")
+class TestStagedExtraction(unittest.TestCase):
+    """Test cases for extractions through a staging area."""
+
+    def test_only_successful_outputs_are_published(self):
+        profile = {"ffmpeg": {"output_bytes": 100}}
+        with FakeToolchain(profile) as tools:
+            inputs = tools.make_inputs(2)
+            extractor = tools.extractor()
+            with StagingArea(tools.root / "scratch", capacity=1 << 30) as area:
+                extractor.staging = area
+                result = extractor.extract_from_file(inputs[0], engine="ffmpeg")
+                tools.configure({"ffmpeg": {"failure_rate": 1.0}})
+                failed = extractor.extract_from_file(inputs[1], engine="ffmpeg")
+                self.assertEqual(list(area.root.iterdir()), [])
+            self.assertTrue(result["success"], result["error"])
+            self.assertEqual(Path(result["output_path"]).parent, extractor.output_dir)
+            self.assertEqual(result.output_bytes, 100)
+            self.assertFalse(failed["success"])
+            self.assertEqual(
+                os.listdir(extractor.output_dir), [Path(result["output_path"]).name]
+            )
+
+    def test_chunked_outputs_are_staged(self):
+        with FakeToolchain({"ffmpeg": {"output_bytes": 8000}}) as tools:
+            inputs = tools.make_inputs(2)
+            extractor = tools.extractor()
+            with StagingArea(tools.root / "scratch", capacity=1 << 30) as area:
+                extractor.staging = area
+                chunked = extractor.extract_from_file(inputs[0], "flac", chunks=2)
+                tools.configure({"ffmpeg": {"failure_rate": 1.0}})
+                failed = extractor.extract_from_file(inputs[1], "flac", chunks=2)
+                self.assertEqual(list(area.root.iterdir()), [])
+            self.assertTrue(chunked["success"], chunked["error"])
+            self.assertFalse(failed["success"])
+            # Neither the segments' work directory nor a partial join remain
+            self.assertEqual(
+                os.listdir(extractor.output_dir), [Path(chunked["output_path"]).name]
+            )
+
+    def test_chunked_resume_with_staging(self):
+        commands = []
+        run_measured = chunked.run_measured
+        join = chunked.ChunkedEncoder._join
+        joins = []
+
+        def record(cmd, **kwargs):
+            commands.append(cmd)
+            return run_measured(cmd, **kwargs)
+
+        def fail_first_join(encoder, *args):
+            joins.append(args)
+            result, usage = join(encoder, *args)
+            if len(joins) == 1:
+                result.returncode = 1
+            return result, usage
+
+        with FakeToolchain({"ffmpeg": {"output_bytes": 8000}}) as tools:
+            source = tools.make_inputs(1)[0]
+            extractor = tools.extractor()
+            with StagingArea(tools.root / "scratch", capacity=1 << 30) as area:
+                extractor.staging = area
+                with mock.patch.object(
+                    chunked, "run_measured", side_effect=record
+                ), mock.patch.object(
+                    chunked.ChunkedEncoder,
+                    "_join",
+                    autospec=True,
+                    side_effect=fail_first_join,
+                ):
+                    failed = extractor.extract_from_file(source, "flac", chunks=2)
+                    work_dir = area.work_dir(
+                        extractor.output_dir / Path(source).with_suffix(".flac").name
+                    )
+                    self.assertTrue((work_dir / chunked.MANIFEST_NAME).exists())
+                    result = extractor.extract_from_file(source, "flac", chunks=2)
+                self.assertFalse(work_dir.exists())
+            self.assertFalse(failed["success"])
+            self.assertTrue(result["success"], result["error"])
+            # Both segments were encoded once; the retry only joined them
+            segments = [cmd for cmd in commands if "chunk_" in cmd[-1]]
+            self.assertEqual(len(segments), 2)
+            self.assertEqual(len(joins), 2)
+            self.assertEqual(
+                os.listdir(extractor.output_dir), [Path(result["output_path"]).name]
+            )
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+    def test_silence_outputs_are_staged(self):
+        with FakeToolchain({"ffmpeg": {"output_bytes": 8000}}) as tools:
+            source = tools.make_inputs(1)[0]
+            extractor = tools.extractor()
+            # Smaller than the spool alone: admitted once, as one reservation
+            with StagingArea(tools.root / "scratch", capacity=1 << 20) as area:
+                extractor.staging = area
+                with mock.patch.object(area, "reserve", wraps=area.reserve) as reserve:
+                    result = extractor.extract_with_silence(source)
+                self.assertEqual(list(area.root.iterdir()), [])
+                self.assertEqual(area.reserved, 0)
+            self.assertTrue(result["success"], result["error"])
+            # 60 s of 48 kHz stereo float32 spooled, plus the output
+            self.assertEqual(reserve.call_count, 1)
+            self.assertGreater(reserve.call_args[0][0], 60 * 48000 * 2 * 4)
+            self.assertEqual(result["outputs"], [result["output_path"]])
+            self.assertEqual(Path(result["output_path"]).parent, extractor.output_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
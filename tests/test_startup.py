@@ -0,0 +1,92 @@
+"""
+Import-time budget tests for the application entry points.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# Generous ceiling on the cumulative import time of an entry point, in
+# microseconds; the real figure is a few tens of milliseconds.
+IMPORT_BUDGET_US = 150_000
+
+# Modules that must not be pulled in just by importing an entry point
+DEFERRED_MODULES = (
+    "tkinter",
+    "subprocess",
+    "importlib.util",
+    "audio_extractor_ui.gui",
+    "audio_extractor_ui.core",
+)
+
+
+def measure_import(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter with ``-X importtime``.
+
+    Returns:
+        Dict mapping imported module names to cumulative microseconds
+    """
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+class TestImportTime(unittest.TestCase):
+    """Test cases for entry point import cost."""
+
+    def test_main_defers_heavy_imports(self):
+        """Test that importing the entry point skips mode-specific modules."""
+        timings = measure_import("audio_extractor_ui.main")
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, timings)
+
+    def test_main_import_budget(self):
+        """Test that importing the entry point stays within budget."""
+        timings = measure_import("audio_extractor_ui.main")
+        self.assertLess(timings["audio_extractor_ui.main"], IMPORT_BUDGET_US)
+
+    def test_core_defers_discovery(self):
+        """Test that importing core does not create the core interface."""
+        timings = measure_import("audio_extractor_ui.core")
+        self.assertNotIn("subprocess", timings)
+        self.assertNotIn("importlib.util", timings)
+
+
+class TestLazyCoreDiscovery(unittest.TestCase):
+    """Test cases for deferred core discovery."""
+
+    def test_discovery_happens_on_first_use(self):
+        """Test that the core path is only resolved when accessed."""
+        sys.path.insert(0, str(SRC_DIR))
+        from audio_extractor_ui.integration import AudioExtractorCore
+
+        core = AudioExtractorCore()
+        self.assertFalse(core._core_path_resolved)
+        self.assertIsNone(core._core_available)
+
+        core.is_available()
+        self.assertTrue(core._core_path_resolved)
+        self.assertIsNotNone(core._core_available)
+
+
+if __name__ == "__main__":
+    unittest.main()
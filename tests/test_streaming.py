@@ -0,0 +1,98 @@
+"""
+Tests for extracting audio to memory through pipes.
+"""
+
+import io
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Add src and the fakes to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent / "fakes"))
+
+from http_fixture import FixtureServer
+from toolchain import MP4_HEADER, FakeToolchain
+
+from audio_extractor_ui.streaming import encode_command
+
+
+class TestEncodeCommand(unittest.TestCase):
+    """Test cases for encode_command."""
+
+    def test_pipe_output(self):
+        with FakeToolchain() as tools:
+            engine = tools.extractor().ffmpeg_engine
+            cmd = encode_command(engine, "in.mp4", "aac", start_time="5")
+            with self.assertRaises(ValueError):
+                encode_command(engine, "in.mp4", "m4a")
+        self.assertEqual(cmd[-3:], ["-f", "adts", "pipe:1"])
+        self.assertLess(cmd.index("-ss"), cmd.index("-i"))
+
+
+@unittest.skipIf(sys.platform == "win32", "fake tools are shebang scripts")
+class TestInMemoryExtraction(unittest.TestCase):
+    """Test cases for the bytes, file-like and chunk outputs."""
+
+    def setUp(self):
+        self.tools = FakeToolchain({"ffmpeg": {"output_bytes": 200000}})
+        self.tools.__enter__()
+        self.extractor = self.tools.extractor()
+        self.input = self.tools.make_inputs(1)[0]
+
+    def tearDown(self):
+        self.tools.__exit__(None, None, None)
+
+    def test_outputs(self):
+        data = self.extractor.extract_to_bytes(self.input)
+        chunks = list(self.extractor.iter_audio(self.input, chunk_size=65536))
+        target = io.BytesIO()
+        result = self.extractor.extract_to_stream(self.input, target, "flac")
+
+        self.assertEqual(len(data), 200000)
+        self.assertEqual([len(c) for c in chunks], [65536] * 3 + [3392])
+        self.assertTrue(result["success"])
+        self.assertNotIn("output_path", result)
+        self.assertEqual(result.output_bytes, 200000)
+        self.assertEqual(result["metrics"]["path"], "ffmpeg-pipe")
+        self.assertEqual(len(target.getvalue()), 200000)
+        # Nothing was written next to the outputs
+        self.assertEqual(os.listdir(self.extractor.output_dir), [])
+
+    def test_early_close_and_failures(self):
+        chunks = self.extractor.iter_audio(self.input, chunk_size=1000)
+        self.assertEqual(len(next(chunks)), 1000)
+        chunks.close()
+
+        with self.assertRaises(ValueError):
+            self.extractor.iter_audio(str(Path(self.input).with_name("missing")))
+        self.tools.configure({"ffmpeg": {"failure_rate": 1.0}})
+        result = self.extractor.extract_to_stream(self.input, io.BytesIO())
+        self.assertFalse(result["success"])
+        self.assertEqual(result.error_category, "process")
+        with self.assertRaises(RuntimeError):
+            self.extractor.extract_to_bytes(self.input)
+
+    def test_url(self):
+        with FixtureServer({"/clip.mp4": MP4_HEADER}) as server:
+            data = self.extractor.extract_to_bytes(server.url("/clip.mp4"))
+            missing = self.extractor.extract_to_stream(
+                server.url("/missing.mp4"), io.BytesIO()
+            )
+        self.assertEqual(len(data), 200000)
+        self.assertFalse(missing["success"])
+        self.assertEqual(missing["metrics"]["path"], "ytdlp-pipe")
+
+    def test_noisy_stderr(self):
+        # More warnings than a pipe buffer holds, from both processes
+        noisy = {"output_bytes": 200000, "stderr_bytes": 200000}
+        self.tools.configure({"ffmpeg": noisy, "yt-dlp": noisy})
+        self.assertEqual(len(self.extractor.extract_to_bytes(self.input)), 200000)
+        with FixtureServer({"/clip.mp4": MP4_HEADER}) as server:
+            data = self.extractor.extract_to_bytes(server.url("/clip.mp4"))
+        self.assertEqual(len(data), 200000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Tests for the hot-folder watch mode.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.watch import FolderWatcher, ProcessedRecord
+
+
+class FakeExtractor:
+    """Records extraction calls instead of running the core."""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def extract_from_file(self, input_file, output_format, quality):
+        with self.lock:
+            self.calls.append(input_file)
+        return {"success": True, "error": "", "output": "", "exit_code": 0}
+
+
+class TestFolderWatcher(unittest.TestCase):
+    """Test cases for FolderWatcher."""
+
+    def setUp(self):
+        """Set up watch and output folders."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = Path(self.tmpdir.name)
+        self.watch_dir = root / "incoming"
+        self.watch_dir.mkdir()
+        self.extractor = FakeExtractor(root / "output")
+        self.extractor.output_dir.mkdir()
+
+    def tearDown(self):
+        """Remove temporary folders."""
+        self.tmpdir.cleanup()
+
+    def make_watcher(self, force_polling=True):
+        """Create a watcher with short timings."""
+        return FolderWatcher(
+            str(self.watch_dir),
+            extractor=self.extractor,
+            debounce=0.0,
+            stability_interval=0.05,
+            force_polling=force_polling,
+            poll_interval=0.02,
+        )
+
+    def drive(self, watcher, until, timeout=5.0):
+        """Run the watch loop until a condition holds."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            watcher.add_candidates(watcher._source.poll(watcher._stop_event))
+            watcher.tick()
+            if until():
+                return
+            time.sleep(0.01)
+        self.fail("watcher did not reach the expected state")
+
+    def test_existing_and_new_files(self):
+        """Test that present and newly created media files are extracted."""
+        (self.watch_dir / "old.mp4").write_bytes(b"x" * 10)
+        watcher = self.make_watcher()
+        watcher.start()
+        try:
+            self.drive(watcher, lambda: len(self.extractor.calls) == 1)
+            (self.watch_dir / "new.mkv").write_bytes(b"y" * 10)
+            (self.watch_dir / "notes.txt").write_bytes(b"z" * 10)
+            self.drive(watcher, lambda: len(self.extractor.calls) == 2)
+        finally:
+            watcher.close()
+
+        names = sorted(Path(p).name for p in self.extractor.calls)
+        self.assertEqual(names, ["new.mkv", "old.mp4"])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+    def test_inotify_source(self):
+        """Test that inotify events trigger extraction."""
+        watcher = self.make_watcher(force_polling=False)
+        watcher.start()
+        try:
+            self.assertEqual(type(watcher._source).__name__, "InotifySource")
+            (self.watch_dir / "clip.mp4").write_bytes(b"x" * 10)
+            self.drive(watcher, lambda: len(self.extractor.calls) == 1)
+        finally:
+            watcher.close()
+
+    def test_growing_file_waits(self):
+        """Test that a file still being written is not picked up."""
+        watcher = self.make_watcher()
+        watcher.stability_interval = 0.3
+        watcher.start()
+        try:
+            path = self.watch_dir / "growing.mp4"
+            with open(path, "wb") as f:
+                for _ in range(5):
+                    f.write(b"x" * 10)
+                    f.flush()
+                    watcher.add_candidates([str(path)])
+                    watcher.tick()
+                    time.sleep(0.05)
+                self.assertEqual(self.extractor.calls, [])
+            self.drive(watcher, lambda: len(self.extractor.calls) == 1)
+        finally:
+            watcher.close()
+
+    def test_restart_does_not_reprocess(self):
+        """Test that the processed record survives a restart."""
+        (self.watch_dir / "clip.mp4").write_bytes(b"x" * 10)
+        watcher = self.make_watcher()
+        watcher.start()
+        try:
+            self.drive(watcher, lambda: len(self.extractor.calls) == 1)
+        finally:
+            watcher.close()
+
+        record = ProcessedRecord(watcher.record.path)
+        self.assertEqual(len(record._entries), 1)
+
+        watcher = self.make_watcher()
+        watcher.start()
+        try:
+            deadline = time.monotonic() + 0.3
+            while time.monotonic() < deadline:
+                watcher.tick()
+                time.sleep(0.02)
+        finally:
+            watcher.close()
+        self.assertEqual(len(self.extractor.calls), 1)
+
+    def test_failures_retried_with_backoff(self):
+        """Test that a failed file is retried without changing or restarting."""
+        results = [{"success": False, "error": "busy"}] * 2 + [{"success": True}]
+
+        def extract_from_file(input_file, output_format, quality):
+            with self.extractor.lock:
+                self.extractor.calls.append(input_file)
+                return results[len(self.extractor.calls) - 1]
+
+        self.extractor.extract_from_file = extract_from_file
+        (self.watch_dir / "clip.mp4").write_bytes(b"x" * 10)
+        watcher = self.make_watcher()
+        watcher.retry_backoff = 0.05
+        watcher.start()
+        try:
+            self.drive(watcher, lambda: len(self.extractor.calls) == 3)
+            # Succeeded on the third attempt, so no more retries
+            deadline = time.monotonic() + 0.3
+            while time.monotonic() < deadline:
+                watcher.tick()
+                time.sleep(0.02)
+        finally:
+            watcher.close()
+        self.assertEqual(len(self.extractor.calls), 3)
+        self.assertEqual(watcher._retries, {})
+
+
+class TestProcessedRecord(unittest.TestCase):
+    """Test cases for ProcessedRecord."""
+
+    def test_failures_retried_up_to_limit(self):
+        """Test that failed files are retried a bounded number of times."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "state.json"
+            record = ProcessedRecord(path, max_attempts=2)
+            signature = (10, 1)
+            record.mark("a.mp4", signature, {"success": False})
+            self.assertFalse(record.is_processed("a.mp4", signature))
+            # Not compacted: reloading replays the journal
+            reloaded = ProcessedRecord(path, max_attempts=2)
+            self.assertFalse(reloaded.is_processed("a.mp4", signature))
+            self.assertFalse(reloaded.journal_path.exists())
+
+            reloaded.mark("a.mp4", signature, {"success": False})
+            reloaded.mark("b.mp4", signature, {"success": True})
+            reloaded.compact()
+            record = ProcessedRecord(path, max_attempts=2)
+            self.assertTrue(record.is_processed("a.mp4", signature))
+            self.assertTrue(record.is_processed("b.mp4", signature))
+            # A changed file is tried again
+            self.assertFalse(record.is_processed("a.mp4", (11, 2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
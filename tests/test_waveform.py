@@ -0,0 +1,82 @@
+"""
+Tests for waveform peak generation and peak files.
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for testing
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_extractor_ui.pcm import NUMPY_AVAILABLE
+from audio_extractor_ui.utils import format_time, parse_time
+from audio_extractor_ui.waveform import (
+    BASE_BUCKET,
+    LEVEL_COUNT,
+    compute_peaks,
+    read_peak_file,
+    write_peak_file,
+)
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+
+class TestFormatTime(unittest.TestCase):
+    """Test cases for format_time."""
+
+    def test_round_trip(self):
+        for seconds in (0.0, 1.5, 90.25, 3723.456, 3 * 3600 + 0.001):
+            self.assertAlmostEqual(parse_time(format_time(seconds)), seconds, 3)
+
+    def test_format(self):
+        self.assertEqual(format_time(3723.456), "01:02:03.456")
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not installed")
+class TestPeaks(unittest.TestCase):
+    """Test cases for peak computation and storage."""
+
+    def setUp(self):
+        # 10 s ramp from -1 to 1 at 800 Hz, fed in uneven blocks
+        self.rate = 800
+        self.audio = np.linspace(-1, 1, 10 * self.rate, dtype=np.float32)
+        blocks = [self.audio[i : i + 999, None] for i in range(0, len(self.audio), 999)]
+        self.waveform = compute_peaks(blocks, self.rate)
+
+    def test_levels(self):
+        self.assertEqual(len(self.waveform.levels), LEVEL_COUNT)
+        base = self.waveform.levels[BASE_BUCKET]
+        self.assertEqual(len(base), -(-len(self.audio) // BASE_BUCKET))
+        self.assertEqual(base[0, 0], -127)
+        self.assertEqual(base[-1, 1], 127)
+        self.assertAlmostEqual(self.waveform.duration, 10.0)
+
+    def test_peaks_per_pixel(self):
+        minimums, maximums = self.waveform.peaks(0, 10, 20)
+        self.assertEqual(len(minimums), 20)
+        self.assertTrue(np.all(np.diff(maximums) > 0))
+        self.assertTrue(np.all(minimums <= maximums))
+
+        minimums, _ = self.waveform.peaks(5, 5.5, 1000)
+        self.assertLessEqual(len(minimums), 1000)
+        self.assertGreater(minimums.min(), -0.01)
+
+    def test_peak_file_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "test.peaks"
+            write_peak_file(path, self.waveform)
+            loaded = read_peak_file(path)
+
+            self.assertEqual(loaded.frames, self.waveform.frames)
+            for bucket, level in self.waveform.levels.items():
+                np.testing.assert_array_equal(loaded.levels[bucket], level)
+
+            path.write_bytes(path.read_bytes()[:-1])
+            self.assertIsNone(read_peak_file(path))
+
+
+if __name__ == "__main__":
+    unittest.main()